@@ -21,6 +21,7 @@ from sqlalchemy import func, and_
 from pydantic import BaseModel, Field
 
 from database import get_db, ProjectAlert, Project, User
+from backend.app.services.stat_counters import alert_counts
 
 logger = logging.getLogger(__name__)
 
@@ -272,17 +273,17 @@ async def dismiss_alerts_batch(
     try:
         logger.info(f"📥 Batch dismiss request for {len(request.alert_ids)} alerts by user {user_id}")
 
-        # Update all alerts
-        updated_count = db.query(ProjectAlert).filter(
+        # Update through the ORM so the alert stat counters see each change
+        alerts = db.query(ProjectAlert).filter(
             ProjectAlert.alert_id.in_(request.alert_ids)
-        ).update(
-            {
-                "dismissed": True,
-                "dismissed_by": user_id,
-                "dismissed_at": datetime.utcnow()
-            },
-            synchronize_session=False
-        )
+        ).all()
+
+        dismissed_at = datetime.utcnow()
+        for alert in alerts:
+            alert.dismissed = True
+            alert.dismissed_by = user_id
+            alert.dismissed_at = dismissed_at
+        updated_count = len(alerts)
 
         db.commit()
 
@@ -320,27 +321,14 @@ async def get_alert_stats(
         if not project:
             raise HTTPException(status_code=404, detail=f"Project {project_id} not found")
 
-        # Get all alerts for project
-        alerts = db.query(ProjectAlert).filter(
-            ProjectAlert.project_id == project_id
-        ).all()
-
-        # Calculate statistics
-        total_alerts = len(alerts)
-        unread_alerts = len([a for a in alerts if not a.dismissed])
-        action_required_count = len([a for a in alerts if a.action_required and not a.dismissed])
+        # Read the maintained counters instead of loading every alert
+        counts = alert_counts(db, project_id)
 
-        # Count by type
-        by_type = {}
-        for alert in alerts:
-            if not alert.dismissed:
-                by_type[alert.alert_type] = by_type.get(alert.alert_type, 0) + 1
-
-        # Count by severity
-        by_severity = {}
-        for alert in alerts:
-            if not alert.dismissed:
-                by_severity[alert.severity] = by_severity.get(alert.severity, 0) + 1
+        total_alerts = counts.total
+        unread_alerts = counts.undismissed
+        action_required_count = counts.action_required
+        by_type = counts.by_type
+        by_severity = counts.by_severity
 
         stats = AlertStats(
             total_alerts=total_alerts,
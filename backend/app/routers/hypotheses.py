@@ -409,18 +409,7 @@ async def link_hypothesis_evidence(
 
         db.add(new_evidence)
 
-        # Update evidence counts (will be automated by trigger in future)
-        if evidence.evidence_type == 'supports':
-            hypothesis.supporting_evidence_count = db.query(func.count(HypothesisEvidence.id)).filter(
-                HypothesisEvidence.hypothesis_id == hypothesis_id,
-                HypothesisEvidence.evidence_type == 'supports'
-            ).scalar() + 1
-        elif evidence.evidence_type == 'contradicts':
-            hypothesis.contradicting_evidence_count = db.query(func.count(HypothesisEvidence.id)).filter(
-                HypothesisEvidence.hypothesis_id == hypothesis_id,
-                HypothesisEvidence.evidence_type == 'contradicts'
-            ).scalar() + 1
-
+        # Hypothesis evidence counts are maintained by the stat_counters write hooks
         db.commit()
         db.refresh(new_evidence)
 
@@ -18,6 +18,7 @@ from backend.app.services.ai_triage_service import AITriageService
 from backend.app.services.enhanced_ai_triage_service import EnhancedAITriageService
 from backend.app.services.alert_generator import alert_generator
 from backend.app.services.pubmed_service import fetch_article_from_pubmed
+from backend.app.services.stat_counters import triage_counts
 import os
 
 logger = logging.getLogger(__name__)
@@ -316,29 +317,16 @@ async def get_global_stats(
         ).all()
         collection_ids = [c[0] for c in user_collections]
 
-        # Phase 3: Get ALL triages the user has access to
-        triages = db.query(PaperTriage).filter(
-            or_(
-                PaperTriage.project_id.in_(project_ids) if project_ids else False,
-                (PaperTriage.collection_id.in_(collection_ids) & PaperTriage.project_id.is_(None)) if collection_ids else False,
-                (PaperTriage.user_id == resolved_user_id) & PaperTriage.project_id.is_(None) & PaperTriage.collection_id.is_(None)
-            )
-        ).all()
-
-        # Calculate stats with context_type breakdown
-        by_context_type = {}
-        for t in triages:
-            ctx = t.context_type or "project"
-            if ctx not in by_context_type:
-                by_context_type[ctx] = 0
-            by_context_type[ctx] += 1
+        # Phase 3: Counts across ALL triages the user has access to (maintained counters)
+        counts = triage_counts(db, project_ids, collection_ids, resolved_user_id)
+        by_context_type = counts.by_context_type
 
         stats = {
-            "total": len(triages),
-            "must_read": len([t for t in triages if t.triage_status == "must_read"]),
-            "nice_to_know": len([t for t in triages if t.triage_status == "nice_to_know"]),
-            "ignored": len([t for t in triages if t.triage_status == "ignore"]),
-            "unread": len([t for t in triages if t.read_status == "unread"]),
+            "total": counts.total,
+            "must_read": counts.by_status.get("must_read", 0),
+            "nice_to_know": counts.by_status.get("nice_to_know", 0),
+            "ignored": counts.by_status.get("ignore", 0),
+            "unread": counts.by_read_status.get("unread", 0),
             "by_context_type": by_context_type
         }
 
@@ -1131,24 +1119,19 @@ async def get_inbox_stats(
         if not project:
             raise HTTPException(status_code=404, detail=f"Project {project_id} not found")
 
-        # Get all triages for project
-        triages = db.query(PaperTriage).filter(PaperTriage.project_id == project_id).all()
+        # Read the maintained counters instead of loading every triage
+        counts = triage_counts(db, project_ids=[project_id])
 
-        # Calculate stats
-        total_papers = len(triages)
-        must_read_count = len([t for t in triages if t.triage_status == "must_read"])
-        nice_to_know_count = len([t for t in triages if t.triage_status == "nice_to_know"])
-        ignore_count = len([t for t in triages if t.triage_status == "ignore"])
+        total_papers = counts.total
+        must_read_count = counts.by_status.get("must_read", 0)
+        nice_to_know_count = counts.by_status.get("nice_to_know", 0)
+        ignore_count = counts.by_status.get("ignore", 0)
 
-        unread_count = len([t for t in triages if t.read_status == "unread"])
-        reading_count = len([t for t in triages if t.read_status == "reading"])
-        read_count = len([t for t in triages if t.read_status == "read"])
+        unread_count = counts.by_read_status.get("unread", 0)
+        reading_count = counts.by_read_status.get("reading", 0)
+        read_count = counts.by_read_status.get("read", 0)
 
-        # Calculate average relevance score
-        if total_papers > 0:
-            avg_relevance_score = sum([t.relevance_score for t in triages]) / total_papers
-        else:
-            avg_relevance_score = 0.0
+        avg_relevance_score = counts.avg_relevance_score
 
         stats = InboxStats(
             total_papers=total_papers,
@@ -45,6 +45,7 @@ class TimelineResponse(BaseModel):
     events: List[ActivityEventResponse]
     total_count: int
     has_more: bool
+    next_cursor: Optional[str] = None
 
 
 # ============================================================================
@@ -56,8 +57,10 @@ async def get_project_timeline(
     project_id: str,
     limit: int = Query(50, ge=1, le=100, description="Number of events to return"),
     offset: int = Query(0, ge=0, description="Offset for pagination"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (preferred over offset)"),
     event_types: Optional[str] = Query(None, description="Comma-separated list of event types to filter"),
     actor_types: Optional[str] = Query(None, description="Comma-separated list of actor types (user, ai)"),
+    actor_ids: Optional[str] = Query(None, description="Comma-separated list of actor IDs"),
     user_id: str = Header(..., alias="User-ID"),
     db: Session = Depends(get_db)
 ):
@@ -72,8 +75,10 @@ async def get_project_timeline(
         project_id: Project ID
         limit: Maximum number of events to return (1-100, default: 50)
         offset: Offset for pagination (default: 0)
+        cursor: Keyset cursor from the previous page's next_cursor
         event_types: Filter by event types (comma-separated)
         actor_types: Filter by actor types (comma-separated: user, ai)
+        actor_ids: Filter by actor IDs (comma-separated)
         user_id: User ID from header
         db: Database session
     
@@ -89,21 +94,19 @@ async def get_project_timeline(
         # Parse filters
         event_type_list = event_types.split(',') if event_types else None
         actor_type_list = actor_types.split(',') if actor_types else None
+        actor_id_list = actor_ids.split(',') if actor_ids else None
         
-        # Get events
-        events = service.get_project_timeline(
+        # Get events (keyset page, filtered in SQL)
+        events, next_cursor = service.get_project_timeline_page(
             project_id=project_id,
-            limit=limit + 1,  # Fetch one extra to check if there are more
+            limit=limit,
+            cursor=cursor,
             offset=offset,
             event_types=event_type_list,
-            actor_types=actor_type_list
+            actor_types=actor_type_list,
+            actor_ids=actor_id_list
         )
         
-        # Check if there are more events
-        has_more = len(events) > limit
-        if has_more:
-            events = events[:limit]
-        
         # Convert to response format
         event_responses = [
             ActivityEventResponse(
@@ -126,9 +129,12 @@ async def get_project_timeline(
         return TimelineResponse(
             events=event_responses,
             total_count=len(event_responses),
-            has_more=has_more
+            has_more=next_cursor is not None,
+            next_cursor=next_cursor
         )
     
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch timeline: {str(e)}")
 
@@ -155,25 +161,8 @@ async def get_timeline_stats(
     try:
         service = ActivityLoggingService(db)
         
-        # Get all events
-        all_events = service.get_project_timeline(
-            project_id=project_id,
-            limit=1000  # Get all events for stats
-        )
-        
-        # Calculate statistics
-        stats = {
-            'total_events': len(all_events),
-            'user_actions': len([e for e in all_events if e.actor_type == 'user']),
-            'ai_actions': len([e for e in all_events if e.actor_type == 'ai']),
-            'event_type_counts': {},
-            'recent_activity': len([e for e in all_events[:10]])  # Last 10 events
-        }
-        
-        # Count by event type
-        for event in all_events:
-            event_type = event.activity_type
-            stats['event_type_counts'][event_type] = stats['event_type_counts'].get(event_type, 0) + 1
+        # Counts come from one grouped query over activity_events
+        stats = service.get_timeline_stats(project_id)
         
         return stats
     
@@ -70,6 +70,7 @@ async def get_project_summary(
 @router.post("/projects/{project_id}/summary/refresh")
 async def refresh_summary(
     project_id: str,
+    full: bool = Query(False, description="Regenerate the whole summary instead of updating changed sections"),
     user_id: str = Header(..., alias="User-ID"),
     db: Session = Depends(get_db)
 ) -> Dict:
@@ -77,7 +78,9 @@ async def refresh_summary(
     Force refresh project summary (ignores cache)
     
     Use this endpoint when you want to regenerate the summary immediately,
-    for example after adding new papers or protocols.
+    for example after adding new papers or protocols. Only the sections
+    affected by changes since the last summary are regenerated unless
+    full=true.
     """
     logger.info(f"🔄 POST /summaries/projects/{project_id}/summary/refresh")
     
@@ -95,7 +98,8 @@ async def refresh_summary(
             project_id=project_id,
             db=db,
             force_refresh=True,
-            user_id=user_id
+            user_id=user_id,
+            full_rebuild=full
         )
         
         logger.info(f"✅ Summary refreshed successfully")
@@ -7,13 +7,24 @@ Logs all user and AI actions for timeline visualization.
 This service provides a unified view of the research journey by tracking:
 - User actions (create question, hypothesis, collection, annotation, etc.)
 - AI actions (triage, evidence linking, protocol extraction, etc.)
+
+Events are stored in the append-only `activity_events` table:
+- Written in the same transaction as the mutation (mapper hooks below act
+  as a transactional outbox), so the timeline never disagrees with the data.
+- Read with keyset pagination on (created_at, event_id) and server-side
+  type/actor filters, using the (project_id, created_at) indexes.
+- History from before the table existed is reconstructed once by
+  `backfill_project` (backend/scripts/backfill_activity_events.py).
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, and_, or_
+from sqlalchemy import desc, and_, or_, event, func, inspect
 from datetime import datetime
+import base64
+import json
 import uuid
+import weakref
 
 from database import (
     ResearchQuestion,
@@ -22,13 +33,16 @@ from database import (
     Collection,
     Protocol,
     ExperimentPlan,
+    ProjectActivityEvent,
     get_db
 )
 
+TRIAGE_EVENT_STATUSES = ('must_read', 'nice_to_know')
+
 
 class ActivityEvent:
     """Data class for activity events"""
-    
+
     def __init__(
         self,
         activity_id: str,
@@ -56,7 +70,7 @@ class ActivityEvent:
         self.description = description
         self.metadata = metadata or {}
         self.created_at = created_at or datetime.utcnow()
-    
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for API response"""
         return {
@@ -74,13 +88,257 @@ class ActivityEvent:
             'created_at': self.created_at.isoformat()
         }
 
+    def to_row(self) -> Dict[str, Any]:
+        """Column values for the activity_events table"""
+        return {
+            'event_id': self.activity_id,
+            'project_id': self.project_id,
+            'activity_type': self.activity_type,
+            'actor_type': self.actor_type,
+            'actor_id': self.actor_id,
+            'entity_type': self.entity_type,
+            'entity_id': self.entity_id,
+            'action': self.action,
+            'title': self.title,
+            'description': self.description,
+            'event_metadata': self.metadata,
+            'created_at': self.created_at
+        }
+
+    @classmethod
+    def from_record(cls, record: ProjectActivityEvent) -> "ActivityEvent":
+        """Build from a stored activity_events row"""
+        return cls(
+            activity_id=record.event_id,
+            project_id=record.project_id,
+            activity_type=record.activity_type,
+            actor_type=record.actor_type,
+            actor_id=record.actor_id,
+            entity_type=record.entity_type,
+            entity_id=record.entity_id,
+            action=record.action,
+            title=record.title,
+            description=record.description,
+            metadata=record.event_metadata,
+            created_at=record.created_at
+        )
+
+
+# ============================================================================
+# Event builders (shared by live recording and backfill)
+# ============================================================================
+
+def question_event(q: ResearchQuestion, created_at: Optional[datetime] = None) -> ActivityEvent:
+    return ActivityEvent(
+        activity_id=str(uuid.uuid4()),
+        project_id=q.project_id,
+        activity_type='question_created',
+        actor_type='user',
+        actor_id=q.created_by or 'unknown',
+        entity_type='question',
+        entity_id=q.question_id,
+        action='created',
+        title='Created Research Question',
+        description=q.question_text,
+        metadata={
+            'question_type': q.question_type,
+            'status': q.status
+        },
+        created_at=created_at or q.created_at
+    )
+
+
+def hypothesis_event(h: Hypothesis, created_at: Optional[datetime] = None) -> ActivityEvent:
+    return ActivityEvent(
+        activity_id=str(uuid.uuid4()),
+        project_id=h.project_id,
+        activity_type='hypothesis_created',
+        actor_type='user',
+        actor_id=h.created_by or 'unknown',
+        entity_type='hypothesis',
+        entity_id=h.hypothesis_id,
+        action='created',
+        title='Created Hypothesis',
+        description=h.hypothesis_text,
+        metadata={
+            'hypothesis_type': h.hypothesis_type,
+            'status': h.status,
+            'confidence_level': h.confidence_level
+        },
+        created_at=created_at or h.created_at
+    )
+
+
+def triage_event(t: PaperTriage, created_at: Optional[datetime] = None) -> ActivityEvent:
+    """Event for a single paper triaged by the AI"""
+    must_read = 1 if t.triage_status == 'must_read' else 0
+    return ActivityEvent(
+        activity_id=str(uuid.uuid4()),
+        project_id=t.project_id,
+        activity_type='triage_completed',
+        actor_type='ai',
+        actor_id='ai_agent',
+        entity_type='triage',
+        entity_id=t.triage_id,
+        action='triaged',
+        title='AI Triaged 1 Papers',
+        description=f'{must_read} must-read, {1 - must_read} nice-to-know',
+        metadata={
+            'total_papers': 1,
+            'must_read_count': must_read,
+            'nice_to_know_count': 1 - must_read,
+            'paper_pmids': [t.article_pmid]
+        },
+        created_at=created_at or t.created_at
+    )
+
+
+def collection_event(c: Collection, paper_count: int = 0, created_at: Optional[datetime] = None) -> ActivityEvent:
+    return ActivityEvent(
+        activity_id=str(uuid.uuid4()),
+        project_id=c.project_id,
+        activity_type='collection_created',
+        actor_type='user',
+        actor_id=c.created_by or 'unknown',
+        entity_type='collection',
+        entity_id=c.collection_id,
+        action='created',
+        title=f'Created Collection: {c.collection_name}',
+        description=c.description,
+        metadata={
+            'paper_count': paper_count,
+            'linked_hypothesis_ids': c.linked_hypothesis_ids or [],
+            'linked_question_ids': c.linked_question_ids or []
+        },
+        created_at=created_at or c.created_at
+    )
+
+
+def protocol_event(p: Protocol, created_at: Optional[datetime] = None) -> ActivityEvent:
+    return ActivityEvent(
+        activity_id=str(uuid.uuid4()),
+        project_id=p.project_id,
+        activity_type='protocol_extracted',
+        actor_type='ai',
+        actor_id='ai_agent',
+        entity_type='protocol',
+        entity_id=p.protocol_id,
+        action='extracted',
+        title='Extracted Protocol from Paper',
+        description=p.protocol_name or 'Unnamed Protocol',
+        metadata={
+            'source_pmid': p.source_pmid,
+            'extraction_method': 'ai'
+        },
+        created_at=created_at or p.created_at
+    )
+
+
+def experiment_event(e: ExperimentPlan, created_at: Optional[datetime] = None) -> ActivityEvent:
+    return ActivityEvent(
+        activity_id=str(uuid.uuid4()),
+        project_id=e.project_id,
+        activity_type='experiment_created',
+        actor_type='user',
+        actor_id=e.created_by or 'unknown',
+        entity_type='experiment',
+        entity_id=e.plan_id,
+        action='created',
+        title='Created Experiment Plan',
+        description=e.plan_name,
+        metadata={
+            'status': e.status,
+            'linked_hypothesis_ids': e.linked_hypotheses or []
+        },
+        created_at=created_at or e.created_at
+    )
+
+
+# ============================================================================
+# Cursor helpers
+# ============================================================================
+
+def encode_cursor(created_at: datetime, event_id: str) -> str:
+    """Opaque keyset cursor for (created_at, event_id) DESC ordering"""
+    payload = json.dumps([created_at.isoformat(), event_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Inverse of encode_cursor; raises ValueError on malformed cursors"""
+    try:
+        created_at, event_id = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+        return datetime.fromisoformat(created_at), str(event_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
 
 class ActivityLoggingService:
-    """Service for generating activity timeline from existing data"""
-    
+    """Service for recording and reading the project activity timeline"""
+
     def __init__(self, db: Session):
         self.db = db
-    
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def get_project_timeline_page(
+        self,
+        project_id: str,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        offset: int = 0,
+        event_types: Optional[List[str]] = None,
+        actor_types: Optional[List[str]] = None,
+        actor_ids: Optional[List[str]] = None
+    ) -> Tuple[List[ActivityEvent], Optional[str]]:
+        """
+        One page of the project timeline, most recent first
+
+        Args:
+            project_id: Project ID
+            limit: Maximum number of events to return
+            cursor: next_cursor of the previous page (takes precedence over offset)
+            offset: Offset for pagination (legacy clients)
+            event_types: Filter by event types (optional)
+            actor_types: Filter by actor types ('user', 'ai') (optional)
+            actor_ids: Filter by actor IDs (optional)
+
+        Returns:
+            (events, next_cursor) - next_cursor is None on the last page
+        """
+        query = self.db.query(ProjectActivityEvent).filter(
+            ProjectActivityEvent.project_id == project_id
+        )
+
+        if event_types:
+            query = query.filter(ProjectActivityEvent.activity_type.in_(event_types))
+        if actor_types:
+            query = query.filter(ProjectActivityEvent.actor_type.in_(actor_types))
+        if actor_ids:
+            query = query.filter(ProjectActivityEvent.actor_id.in_(actor_ids))
+
+        if cursor:
+            created_at, event_id = decode_cursor(cursor)
+            query = query.filter(or_(
+                ProjectActivityEvent.created_at < created_at,
+                and_(ProjectActivityEvent.created_at == created_at, ProjectActivityEvent.event_id < event_id)
+            ))
+        elif offset:
+            query = query.offset(offset)
+
+        records = query.order_by(
+            desc(ProjectActivityEvent.created_at), desc(ProjectActivityEvent.event_id)
+        ).limit(limit + 1).all()
+
+        next_cursor = None
+        if len(records) > limit:
+            records = records[:limit]
+            next_cursor = encode_cursor(records[-1].created_at, records[-1].event_id)
+
+        return [ActivityEvent.from_record(r) for r in records], next_cursor
+
     def get_project_timeline(
         self,
         project_id: str,
@@ -90,109 +348,122 @@ class ActivityLoggingService:
         actor_types: Optional[List[str]] = None
     ) -> List[ActivityEvent]:
         """
-        Generate timeline from existing project data
-        
-        This is a simplified implementation that reconstructs the timeline
-        from existing database records. In a production system, you would
-        store activity events in a dedicated table.
-        
+        Timeline events for a project, sorted by created_at descending
+
         Args:
             project_id: Project ID
             limit: Maximum number of events to return
             offset: Offset for pagination
             event_types: Filter by event types (optional)
             actor_types: Filter by actor types ('user', 'ai') (optional)
-        
+
         Returns:
             List of activity events sorted by created_at descending
         """
+        events, _ = self.get_project_timeline_page(
+            project_id, limit=limit, offset=offset, event_types=event_types, actor_types=actor_types
+        )
+        return events
+
+    def get_timeline_stats(self, project_id: str) -> Dict[str, Any]:
+        """Event counts by type and actor, computed with one grouped query"""
+        rows = self.db.query(
+            ProjectActivityEvent.activity_type,
+            ProjectActivityEvent.actor_type,
+            func.count(ProjectActivityEvent.event_id)
+        ).filter(
+            ProjectActivityEvent.project_id == project_id
+        ).group_by(
+            ProjectActivityEvent.activity_type, ProjectActivityEvent.actor_type
+        ).all()
+
+        stats = {
+            'total_events': 0,
+            'user_actions': 0,
+            'ai_actions': 0,
+            'event_type_counts': {},
+        }
+        for activity_type, actor_type, count in rows:
+            stats['total_events'] += count
+            if actor_type == 'user':
+                stats['user_actions'] += count
+            elif actor_type == 'ai':
+                stats['ai_actions'] += count
+            stats['event_type_counts'][activity_type] = stats['event_type_counts'].get(activity_type, 0) + count
+        stats['recent_activity'] = min(stats['total_events'], 10)
+        return stats
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def record(self, activity: ActivityEvent) -> ProjectActivityEvent:
+        """Append an event (committed with the caller's transaction)"""
+        record = ProjectActivityEvent(**activity.to_row())
+        self.db.add(record)
+        return record
+
+    def backfill_project(self, project_id: str, dry_run: bool = False) -> int:
+        """
+        Reconstruct history for a project from the source tables
+
+        Idempotent: entities that already have an event of the same type are
+        skipped. Returns the number of events written (or that would be
+        written, with dry_run).
+        """
+        existing = set(
+            self.db.query(ProjectActivityEvent.activity_type, ProjectActivityEvent.entity_id).filter(
+                ProjectActivityEvent.project_id == project_id
+            ).all()
+        )
+
         events = []
-        
-        # Collect events from different sources
         events.extend(self._get_question_events(project_id))
         events.extend(self._get_hypothesis_events(project_id))
-        events.extend(self._get_triage_events(project_id))
+        # Triages recorded live are excluded so they are not re-counted in a batch
+        recorded_triages = {entity_id for activity_type, entity_id in existing if activity_type == 'triage_completed'}
+        events.extend(self._get_triage_events(project_id, exclude_ids=recorded_triages))
         events.extend(self._get_collection_events(project_id))
         events.extend(self._get_protocol_events(project_id))
         events.extend(self._get_experiment_events(project_id))
-        
-        # Sort by created_at descending (most recent first)
-        events.sort(key=lambda e: e.created_at, reverse=True)
-        
-        # Apply filters
-        if event_types:
-            events = [e for e in events if e.activity_type in event_types]
-        
-        if actor_types:
-            events = [e for e in events if e.actor_type in actor_types]
-        
-        # Apply pagination
-        return events[offset:offset + limit]
-    
+
+        rows = [
+            e.to_row() for e in events
+            if e.created_at is not None and (e.activity_type, e.entity_id) not in existing
+        ]
+        if dry_run:
+            return len(rows)
+        if rows:
+            self.db.bulk_insert_mappings(ProjectActivityEvent, rows)
+        self.db.commit()
+        return len(rows)
+
+    # ------------------------------------------------------------------
+    # History reconstruction from source tables (backfill only)
+    # ------------------------------------------------------------------
+
     def _get_question_events(self, project_id: str) -> List[ActivityEvent]:
         """Get events for research questions"""
-        events = []
         questions = self.db.query(ResearchQuestion).filter(
             ResearchQuestion.project_id == project_id
         ).all()
-        
-        for q in questions:
-            events.append(ActivityEvent(
-                activity_id=str(uuid.uuid4()),
-                project_id=project_id,
-                activity_type='question_created',
-                actor_type='user',
-                actor_id=q.created_by or 'unknown',
-                entity_type='question',
-                entity_id=q.question_id,
-                action='created',
-                title=f'Created Research Question',
-                description=q.question_text,
-                metadata={
-                    'question_type': q.question_type,
-                    'status': q.status
-                },
-                created_at=q.created_at
-            ))
-
-        return events
+        return [question_event(q) for q in questions]
 
     def _get_hypothesis_events(self, project_id: str) -> List[ActivityEvent]:
         """Get events for hypotheses"""
-        events = []
         hypotheses = self.db.query(Hypothesis).filter(
             Hypothesis.project_id == project_id
         ).all()
+        return [hypothesis_event(h) for h in hypotheses]
 
-        for h in hypotheses:
-            events.append(ActivityEvent(
-                activity_id=str(uuid.uuid4()),
-                project_id=project_id,
-                activity_type='hypothesis_created',
-                actor_type='user',
-                actor_id=h.created_by or 'unknown',
-                entity_type='hypothesis',
-                entity_id=h.hypothesis_id,
-                action='created',
-                title=f'Created Hypothesis',
-                description=h.hypothesis_text,
-                metadata={
-                    'hypothesis_type': h.hypothesis_type,
-                    'status': h.status,
-                    'confidence_level': h.confidence_level
-                },
-                created_at=h.created_at
-            ))
-
-        return events
-
-    def _get_triage_events(self, project_id: str) -> List[ActivityEvent]:
+    def _get_triage_events(self, project_id: str, exclude_ids=()) -> List[ActivityEvent]:
         """Get events for AI triage"""
         events = []
         triages = self.db.query(PaperTriage).filter(
             PaperTriage.project_id == project_id,
-            PaperTriage.triage_status.in_(['must_read', 'nice_to_know'])
+            PaperTriage.triage_status.in_(TRIAGE_EVENT_STATUSES)
         ).all()
+        triages = [t for t in triages if t.triage_id not in exclude_ids]
 
         # Group by batch (same created_at = same triage batch)
         batches = {}
@@ -204,6 +475,10 @@ class ActivityLoggingService:
 
         # Create one event per batch
         for batch_key, batch_triages in batches.items():
+            if len(batch_triages) == 1:
+                events.append(triage_event(batch_triages[0]))
+                continue
+
             must_read = len([t for t in batch_triages if t.triage_status == 'must_read'])
             nice_to_know = len([t for t in batch_triages if t.triage_status == 'nice_to_know'])
 
@@ -240,25 +515,7 @@ class ActivityLoggingService:
             for c in collections:
                 # Get paper count from article_collections relationship
                 paper_count = len(c.article_collections) if hasattr(c, 'article_collections') else 0
-
-                events.append(ActivityEvent(
-                    activity_id=str(uuid.uuid4()),
-                    project_id=project_id,
-                    activity_type='collection_created',
-                    actor_type='user',
-                    actor_id=c.created_by or 'unknown',
-                    entity_type='collection',
-                    entity_id=c.collection_id,
-                    action='created',
-                    title=f'Created Collection: {c.collection_name}',
-                    description=c.description,
-                    metadata={
-                        'paper_count': paper_count,
-                        'linked_hypothesis_ids': c.linked_hypothesis_ids or [],
-                        'linked_question_ids': c.linked_question_ids or []
-                    },
-                    created_at=c.created_at
-                ))
+                events.append(collection_event(c, paper_count))
         except Exception as e:
             # Gracefully handle database schema issues
             print(f"⚠️ Could not fetch collection events: {e}")
@@ -272,25 +529,7 @@ class ActivityLoggingService:
             protocols = self.db.query(Protocol).filter(
                 Protocol.project_id == project_id
             ).all()
-
-            for p in protocols:
-                events.append(ActivityEvent(
-                    activity_id=str(uuid.uuid4()),
-                    project_id=project_id,
-                    activity_type='protocol_extracted',
-                    actor_type='ai',
-                    actor_id='ai_agent',
-                    entity_type='protocol',
-                    entity_id=p.protocol_id,
-                    action='extracted',
-                    title=f'Extracted Protocol from Paper',
-                    description=p.protocol_name or 'Unnamed Protocol',
-                    metadata={
-                        'source_pmid': p.source_pmid,
-                        'extraction_method': 'ai'
-                    },
-                    created_at=p.created_at
-                ))
+            events = [protocol_event(p) for p in protocols]
         except Exception as e:
             # Gracefully handle database schema issues
             print(f"⚠️ Could not fetch protocol events: {e}")
@@ -304,28 +543,62 @@ class ActivityLoggingService:
             experiments = self.db.query(ExperimentPlan).filter(
                 ExperimentPlan.project_id == project_id
             ).all()
-
-            for e in experiments:
-                events.append(ActivityEvent(
-                    activity_id=str(uuid.uuid4()),
-                    project_id=project_id,
-                    activity_type='experiment_created',
-                    actor_type='user',
-                    actor_id=e.created_by or 'unknown',
-                    entity_type='experiment',
-                    entity_id=e.experiment_id,
-                    action='created',
-                    title=f'Created Experiment Plan',
-                    description=e.experiment_name,
-                    metadata={
-                        'status': e.status,
-                        'linked_hypothesis_id': e.linked_hypothesis_id
-                    },
-                    created_at=e.created_at
-                ))
+            events = [experiment_event(e) for e in experiments]
         except Exception as e:
             # Gracefully handle database schema issues
             print(f"⚠️ Could not fetch experiment events: {e}")
 
         return events
 
+
+# ============================================================================
+# Transactional outbox: append events when source rows are written
+# ============================================================================
+
+_events_table = ProjectActivityEvent.__table__
+_table_ready: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def _recording_enabled(connection) -> bool:
+    engine = connection.engine
+    ready = _table_ready.get(engine)
+    if ready is None:
+        ready = inspect(connection).has_table(_events_table.name)
+        _table_ready[engine] = ready
+    return ready
+
+
+def _append(connection, activity: ActivityEvent):
+    if _recording_enabled(connection):
+        connection.execute(_events_table.insert().values(**activity.to_row()))
+
+
+def _on_created(builder):
+    def listener(mapper, connection, target):
+        # created_at is a server default and not loaded yet; stamp the event now
+        _append(connection, builder(target, created_at=datetime.utcnow()))
+    return listener
+
+
+def _on_triage_inserted(mapper, connection, target: PaperTriage):
+    # Contextless triages (no project) have no timeline
+    if target.project_id and target.triage_status in TRIAGE_EVENT_STATUSES:
+        _append(connection, triage_event(target, created_at=datetime.utcnow()))
+
+
+def _on_triage_updated(mapper, connection, target: PaperTriage):
+    # Re-triage only counts when the status actually moved into a reading list
+    if not target.project_id or target.triage_status not in TRIAGE_EVENT_STATUSES:
+        return
+    if not inspect(target).attrs.triage_status.history.has_changes():
+        return
+    _append(connection, triage_event(target, created_at=datetime.utcnow()))
+
+
+event.listen(ResearchQuestion, "after_insert", _on_created(question_event))
+event.listen(Hypothesis, "after_insert", _on_created(hypothesis_event))
+event.listen(Collection, "after_insert", _on_created(collection_event))
+event.listen(Protocol, "after_insert", _on_created(protocol_event))
+event.listen(ExperimentPlan, "after_insert", _on_created(experiment_event))
+event.listen(PaperTriage, "after_insert", _on_triage_inserted)
+event.listen(PaperTriage, "after_update", _on_triage_updated)
@@ -12,10 +12,10 @@ This service:
 import logging
 from typing import Dict, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from datetime import datetime, timezone
 
-from database import Hypothesis, HypothesisEvidence
+from database import Hypothesis
+from backend.app.services.stat_counters import hypothesis_evidence_counts
 
 logger = logging.getLogger(__name__)
 
@@ -38,7 +38,7 @@ class AutoHypothesisStatusService:
         db: Session
     ) -> Dict[str, int]:
         """
-        Calculate evidence counts for a hypothesis.
+        Evidence counts for a hypothesis.
         
         Returns:
             {
@@ -48,30 +48,9 @@ class AutoHypothesisStatusService:
                 "total": int
             }
         """
-        # Count by evidence type
-        # Week 24: Fixed - use 'id' instead of 'evidence_id' (HypothesisEvidence model uses 'id')
-        supporting = db.query(func.count(HypothesisEvidence.id)).filter(
-            HypothesisEvidence.hypothesis_id == hypothesis_id,
-            HypothesisEvidence.evidence_type == "supports"
-        ).scalar() or 0
+        # Maintained by the HypothesisEvidence write hooks, so this is a single-row read
+        return hypothesis_evidence_counts(db, hypothesis_id)
 
-        contradicting = db.query(func.count(HypothesisEvidence.id)).filter(
-            HypothesisEvidence.hypothesis_id == hypothesis_id,
-            HypothesisEvidence.evidence_type == "contradicts"
-        ).scalar() or 0
-
-        neutral = db.query(func.count(HypothesisEvidence.id)).filter(
-            HypothesisEvidence.hypothesis_id == hypothesis_id,
-            HypothesisEvidence.evidence_type == "neutral"
-        ).scalar() or 0
-        
-        return {
-            "supporting": supporting,
-            "contradicting": contradicting,
-            "neutral": neutral,
-            "total": supporting + contradicting + neutral
-        }
-    
     def _determine_status(
         self,
         supporting: int,
@@ -174,8 +153,6 @@ class AutoHypothesisStatusService:
             # Update hypothesis
             hypothesis.status = new_status
             hypothesis.confidence_level = new_confidence
-            hypothesis.supporting_evidence_count = evidence_counts["supporting"]
-            hypothesis.contradicting_evidence_count = evidence_counts["contradicting"]
             hypothesis.updated_at = datetime.now(timezone.utc)
             
             db.commit()
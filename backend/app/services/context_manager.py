@@ -15,9 +15,8 @@ from sqlalchemy.orm import Session
 from sqlalchemy import desc
 import json
 
-from database import (
-    Project, ResearchQuestion, Hypothesis, Article,
-    Protocol, ExperimentPlan
+from backend.app.services.project_context_snapshot import (
+    ProjectContextSnapshot, get_project_context_snapshots
 )
 
 
@@ -50,31 +49,33 @@ class ContextManager:
         - Previous insights/summaries
         
         This is the MASTER context that flows through the entire journey.
+        Built from the shared project context snapshot.
         """
-        project = self.db.query(Project).filter(Project.project_id == project_id).first()
-        if not project:
+        return self._build_context(self._snapshot(project_id))
+
+    def _snapshot(self, project_id: str) -> ProjectContextSnapshot:
+        return get_project_context_snapshots().get(self.db, project_id)
+
+    def _build_context(self, snapshot: ProjectContextSnapshot) -> Dict[str, Any]:
+        if snapshot.project is None:
             return {}
-        
+
         context = {
-            "project_id": project_id,
-            "project_name": project.name,
-            "created_at": project.created_at.isoformat() if project.created_at else None,
-            "research_questions": self._get_questions_context(project_id),
-            "hypotheses": self._get_hypotheses_context(project_id),
-            "papers": self._get_papers_context(project_id),
-            "protocols": self._get_protocols_context(project_id),
-            "experiment_plans": self._get_experiment_plans_context(project_id),
-            "timeline": self._build_timeline(project_id)
+            "project_id": snapshot.project_id,
+            "project_name": snapshot.project.project_name,
+            "created_at": snapshot.project.created_at.isoformat() if snapshot.project.created_at else None,
+            "research_questions": self._get_questions_context(snapshot),
+            "hypotheses": self._get_hypotheses_context(snapshot),
+            "papers": self._get_papers_context(snapshot),
+            "protocols": self._get_protocols_context(snapshot),
+            "experiment_plans": self._get_experiment_plans_context(snapshot),
+            "timeline": self._build_timeline(snapshot)
         }
         
         return context
     
-    def _get_questions_context(self, project_id: str) -> List[Dict[str, Any]]:
+    def _get_questions_context(self, snapshot: ProjectContextSnapshot) -> List[Dict[str, Any]]:
         """Get all research questions for context."""
-        questions = self.db.query(ResearchQuestion).filter(
-            ResearchQuestion.project_id == project_id
-        ).order_by(ResearchQuestion.created_at).all()
-        
         return [
             {
                 "question_id": q.question_id,
@@ -82,15 +83,11 @@ class ContextManager:
                 "created_at": q.created_at.isoformat() if q.created_at else None,
                 "status": "active"
             }
-            for q in questions
+            for q in snapshot.questions
         ]
     
-    def _get_hypotheses_context(self, project_id: str) -> List[Dict[str, Any]]:
+    def _get_hypotheses_context(self, snapshot: ProjectContextSnapshot) -> List[Dict[str, Any]]:
         """Get all hypotheses for context."""
-        hypotheses = self.db.query(Hypothesis).filter(
-            Hypothesis.project_id == project_id
-        ).order_by(Hypothesis.created_at).all()
-        
         return [
             {
                 "hypothesis_id": h.hypothesis_id,
@@ -99,10 +96,10 @@ class ContextManager:
                 "confidence_level": h.confidence_level,
                 "created_at": h.created_at.isoformat() if h.created_at else None
             }
-            for h in hypotheses
+            for h in snapshot.hypotheses
         ]
     
-    def _get_papers_context(self, project_id: str) -> List[Dict[str, Any]]:
+    def _get_papers_context(self, snapshot: ProjectContextSnapshot) -> List[Dict[str, Any]]:
         """Get triaged papers for context."""
         # Note: Papers are stored in Article table, triage info in PaperTriage table
         # For now, return empty list - will be enhanced in Day 2 with proper joins
@@ -110,41 +107,33 @@ class ContextManager:
 
         return []  # Will be implemented with proper Article/PaperTriage joins in Day 2
     
-    def _get_protocols_context(self, project_id: str) -> List[Dict[str, Any]]:
+    def _get_protocols_context(self, snapshot: ProjectContextSnapshot) -> List[Dict[str, Any]]:
         """Get extracted protocols for context."""
-        protocols = self.db.query(Protocol).filter(
-            Protocol.project_id == project_id
-        ).order_by(Protocol.created_at).all()
-        
         return [
             {
                 "protocol_id": p.protocol_id,
-                "paper_id": p.paper_id,
-                "protocol_text": p.protocol_text[:500] if p.protocol_text else None,  # Truncate for context
-                "key_steps": p.key_steps,
+                "paper_id": p.source_pmid,
+                "protocol_text": p.description[:500] if p.description else None,  # Truncate for context
+                "key_steps": p.steps,
                 "created_at": p.created_at.isoformat() if p.created_at else None
             }
-            for p in protocols
+            for p in reversed(snapshot.protocols)
         ]
     
-    def _get_experiment_plans_context(self, project_id: str) -> List[Dict[str, Any]]:
+    def _get_experiment_plans_context(self, snapshot: ProjectContextSnapshot) -> List[Dict[str, Any]]:
         """Get experiment plans for context."""
-        plans = self.db.query(ExperimentPlan).filter(
-            ExperimentPlan.project_id == project_id
-        ).order_by(ExperimentPlan.created_at).all()
-
         return [
             {
                 "plan_id": p.plan_id,
                 "protocol_id": p.protocol_id,
-                "plan_text": p.plan_text[:500] if p.plan_text else None,  # Truncate for context
+                "plan_text": p.objective[:500] if p.objective else None,  # Truncate for context
                 "status": p.status,
                 "created_at": p.created_at.isoformat() if p.created_at else None
             }
-            for p in plans
+            for p in reversed(snapshot.plans)
         ]
 
-    def _build_timeline(self, project_id: str) -> List[Dict[str, Any]]:
+    def _build_timeline(self, snapshot: ProjectContextSnapshot) -> List[Dict[str, Any]]:
         """
         Build a chronological timeline of all research activities.
         This helps AI understand the sequence of events.
@@ -152,10 +141,7 @@ class ContextManager:
         timeline = []
 
         # Add questions
-        questions = self.db.query(ResearchQuestion).filter(
-            ResearchQuestion.project_id == project_id
-        ).all()
-        for q in questions:
+        for q in snapshot.questions:
             if q.created_at:
                 timeline.append({
                     "timestamp": q.created_at.isoformat(),
@@ -164,10 +150,7 @@ class ContextManager:
                 })
 
         # Add hypotheses
-        hypotheses = self.db.query(Hypothesis).filter(
-            Hypothesis.project_id == project_id
-        ).all()
-        for h in hypotheses:
+        for h in snapshot.hypotheses:
             if h.created_at:
                 timeline.append({
                     "timestamp": h.created_at.isoformat(),
@@ -176,14 +159,10 @@ class ContextManager:
                 })
 
         # Add papers (will be implemented with proper joins in Day 2)
-        # papers = self.db.query(Article).filter(...).all()
         # For now, skip papers in timeline
 
         # Add protocols
-        protocols = self.db.query(Protocol).filter(
-            Protocol.project_id == project_id
-        ).all()
-        for p in protocols:
+        for p in snapshot.protocols:
             if p.created_at:
                 timeline.append({
                     "timestamp": p.created_at.isoformat(),
@@ -192,10 +171,7 @@ class ContextManager:
                 })
 
         # Add experiment plans
-        plans = self.db.query(ExperimentPlan).filter(
-            ExperimentPlan.project_id == project_id
-        ).all()
-        for p in plans:
+        for p in snapshot.plans:
             if p.created_at:
                 timeline.append({
                     "timestamp": p.created_at.isoformat(),
@@ -213,8 +189,10 @@ class ContextManager:
         Get a human-readable summary of the project context.
         Used in AI prompts to provide high-level overview.
         """
-        context = self.get_full_context(project_id)
+        snapshot = self._snapshot(project_id)
+        return snapshot.memoize(("context_manager.summary",), lambda: self._summarize(self._build_context(snapshot)))
 
+    def _summarize(self, context: Dict[str, Any]) -> str:
         summary_parts = []
 
         # Project overview
@@ -276,11 +254,16 @@ class ContextManager:
         Returns:
             Formatted context string for AI prompts
         """
-        context = self.get_full_context(project_id)
+        snapshot = self._snapshot(project_id)
+        return snapshot.memoize(("context_manager.format_context_for_ai", focus),
+                                lambda: self._format_context_for_ai(snapshot, focus))
+
+    def _format_context_for_ai(self, snapshot: ProjectContextSnapshot, focus: Optional[str]) -> str:
+        context = self._build_context(snapshot)
 
         # Start with summary
         formatted = "=== RESEARCH CONTEXT ===\n\n"
-        formatted += self.get_context_summary(project_id)
+        formatted += snapshot.memoize(("context_manager.summary",), lambda: self._summarize(context))
         formatted += "\n\n=== DETAILED CONTEXT ===\n\n"
 
         # Add focused section if specified
@@ -17,10 +17,7 @@ from datetime import datetime
 from sqlalchemy.orm import Session
 from openai import AsyncOpenAI
 
-from database import (
-    ExperimentPlan, Protocol, Article, Project,
-    ResearchQuestion, Hypothesis, ExperimentResult, ProjectDecision
-)
+from database import ExperimentPlan, Protocol, Article
 
 # Week 1 Improvements
 from backend.app.services.strategic_context import StrategicContext
@@ -29,6 +26,7 @@ from backend.app.services.validation_service import ValidationService
 # Week 2 Improvements: Memory System
 from backend.app.services.memory_store import MemoryStore
 from backend.app.services.retrieval_engine import RetrievalEngine
+from backend.app.services.project_context_snapshot import get_project_context_snapshots
 
 # Week 23: Multi-Agent System
 from backend.app.services.agents.orchestrator import MultiAgentOrchestrator
@@ -206,8 +204,9 @@ class ExperimentPlannerService:
         if not protocol:
             return {"protocol": None}
         
-        # Get project
-        project = db.query(Project).filter(Project.project_id == project_id).first()
+        # Project context comes from the shared, versioned snapshot
+        snapshot = get_project_context_snapshots().get(db, project_id)
+        project = snapshot.project
 
         if not project:
             raise ValueError(f"Project {project_id} not found")
@@ -218,36 +217,32 @@ class ExperimentPlannerService:
             article = db.query(Article).filter(Article.pmid == protocol.source_pmid).first()
         
         # Get research questions (top 10 most recent)
-        questions = db.query(ResearchQuestion).filter(
-            ResearchQuestion.project_id == project_id
-        ).order_by(ResearchQuestion.created_at.desc()).limit(10).all()
+        questions = snapshot.questions[::-1][:10]
         
         # Get hypotheses (prioritize active ones: exploring, testing, supported)
         # First get active hypotheses, then fill with others if needed
-        active_hypotheses = db.query(Hypothesis).filter(
-            Hypothesis.project_id == project_id,
-            Hypothesis.status.in_(['exploring', 'testing', 'supported'])
-        ).order_by(Hypothesis.created_at.desc()).limit(10).all()
+        newest_hypotheses = snapshot.hypotheses[::-1]
+        active_hypotheses = [
+            h for h in newest_hypotheses if h.status in ('exploring', 'testing', 'supported')
+        ][:10]
 
         # If we have fewer than 10 active, get some inactive ones too for context
         hypotheses = active_hypotheses
         if len(active_hypotheses) < 10:
-            inactive_hypotheses = db.query(Hypothesis).filter(
-                Hypothesis.project_id == project_id,
-                Hypothesis.status.in_(['refuted', 'parked'])
-            ).order_by(Hypothesis.created_at.desc()).limit(10 - len(active_hypotheses)).all()
+            inactive_hypotheses = [
+                h for h in newest_hypotheses if h.status in ('refuted', 'parked')
+            ][:10 - len(active_hypotheses)]
             hypotheses = active_hypotheses + inactive_hypotheses
 
         # Phase 1.3: Get decision history
-        from database import ProjectDecision, ExperimentResult
-        decisions = db.query(ProjectDecision).filter(
-            ProjectDecision.project_id == project_id
-        ).order_by(ProjectDecision.decided_at.desc()).limit(5).all()
+        decisions = snapshot.decisions[:5]
 
         # Phase 3.2: Get existing experiment results (cross-service learning)
-        experiment_results = db.query(ExperimentResult).filter(
-            ExperimentResult.project_id == project_id
-        ).order_by(ExperimentResult.created_at.desc()).limit(3).all()
+        experiment_results = sorted(
+            snapshot.results,
+            key=lambda r: (r.created_at is not None, r.created_at or 0),
+            reverse=True
+        )[:3]
 
         return {
             "protocol": protocol,
@@ -15,11 +15,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func
 from openai import AsyncOpenAI
 
-from database import (
-    Project, ResearchQuestion, Hypothesis, Article, PaperTriage,
-    Protocol, ExperimentPlan, QuestionEvidence, HypothesisEvidence,
-    ProjectInsights, ProjectDecision, ExperimentResult
-)
+from database import ProjectInsights
 
 # Week 1 Improvements
 from backend.app.services.strategic_context import StrategicContext
@@ -29,6 +25,7 @@ from backend.app.services.validation_service import ValidationService
 
 # Week 2 Improvements: Memory System
 from backend.app.services.memory_store import MemoryStore
+from backend.app.services.project_context_snapshot import get_project_context_snapshots
 from backend.app.services.retrieval_engine import RetrievalEngine
 
 # Week 24 Phase 3: Multi-Agent System
@@ -120,59 +117,20 @@ class InsightsService:
         """Gather all relevant project data for insights with full context"""
         logger.info(f"📦 Gathering project data for insights with context...")
 
-        # Get project
-        project = db.query(Project).filter(Project.project_id == project_id).first()
-
-        # Get research questions (ordered by creation)
-        questions = db.query(ResearchQuestion).filter(
-            ResearchQuestion.project_id == project_id
-        ).order_by(ResearchQuestion.created_at.asc()).all()
-
-        # Get hypotheses (ordered by creation)
-        hypotheses = db.query(Hypothesis).filter(
-            Hypothesis.project_id == project_id
-        ).order_by(Hypothesis.created_at.asc()).all()
-
-        # Get papers with triage data (ordered by triage date)
-        papers = db.query(Article, PaperTriage).join(
-            PaperTriage, Article.pmid == PaperTriage.article_pmid
-        ).filter(
-            PaperTriage.project_id == project_id
-        ).order_by(PaperTriage.triaged_at.desc()).all()
-
-        # Get protocols (ordered by creation)
-        protocols = db.query(Protocol).filter(
-            Protocol.project_id == project_id
-        ).order_by(Protocol.created_at.desc()).all()
-
-        # Get experiment plans (ordered by creation)
-        plans = db.query(ExperimentPlan).filter(
-            ExperimentPlan.project_id == project_id
-        ).order_by(ExperimentPlan.created_at.desc()).all()
-
-        # Get experiment results (ordered by completion)
-        from database import ExperimentResult
-        results = db.query(ExperimentResult).filter(
-            ExperimentResult.project_id == project_id
-        ).order_by(ExperimentResult.completed_at.desc().nullslast()).all()
-
-        # Get evidence links
-        question_evidence = db.query(QuestionEvidence).join(
-            ResearchQuestion
-        ).filter(
-            ResearchQuestion.project_id == project_id
-        ).all()
-
-        hypothesis_evidence = db.query(HypothesisEvidence).join(
-            Hypothesis
-        ).filter(
-            Hypothesis.project_id == project_id
-        ).all()
-
-        # Get project decisions for context
-        decisions = db.query(ProjectDecision).filter(
-            ProjectDecision.project_id == project_id
-        ).order_by(ProjectDecision.decided_at.desc()).all()
+        # One shared, versioned snapshot: questions and hypotheses by creation,
+        # papers by triage date, protocols and plans newest first, results by
+        # completion, decisions newest first, plus evidence links
+        snapshot = get_project_context_snapshots().get(db, project_id)
+        project = snapshot.project
+        questions = snapshot.questions
+        hypotheses = snapshot.hypotheses
+        papers = snapshot.papers
+        protocols = snapshot.protocols
+        plans = snapshot.plans
+        results = snapshot.results
+        question_evidence = snapshot.question_evidence
+        hypothesis_evidence = snapshot.hypothesis_evidence
+        decisions = snapshot.decisions
 
         logger.info(f"📊 Data gathered: {len(questions)} questions, {len(hypotheses)} hypotheses, "
                    f"{len(papers)} papers, {len(protocols)} protocols, {len(plans)} plans, "
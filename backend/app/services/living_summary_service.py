@@ -4,6 +4,7 @@ Week 21-22: Living Summaries Feature
 Week 1 Improvements: Strategic context, tool patterns, validation, orchestration rules
 """
 
+import asyncio
 import logging
 import json
 from datetime import datetime, timedelta, timezone
@@ -13,10 +14,7 @@ import uuid
 from sqlalchemy.orm import Session
 from openai import AsyncOpenAI
 
-from database import (
-    ProjectSummary, Project, ResearchQuestion, Hypothesis,
-    Article, PaperTriage, Protocol, ExperimentPlan, ProjectDecision, ExperimentResult
-)
+from database import ProjectSummary
 
 # Week 1 Improvements
 from backend.app.services.strategic_context import StrategicContext
@@ -25,6 +23,11 @@ from backend.app.services.orchestration_rules import OrchestrationRules
 
 # Week 2 Improvements: Memory System
 from backend.app.services.memory_store import MemoryStore
+from backend.app.services.project_context_snapshot import get_project_context_snapshots
+from backend.app.services.summary_deltas import (
+    SUMMARY_FIELDS, SUMMARY_SECTIONS, affected_sections, count_changes, diff_source_state,
+    section_system_prompt, section_user_prompt, summary_source_state
+)
 from backend.app.services.retrieval_engine import RetrievalEngine
 
 logger = logging.getLogger(__name__)
@@ -33,25 +36,44 @@ logger = logging.getLogger(__name__)
 client = AsyncOpenAI()
 
 
+def _token_usage(response) -> Dict[str, int]:
+    """Token counts of a chat completion (zeros when unavailable)"""
+    usage = getattr(response, 'usage', None)
+    return {key: int(getattr(usage, key, 0) or 0)
+            for key in ('prompt_tokens', 'completion_tokens', 'total_tokens')}
+
+
 class LivingSummaryService:
     """Service for generating and managing project summaries"""
     
     CACHE_TTL_HOURS = 24  # Cache valid for 24 hours
+
+    # Delta updates: rebuild in full instead when too much has changed
+    DELTA_MAX_CHANGES = 12  # Changed entities per update
+    DELTA_MAX_RATIO = 0.3  # Changed entities / all summarized entities
+    MAX_INCREMENTAL_UPDATES = 10  # Consecutive delta updates before a full rebuild
     
     async def generate_summary(
         self,
         project_id: str,
         db: Session,
         force_refresh: bool = False,
-        user_id: str = None
+        user_id: str = None,
+        full_rebuild: bool = False
     ) -> Dict:
         """
         Generate or retrieve cached project summary
+
+        An existing summary is updated from the entities that changed since
+        it was written (one small prompt per affected section); it is only
+        regenerated from scratch when there is no stored state, on large
+        drift, or when full_rebuild is set.
         
         Args:
             project_id: Project ID
             db: Database session
             force_refresh: Force regeneration even if cache is valid
+            full_rebuild: Regenerate the whole summary instead of applying deltas
             
         Returns:
             Dict with summary data
@@ -59,7 +81,7 @@ class LivingSummaryService:
         logger.info(f"📊 Generating summary for project: {project_id}")
         
         # Check for existing cached summary
-        if not force_refresh:
+        if not force_refresh and not full_rebuild:
             cached = self._get_cached_summary(project_id, db)
             if cached:
                 logger.info(f"✅ Using cached summary (valid until {cached.cache_valid_until})")
@@ -67,15 +89,111 @@ class LivingSummaryService:
         
         # Gather project data
         project_data = await self._gather_project_data(project_id, db)
+        source_state = summary_source_state(project_data)
+
+        existing = db.query(ProjectSummary).filter(ProjectSummary.project_id == project_id).first()
+        changes = diff_source_state(existing.source_state, source_state) if existing else None
+
+        if changes is not None and not full_rebuild and (
+                not changes or not self._is_large_drift(existing, changes, source_state)):
+            try:
+                summary_data = await self._update_summary_sections(existing, project_data, changes, source_state)
+                summary = self._save_summary(project_id, summary_data, db, source_state=source_state)
+                return self._format_summary(summary)
+            except Exception as e:
+                logger.warning(f"⚠️ Delta summary update failed, rebuilding in full: {e}")
+                db.rollback()
 
         # Generate summary with AI (Week 2: pass db and user_id for memory system)
         summary_data = await self._generate_ai_summary(project_data, db=db, user_id=user_id)
+        summary_data['generation_stats'] = {
+            'mode': 'full',
+            'sections': list(SUMMARY_SECTIONS),
+            'changed_entities': count_changes(changes) if changes else None,
+            **summary_data.pop('token_usage', _token_usage(None))
+        }
+        logger.info(f"🪙 Full summary rebuild: {summary_data['generation_stats']['total_tokens']} tokens")
 
         # Save to database
-        summary = self._save_summary(project_id, summary_data, db)
+        summary = self._save_summary(project_id, summary_data, db, source_state=source_state)
         
         logger.info(f"✅ Summary generated and cached until {summary.cache_valid_until}")
         return self._format_summary(summary)
+
+    def _is_large_drift(self, summary: ProjectSummary, changes: Dict, source_state: Dict) -> bool:
+        """Too many changes (or delta updates) to patch the summary reliably"""
+        changed = count_changes(changes)
+        total = max(sum(len(items) for items in source_state.values()), 1)
+        drift = (
+            changed > self.DELTA_MAX_CHANGES
+            or changed / total > self.DELTA_MAX_RATIO
+            or (summary.incremental_updates or 0) >= self.MAX_INCREMENTAL_UPDATES
+        )
+        if drift:
+            logger.info(f"🔁 Large drift ({changed}/{total} entities changed, "
+                        f"{summary.incremental_updates or 0} delta updates): full rebuild")
+        return drift
+
+    async def _update_summary_sections(
+        self,
+        summary: ProjectSummary,
+        project_data: Dict,
+        changes: Dict,
+        source_state: Dict
+    ) -> Dict:
+        """Re-summarize only the sections whose entities changed and merge them in"""
+        current = self._format_summary(summary)
+        summary_data = {field: current[field] for field in SUMMARY_FIELDS}
+        sections = affected_sections(changes)
+
+        updates = await asyncio.gather(*[
+            self._summarize_section(section, project_data, current, changes, source_state)
+            for section in sections
+        ])
+
+        usage = _token_usage(None)
+        for section, (section_data, section_usage) in zip(sections, updates):
+            for field in SUMMARY_SECTIONS[section]['fields']:
+                if field in section_data:
+                    summary_data[field] = section_data[field]
+            for key in usage:
+                usage[key] += section_usage[key]
+
+        _, summary_data['timeline_events'] = self._build_research_journey(project_data)
+        summary_data['generation_stats'] = {
+            'mode': 'incremental' if sections else 'unchanged',
+            'sections': sections,
+            'changed_entities': count_changes(changes),
+            **usage
+        }
+        logger.info(f"🪙 Delta summary update: sections={sections}, "
+                    f"{count_changes(changes)} changed entities, {usage['total_tokens']} tokens")
+        return summary_data
+
+    async def _summarize_section(
+        self,
+        section: str,
+        project_data: Dict,
+        current: Dict,
+        changes: Dict,
+        source_state: Dict
+    ) -> tuple[Dict, Dict]:
+        """One small prompt revising a single summary section"""
+        response = await client.chat.completions.create(
+            model="gpt-4o-mini",
+            temperature=0.3,
+            response_format={"type": "json_object"},
+            messages=[
+                {"role": "system", "content": section_system_prompt(section)},
+                {"role": "user", "content": section_user_prompt(
+                    section, project_data['project'].project_name, current, changes, source_state
+                )}
+            ]
+        )
+        ai_response = response.choices[0].message.content
+        if not ai_response or not ai_response.strip():
+            raise ValueError(f"AI returned empty response for section {section}")
+        return json.loads(ai_response), _token_usage(response)
     
     async def invalidate_cache(self, project_id: str, db: Session):
         """Invalidate cache when project content changes"""
@@ -110,48 +228,23 @@ class LivingSummaryService:
         """Gather all relevant project data with full context"""
         logger.info(f"📦 Gathering project data with context...")
 
-        # Get project
-        project = db.query(Project).filter(Project.project_id == project_id).first()
+        # Shared, versioned project snapshot (see project_context_snapshot)
+        snapshot = get_project_context_snapshots().get(db, project_id)
+        project = snapshot.project
+        questions = snapshot.questions
+        hypotheses = snapshot.hypotheses
 
-        # Get research questions (ordered by creation)
-        questions = db.query(ResearchQuestion).filter(
-            ResearchQuestion.project_id == project_id
-        ).order_by(ResearchQuestion.created_at.asc()).all()
-
-        # Get hypotheses (ordered by creation)
-        hypotheses = db.query(Hypothesis).filter(
-            Hypothesis.project_id == project_id
-        ).order_by(Hypothesis.created_at.asc()).all()
-
-        # Get triaged papers WITH context (ordered by triage date)
+        # Triaged papers WITH context (ordered by triage date)
         # Include ai_reasoning which contains the WHY
-        papers = db.query(Article, PaperTriage).join(
-            PaperTriage, Article.pmid == PaperTriage.article_pmid
-        ).filter(
-            PaperTriage.project_id == project_id,
-            PaperTriage.triage_status.in_(['must_read', 'nice_to_know'])
-        ).order_by(PaperTriage.triaged_at.desc()).all()
-
-        # Get protocols WITH source paper info (ordered by creation)
-        protocols = db.query(Protocol).filter(
-            Protocol.project_id == project_id
-        ).order_by(Protocol.created_at.desc()).all()
-
-        # Get experiment plans (ordered by creation)
-        plans = db.query(ExperimentPlan).filter(
-            ExperimentPlan.project_id == project_id
-        ).order_by(ExperimentPlan.created_at.desc()).all()
-
-        # Get experiment results (ordered by completion)
-        from database import ExperimentResult
-        results = db.query(ExperimentResult).filter(
-            ExperimentResult.project_id == project_id
-        ).order_by(ExperimentResult.completed_at.desc().nullslast()).all()
-
-        # Get project decisions for additional context
-        decisions = db.query(ProjectDecision).filter(
-            ProjectDecision.project_id == project_id
-        ).order_by(ProjectDecision.decided_at.desc()).all()
+        papers = [
+            (article, triage) for article, triage in snapshot.papers
+            if triage.triage_status in ('must_read', 'nice_to_know')
+        ]
+
+        protocols = snapshot.protocols
+        plans = snapshot.plans
+        results = snapshot.results
+        decisions = snapshot.decisions
 
         logger.info(f"📊 Found: {len(questions)} questions, {len(hypotheses)} hypotheses, "
                    f"{len(papers)} papers, {len(protocols)} protocols, {len(plans)} plans, "
@@ -277,6 +370,8 @@ class LivingSummaryService:
                     except:
                         pass
 
+            summary_data['token_usage'] = _token_usage(response)
+
             logger.info(f"✅ AI summary generated successfully with {len(timeline_events)} timeline events")
             return summary_data
 
@@ -765,13 +860,22 @@ Guidelines for Context-Aware Summaries:
 - Include 3-5 protocol insights with source papers and application to specific questions/hypotheses
 - Include 3-5 recommended next steps that each close a specific gap in the research loop"""
 
-    def _save_summary(self, project_id: str, summary_data: Dict, db: Session) -> ProjectSummary:
+    def _save_summary(
+        self,
+        project_id: str,
+        summary_data: Dict,
+        db: Session,
+        source_state: Optional[Dict] = None
+    ) -> ProjectSummary:
         """Save summary to database"""
         # Check if summary exists
         summary = db.query(ProjectSummary).filter(
             ProjectSummary.project_id == project_id
         ).first()
 
+        stats = summary_data.get('generation_stats')
+        mode = (stats or {}).get('mode', 'full')
+
         # Calculate cache expiration
         now = datetime.now(timezone.utc)
         cache_valid_until = now + timedelta(hours=self.CACHE_TTL_HOURS)
@@ -784,6 +888,12 @@ Guidelines for Context-Aware Summaries:
             summary.experiment_status = summary_data.get('experiment_status')
             summary.next_steps = summary_data.get('next_steps', [])
             summary.timeline_events = summary_data.get('timeline_events', [])
+            summary.source_state = source_state
+            summary.generation_stats = stats
+            if mode == 'full':
+                summary.incremental_updates = 0
+            elif mode == 'incremental':
+                summary.incremental_updates = (summary.incremental_updates or 0) + 1
             summary.last_updated = now
             summary.cache_valid_until = cache_valid_until
             summary.updated_at = now
@@ -798,6 +908,9 @@ Guidelines for Context-Aware Summaries:
                 experiment_status=summary_data.get('experiment_status'),
                 next_steps=summary_data.get('next_steps', []),
                 timeline_events=summary_data.get('timeline_events', []),
+                source_state=source_state,
+                generation_stats=stats,
+                incremental_updates=0,
                 last_updated=datetime.utcnow(),
                 cache_valid_until=cache_valid_until
             )
@@ -818,6 +931,7 @@ Guidelines for Context-Aware Summaries:
             'experiment_status': summary.experiment_status,
             'next_steps': summary.next_steps or [],
             'timeline_events': summary.timeline_events or [],
+            'generation_stats': summary.generation_stats or {},
             'last_updated': summary.last_updated.isoformat() if summary.last_updated else None,
             'cache_valid_until': summary.cache_valid_until.isoformat() if summary.cache_valid_until else None
         }
@@ -15,11 +15,21 @@ Key Features:
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, and_, or_
+from sqlalchemy import desc, and_, or_, func, literal, select, union_all, String
 import uuid
 import json
 
-from database import ConversationMemory
+from database import ConversationMemory, MemoryEntityLink
+from backend.app.services.memory_vector_index import get_memory_vector_index, memory_text
+
+# entity_type in memory_entity_links -> ConversationMemory column it mirrors
+ENTITY_LINK_COLUMNS = {
+    'question': 'linked_question_ids',
+    'hypothesis': 'linked_hypothesis_ids',
+    'paper': 'linked_paper_ids',
+    'protocol': 'linked_protocol_ids',
+    'experiment': 'linked_experiment_ids',
+}
 
 
 class MemoryStore:
@@ -34,8 +44,9 @@ class MemoryStore:
     - Lifecycle (creation, access, expiration)
     """
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, vector_index=None):
         self.db = db
+        self.vector_index = vector_index or get_memory_vector_index()
         self.default_ttl_days = 90  # Memories expire after 90 days by default
         self.max_memories_per_project = 100  # Keep last 100 memories per project
     
@@ -94,10 +105,13 @@ class MemoryStore:
             is_archived=False,
             created_by=user_id
         )
+        memory.entity_links = self._build_entity_links(memory)
+        memory.embedding = self.vector_index.embed([memory_text(summary, content)])[0].tolist()
         
         self.db.add(memory)
         self.db.commit()
         self.db.refresh(memory)
+        self.vector_index.add(project_id, memory_id, memory.embedding)
         
         # Prune old memories if we exceed the limit
         self._prune_old_memories(project_id)
@@ -189,6 +203,27 @@ class MemoryStore:
 
         return [self._memory_to_dict(m) for m in memories]
 
+    def get_memories_by_ids(self, project_id: str, memory_ids: List[str]) -> List[Dict[str, Any]]:
+        """
+        Retrieve active memories by ID in one query, preserving the given order.
+        Used for vector search hits.
+        """
+        if not memory_ids:
+            return []
+
+        memories = self.db.query(ConversationMemory).filter(
+            ConversationMemory.project_id == project_id,
+            ConversationMemory.memory_id.in_(memory_ids),
+            ConversationMemory.is_archived == False,
+            or_(
+                ConversationMemory.expires_at.is_(None),
+                ConversationMemory.expires_at > datetime.utcnow()
+            )
+        ).all()
+
+        by_id = {m.memory_id: m for m in memories}
+        return [self._memory_to_dict(by_id[mid]) for mid in memory_ids if mid in by_id]
+
     def get_memories_by_links(
         self,
         project_id: str,
@@ -208,43 +243,128 @@ class MemoryStore:
             ConversationMemory.is_archived == False
         )
 
-        # Build OR conditions for linked entities
-        # Use PostgreSQL's @> operator for JSON containment
-        from sqlalchemy import cast, String
-        import json as json_module
+        linked = self.linked_memory_ids(
+            project_id,
+            question=question_ids,
+            hypothesis=hypothesis_ids,
+            paper=paper_ids,
+            protocol=protocol_ids,
+            experiment=experiment_ids
+        )
+        if linked is not None:
+            query = query.filter(ConversationMemory.memory_id.in_(linked))
 
-        conditions = []
+        memories = query.order_by(
+            desc(ConversationMemory.relevance_score),
+            desc(ConversationMemory.created_at)
+        ).limit(limit).all()
 
-        if question_ids:
-            for qid in question_ids:
-                # Check if the JSON array contains the ID
-                conditions.append(cast(ConversationMemory.linked_question_ids, String).like(f'%"{qid}"%'))
+        return [self._memory_to_dict(m) for m in memories]
 
-        if hypothesis_ids:
-            for hid in hypothesis_ids:
-                conditions.append(cast(ConversationMemory.linked_hypothesis_ids, String).like(f'%"{hid}"%'))
+    def linked_memory_ids(self, project_id: str, **entity_ids: Optional[List[str]]):
+        """
+        Subquery of memory_ids linked to any of the given entities.
 
-        if paper_ids:
-            for pid in paper_ids:
-                conditions.append(cast(ConversationMemory.linked_paper_ids, String).like(f'%"{pid}"%'))
+        Keyword arguments are entity types (question, hypothesis, paper,
+        protocol, experiment) mapped to id lists. Returns None when no ids
+        are given, so callers can skip the filter.
+        """
+        conditions = [
+            and_(MemoryEntityLink.entity_type == entity_type, MemoryEntityLink.entity_id.in_(ids))
+            for entity_type, ids in entity_ids.items()
+            if ids and entity_type in ENTITY_LINK_COLUMNS
+        ]
+        if not conditions:
+            return None
 
-        if protocol_ids:
-            for pid in protocol_ids:
-                conditions.append(cast(ConversationMemory.linked_protocol_ids, String).like(f'%"{pid}"%'))
+        return self.db.query(MemoryEntityLink.memory_id).filter(
+            MemoryEntityLink.project_id == project_id,
+            or_(*conditions)
+        )
 
-        if experiment_ids:
-            for eid in experiment_ids:
-                conditions.append(cast(ConversationMemory.linked_experiment_ids, String).like(f'%"{eid}"%'))
+    def get_candidate_memories(
+        self,
+        project_id: str,
+        entity_ids: Optional[Dict[str, List[str]]] = None,
+        interaction_types: Optional[List[str]] = None,
+        link_limit: int = 50,
+        type_limit: int = 20,
+        recent_limit: int = 30
+    ) -> List[Dict[str, Any]]:
+        """
+        Retrieval candidates from one UNION ALL query.
 
-        if conditions:
-            query = query.filter(or_(*conditions))
+        Combines, in priority order:
+        - memories linked to entity_ids (same as get_memories_by_links)
+        - the top memories of each interaction type (get_memories_by_project per type)
+        - the top memories of the project, only used when both of the above are empty
 
-        memories = query.order_by(
-            desc(ConversationMemory.relevance_score),
-            desc(ConversationMemory.created_at)
-        ).limit(limit).all()
+        Each branch ranks with row_number() so per-type limits hold inside a
+        single statement. Returns deduplicated memory dicts.
+        """
+        ranking = (desc(ConversationMemory.relevance_score), desc(ConversationMemory.created_at))
+        active = [
+            ConversationMemory.project_id == project_id,
+            ConversationMemory.is_archived == False
+        ]
+        unexpired = or_(
+            ConversationMemory.expires_at.is_(None),
+            ConversationMemory.expires_at > datetime.utcnow()
+        )
 
-        return [self._memory_to_dict(m) for m in memories]
+        def ranked(source: str, conditions: List, limit: int, partition_by=None):
+            rank = func.row_number().over(partition_by=partition_by, order_by=ranking).label('rank')
+            inner = select(
+                ConversationMemory.memory_id,
+                literal(source, String).label('source'),
+                rank
+            ).where(*conditions).subquery()
+            return select(inner.c.memory_id, inner.c.source, inner.c.rank).where(inner.c.rank <= limit)
+
+        branches = []
+        entity_ids = entity_ids or {}
+        linked = self.linked_memory_ids(
+            project_id,
+            question=entity_ids.get('questions'),
+            hypothesis=entity_ids.get('hypotheses'),
+            paper=entity_ids.get('papers'),
+            protocol=entity_ids.get('protocols'),
+            experiment=entity_ids.get('experiments')
+        )
+        if linked is not None:
+            branches.append(ranked('link', active + [ConversationMemory.memory_id.in_(linked)], link_limit))
+        if interaction_types:
+            branches.append(ranked(
+                'type',
+                active + [unexpired, ConversationMemory.interaction_type.in_(interaction_types)],
+                type_limit,
+                partition_by=ConversationMemory.interaction_type
+            ))
+        branches.append(ranked('recent', active + [unexpired], recent_limit))
+
+        candidates = union_all(*branches).subquery('candidates')
+        rows = self.db.query(ConversationMemory, candidates.c.source, candidates.c.rank).join(
+            candidates, ConversationMemory.memory_id == candidates.c.memory_id
+        ).all()
+
+        type_order = {t: i for i, t in enumerate(interaction_types or [])}
+        source_order = {'link': 0, 'type': 1, 'recent': 2}
+
+        def sort_key(row):
+            memory, source, rank = row
+            return (source_order[source], type_order.get(memory.interaction_type, 0) if source == 'type' else 0, rank)
+
+        rows.sort(key=sort_key)
+        if any(source != 'recent' for _, source, _ in rows):
+            rows = [row for row in rows if row[1] != 'recent']
+
+        seen = set()
+        result = []
+        for memory, _, _ in rows:
+            if memory.memory_id not in seen:
+                seen.add(memory.memory_id)
+                result.append(self._memory_to_dict(memory))
+        return result
 
     def update_relevance_score(self, memory_id: str, new_score: float) -> bool:
         """
@@ -316,6 +436,10 @@ class MemoryStore:
             query = query.filter(ConversationMemory.project_id == project_id)
 
         count = query.count()
+        # Bulk deletes bypass the ORM cascade (and SQLite does not enforce FKs by default)
+        self.db.query(MemoryEntityLink).filter(
+            MemoryEntityLink.memory_id.in_(query.with_entities(ConversationMemory.memory_id))
+        ).delete(synchronize_session=False)
         query.delete(synchronize_session=False)
         self.db.commit()
 
@@ -339,6 +463,19 @@ class MemoryStore:
 
             self.db.commit()
 
+    def _build_entity_links(self, memory: ConversationMemory) -> List[MemoryEntityLink]:
+        """memory_entity_links rows mirroring a memory's linked_*_ids arrays."""
+        links = []
+        for entity_type, column in ENTITY_LINK_COLUMNS.items():
+            for entity_id in dict.fromkeys(getattr(memory, column) or []):
+                links.append(MemoryEntityLink(
+                    memory_id=memory.memory_id,
+                    entity_type=entity_type,
+                    entity_id=str(entity_id),
+                    project_id=memory.project_id
+                ))
+        return links
+
     def _memory_to_dict(self, memory: ConversationMemory) -> Dict[str, Any]:
         """Convert memory model to dictionary."""
         return {
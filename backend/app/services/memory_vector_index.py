@@ -0,0 +1,292 @@
+"""
+Memory Vector Index - Memory System
+
+Per-project vector index over conversation memories, used by RetrievalEngine
+for semantic top-k retrieval.
+
+Memories are embedded once when MemoryStore.store_memory writes them (the
+vector is persisted in conversation_memory.embedding). Rows stored before
+embeddings existed are embedded in memory when their project is indexed;
+ensure_embeddings persists them from an explicit backfill. Two backends:
+
+- LocalMemoryIndex (default): one flat, L2-normalized NumPy matrix per
+  project held in process. Projects keep at most a few hundred active
+  memories, so exact search is a single matrix-vector product. Each lookup
+  first syncs the project's active memory ids with one indexed query, so
+  memories written, archived or pruned by other workers are picked up.
+  The index is shared by concurrent requests: each project's vectors are
+  replaced copy-on-write under a per-project lock, and lookups score against
+  one consistent (ids, positions, matrix) snapshot.
+- PineconeMemoryIndex (optional): the existing Pinecone index, selected with
+  MEMORY_VECTOR_BACKEND=pinecone when PINECONE_API_KEY is set.
+
+Embeddings default to deterministic hashed text features, so no model is
+needed on the request path; any callable mapping texts to an (n, dim) array
+can be supplied instead.
+"""
+
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from database import ConversationMemory
+from services.domain_candidate_pool import embed_texts
+
+logger = logging.getLogger(__name__)
+
+MEMORY_EMBEDDING_DIM = int(os.getenv("MEMORY_EMBEDDING_DIM", "384"))  # all-MiniLM-L6-v2 size, as in Pinecone
+
+EmbedFn = Callable[[Sequence[str]], np.ndarray]
+
+
+def memory_text(summary: Optional[str], content: Any) -> str:
+    """Searchable text of a memory: its summary plus string content values."""
+    parts = []
+
+    if summary:
+        parts.append(summary)
+
+    if isinstance(content, dict):
+        for key, value in content.items():
+            if isinstance(value, str):
+                parts.append(value)
+            elif isinstance(value, list):
+                for item in value:
+                    if isinstance(item, str):
+                        parts.append(item)
+
+    return " ".join(parts)
+
+
+def hashed_embeddings(texts: Sequence[str]) -> np.ndarray:
+    return embed_texts(texts, dim=MEMORY_EMBEDDING_DIM)
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+
+class _ProjectVectors:
+    """Flat index for one project"""
+
+    def __init__(self, dim: int):
+        self.lock = threading.Lock()
+        self.ids: List[str] = []
+        self.positions: Dict[str, int] = {}
+        self.matrix = np.zeros((0, dim), dtype=np.float32)
+
+    def snapshot(self) -> Tuple[List[str], Dict[str, int], np.ndarray]:
+        with self.lock:
+            return self.ids, self.positions, self.matrix
+
+    def add(self, memory_ids: List[str], vectors: np.ndarray):
+        with self.lock:
+            new = [(mid, vec) for mid, vec in zip(memory_ids, vectors) if mid not in self.positions]
+            if not new:
+                return
+            ids = self.ids + [mid for mid, _ in new]
+            matrix = np.vstack([self.matrix, _normalize(np.stack([vec for _, vec in new]))])
+            self.ids, self.positions, self.matrix = ids, {mid: i for i, mid in enumerate(ids)}, matrix
+
+    def retain(self, memory_ids: set):
+        with self.lock:
+            keep = [i for i, mid in enumerate(self.ids) if mid in memory_ids]
+            if len(keep) == len(self.ids):
+                return
+            ids = [self.ids[i] for i in keep]
+            self.ids, self.positions, self.matrix = ids, {mid: i for i, mid in enumerate(ids)}, self.matrix[keep]
+
+    def missing(self, memory_ids: set) -> List[str]:
+        with self.lock:
+            return [mid for mid in memory_ids if mid not in self.positions]
+
+
+class LocalMemoryIndex:
+    """In-process flat vector index, one matrix per project."""
+
+    backend = "local"
+
+    def __init__(self, embed_fn: Optional[EmbedFn] = None, dim: int = MEMORY_EMBEDDING_DIM):
+        self.embed_fn = embed_fn or hashed_embeddings
+        self.dim = dim
+        self._projects: Dict[str, _ProjectVectors] = {}
+        self._lock = threading.Lock()
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        return _normalize(self.embed_fn(list(texts)))
+
+    def add(self, project_id: str, memory_id: str, vector: Sequence[float]):
+        """Index a newly stored memory (no-op until the project is first searched)."""
+        with self._lock:
+            vectors = self._projects.get(project_id)
+        if vectors is not None:
+            vectors.add([memory_id], np.asarray([vector], dtype=np.float32))
+
+    def search(self, db: Session, project_id: str, query_vector: np.ndarray, k: int) -> List[Tuple[str, float]]:
+        """Top-k (memory_id, cosine similarity) among the project's active memories."""
+        ids, _, matrix = self._sync(db, project_id).snapshot()
+        if not ids or k <= 0:
+            return []
+        scores = matrix @ _normalize(query_vector)
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(ids[i], float(scores[i])) for i in top]
+
+    def similarities(self, db: Session, project_id: str, query_vector: np.ndarray,
+                     memory_ids: List[str]) -> np.ndarray:
+        """Cosine similarity of the query to each memory (0 for unindexed ids)."""
+        _, positions, matrix = self._sync(db, project_id).snapshot()
+        rows = [positions.get(mid, -1) for mid in memory_ids]
+        scores = np.zeros(len(memory_ids), dtype=np.float32)
+        found = np.array([r >= 0 for r in rows], dtype=bool)
+        if found.any():
+            scores[found] = matrix[[r for r in rows if r >= 0]] @ _normalize(query_vector)
+        return scores
+
+    def invalidate(self, project_id: Optional[str] = None):
+        with self._lock:
+            if project_id is None:
+                self._projects.clear()
+            else:
+                self._projects.pop(project_id, None)
+
+    def _sync(self, db: Session, project_id: str) -> _ProjectVectors:
+        """Align the project's vectors with its active memories in one id query."""
+        with self._lock:
+            vectors = self._projects.setdefault(project_id, _ProjectVectors(self.dim))
+        active = {mid for (mid,) in db.query(ConversationMemory.memory_id).filter(
+            ConversationMemory.project_id == project_id,
+            ConversationMemory.is_archived == False,
+            or_(
+                ConversationMemory.expires_at.is_(None),
+                ConversationMemory.expires_at > datetime.utcnow()
+            )
+        )}
+        vectors.retain(active)
+
+        missing = vectors.missing(active)
+        if missing:
+            rows = db.query(ConversationMemory).filter(ConversationMemory.memory_id.in_(missing)).all()
+            if rows:
+                # Read path: legacy rows are embedded here but not written back
+                vectors.add([r.memory_id for r in rows], memory_vectors(rows, self))
+        return vectors
+
+
+class PineconeMemoryIndex:
+    """Memory vectors in the shared Pinecone index, filtered by project."""
+
+    backend = "pinecone"
+
+    def __init__(self, index, embed_fn: Optional[EmbedFn] = None, dim: int = MEMORY_EMBEDDING_DIM):
+        self.index = index
+        self.embed_fn = embed_fn or hashed_embeddings
+        self.dim = dim
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        return _normalize(self.embed_fn(list(texts)))
+
+    def add(self, project_id: str, memory_id: str, vector: Sequence[float]):
+        try:
+            self.index.upsert(vectors=[{
+                "id": f"memory:{memory_id}",
+                "values": [float(v) for v in vector],
+                "metadata": {"project_id": project_id, "memory_id": memory_id, "kind": "conversation_memory"}
+            }])
+        except Exception as e:
+            logger.warning(f"⚠️ Pinecone memory upsert failed for {memory_id}: {e}")
+
+    def _query(self, project_id: str, query_vector: np.ndarray, k: int, extra_filter: Optional[Dict] = None):
+        flt = {"project_id": {"$eq": project_id}, "kind": {"$eq": "conversation_memory"}}
+        flt.update(extra_filter or {})
+        res = self.index.query(vector=_normalize(query_vector).tolist(), top_k=k, filter=flt, include_metadata=True)
+        return [((m.get("metadata") or {}).get("memory_id"), float(m.get("score", 0.0)))
+                for m in res.get("matches", []) or []]
+
+    def search(self, db: Session, project_id: str, query_vector: np.ndarray, k: int) -> List[Tuple[str, float]]:
+        try:
+            return [(mid, score) for mid, score in self._query(project_id, query_vector, k) if mid]
+        except Exception as e:
+            logger.warning(f"⚠️ Pinecone memory query failed: {e}")
+            return []
+
+    def similarities(self, db: Session, project_id: str, query_vector: np.ndarray,
+                     memory_ids: List[str]) -> np.ndarray:
+        if not memory_ids:
+            return np.zeros(0, dtype=np.float32)
+        try:
+            scores = dict(self._query(project_id, query_vector, len(memory_ids),
+                                      {"memory_id": {"$in": list(memory_ids)}}))
+        except Exception as e:
+            logger.warning(f"⚠️ Pinecone memory similarity query failed: {e}")
+            scores = {}
+        return np.array([scores.get(mid, 0.0) for mid in memory_ids], dtype=np.float32)
+
+    def invalidate(self, project_id: Optional[str] = None):
+        pass
+
+
+def _needs_embedding(memory: ConversationMemory, dim: int) -> bool:
+    return not memory.embedding or len(memory.embedding) != dim
+
+
+def memory_vectors(memories: List[ConversationMemory], index) -> np.ndarray:
+    """Vectors of the memories, embedding those without a stored one (nothing is written)."""
+    vectors = np.zeros((len(memories), index.dim), dtype=np.float32)
+    pending = []
+    for i, memory in enumerate(memories):
+        if _needs_embedding(memory, index.dim):
+            pending.append(i)
+        else:
+            vectors[i] = memory.embedding
+    if pending:
+        vectors[pending] = index.embed([memory_text(memories[i].summary, memories[i].content) for i in pending])
+    return vectors
+
+
+def ensure_embeddings(db: Session, memories: List[ConversationMemory], index) -> int:
+    """
+    Backfill job: set embeddings on memories stored before embeddings existed.
+
+    Only assigns the column on the caller's session; flushing and committing
+    are left to the caller. Returns the number of memories updated.
+    """
+    pending = [m for m in memories if _needs_embedding(m, index.dim)]
+    if pending:
+        for memory, vector in zip(pending, index.embed([memory_text(m.summary, m.content) for m in pending])):
+            memory.embedding = vector.tolist()
+    return len(pending)
+
+
+def _create_index():
+    if os.getenv("MEMORY_VECTOR_BACKEND", "local").lower() == "pinecone" and os.getenv("PINECONE_API_KEY"):
+        try:
+            from pinecone import Pinecone
+            pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
+            host = os.getenv("PINECONE_HOST")
+            index = pc.Index(host=host) if host else pc.Index(os.getenv("PINECONE_INDEX", "rd-agent-memory"))
+            logger.info("🧠 Memory vector index: Pinecone")
+            return PineconeMemoryIndex(index)
+        except Exception as e:
+            logger.warning(f"⚠️ Pinecone unavailable for memories, using local index: {e}")
+    return LocalMemoryIndex()
+
+
+_memory_vector_index = None
+
+
+def get_memory_vector_index():
+    """Process-wide memory vector index (local unless configured for Pinecone)."""
+    global _memory_vector_index
+    if _memory_vector_index is None:
+        _memory_vector_index = _create_index()
+    return _memory_vector_index
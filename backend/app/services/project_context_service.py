@@ -16,15 +16,24 @@ Week 19: Context-Aware Architecture
 import logging
 from typing import Dict, List, Optional
 from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
-from database import (
-    Project, ResearchQuestion, Hypothesis, ProjectDecision,
-    PaperTriage, Protocol, Experiment, Article
+from backend.app.services.project_context_snapshot import (
+    ProjectContextSnapshot, get_project_context_snapshots
 )
 
 logger = logging.getLogger(__name__)
 
+QUESTION_PRIORITY_RANK = {'critical': 3, 'high': 2, 'medium': 1, 'low': 0}
+
+
+def _as_utc_naive(value: datetime) -> datetime:
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+
+def _newest_first(rows: List, key: str) -> List:
+    return sorted(rows, key=lambda r: (r.get(key) is not None, r.get(key) or 0), reverse=True)
+
 
 class ProjectContextService:
     """
@@ -70,8 +79,9 @@ class ProjectContextService:
         """
         logger.info(f"🔍 Fetching full context for project {project_id}")
         
-        # Get project
-        project = db.query(Project).filter(Project.project_id == project_id).first()
+        # Get project snapshot (shared with the other context consumers)
+        snapshot = get_project_context_snapshots().get(db, project_id)
+        project = snapshot.project
         if not project:
             logger.warning(f"⚠️ Project {project_id} not found")
             return self._empty_context(project_id)
@@ -79,23 +89,24 @@ class ProjectContextService:
         # Build context
         context = {
             "project_id": project_id,
-            "project_name": project.name,
+            "project_name": project.project_name,
             "project_description": project.description or "",
             "created_at": project.created_at.isoformat() if project.created_at else None,
             
             # Core research elements
-            "questions": self._get_questions(project_id, db),
-            "hypotheses": self._get_hypotheses(project_id, db),
-            "decisions": self._get_decisions(project_id, db),
+            "questions": self._get_questions(snapshot),
+            "hypotheses": self._get_hypotheses(snapshot),
+            "decisions": self._get_decisions(snapshot),
             
             # Research artifacts
-            "papers": self._get_papers(project_id, db) if include_papers else [],
-            "protocols": self._get_protocols(project_id, db) if include_protocols else [],
-            "experiments": self._get_experiments(project_id, db) if include_experiments else [],
+            "papers": self._get_papers(snapshot) if include_papers else [],
+            "protocols": self._get_protocols(snapshot) if include_protocols else [],
+            "experiments": self._get_experiments(snapshot) if include_experiments else [],
             
             # Metadata
             "context_generated_at": datetime.utcnow().isoformat(),
-            "context_version": "1.0"
+            "context_version": "1.0",
+            "snapshot_version": snapshot.version
         }
         
         logger.info(f"✅ Context: {len(context['questions'])} Q, {len(context['hypotheses'])} H, "
@@ -111,23 +122,23 @@ class ProjectContextService:
         """
         logger.info(f"🎯 Fetching research focus for project {project_id}")
         
-        project = db.query(Project).filter(Project.project_id == project_id).first()
+        snapshot = get_project_context_snapshots().get(db, project_id)
+        project = snapshot.project
         
         return {
             "project_id": project_id,
             "project_description": project.description[:200] if project and project.description else "",
-            "questions": self._get_questions(project_id, db),
-            "hypotheses": self._get_hypotheses(project_id, db)
+            "questions": self._get_questions(snapshot),
+            "hypotheses": self._get_hypotheses(snapshot)
         }
     
-    def _get_questions(self, project_id: str, db: Session) -> List[Dict]:
+    def _get_questions(self, snapshot: ProjectContextSnapshot) -> List[Dict]:
         """Get top research questions by priority."""
-        questions = db.query(ResearchQuestion).filter(
-            ResearchQuestion.project_id == project_id
-        ).order_by(
-            ResearchQuestion.priority.desc(),
-            ResearchQuestion.created_at.desc()
-        ).limit(self.max_questions).all()
+        questions = sorted(
+            _newest_first(snapshot.questions, "created_at"),
+            key=lambda q: QUESTION_PRIORITY_RANK.get(q.priority, 0),
+            reverse=True
+        )[:self.max_questions]
         
         return [
             {
@@ -135,19 +146,18 @@ class ProjectContextService:
                 "question_text": q.question_text,
                 "priority": q.priority,
                 "status": q.status,
-                "tags": q.tags or []
+                "tags": q.get("tags") or []
             }
             for q in questions
         ]
     
-    def _get_hypotheses(self, project_id: str, db: Session) -> List[Dict]:
+    def _get_hypotheses(self, snapshot: ProjectContextSnapshot) -> List[Dict]:
         """Get top hypotheses by confidence."""
-        hypotheses = db.query(Hypothesis).filter(
-            Hypothesis.project_id == project_id
-        ).order_by(
-            Hypothesis.confidence_level.desc(),
-            Hypothesis.created_at.desc()
-        ).limit(self.max_hypotheses).all()
+        hypotheses = sorted(
+            _newest_first(snapshot.hypotheses, "created_at"),
+            key=lambda h: h.confidence_level if h.confidence_level is not None else -1,
+            reverse=True
+        )[:self.max_hypotheses]
         
         return [
             {
@@ -155,22 +165,23 @@ class ProjectContextService:
                 "hypothesis_text": h.hypothesis_text,
                 "confidence_level": h.confidence_level,
                 "status": h.status,
-                "related_question_id": h.related_question_id
+                "related_question_id": h.question_id
             }
             for h in hypotheses
         ]
 
-    def _get_decisions(self, project_id: str, db: Session) -> List[Dict]:
+    def _decisions_cutoff(self) -> datetime:
+        """Oldest decision time included in context (last 90 days)."""
+        return datetime.utcnow() - timedelta(days=90)
+
+    def _get_decisions(self, snapshot: ProjectContextSnapshot) -> List[Dict]:
         """Get recent decisions."""
-        # Get decisions from last 90 days
-        cutoff = datetime.utcnow() - timedelta(days=90)
+        cutoff = self._decisions_cutoff()
 
-        decisions = db.query(ProjectDecision).filter(
-            ProjectDecision.project_id == project_id,
-            ProjectDecision.created_at >= cutoff
-        ).order_by(
-            ProjectDecision.created_at.desc()
-        ).limit(self.max_decisions).all()
+        decisions = [
+            d for d in snapshot.decisions
+            if d.decided_at and _as_utc_naive(d.decided_at) >= cutoff
+        ][:self.max_decisions]
 
         return [
             {
@@ -179,65 +190,53 @@ class ProjectContextService:
                 "decision_text": f"{d.title}: {d.description}",
                 "decision_type": d.decision_type,
                 "rationale": d.rationale,
-                "created_at": d.created_at.isoformat() if d.created_at else None
+                "created_at": d.decided_at.isoformat() if d.decided_at else None
             }
             for d in decisions
         ]
 
-    def _get_papers(self, project_id: str, db: Session) -> List[Dict]:
+    def _get_papers(self, snapshot: ProjectContextSnapshot) -> List[Dict]:
         """Get key triaged papers (must-read only)."""
-        triages = db.query(PaperTriage).filter(
-            PaperTriage.project_id == project_id,
-            PaperTriage.triage_status == 'must_read'
-        ).order_by(
-            PaperTriage.relevance_score.desc()
-        ).limit(self.max_papers).all()
-
-        papers = []
-        for triage in triages:
-            article = db.query(Article).filter(Article.pmid == triage.article_pmid).first()
-            if article:
-                papers.append({
-                    "pmid": article.pmid,
-                    "title": article.title,
-                    "relevance_score": triage.relevance_score,
-                    "impact_assessment": triage.impact_assessment
-                })
-
-        return papers
-
-    def _get_protocols(self, project_id: str, db: Session) -> List[Dict]:
-        """Get extracted protocols."""
-        protocols = db.query(Protocol).filter(
-            Protocol.project_id == project_id
-        ).order_by(
-            Protocol.created_at.desc()
-        ).limit(self.max_protocols).all()
+        must_read = sorted(
+            [(article, triage) for article, triage in snapshot.papers if triage.triage_status == 'must_read'],
+            key=lambda pair: pair[1].relevance_score or 0,
+            reverse=True
+        )[:self.max_papers]
 
+        return [
+            {
+                "pmid": article.pmid,
+                "title": article.title,
+                "relevance_score": triage.relevance_score,
+                "impact_assessment": triage.impact_assessment
+            }
+            for article, triage in must_read
+        ]
+
+    def _get_protocols(self, snapshot: ProjectContextSnapshot) -> List[Dict]:
+        """Get extracted protocols."""
         return [
             {
                 "protocol_id": p.protocol_id,
                 "protocol_name": p.protocol_name,
                 "protocol_type": p.protocol_type,
-                "relevance_score": getattr(p, 'relevance_score', None),
-                "context_aware": getattr(p, 'context_aware', False)
+                "relevance_score": p.get('relevance_score'),
+                "context_aware": p.get('context_aware', False)
             }
-            for p in protocols
+            for p in snapshot.protocols[:self.max_protocols]
         ]
 
-    def _get_experiments(self, project_id: str, db: Session) -> List[Dict]:
+    def _get_experiments(self, snapshot: ProjectContextSnapshot) -> List[Dict]:
         """Get active experiments."""
-        experiments = db.query(Experiment).filter(
-            Experiment.project_id == project_id,
-            Experiment.status.in_(['planned', 'in_progress'])
-        ).order_by(
-            Experiment.created_at.desc()
-        ).limit(5).all()
+        experiments = [
+            e for e in snapshot.experiments
+            if e.status in ('planned', 'in_progress')
+        ][:5]
 
         return [
             {
                 "experiment_id": e.experiment_id,
-                "experiment_name": e.experiment_name,
+                "experiment_name": e.experiment_title,
                 "status": e.status,
                 "protocol_id": e.protocol_id
             }
@@ -257,7 +256,8 @@ class ProjectContextService:
             "protocols": [],
             "experiments": [],
             "context_generated_at": datetime.utcnow().isoformat(),
-            "context_version": "1.0"
+            "context_version": "1.0",
+            "snapshot_version": None
         }
 
     def format_for_prompt(self, context: Dict, max_length: int = 1000) -> str:
@@ -271,6 +271,17 @@ class ProjectContextService:
         Returns:
             Formatted string for prompt injection
         """
+        # Contexts from get_full_context are memoized on their snapshot version;
+        # the key also carries the decisions cutoff day so aged-out decisions drop
+        snapshot = get_project_context_snapshots().peek(context.get("project_id"))
+        if snapshot is not None and snapshot.version is not None \
+                and context.get("snapshot_version") == snapshot.version:
+            cutoff_day = self._decisions_cutoff().date()
+            return snapshot.memoize(("project_context.format_for_prompt", max_length, cutoff_day),
+                                    lambda: self._format_for_prompt(context, max_length))
+        return self._format_for_prompt(context, max_length)
+
+    def _format_for_prompt(self, context: Dict, max_length: int) -> str:
         parts = []
 
         # Project description
@@ -0,0 +1,366 @@
+"""
+Project Context Snapshots
+
+Versioned, shared snapshot of a project's research context.
+
+ContextManager, ProjectContextService, InsightsService, LivingSummaryService
+and ExperimentPlannerService all need the same rows - questions, hypotheses,
+triaged papers, protocols, experiment plans/results, decisions and evidence
+links - and used to reload them separately, several times per request.
+
+Now they all read one snapshot per project:
+- `projects.context_version` is bumped by a session `after_flush` hook in the
+  same transaction as any write to those rows (see `_after_flush`), so a
+  committed change always moves the version.
+- `ProjectContextSnapshots.get()` reads the version (one primary-key lookup)
+  and returns the cached snapshot while it still matches; otherwise it loads
+  every table once and caches the result for all services in the process.
+- Snapshot rows are detached, read-only `SnapshotRow` copies of the column
+  values (attribute and dict access), so they can be shared across sessions.
+- `ProjectContextSnapshot.memoize()` caches derived output such as formatted
+  prompt context; it lives and dies with the snapshot version.
+
+Article rows are loaded with the "pool" load profile and are not versioned:
+bibliographic data is treated as immutable once triaged.
+"""
+
+import logging
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.orm import Session
+
+from database import (
+    Project, ResearchQuestion, Hypothesis, QuestionEvidence, HypothesisEvidence,
+    Article, PaperTriage, Protocol, Experiment, ExperimentPlan, ExperimentResult,
+    ProjectDecision
+)
+from utils.article_profiles import ARTICLE_LOAD_PROFILES
+
+logger = logging.getLogger(__name__)
+
+CONTEXT_SNAPSHOT_CACHE_SIZE = int(os.getenv("CONTEXT_SNAPSHOT_CACHE_SIZE", "256"))
+
+# Rows with a project_id whose writes change the project context
+PROJECT_SCOPED_MODELS = (
+    ResearchQuestion, Hypothesis, PaperTriage, Protocol, Experiment,
+    ExperimentPlan, ExperimentResult, ProjectDecision
+)
+# Evidence rows reach their project through the parent question / hypothesis
+EVIDENCE_PARENTS = {
+    QuestionEvidence: (QuestionEvidence.question_id, ResearchQuestion.question_id, ResearchQuestion.project_id),
+    HypothesisEvidence: (HypothesisEvidence.hypothesis_id, Hypothesis.hypothesis_id, Hypothesis.project_id),
+}
+# Project columns that are part of the context
+PROJECT_CONTEXT_FIELDS = ("project_name", "description", "tags", "settings")
+
+
+class SnapshotRow:
+    """Read-only copy of a row's column values with attribute and dict access"""
+
+    __slots__ = ("_values",)
+
+    def __init__(self, values: Dict[str, Any]):
+        object.__setattr__(self, "_values", values)
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self._values[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError("snapshot rows are read-only")
+
+    def __getitem__(self, key: str) -> Any:
+        return self._values[key]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._values
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._values.get(key, default)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self._values)
+
+    def __repr__(self):
+        return f"SnapshotRow({self._values!r})"
+
+
+@dataclass
+class ProjectContextSnapshot:
+    """
+    A project's research context at one context_version
+
+    Collections use the canonical orderings shared by the services:
+    questions and hypotheses oldest first, papers by triage date, protocols,
+    plans and experiments newest first, results by completion (unfinished
+    last) and decisions by decision date.
+    """
+    project_id: str
+    version: Optional[int]
+    project: Optional[SnapshotRow]
+    questions: List[SnapshotRow] = field(default_factory=list)
+    hypotheses: List[SnapshotRow] = field(default_factory=list)
+    papers: List[Tuple[SnapshotRow, SnapshotRow]] = field(default_factory=list)  # (article, triage)
+    protocols: List[SnapshotRow] = field(default_factory=list)
+    experiments: List[SnapshotRow] = field(default_factory=list)
+    plans: List[SnapshotRow] = field(default_factory=list)
+    results: List[SnapshotRow] = field(default_factory=list)  # .plan is the linked plan row
+    decisions: List[SnapshotRow] = field(default_factory=list)
+    question_evidence: List[SnapshotRow] = field(default_factory=list)
+    hypothesis_evidence: List[SnapshotRow] = field(default_factory=list)
+    built_at: datetime = field(default_factory=datetime.utcnow)
+    _memo: Dict[Hashable, Any] = field(default_factory=dict, repr=False)
+
+    def memoize(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        """Cache a value derived from this snapshot (e.g. formatted prompt text)"""
+        try:
+            return self._memo[key]
+        except KeyError:
+            value = self._memo[key] = build()
+            return value
+
+
+# ============================================================================
+# Loading
+# ============================================================================
+
+def _columns(model) -> List[str]:
+    return [attr.key for attr in inspect(model).column_attrs]
+
+
+def _load_rows(db: Session, model, *criteria, names: Optional[Iterable[str]] = None) -> List[SnapshotRow]:
+    names = list(names or _columns(model))
+    rows = db.query(*[getattr(model, n) for n in names]).filter(*criteria).all()
+    return [SnapshotRow(dict(zip(names, row))) for row in rows]
+
+
+def _ordered(rows: List[SnapshotRow], key: str, descending: bool = False) -> List[SnapshotRow]:
+    """Sort on a nullable column, rows without a value last"""
+    present = [r for r in rows if r.get(key) is not None]
+    present.sort(key=lambda r: r[key], reverse=descending)
+    return present + [r for r in rows if r.get(key) is None]
+
+
+def _load_papers(db: Session, project_id: str) -> List[Tuple[SnapshotRow, SnapshotRow]]:
+    article_names = list(ARTICLE_LOAD_PROFILES["pool"])
+    triage_names = _columns(PaperTriage)
+    rows = db.query(
+        *[getattr(Article, n) for n in article_names],
+        *[getattr(PaperTriage, n) for n in triage_names]
+    ).join(
+        PaperTriage, Article.pmid == PaperTriage.article_pmid
+    ).filter(
+        PaperTriage.project_id == project_id
+    ).all()
+
+    split = len(article_names)
+    papers = [
+        (SnapshotRow(dict(zip(article_names, row[:split]))), SnapshotRow(dict(zip(triage_names, row[split:]))))
+        for row in rows
+    ]
+    present = [p for p in papers if p[1].triaged_at is not None]
+    present.sort(key=lambda p: p[1].triaged_at, reverse=True)
+    return present + [p for p in papers if p[1].triaged_at is None]
+
+
+def build_snapshot(db: Session, project_id: str, version: Optional[int]) -> ProjectContextSnapshot:
+    """Load a project's full research context (one query per table)"""
+    projects = _load_rows(db, Project, Project.project_id == project_id)
+    if not projects:
+        return ProjectContextSnapshot(project_id=project_id, version=version, project=None)
+
+    plans = _ordered(_load_rows(db, ExperimentPlan, ExperimentPlan.project_id == project_id),
+                     "created_at", descending=True)
+    plans_by_id = {p.plan_id: p for p in plans}
+    results = [
+        SnapshotRow({**r.to_dict(), "plan": plans_by_id.get(r.plan_id)})
+        for r in _load_rows(db, ExperimentResult, ExperimentResult.project_id == project_id)
+    ]
+
+    return ProjectContextSnapshot(
+        project_id=project_id,
+        version=version,
+        project=projects[0],
+        questions=_ordered(_load_rows(db, ResearchQuestion, ResearchQuestion.project_id == project_id),
+                           "created_at"),
+        hypotheses=_ordered(_load_rows(db, Hypothesis, Hypothesis.project_id == project_id), "created_at"),
+        papers=_load_papers(db, project_id),
+        protocols=_ordered(_load_rows(db, Protocol, Protocol.project_id == project_id),
+                           "created_at", descending=True),
+        experiments=_ordered(_load_rows(db, Experiment, Experiment.project_id == project_id),
+                             "created_at", descending=True),
+        plans=plans,
+        results=_ordered(results, "completed_at", descending=True),
+        decisions=_ordered(_load_rows(db, ProjectDecision, ProjectDecision.project_id == project_id),
+                           "decided_at", descending=True),
+        question_evidence=_load_rows(
+            db, QuestionEvidence,
+            QuestionEvidence.question_id.in_(
+                select(ResearchQuestion.question_id).where(ResearchQuestion.project_id == project_id)
+            )
+        ),
+        hypothesis_evidence=_load_rows(
+            db, HypothesisEvidence,
+            HypothesisEvidence.hypothesis_id.in_(
+                select(Hypothesis.hypothesis_id).where(Hypothesis.project_id == project_id)
+            )
+        ),
+    )
+
+
+# ============================================================================
+# Snapshot cache
+# ============================================================================
+
+class ProjectContextSnapshots:
+    """Process-wide LRU of project snapshots, validated against context_version"""
+
+    def __init__(self, max_projects: int = CONTEXT_SNAPSHOT_CACHE_SIZE):
+        self.max_projects = max_projects
+        self._snapshots: "OrderedDict[str, ProjectContextSnapshot]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.builds = 0
+
+    def current_version(self, db: Session, project_id: str) -> Optional[int]:
+        """The project's context_version, or None when it cannot be versioned"""
+        if not _versioning_enabled(db.connection()):
+            return None
+        return db.query(Project.context_version).filter(Project.project_id == project_id).scalar()
+
+    def get(self, db: Session, project_id: str) -> ProjectContextSnapshot:
+        """
+        Current snapshot of a project's context
+
+        Sessions holding uncommitted context writes for the project get a
+        private snapshot, so data that may still roll back is never shared.
+        """
+        version = self.current_version(db, project_id)
+        shareable = version is not None and project_id not in db.info.get(_PENDING_KEY, ())
+
+        if shareable:
+            with self._lock:
+                snapshot = self._snapshots.get(project_id)
+                if snapshot is not None and snapshot.version == version:
+                    self._snapshots.move_to_end(project_id)
+                    self.hits += 1
+                    return snapshot
+
+        snapshot = build_snapshot(db, project_id, version)
+        self.builds += 1
+        logger.info(f"📸 Built context snapshot for project {project_id} (version {version})")
+
+        if shareable and snapshot.project is not None:
+            with self._lock:
+                current = self._snapshots.get(project_id)
+                if current is None or current.version is None or current.version <= version:
+                    self._snapshots[project_id] = snapshot
+                    self._snapshots.move_to_end(project_id)
+                while len(self._snapshots) > self.max_projects:
+                    self._snapshots.popitem(last=False)
+        return snapshot
+
+    def peek(self, project_id: Optional[str]) -> Optional[ProjectContextSnapshot]:
+        """Cached snapshot without a version check (None when not cached)"""
+        with self._lock:
+            return self._snapshots.get(project_id)
+
+    def invalidate(self, project_id: Optional[str] = None):
+        with self._lock:
+            if project_id is None:
+                self._snapshots.clear()
+            else:
+                self._snapshots.pop(project_id, None)
+
+
+_project_context_snapshots = None
+
+
+def get_project_context_snapshots() -> ProjectContextSnapshots:
+    """Process-wide project context snapshot cache"""
+    global _project_context_snapshots
+    if _project_context_snapshots is None:
+        _project_context_snapshots = ProjectContextSnapshots()
+    return _project_context_snapshots
+
+
+# ============================================================================
+# Change counter: bump context_version when context rows are flushed
+# ============================================================================
+
+_PENDING_KEY = "context_version_pending"
+_projects_table = Project.__table__
+_version_ready: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def _versioning_enabled(connection) -> bool:
+    engine = connection.engine
+    ready = _version_ready.get(engine)
+    if ready is None:
+        columns = inspect(connection).get_columns(_projects_table.name)
+        ready = any(c["name"] == "context_version" for c in columns)
+        _version_ready[engine] = ready
+    return ready
+
+
+def _changed_projects(session: Session) -> set:
+    project_ids = set()
+    evidence_parents: Dict[Any, set] = {}
+
+    changed = list(session.new) + list(session.deleted) + [
+        obj for obj in session.dirty if session.is_modified(obj, include_collections=False)
+    ]
+    for obj in changed:
+        if isinstance(obj, PROJECT_SCOPED_MODELS):
+            if obj.project_id:
+                project_ids.add(obj.project_id)
+        elif isinstance(obj, Project):
+            state = inspect(obj)
+            if obj in session.deleted or any(
+                state.attrs[name].history.has_changes() for name in PROJECT_CONTEXT_FIELDS
+            ):
+                project_ids.add(obj.project_id)
+        elif type(obj) in EVIDENCE_PARENTS:
+            fk, _, _ = EVIDENCE_PARENTS[type(obj)]
+            evidence_parents.setdefault(type(obj), set()).add(getattr(obj, fk.key))
+
+    for model, parent_ids in evidence_parents.items():
+        _, parent_pk, parent_project = EVIDENCE_PARENTS[model]
+        rows = session.connection().execute(select(parent_project).where(parent_pk.in_(parent_ids)))
+        project_ids.update(pid for (pid,) in rows if pid)
+    return project_ids
+
+
+def _after_flush(session: Session, flush_context):
+    project_ids = _changed_projects(session)
+    if not project_ids:
+        return
+    connection = session.connection()
+    if not _versioning_enabled(connection):
+        return
+    connection.execute(
+        _projects_table.update()
+        .where(_projects_table.c.project_id.in_(sorted(project_ids)))
+        # Keep updated_at: a context change is not an edit of the project itself
+        .values(context_version=func.coalesce(_projects_table.c.context_version, 0) + 1,
+                updated_at=_projects_table.c.updated_at)
+    )
+    session.info.setdefault(_PENDING_KEY, set()).update(project_ids)
+
+
+def _end_transaction(session: Session, *args):
+    session.info.pop(_PENDING_KEY, None)
+
+
+event.listen(Session, "after_flush", _after_flush)
+event.listen(Session, "after_commit", _end_transaction)
+event.listen(Session, "after_rollback", _end_transaction)
@@ -2,10 +2,9 @@
 Retrieval Engine - Week 2 Day 3 Memory System
 
 Intelligent retrieval of memories using multiple strategies:
-- Semantic search (embedding-based)
-- Keyword matching
+- Semantic search (vector top-k over the project's memory index)
 - Entity-based retrieval
-- Hybrid ranking
+- Hybrid ranking (scored in NumPy over the candidate batch)
 
 Integrates with MemoryStore and ContextManager.
 """
@@ -13,12 +12,11 @@ Integrates with MemoryStore and ContextManager.
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple
 from sqlalchemy.orm import Session
-import re
-import math
-from collections import Counter
+import numpy as np
 
-from backend.app.services.memory_store import MemoryStore
+from backend.app.services.memory_store import MemoryStore, ENTITY_LINK_COLUMNS
 from backend.app.services.context_manager import ContextManager
+from backend.app.services.memory_vector_index import memory_text
 
 
 class RetrievalEngine:
@@ -26,18 +24,17 @@ class RetrievalEngine:
     Intelligent memory retrieval with multiple strategies.
     
     Retrieval Strategies:
-    1. Keyword-based (fast, exact matches)
+    1. Semantic (vector top-k over all active memories of the project)
     2. Entity-based (linked questions, hypotheses, etc.)
     3. Recency-based (recent memories)
     4. Popularity-based (frequently accessed)
     5. Hybrid ranking (combines all signals)
-    
-    Future: Semantic search with embeddings (requires OpenAI API)
     """
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, vector_index=None):
         self.db = db
-        self.memory_store = MemoryStore(db)
+        self.memory_store = MemoryStore(db, vector_index=vector_index)
+        self.vector_index = self.memory_store.vector_index
         self.context_manager = ContextManager(db)
         
         # Ranking weights
@@ -45,9 +42,10 @@ class RetrievalEngine:
             'relevance_score': 0.3,    # Base relevance
             'recency': 0.25,            # How recent
             'popularity': 0.15,         # Access count
-            'keyword_match': 0.2,       # Keyword overlap
+            'semantic_match': 0.2,      # Query/memory embedding similarity
             'entity_match': 0.1         # Entity linkage
         }
+        self.vector_top_k = 50  # Semantic candidates per query, on top of link/type candidates
     
     def retrieve_relevant_memories(
         self,
@@ -73,33 +71,37 @@ class RetrievalEngine:
         Returns:
             List of memories with computed relevance scores
         """
-        # Step 1: Get candidate memories
+        query_vector = self.vector_index.embed([query])[0] if query and query.strip() else None
+
+        # Step 1: Get candidate memories (links/types/recent, plus semantic top-k)
         candidates = self._get_candidate_memories(
             project_id, 
             interaction_types, 
             entity_ids
         )
+        if query_vector is not None:
+            candidates = self._add_semantic_candidates(
+                project_id, query_vector, candidates, interaction_types, max(self.vector_top_k, limit)
+            )
         
         if not candidates:
             return []
         
-        # Step 2: Score each candidate
-        scored_memories = []
-        for memory in candidates:
-            score = self._compute_hybrid_score(
-                memory,
-                query=query,
-                entity_ids=entity_ids
-            )
-            
-            if score >= min_score:
-                memory['computed_relevance_score'] = score
-                scored_memories.append(memory)
+        # Step 2: Score all candidates at once
+        scores = self._score_candidates(project_id, candidates, query_vector, entity_ids)
         
         # Step 3: Sort by score and limit
-        scored_memories.sort(key=lambda m: m['computed_relevance_score'], reverse=True)
+        scored_memories = []
+        for i in np.argsort(-scores, kind="stable"):
+            if scores[i] < min_score:
+                break
+            memory = candidates[i]
+            memory['computed_relevance_score'] = float(scores[i])
+            scored_memories.append(memory)
+            if len(scored_memories) >= limit:
+                break
         
-        return scored_memories[:limit]
+        return scored_memories
     
     def retrieve_context_for_task(
         self,
@@ -178,48 +180,34 @@ class RetrievalEngine:
         interaction_types: Optional[List[str]],
         entity_ids: Optional[Dict[str, List[str]]]
     ) -> List[Dict[str, Any]]:
-        """Get candidate memories for scoring."""
-        candidates = []
+        """Get candidate memories for scoring (entity links, then types, then recent) in one query."""
+        return self.memory_store.get_candidate_memories(
+            project_id=project_id,
+            entity_ids=entity_ids,
+            interaction_types=interaction_types,
+            link_limit=50,
+            type_limit=20,
+            recent_limit=30
+        )
 
-        # Strategy 1: Get by entity links (most specific)
-        if entity_ids:
-            entity_memories = self.memory_store.get_memories_by_links(
-                project_id=project_id,
-                question_ids=entity_ids.get('questions'),
-                hypothesis_ids=entity_ids.get('hypotheses'),
-                paper_ids=entity_ids.get('papers'),
-                protocol_ids=entity_ids.get('protocols'),
-                experiment_ids=entity_ids.get('experiments'),
-                limit=50
-            )
-            candidates.extend(entity_memories)
+    def _add_semantic_candidates(
+        self,
+        project_id: str,
+        query_vector: np.ndarray,
+        candidates: List[Dict[str, Any]],
+        interaction_types: Optional[List[str]],
+        k: int
+    ) -> List[Dict[str, Any]]:
+        """Append the project's vector top-k memories that are not candidates yet."""
+        seen = {m['memory_id'] for m in candidates}
+        hits = [mid for mid, _ in self.vector_index.search(self.db, project_id, query_vector, k) if mid not in seen]
+        if not hits:
+            return candidates
 
-        # Strategy 2: Get by interaction type
+        extra = self.memory_store.get_memories_by_ids(project_id, hits)
         if interaction_types:
-            for itype in interaction_types:
-                type_memories = self.memory_store.get_memories_by_project(
-                    project_id=project_id,
-                    interaction_type=itype,
-                    limit=20
-                )
-                candidates.extend(type_memories)
-
-        # Strategy 3: Get recent memories (fallback)
-        if not candidates:
-            candidates = self.memory_store.get_memories_by_project(
-                project_id=project_id,
-                limit=30
-            )
-
-        # Deduplicate by memory_id
-        seen = set()
-        unique_candidates = []
-        for memory in candidates:
-            if memory['memory_id'] not in seen:
-                seen.add(memory['memory_id'])
-                unique_candidates.append(memory)
-
-        return unique_candidates
+            extra = [m for m in extra if m['interaction_type'] in interaction_types]
+        return candidates + extra
 
     def _compute_hybrid_score(
         self,
@@ -227,174 +215,132 @@ class RetrievalEngine:
         query: Optional[str] = None,
         entity_ids: Optional[Dict[str, List[str]]] = None
     ) -> float:
+        """Hybrid relevance score of a single memory (see _score_candidates)."""
+        query_vector = self.vector_index.embed([query])[0] if query and query.strip() else None
+        return float(self._score_candidates(memory['project_id'], [memory], query_vector, entity_ids)[0])
+
+    def _score_candidates(
+        self,
+        project_id: str,
+        memories: List[Dict[str, Any]],
+        query_vector: Optional[np.ndarray] = None,
+        entity_ids: Optional[Dict[str, List[str]]] = None
+    ) -> np.ndarray:
         """
-        Compute hybrid relevance score combining multiple signals.
+        Compute hybrid relevance scores for a batch of memories.
 
-        Score components:
+        Score components (each 0-1, combined with self.weights):
         1. Base relevance score (from memory)
         2. Recency score (newer = higher)
         3. Popularity score (more accessed = higher)
-        4. Keyword match score (query overlap)
+        4. Semantic match (cosine similarity to the query embedding)
         5. Entity match score (linked entities)
         """
+        n = len(memories)
         scores = {}
 
         # 1. Base relevance score (normalized 0-1)
-        scores['relevance_score'] = min(memory.get('relevance_score', 1.0), 2.0) / 2.0
+        relevance = np.array([m.get('relevance_score', 1.0) for m in memories], dtype=float)
+        scores['relevance_score'] = np.minimum(relevance, 2.0) / 2.0
 
         # 2. Recency score (exponential decay)
-        scores['recency'] = self._compute_recency_score(memory['created_at'])
+        scores['recency'] = self._compute_recency_scores([m.get('created_at') for m in memories])
 
         # 3. Popularity score (log scale)
-        scores['popularity'] = self._compute_popularity_score(memory.get('access_count', 0))
+        scores['popularity'] = self._compute_popularity_scores(
+            np.array([m.get('access_count') or 0 for m in memories], dtype=float)
+        )
 
-        # 4. Keyword match score
-        if query:
-            scores['keyword_match'] = self._compute_keyword_score(memory, query)
+        # 4. Semantic match score
+        if query_vector is not None:
+            similarity = self.vector_index.similarities(
+                self.db, project_id, query_vector, [m['memory_id'] for m in memories]
+            )
+            scores['semantic_match'] = np.clip(similarity, 0.0, 1.0)
         else:
-            scores['keyword_match'] = 0.5  # Neutral
+            scores['semantic_match'] = np.full(n, 0.5)  # Neutral
 
         # 5. Entity match score
         if entity_ids:
-            scores['entity_match'] = self._compute_entity_score(memory, entity_ids)
+            scores['entity_match'] = self._compute_entity_scores(memories, entity_ids)
         else:
-            scores['entity_match'] = 0.5  # Neutral
+            scores['entity_match'] = np.full(n, 0.5)  # Neutral
 
         # Weighted sum
-        total_score = sum(
-            scores[component] * self.weights[component]
-            for component in scores
-        )
+        return sum(scores[component] * self.weights[component] for component in scores)
 
-        return total_score
-
-    def _compute_recency_score(self, created_at: str) -> float:
+    def _compute_recency_scores(self, created_at: List[Optional[str]]) -> np.ndarray:
         """
-        Compute recency score with exponential decay.
+        Compute recency scores with exponential decay.
 
         Score = e^(-days / half_life)
         - Recent memories (< 1 day): ~1.0
-        - 1 week old: ~0.7
-        - 1 month old: ~0.3
-        - 3 months old: ~0.1
+        - 1 week old: ~0.6
+        - 1 month old: ~0.1
+        - Unparseable timestamps: 0.5
         """
-        try:
-            created = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-            age_days = (datetime.utcnow() - created.replace(tzinfo=None)).days
-            half_life = 14  # 2 weeks half-life
-            score = math.exp(-age_days / half_life)
-            return max(0.0, min(1.0, score))
-        except:
-            return 0.5  # Default if parsing fails
-
-    def _compute_popularity_score(self, access_count: int) -> float:
+        now = datetime.utcnow()
+        age_days = np.full(len(created_at), np.nan)
+        for i, value in enumerate(created_at):
+            try:
+                created = datetime.fromisoformat(value.replace('Z', '+00:00'))
+                age_days[i] = (now - created.replace(tzinfo=None)).days
+            except (AttributeError, TypeError, ValueError):
+                pass
+
+        half_life = 14  # 2 weeks half-life
+        score = np.clip(np.exp(-np.nan_to_num(age_days) / half_life), 0.0, 1.0)
+        return np.where(np.isnan(age_days), 0.5, score)
+
+    def _compute_popularity_scores(self, access_counts: np.ndarray) -> np.ndarray:
         """
-        Compute popularity score using log scale.
+        Compute popularity scores using log scale.
 
         - 0 accesses: 0.3
-        - 1 access: 0.5
-        - 10 accesses: 0.8
+        - 1 access: ~0.3 (floor)
+        - 10 accesses: ~0.5
         - 100+ accesses: 1.0
         """
-        if access_count == 0:
-            return 0.3
-
-        # Log scale: log10(count + 1) / log10(101)
-        score = math.log10(access_count + 1) / math.log10(101)
-        return max(0.3, min(1.0, score))
-
-    def _compute_keyword_score(self, memory: Dict[str, Any], query: str) -> float:
-        """
-        Compute keyword overlap score using TF-IDF-like approach.
-        """
-        # Extract text from memory
-        memory_text = self._extract_text(memory)
-
-        # Tokenize
-        query_tokens = set(self._tokenize(query.lower()))
-        memory_tokens = set(self._tokenize(memory_text.lower()))
-
-        if not query_tokens:
-            return 0.5
-
-        # Compute overlap
-        overlap = query_tokens.intersection(memory_tokens)
-        score = len(overlap) / len(query_tokens)
-
-        return score
+        score = np.log10(access_counts + 1) / np.log10(101)
+        return np.clip(score, 0.3, 1.0)
 
-    def _compute_entity_score(
+    def _compute_entity_scores(
         self,
-        memory: Dict[str, Any],
+        memories: List[Dict[str, Any]],
         entity_ids: Dict[str, List[str]]
-    ) -> float:
+    ) -> np.ndarray:
         """
-        Compute entity linkage score.
+        Compute entity linkage scores.
 
         Score = (matched entities) / (total query entities)
         """
-        total_query_entities = 0
-        matched_entities = 0
-
         entity_mapping = {
-            'questions': 'linked_question_ids',
-            'hypotheses': 'linked_hypothesis_ids',
-            'papers': 'linked_paper_ids',
-            'protocols': 'linked_protocol_ids',
-            'experiments': 'linked_experiment_ids'
+            'questions': 'question',
+            'hypotheses': 'hypothesis',
+            'papers': 'paper',
+            'protocols': 'protocol',
+            'experiments': 'experiment'
         }
 
+        total_query_entities = 0
+        matched = np.zeros(len(memories))
         for entity_type, query_ids in entity_ids.items():
-            if not query_ids:
+            if not query_ids or entity_type not in entity_mapping:
                 continue
 
-            memory_field = entity_mapping.get(entity_type)
-            if not memory_field:
-                continue
-
-            memory_ids = set(memory.get(memory_field, []))
+            memory_field = ENTITY_LINK_COLUMNS[entity_mapping[entity_type]]
             query_ids_set = set(query_ids)
-
             total_query_entities += len(query_ids_set)
-            matched_entities += len(query_ids_set.intersection(memory_ids))
+            matched += [len(query_ids_set.intersection(m.get(memory_field) or [])) for m in memories]
 
         if total_query_entities == 0:
-            return 0.5
+            return np.full(len(memories), 0.5)
 
-        score = matched_entities / total_query_entities
-        return score
+        return matched / total_query_entities
 
     def _extract_text(self, memory: Dict[str, Any]) -> str:
         """Extract searchable text from memory."""
-        parts = []
-
-        if memory.get('summary'):
-            parts.append(memory['summary'])
-
-        # Extract text from content (simplified)
-        content = memory.get('content', {})
-        if isinstance(content, dict):
-            for key, value in content.items():
-                if isinstance(value, str):
-                    parts.append(value)
-                elif isinstance(value, list):
-                    for item in value:
-                        if isinstance(item, str):
-                            parts.append(item)
-
-        return " ".join(parts)
-
-    def _tokenize(self, text: str) -> List[str]:
-        """Simple tokenization."""
-        # Remove punctuation and split
-        text = re.sub(r'[^\w\s]', ' ', text)
-        tokens = text.split()
-
-        # Remove common stop words
-        stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'}
-        tokens = [t for t in tokens if t not in stop_words and len(t) > 2]
-
-        return tokens
+        return memory_text(memory.get('summary'), memory.get('content', {}))
 
     def _format_content(self, content: Dict[str, Any], max_length: int = 200) -> str:
         """Format content for display (truncated)."""
@@ -0,0 +1,402 @@
+"""
+Stat Counters
+
+Maintained aggregates behind the dashboard stat endpoints.
+
+Inbox stats, global inbox stats, alert stats and hypothesis evidence counts
+used to load (or COUNT) every row on each request. They now read a handful
+of counter rows kept current by mapper hooks in the same transaction as the
+writes, like the activity event outbox:
+
+- paper_triage_stats: triages per inbox scope and (context_type,
+  triage_status, read_status) cell, with the relevance score sum for averages
+- project_alert_stats: alerts per project and (alert_type, severity,
+  action_required, dismissed) cell
+- hypotheses.supporting/contradicting/neutral_evidence_count
+
+Deltas are applied as atomic `count = count + delta` upserts, so concurrent
+writers cannot lose updates. Writes that bypass the unit of work
+(Query.update/delete, raw SQL) are not seen; `rebuild_counters` recomputes
+everything from the source tables. Until migration 023 is applied the read
+helpers fall back to one grouped query.
+"""
+
+import logging
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, event, func, inspect, or_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from database import (
+    Hypothesis, HypothesisEvidence, PaperTriage, PaperTriageStat,
+    ProjectAlert, ProjectAlertStat
+)
+
+logger = logging.getLogger(__name__)
+
+EVIDENCE_COLUMNS = {
+    'supports': 'supporting_evidence_count',
+    'contradicts': 'contradicting_evidence_count',
+    'neutral': 'neutral_evidence_count',
+}
+
+TRIAGE_ATTRS = ('project_id', 'collection_id', 'user_id', 'context_type',
+                'triage_status', 'read_status', 'relevance_score')
+ALERT_ATTRS = ('project_id', 'alert_type', 'severity', 'action_required', 'dismissed')
+EVIDENCE_ATTRS = ('hypothesis_id', 'evidence_type')
+
+_triage_stats = PaperTriageStat.__table__
+_alert_stats = ProjectAlertStat.__table__
+_hypotheses = Hypothesis.__table__
+
+
+# ============================================================================
+# Cells
+# ============================================================================
+
+def triage_scope(project_id: Optional[str], collection_id: Optional[str],
+                 user_id: Optional[str]) -> Optional[Tuple[str, str]]:
+    """Inbox a triage is counted in: its project, else collection, else user"""
+    if project_id:
+        return 'project', project_id
+    if collection_id:
+        return 'collection', collection_id
+    if user_id:
+        return 'user', user_id
+    return None
+
+
+def _triage_cell(values: Dict[str, Any]) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    scope = triage_scope(values['project_id'], values['collection_id'], values['user_id'])
+    if scope is None:
+        return None
+    key = {
+        'scope_type': scope[0],
+        'scope_id': scope[1],
+        'context_type': values['context_type'] or 'project',
+        'triage_status': values['triage_status'] or '',
+        'read_status': values['read_status'] or '',
+    }
+    return key, {'paper_count': 1, 'relevance_sum': float(values['relevance_score'] or 0)}
+
+
+def _alert_cell(values: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    key = {
+        'project_id': values['project_id'],
+        'alert_type': values['alert_type'] or '',
+        'severity': values['severity'] or '',
+        'action_required': bool(values['action_required']),
+        'dismissed': bool(values['dismissed']),
+    }
+    return key, {'alert_count': 1}
+
+
+# ============================================================================
+# Write hooks
+# ============================================================================
+
+_counters_ready_cache: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def _counters_ready(connection) -> bool:
+    engine = connection.engine
+    ready = _counters_ready_cache.get(engine)
+    if ready is None:
+        inspector = inspect(connection)
+        ready = (
+            inspector.has_table(_triage_stats.name)
+            and inspector.has_table(_alert_stats.name)
+            and any(c['name'] == 'neutral_evidence_count' for c in inspector.get_columns(_hypotheses.name))
+        )
+        _counters_ready_cache[engine] = ready
+    return ready
+
+
+def _values(target, attrs: Sequence[str], previous: bool = False) -> Dict[str, Any]:
+    """Current attribute values, or the values before this flush's changes"""
+    values = {name: getattr(target, name) for name in attrs}
+    if previous:
+        state = inspect(target)
+        for name in attrs:
+            history = state.attrs[name].history
+            if history.deleted:
+                values[name] = history.deleted[0]
+    return values
+
+
+def _add(connection, table, key: Dict[str, Any], deltas: Dict[str, Any]):
+    """Atomically add deltas to the counter row for key, creating it if needed"""
+    dialect = connection.dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+        stmt = insert(table).values(**key, **deltas)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c[name] for name in key],
+            set_={name: table.c[name] + stmt.excluded[name] for name in deltas}
+        )
+        connection.execute(stmt)
+        return
+
+    match = and_(*[table.c[name] == value for name, value in key.items()])
+    updated = connection.execute(
+        table.update().where(match).values({name: table.c[name] + value for name, value in deltas.items()})
+    )
+    if updated.rowcount == 0:
+        connection.execute(table.insert().values(**key, **deltas))
+
+
+def _apply(connection, table, cell, sign: int):
+    if cell is not None:
+        key, deltas = cell
+        _add(connection, table, key, {name: sign * value for name, value in deltas.items()})
+
+
+def _add_evidence(connection, values: Dict[str, Any], sign: int):
+    column = EVIDENCE_COLUMNS.get(values['evidence_type'])
+    if not column or not values['hypothesis_id']:
+        return
+    connection.execute(
+        _hypotheses.update()
+        .where(_hypotheses.c.hypothesis_id == values['hypothesis_id'])
+        # Derived counts are not an edit of the hypothesis: keep updated_at
+        .values({column: func.coalesce(_hypotheses.c[column], 0) + sign,
+                 'updated_at': _hypotheses.c.updated_at})
+    )
+
+
+def _counter_hooks(attrs: Sequence[str], apply):
+    """after_insert / after_update / after_delete listeners applying apply(connection, values, sign)"""
+
+    def on_insert(mapper, connection, target):
+        if _counters_ready(connection):
+            apply(connection, _values(target, attrs), 1)
+
+    def on_update(mapper, connection, target):
+        if not _counters_ready(connection):
+            return
+        before, after = _values(target, attrs, previous=True), _values(target, attrs)
+        if before != after:
+            apply(connection, before, -1)
+            apply(connection, after, 1)
+
+    def on_delete(mapper, connection, target):
+        if _counters_ready(connection):
+            apply(connection, _values(target, attrs, previous=True), -1)
+
+    return on_insert, on_update, on_delete
+
+
+def _track(model, attrs: Sequence[str], apply):
+    # Load the old value when a tracked attribute is set, so updates can move counts between cells
+    for name in attrs:
+        event.listen(getattr(model, name), 'set', lambda target, value, old, initiator: value,
+                     active_history=True, retval=True)
+    on_insert, on_update, on_delete = _counter_hooks(attrs, apply)
+    event.listen(model, 'after_insert', on_insert)
+    event.listen(model, 'after_update', on_update)
+    event.listen(model, 'after_delete', on_delete)
+
+
+_track(PaperTriage, TRIAGE_ATTRS, lambda conn, values, sign: _apply(conn, _triage_stats, _triage_cell(values), sign))
+_track(ProjectAlert, ALERT_ATTRS, lambda conn, values, sign: _apply(conn, _alert_stats, _alert_cell(values), sign))
+_track(HypothesisEvidence, EVIDENCE_ATTRS, _add_evidence)
+
+
+# ============================================================================
+# Reads
+# ============================================================================
+
+@dataclass
+class TriageCounts:
+    """Triage totals for one or more inboxes"""
+    total: int = 0
+    relevance_sum: float = 0.0
+    by_status: Dict[str, int] = field(default_factory=dict)
+    by_read_status: Dict[str, int] = field(default_factory=dict)
+    by_context_type: Dict[str, int] = field(default_factory=dict)
+
+    def add(self, context_type: str, triage_status: str, read_status: str, count: int, relevance_sum: float):
+        if not count:
+            return
+        self.total += count
+        self.relevance_sum += relevance_sum or 0
+        self.by_status[triage_status] = self.by_status.get(triage_status, 0) + count
+        self.by_read_status[read_status] = self.by_read_status.get(read_status, 0) + count
+        self.by_context_type[context_type] = self.by_context_type.get(context_type, 0) + count
+
+    @property
+    def avg_relevance_score(self) -> float:
+        return self.relevance_sum / self.total if self.total else 0.0
+
+
+@dataclass
+class AlertCounts:
+    """Alert totals for one project; by_type / by_severity cover undismissed alerts"""
+    total: int = 0
+    undismissed: int = 0
+    action_required: int = 0
+    by_type: Dict[str, int] = field(default_factory=dict)
+    by_severity: Dict[str, int] = field(default_factory=dict)
+
+    def add(self, alert_type: str, severity: str, action_required: bool, dismissed: bool, count: int):
+        if not count:
+            return
+        self.total += count
+        if dismissed:
+            return
+        self.undismissed += count
+        if action_required:
+            self.action_required += count
+        self.by_type[alert_type] = self.by_type.get(alert_type, 0) + count
+        self.by_severity[severity] = self.by_severity.get(severity, 0) + count
+
+
+def triage_counts(
+    db: Session,
+    project_ids: Iterable[str] = (),
+    collection_ids: Iterable[str] = (),
+    user_id: Optional[str] = None
+) -> TriageCounts:
+    """Triage counts across project inboxes, collection inboxes and a user's contextless inbox"""
+    project_ids, collection_ids = list(project_ids), list(collection_ids)
+    counts = TriageCounts()
+
+    if _counters_ready(db.connection()):
+        stat = PaperTriageStat
+        scopes = []
+        if project_ids:
+            scopes.append(and_(stat.scope_type == 'project', stat.scope_id.in_(project_ids)))
+        if collection_ids:
+            scopes.append(and_(stat.scope_type == 'collection', stat.scope_id.in_(collection_ids)))
+        if user_id:
+            scopes.append(and_(stat.scope_type == 'user', stat.scope_id == user_id))
+        if not scopes:
+            return counts
+        rows = db.query(
+            stat.context_type, stat.triage_status, stat.read_status,
+            func.sum(stat.paper_count), func.sum(stat.relevance_sum)
+        ).filter(or_(*scopes)).group_by(stat.context_type, stat.triage_status, stat.read_status)
+    else:
+        scopes = []
+        if project_ids:
+            scopes.append(PaperTriage.project_id.in_(project_ids))
+        if collection_ids:
+            scopes.append(and_(PaperTriage.collection_id.in_(collection_ids), PaperTriage.project_id.is_(None)))
+        if user_id:
+            scopes.append(and_(PaperTriage.user_id == user_id, PaperTriage.project_id.is_(None),
+                               PaperTriage.collection_id.is_(None)))
+        if not scopes:
+            return counts
+        context_type = func.coalesce(PaperTriage.context_type, 'project')
+        triage_status = func.coalesce(PaperTriage.triage_status, '')
+        read_status = func.coalesce(PaperTriage.read_status, '')
+        rows = db.query(
+            context_type, triage_status, read_status,
+            func.count(PaperTriage.triage_id), func.sum(PaperTriage.relevance_score)
+        ).filter(or_(*scopes)).group_by(context_type, triage_status, read_status)
+
+    for context, status, read, count, relevance in rows:
+        counts.add(context, status, read, int(count or 0), float(relevance or 0))
+    return counts
+
+
+def alert_counts(db: Session, project_id: str) -> AlertCounts:
+    counts = AlertCounts()
+    if _counters_ready(db.connection()):
+        stat = ProjectAlertStat
+        rows = db.query(
+            stat.alert_type, stat.severity, stat.action_required, stat.dismissed, stat.alert_count
+        ).filter(stat.project_id == project_id)
+    else:
+        action_required = func.coalesce(ProjectAlert.action_required, False)
+        dismissed = func.coalesce(ProjectAlert.dismissed, False)
+        rows = db.query(
+            ProjectAlert.alert_type, func.coalesce(ProjectAlert.severity, ''), action_required, dismissed,
+            func.count(ProjectAlert.alert_id)
+        ).filter(
+            ProjectAlert.project_id == project_id
+        ).group_by(ProjectAlert.alert_type, func.coalesce(ProjectAlert.severity, ''), action_required, dismissed)
+
+    for alert_type, severity, action, dismissed_flag, count in rows:
+        counts.add(alert_type, severity, bool(action), bool(dismissed_flag), int(count or 0))
+    return counts
+
+
+def hypothesis_evidence_counts(db: Session, hypothesis_id: str) -> Dict[str, int]:
+    """{supporting, contradicting, neutral, total} evidence links of a hypothesis"""
+    if _counters_ready(db.connection()):
+        row = db.query(
+            Hypothesis.supporting_evidence_count,
+            Hypothesis.contradicting_evidence_count,
+            Hypothesis.neutral_evidence_count
+        ).filter(Hypothesis.hypothesis_id == hypothesis_id).first()
+        supporting, contradicting, neutral = (int(v or 0) for v in (row or (0, 0, 0)))
+    else:
+        by_type = dict(db.query(
+            HypothesisEvidence.evidence_type, func.count(HypothesisEvidence.id)
+        ).filter(
+            HypothesisEvidence.hypothesis_id == hypothesis_id
+        ).group_by(HypothesisEvidence.evidence_type).all())
+        supporting, contradicting, neutral = (
+            int(by_type.get(t, 0)) for t in ('supports', 'contradicts', 'neutral')
+        )
+
+    return {
+        "supporting": supporting,
+        "contradicting": contradicting,
+        "neutral": neutral,
+        "total": supporting + contradicting + neutral
+    }
+
+
+# ============================================================================
+# Repair
+# ============================================================================
+
+def rebuild_counters(db: Session) -> Dict[str, int]:
+    """Recompute every counter from the source tables (after bulk writes or restores)"""
+    db.query(PaperTriageStat).delete(synchronize_session=False)
+    db.query(ProjectAlertStat).delete(synchronize_session=False)
+
+    triage_cells: Dict[Tuple, List[float]] = {}
+    for values in db.query(*[getattr(PaperTriage, a) for a in TRIAGE_ATTRS]).yield_per(1000):
+        cell = _triage_cell(dict(zip(TRIAGE_ATTRS, values)))
+        if cell is not None:
+            key, deltas = cell
+            totals = triage_cells.setdefault(tuple(key.items()), [0, 0.0])
+            totals[0] += 1
+            totals[1] += deltas['relevance_sum']
+    db.bulk_insert_mappings(PaperTriageStat, [
+        {**dict(key), 'paper_count': count, 'relevance_sum': relevance}
+        for key, (count, relevance) in triage_cells.items()
+    ])
+
+    alert_cells: Dict[Tuple, int] = {}
+    for values in db.query(*[getattr(ProjectAlert, a) for a in ALERT_ATTRS]).yield_per(1000):
+        key, _ = _alert_cell(dict(zip(ALERT_ATTRS, values)))
+        alert_cells[tuple(key.items())] = alert_cells.get(tuple(key.items()), 0) + 1
+    db.bulk_insert_mappings(ProjectAlertStat, [
+        {**dict(key), 'alert_count': count} for key, count in alert_cells.items()
+    ])
+
+    evidence: Dict[str, Dict[str, int]] = {}
+    for hypothesis_id, evidence_type, count in db.query(
+        HypothesisEvidence.hypothesis_id, HypothesisEvidence.evidence_type, func.count(HypothesisEvidence.id)
+    ).group_by(HypothesisEvidence.hypothesis_id, HypothesisEvidence.evidence_type):
+        evidence.setdefault(hypothesis_id, {})[evidence_type] = count
+    db.query(Hypothesis).update({
+        getattr(Hypothesis, column): 0 for column in EVIDENCE_COLUMNS.values()
+    }, synchronize_session=False)
+    for hypothesis_id, by_type in evidence.items():
+        db.query(Hypothesis).filter(Hypothesis.hypothesis_id == hypothesis_id).update({
+            getattr(Hypothesis, column): by_type.get(evidence_type, 0)
+            for evidence_type, column in EVIDENCE_COLUMNS.items()
+        }, synchronize_session=False)
+
+    db.commit()
+    logger.info(f"🔢 Rebuilt stat counters: {len(triage_cells)} triage cells, "
+                f"{len(alert_cells)} alert cells, {len(evidence)} hypotheses with evidence")
+    return {'triage_cells': len(triage_cells), 'alert_cells': len(alert_cells), 'hypotheses': len(evidence)}
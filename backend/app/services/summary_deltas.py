@@ -0,0 +1,177 @@
+"""
+Summary Deltas - Living Summaries
+
+Change tracking for incremental project summary updates.
+
+Each ProjectSummary stores the `source_state` it was generated from: per
+entity type, a map of entity id -> [fingerprint, label], where the
+fingerprint is the row's updated_at (or created_at) and the label is a short
+description used in prompts. Diffing that against the current project data
+tells LivingSummaryService which entities were added, updated or removed,
+and therefore which summary sections need a (small) re-summarization:
+
+- questions:   questions, hypotheses, decisions -> summary_text, next_steps
+- evidence:    triaged papers                   -> key_findings
+- protocols:   protocols                        -> protocol_insights
+- experiments: experiment plans and results     -> experiment_status
+"""
+
+import json
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+SUMMARY_SECTIONS: Dict[str, Dict[str, Tuple[str, ...]]] = {
+    'questions': {
+        'entities': ('questions', 'hypotheses', 'decisions'),
+        'fields': ('summary_text', 'next_steps'),
+        'context': (),
+    },
+    'evidence': {
+        'entities': ('papers',),
+        'fields': ('key_findings',),
+        'context': ('questions', 'hypotheses'),
+    },
+    'protocols': {
+        'entities': ('protocols',),
+        'fields': ('protocol_insights',),
+        'context': ('questions', 'hypotheses'),
+    },
+    'experiments': {
+        'entities': ('plans', 'results'),
+        'fields': ('experiment_status',),
+        'context': ('hypotheses', 'protocols'),
+    },
+}
+
+SUMMARY_FIELDS = tuple(f for section in SUMMARY_SECTIONS.values() for f in section['fields'])
+
+FIELD_FORMATS = {
+    'summary_text': "2-3 paragraph narrative that follows the research journey chronologically",
+    'next_steps': "list of {action, priority (high|medium|low), estimated_effort, rationale, closes_loop} "
+                  "objects, 3-5 steps that each close a gap in the research loop",
+    'key_findings': "list of 5-7 strings, each citing its source paper (with score) and the "
+                    "hypothesis or question it supports",
+    'protocol_insights': "list of 3-5 strings naming the protocol, its source paper and the "
+                         "question or hypothesis it helps test",
+    'experiment_status': "string covering planned/in-progress/completed experiments, what they test, "
+                         "and gaps (protocols without experiments, untested hypotheses)",
+}
+
+LABEL_LENGTH = 300
+CONTEXT_ITEMS = 10
+
+
+def _fingerprint(row: Any) -> str:
+    value = getattr(row, 'updated_at', None) or getattr(row, 'created_at', None)
+    return value.isoformat() if value else ''
+
+
+def _clip(text: Any, length: int) -> str:
+    text = str(text or '')
+    return text if len(text) <= length else text[:length] + '...'
+
+
+def _summary_entities(project_data: Dict) -> Iterator[Tuple[str, str, Any, str]]:
+    """(entity_type, id, fingerprint row, label) for everything a summary covers"""
+    for q in project_data.get('questions', []):
+        yield 'questions', q.question_id, q, \
+            f"Question: {q.question_text} (status: {q.status}, priority: {q.priority})"
+    for h in project_data.get('hypotheses', []):
+        yield 'hypotheses', h.hypothesis_id, h, \
+            f"Hypothesis: {h.hypothesis_text} (status: {h.status}, confidence: {h.confidence_level}%)"
+    for d in project_data.get('decisions', []):
+        yield 'decisions', d.decision_id, d, \
+            f"Decision ({d.decision_type}): {d.title} - {_clip(d.description, 120)}" + \
+            (f" | Rationale: {_clip(d.rationale, 80)}" if d.rationale else "")
+    for article, triage in project_data.get('papers', []):
+        yield 'papers', triage.triage_id, triage, \
+            f"Paper: {article.title} (PMID {article.pmid}, score {triage.relevance_score}/100, " \
+            f"{triage.triage_status})" + \
+            (f" - {_clip(triage.ai_reasoning or triage.impact_assessment, 150)}"
+             if (triage.ai_reasoning or triage.impact_assessment) else "")
+    for p in project_data.get('protocols', []):
+        yield 'protocols', p.protocol_id, p, \
+            f"Protocol: {p.protocol_name} ({p.protocol_type or 'general'}, source PMID {p.source_pmid})" + \
+            (f" - {_clip(p.description, 150)}" if p.description else "")
+    for plan in project_data.get('plans', []):
+        yield 'plans', plan.plan_id, plan, \
+            f"Experiment plan: {plan.plan_name} (status: {plan.status}) - {_clip(plan.objective, 150)}"
+    for r in project_data.get('results', []):
+        plan = getattr(r, 'plan', None)
+        verdict = {True: 'supports hypothesis', False: 'refutes hypothesis'}.get(r.supports_hypothesis, 'no verdict')
+        yield 'results', r.result_id, r, \
+            f"Experiment result for {plan.plan_name if plan else r.plan_id} (status: {r.status}, {verdict})" + \
+            (f" - {_clip(r.interpretation or r.outcome, 150)}" if (r.interpretation or r.outcome) else "")
+
+
+def summary_source_state(project_data: Dict) -> Dict[str, Dict[str, List[str]]]:
+    """Per entity type: id -> [fingerprint, label] of the current project data"""
+    state = {t: {} for section in SUMMARY_SECTIONS.values() for t in section['entities']}
+    for entity_type, entity_id, row, label in _summary_entities(project_data):
+        state[entity_type][entity_id] = [_fingerprint(row), _clip(label, LABEL_LENGTH)]
+    return state
+
+
+def diff_source_state(previous: Optional[Dict], current: Dict) -> Optional[Dict[str, Dict[str, List[str]]]]:
+    """
+    Entities added, updated or removed since `previous`, as labels per type
+
+    Returns None when there is no previous state to diff against.
+    """
+    if not previous:
+        return None
+
+    changes = {}
+    for entity_type, items in current.items():
+        before = previous.get(entity_type) or {}
+        added = [items[i][1] for i in items if i not in before]
+        updated = [items[i][1] for i in items if i in before and before[i][0] != items[i][0]]
+        removed = [before[i][1] for i in before if i not in items]
+        if added or updated or removed:
+            changes[entity_type] = {'added': added, 'updated': updated, 'removed': removed}
+    return changes
+
+
+def count_changes(changes: Dict) -> int:
+    return sum(len(labels) for delta in changes.values() for labels in delta.values())
+
+
+def affected_sections(changes: Dict) -> List[str]:
+    return [name for name, spec in SUMMARY_SECTIONS.items()
+            if any(entity_type in changes for entity_type in spec['entities'])]
+
+
+def section_system_prompt(section: str) -> str:
+    fields = SUMMARY_SECTIONS[section]['fields']
+    formats = "\n".join(f'- "{f}": {FIELD_FORMATS[f]}' for f in fields)
+    return f"""You maintain one section of a living research project summary.
+
+You receive the section as it currently reads and the project entities that changed since it was written.
+Revise the section so it reflects the changes: integrate added and updated items, drop statements that
+relied only on removed items, and keep everything else unchanged. Be specific: reference questions,
+hypotheses, papers, protocols and experiments by name.
+
+IMPORTANT: You MUST respond with ONLY valid JSON containing exactly these keys:
+{formats}"""
+
+
+def section_user_prompt(section: str, project_name: str, current: Dict, changes: Dict, state: Dict) -> str:
+    spec = SUMMARY_SECTIONS[section]
+    current_section = {f: current.get(f) for f in spec['fields']}
+    prompt = f"# Project: {project_name}\n\n## Current section\n{json.dumps(current_section, indent=2, default=str)}\n"
+
+    prompt += "\n## Changes since the last summary\n"
+    for entity_type in spec['entities']:
+        delta = changes.get(entity_type)
+        if not delta:
+            continue
+        for kind in ('added', 'updated', 'removed'):
+            for label in delta[kind]:
+                prompt += f"- {kind.capitalize()}: {label}\n"
+
+    related = [(t, list(state.get(t, {}).values())[:CONTEXT_ITEMS]) for t in spec['context']]
+    if any(items for _, items in related):
+        prompt += "\n## Related project context\n"
+        for entity_type, items in related:
+            for _, label in items:
+                prompt += f"- {label}\n"
+    return prompt
@@ -0,0 +1,14 @@
+-- Migration: Add version tracking to network_graphs for incremental updates
+-- Date: 2026-10-19
+-- Description: Cached graphs are patched in place when collections change or
+-- citations are enriched; clients fetch deltas with ?since=<version>
+
+ALTER TABLE network_graphs ADD COLUMN IF NOT EXISTS version INTEGER DEFAULT 1;
+ALTER TABLE network_graphs ADD COLUMN IF NOT EXISTS base_version INTEGER DEFAULT 1;
+ALTER TABLE network_graphs ADD COLUMN IF NOT EXISTS change_log JSONB DEFAULT '[]'::jsonb;
+
+CREATE INDEX IF NOT EXISTS idx_network_source_version ON network_graphs(source_type, source_id, version);
+
+COMMENT ON COLUMN network_graphs.version IS 'Monotonic graph version, bumped on every in-place patch';
+COMMENT ON COLUMN network_graphs.base_version IS 'Oldest version a ?since= delta can be computed from';
+COMMENT ON COLUMN network_graphs.change_log IS 'Bounded log of removed node/edge ids with the version they were removed at';
@@ -0,0 +1,8 @@
+-- Migration: Cache server-side layout alongside network_graphs
+-- Date: 2026-10-19
+-- Description: Force-directed positions and community assignments for large
+-- project/collection networks, keyed by graph version
+
+ALTER TABLE network_graphs ADD COLUMN IF NOT EXISTS layout JSONB;
+
+COMMENT ON COLUMN network_graphs.layout IS 'Server-side layout: {version, positions: {node_id: [x, y]}, communities: {node_id: cluster_id}}';
@@ -0,0 +1,61 @@
+-- Migration: Full-text search index for project content
+-- Date: 2026-10-19
+-- Description: Denormalized search_documents table with a generated tsvector
+-- column and GIN index, replacing per-keystroke ILIKE scans in project search.
+-- Rows are maintained by application write hooks (services/project_search.py).
+
+CREATE TABLE IF NOT EXISTS search_documents (
+    id SERIAL PRIMARY KEY,
+    doc_type VARCHAR NOT NULL,
+    doc_id VARCHAR NOT NULL,
+    project_id VARCHAR NOT NULL,
+    collection_id VARCHAR,
+    pmid VARCHAR,
+    title TEXT,
+    body TEXT,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+ALTER TABLE search_documents ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(body, '')), 'B')
+    ) STORED;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_search_doc_source ON search_documents(doc_type, doc_id);
+CREATE INDEX IF NOT EXISTS idx_search_doc_project ON search_documents(project_id, doc_type);
+CREATE INDEX IF NOT EXISTS idx_search_doc_vector ON search_documents USING GIN (search_vector);
+
+-- Backfill
+INSERT INTO search_documents (doc_type, doc_id, project_id, collection_id, pmid, title, body)
+SELECT 'paper', ac.id::text, c.project_id, ac.collection_id, ac.article_pmid, ac.article_title,
+       concat_ws(' ', ac.article_journal, ac.article_authors::text, a.abstract)
+FROM article_collections ac
+JOIN collections c ON c.collection_id = ac.collection_id
+LEFT JOIN articles a ON a.pmid = ac.article_pmid
+ON CONFLICT (doc_type, doc_id) DO NOTHING;
+
+INSERT INTO search_documents (doc_type, doc_id, project_id, collection_id, title, body)
+SELECT 'collection', collection_id, project_id, collection_id, collection_name, description
+FROM collections
+ON CONFLICT (doc_type, doc_id) DO NOTHING;
+
+INSERT INTO search_documents (doc_type, doc_id, project_id, pmid, body)
+SELECT 'note', annotation_id, project_id, article_pmid,
+       concat_ws(' ', content, highlight_text, research_question, note_type, tags::text)
+FROM annotations
+ON CONFLICT (doc_type, doc_id) DO NOTHING;
+
+INSERT INTO search_documents (doc_type, doc_id, project_id, title, body)
+SELECT 'report', report_id, project_id, title, concat_ws(' ', objective, molecule)
+FROM reports
+ON CONFLICT (doc_type, doc_id) DO NOTHING;
+
+INSERT INTO search_documents (doc_type, doc_id, project_id, pmid, title, body)
+SELECT 'analysis', analysis_id, project_id, article_pmid, article_title,
+       concat_ws(' ', article_journal, article_authors::text)
+FROM deep_dive_analyses
+ON CONFLICT (doc_type, doc_id) DO NOTHING;
+
+COMMENT ON TABLE search_documents IS 'Full-text search documents for project content (papers, collections, notes, reports, analyses)';
+COMMENT ON COLUMN search_documents.search_vector IS 'Title (weight A) + body (weight B) tsvector, GIN indexed';
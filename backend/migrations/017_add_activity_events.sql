@@ -0,0 +1,30 @@
+-- Migration: Append-only activity event store
+-- Date: 2026-10-19
+-- Description: activity_events table for the project research timeline.
+-- Replaces rebuilding the timeline from six source tables on every request.
+-- Rows are appended in the same transaction as the mutation by application
+-- write hooks (backend/app/services/activity_logging_service.py). Existing
+-- history is reconstructed with backend/scripts/backfill_activity_events.py.
+
+CREATE TABLE IF NOT EXISTS activity_events (
+    event_id VARCHAR PRIMARY KEY,
+    project_id VARCHAR NOT NULL,
+    activity_type VARCHAR NOT NULL,
+    actor_type VARCHAR NOT NULL,
+    actor_id VARCHAR NOT NULL,
+    entity_type VARCHAR NOT NULL,
+    entity_id VARCHAR NOT NULL,
+    action VARCHAR NOT NULL,
+    title VARCHAR NOT NULL,
+    description TEXT,
+    event_metadata JSON,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_activity_events_project_time ON activity_events(project_id, created_at DESC, event_id DESC);
+CREATE INDEX IF NOT EXISTS idx_activity_events_project_type ON activity_events(project_id, activity_type, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_activity_events_project_actor ON activity_events(project_id, actor_type, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_activity_events_entity ON activity_events(entity_type, entity_id);
+
+COMMENT ON TABLE activity_events IS 'Append-only research journey events (user and AI actions) for the project timeline';
+COMMENT ON COLUMN activity_events.created_at IS 'Event time; timeline is keyset-paginated on (created_at, event_id) DESC';
@@ -0,0 +1,24 @@
+-- Migration: Precomputed weekly recommendation feeds
+-- Date: 2026-10-19
+-- Description: One stored feed per user and scope (project or 'global'),
+-- built in the background by services/weekly_feed_builder.py so that
+-- /recommendations/weekly is a single indexed read. Saving papers marks the
+-- saver's feeds stale, which queues them for a rebuild.
+
+CREATE TABLE IF NOT EXISTS weekly_recommendation_feeds (
+    id SERIAL PRIMARY KEY,
+    user_id VARCHAR NOT NULL,
+    project_id VARCHAR,
+    scope_key VARCHAR NOT NULL,
+    week_of TIMESTAMP WITH TIME ZONE NOT NULL,
+    payload JSON NOT NULL,
+    status VARCHAR NOT NULL DEFAULT 'ready',
+    generated_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    stale_since TIMESTAMP WITH TIME ZONE
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_weekly_feed_user_scope ON weekly_recommendation_feeds(user_id, scope_key);
+CREATE INDEX IF NOT EXISTS idx_weekly_feed_due ON weekly_recommendation_feeds(status, week_of);
+
+COMMENT ON TABLE weekly_recommendation_feeds IS 'Precomputed /recommendations/weekly responses per user and scope';
+COMMENT ON COLUMN weekly_recommendation_feeds.status IS 'ready, or stale after the user saved papers (rebuild queued)';
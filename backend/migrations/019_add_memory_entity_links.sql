@@ -0,0 +1,40 @@
+-- Migration: Normalized entity links for conversation memory
+-- Date: 2026-10-19
+-- Description: memory_entity_links table, one row per (memory, linked entity).
+-- MemoryStore.get_memories_by_links used to match ids with
+-- CAST(linked_*_ids AS VARCHAR) LIKE '%"id"%', which scans every memory.
+-- New rows are written by MemoryStore.store_memory; existing links are
+-- backfilled below from the linked_*_ids JSONB arrays.
+
+CREATE TABLE IF NOT EXISTS memory_entity_links (
+    memory_id VARCHAR NOT NULL REFERENCES conversation_memory(memory_id) ON DELETE CASCADE,
+    entity_type VARCHAR NOT NULL,  -- question, hypothesis, paper, protocol, experiment
+    entity_id VARCHAR NOT NULL,
+    project_id VARCHAR NOT NULL,
+    PRIMARY KEY (memory_id, entity_type, entity_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_memory_links_project_entity ON memory_entity_links(project_id, entity_type, entity_id);
+CREATE INDEX IF NOT EXISTS idx_memory_links_entity ON memory_entity_links(entity_type, entity_id);
+
+-- Backfill from the JSON arrays
+INSERT INTO memory_entity_links (memory_id, entity_type, entity_id, project_id)
+SELECT m.memory_id, l.entity_type, l.entity_id, m.project_id
+FROM conversation_memory m
+CROSS JOIN LATERAL (
+    SELECT 'question' AS entity_type, jsonb_array_elements_text(COALESCE(m.linked_question_ids, '[]'::jsonb)) AS entity_id
+    UNION ALL
+    SELECT 'hypothesis', jsonb_array_elements_text(COALESCE(m.linked_hypothesis_ids, '[]'::jsonb))
+    UNION ALL
+    SELECT 'paper', jsonb_array_elements_text(COALESCE(m.linked_paper_ids, '[]'::jsonb))
+    UNION ALL
+    SELECT 'protocol', jsonb_array_elements_text(COALESCE(m.linked_protocol_ids, '[]'::jsonb))
+    UNION ALL
+    SELECT 'experiment', jsonb_array_elements_text(COALESCE(m.linked_experiment_ids, '[]'::jsonb))
+) l
+ON CONFLICT DO NOTHING;
+
+-- Candidate queries filter active memories per project and order by relevance
+CREATE INDEX IF NOT EXISTS idx_memory_project_active_rank ON conversation_memory(project_id, is_archived, relevance_score DESC, created_at DESC);
+
+COMMENT ON TABLE memory_entity_links IS 'Normalized conversation_memory.linked_*_ids for indexed entity lookups';
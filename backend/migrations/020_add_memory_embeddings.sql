@@ -0,0 +1,10 @@
+-- Migration: Embeddings for conversation memory
+-- Date: 2026-10-19
+-- Description: Vector of each memory's summary + content text, written by
+-- MemoryStore.store_memory and searched by RetrievalEngine through the
+-- per-project memory vector index. Existing memories are embedded lazily
+-- the first time their project is searched.
+
+ALTER TABLE conversation_memory ADD COLUMN IF NOT EXISTS embedding JSONB;
+
+COMMENT ON COLUMN conversation_memory.embedding IS 'L2-normalized embedding of summary + content (MEMORY_EMBEDDING_DIM floats)';
@@ -0,0 +1,10 @@
+-- Migration: Project context version counter
+-- Date: 2026-10-19
+-- Description: Change counter for a project's research context. Bumped in the
+-- writing transaction whenever questions, hypotheses, evidence, triages,
+-- protocols, experiment plans/results or decisions of the project change;
+-- the shared project context snapshots are rebuilt when it moves.
+
+ALTER TABLE projects ADD COLUMN IF NOT EXISTS context_version INTEGER NOT NULL DEFAULT 0;
+
+COMMENT ON COLUMN projects.context_version IS 'Incremented on writes to the project research context; keys cached context snapshots';
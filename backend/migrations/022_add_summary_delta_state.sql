@@ -0,0 +1,14 @@
+-- Migration: Delta regeneration state for living summaries
+-- Date: 2026-10-19
+-- Description: LivingSummaryService records which entity versions each
+-- project summary reflects, so later updates only re-summarize the sections
+-- whose questions, evidence, protocols or experiments changed. Existing
+-- summaries have no state and are rebuilt in full on their next refresh.
+
+ALTER TABLE project_summaries ADD COLUMN IF NOT EXISTS source_state JSONB;
+ALTER TABLE project_summaries ADD COLUMN IF NOT EXISTS incremental_updates INTEGER DEFAULT 0;
+ALTER TABLE project_summaries ADD COLUMN IF NOT EXISTS generation_stats JSONB;
+
+COMMENT ON COLUMN project_summaries.source_state IS 'Per entity type: id -> [updated_at fingerprint, label] covered by the summary';
+COMMENT ON COLUMN project_summaries.incremental_updates IS 'Delta updates applied since the last full rebuild';
+COMMENT ON COLUMN project_summaries.generation_stats IS 'Mode (full/incremental/unchanged), sections and token usage of the last update';
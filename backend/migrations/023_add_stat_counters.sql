@@ -0,0 +1,70 @@
+-- Migration: Maintained stat counters for dashboard endpoints
+-- Date: 2026-10-19
+-- Description: Inbox, global inbox, alert and hypothesis evidence stats read
+-- counter rows kept current by write hooks (backend/app/services/stat_counters.py)
+-- instead of counting every row per request. This creates the counter tables,
+-- adds the missing neutral evidence count and backfills all counters.
+
+ALTER TABLE hypotheses ADD COLUMN IF NOT EXISTS neutral_evidence_count INTEGER DEFAULT 0;
+
+CREATE TABLE IF NOT EXISTS paper_triage_stats (
+    scope_type VARCHAR NOT NULL,
+    scope_id VARCHAR NOT NULL,
+    context_type VARCHAR NOT NULL,
+    triage_status VARCHAR NOT NULL,
+    read_status VARCHAR NOT NULL,
+    paper_count INTEGER NOT NULL DEFAULT 0,
+    relevance_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    PRIMARY KEY (scope_type, scope_id, context_type, triage_status, read_status)
+);
+
+CREATE TABLE IF NOT EXISTS project_alert_stats (
+    project_id VARCHAR NOT NULL REFERENCES projects(project_id) ON DELETE CASCADE,
+    alert_type VARCHAR NOT NULL,
+    severity VARCHAR NOT NULL,
+    action_required BOOLEAN NOT NULL,
+    dismissed BOOLEAN NOT NULL,
+    alert_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (project_id, alert_type, severity, action_required, dismissed)
+);
+
+COMMENT ON TABLE paper_triage_stats IS 'Triage counts per inbox scope (project, else collection, else user) and status cell';
+COMMENT ON TABLE project_alert_stats IS 'Alert counts per project and (type, severity, action_required, dismissed) cell';
+
+-- Backfill (recomputed from scratch, so the migration can be re-run)
+DELETE FROM paper_triage_stats;
+INSERT INTO paper_triage_stats (scope_type, scope_id, context_type, triage_status, read_status, paper_count, relevance_sum)
+SELECT
+    CASE WHEN project_id IS NOT NULL THEN 'project'
+         WHEN collection_id IS NOT NULL THEN 'collection'
+         ELSE 'user' END,
+    COALESCE(project_id, collection_id, user_id),
+    COALESCE(context_type, 'project'),
+    COALESCE(triage_status, ''),
+    COALESCE(read_status, ''),
+    COUNT(*),
+    COALESCE(SUM(relevance_score), 0)
+FROM paper_triage
+WHERE COALESCE(project_id, collection_id, user_id) IS NOT NULL
+GROUP BY 1, 2, 3, 4, 5;
+
+DELETE FROM project_alert_stats;
+INSERT INTO project_alert_stats (project_id, alert_type, severity, action_required, dismissed, alert_count)
+SELECT project_id, alert_type, COALESCE(severity, ''), COALESCE(action_required, FALSE), COALESCE(dismissed, FALSE), COUNT(*)
+FROM project_alerts
+GROUP BY 1, 2, 3, 4, 5;
+
+UPDATE hypotheses h SET
+    supporting_evidence_count = COALESCE(e.supporting, 0),
+    contradicting_evidence_count = COALESCE(e.contradicting, 0),
+    neutral_evidence_count = COALESCE(e.neutral, 0)
+FROM hypotheses h2
+LEFT JOIN (
+    SELECT hypothesis_id,
+           COUNT(*) FILTER (WHERE evidence_type = 'supports') AS supporting,
+           COUNT(*) FILTER (WHERE evidence_type = 'contradicts') AS contradicting,
+           COUNT(*) FILTER (WHERE evidence_type = 'neutral') AS neutral
+    FROM hypothesis_evidence
+    GROUP BY hypothesis_id
+) e ON e.hypothesis_id = h2.hypothesis_id
+WHERE h.hypothesis_id = h2.hypothesis_id;
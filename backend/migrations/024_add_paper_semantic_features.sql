@@ -0,0 +1,23 @@
+-- Migration: Persisted semantic analysis per paper
+-- Date: 2026-10-19
+-- Description: SemanticAnalysisService.analyze_papers stores the features it
+-- computes per PMID, so repeat analyses of an unchanged paper (same text and
+-- embedding model) are served from this table instead of re-running spaCy,
+-- the pattern detectors and the embedding model.
+
+CREATE TABLE IF NOT EXISTS paper_semantic_features (
+    pmid VARCHAR PRIMARY KEY,
+    text_hash VARCHAR NOT NULL,
+    model_name VARCHAR NOT NULL,
+    methodology VARCHAR NOT NULL,
+    complexity_score DOUBLE PRECISION NOT NULL,
+    novelty_type VARCHAR NOT NULL,
+    technical_terms JSONB DEFAULT '[]'::jsonb,
+    research_domains JSONB DEFAULT '[]'::jsonb,
+    confidence_scores JSONB DEFAULT '{}'::jsonb,
+    embedding JSONB,
+    analyzed_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+COMMENT ON COLUMN paper_semantic_features.text_hash IS 'sha1 of the analyzed title, abstract and full text';
+COMMENT ON COLUMN paper_semantic_features.model_name IS 'Embedding model the features were computed with';
@@ -0,0 +1,29 @@
+-- Migration: Article links for cached citation graphs
+-- Date: 2026-10-19
+-- Description: network_graph_articles table, one row per (project/report
+-- network graph, article node). NetworkGraphCache.refresh_articles used to
+-- find graphs containing a PMID with CAST(nodes AS VARCHAR) LIKE '%"pmid"%',
+-- a sequential scan of network_graphs for every enriched article. New rows
+-- are written by NetworkGraphCache as graphs are stored and patched; links of
+-- active graphs are backfilled below from their JSON nodes.
+
+CREATE TABLE IF NOT EXISTS network_graph_articles (
+    graph_id VARCHAR NOT NULL REFERENCES network_graphs(graph_id) ON DELETE CASCADE,
+    pmid VARCHAR NOT NULL,
+    PRIMARY KEY (graph_id, pmid)
+);
+
+CREATE INDEX IF NOT EXISTS idx_network_graph_articles_pmid ON network_graph_articles(pmid);
+
+-- Backfill from the nodes of active citation graphs
+INSERT INTO network_graph_articles (graph_id, pmid)
+SELECT g.graph_id, n->>'id'
+FROM network_graphs g
+CROSS JOIN LATERAL json_array_elements(g.nodes::json) n
+WHERE g.source_type IN ('project', 'report')
+  AND g.is_active = TRUE
+  AND n->>'id' IS NOT NULL
+  AND n->>'id' NOT LIKE 'collection\_%'
+ON CONFLICT DO NOTHING;
+
+COMMENT ON TABLE network_graph_articles IS 'Article node ids of cached project/report network graphs for indexed enrichment patches';
@@ -0,0 +1,75 @@
+"""
+Script to backfill the activity_events table from existing project data.
+
+This script:
+1. Finds projects (or a single project) with research questions, hypotheses,
+   triages, collections, protocols or experiment plans
+2. Reconstructs their timeline events the way the timeline used to build them
+   on every request
+3. Appends events that are not already recorded (safe to re-run)
+
+Usage:
+    python backend/scripts/backfill_activity_events.py [--project-id PROJECT_ID] [--dry-run]
+"""
+
+import sys
+import os
+import argparse
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from database import (
+    get_session_local, ResearchQuestion, Hypothesis, PaperTriage, Collection, Protocol, ExperimentPlan
+)
+from backend.app.services.activity_logging_service import ActivityLoggingService
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SOURCE_MODELS = [ResearchQuestion, Hypothesis, PaperTriage, Collection, Protocol, ExperimentPlan]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Backfill activity_events from existing project data')
+    parser.add_argument('--project-id', type=str, help='Only backfill a specific project')
+    parser.add_argument('--dry-run', action='store_true', help='Show what would be done without making changes')
+    args = parser.parse_args()
+
+    SessionLocal = get_session_local()
+    db = SessionLocal()
+
+    try:
+        if args.project_id:
+            project_ids = [args.project_id]
+        else:
+            project_ids = set()
+            for model in SOURCE_MODELS:
+                project_ids.update(pid for (pid,) in db.query(model.project_id).distinct())
+            project_ids = sorted(pid for pid in project_ids if pid)
+
+        logger.info(f"📊 Backfilling activity events for {len(project_ids)} project(s)")
+        service = ActivityLoggingService(db)
+        total = 0
+        for project_id in project_ids:
+            written = service.backfill_project(project_id, dry_run=args.dry_run)
+            total += written
+            logger.info(f"  {'[DRY RUN] ' if args.dry_run else ''}{project_id}: {written} events")
+
+        logger.info(f"✅ {'Would write' if args.dry_run else 'Wrote'} {total} activity events")
+
+    except Exception as e:
+        logger.error(f"❌ Backfill failed: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
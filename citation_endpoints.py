@@ -13,6 +13,7 @@ import asyncio
 import logging
 from typing import List, Optional
 from fastapi import HTTPException, Depends, Query, Header
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from database import get_db, Article, ArticleCitation
 
@@ -146,6 +147,64 @@ def register_citation_endpoints(app):
             logger.error(f"Error fetching references for article {pmid}: {e}")
             raise HTTPException(status_code=500, detail=f"Failed to fetch references: {str(e)}")
     
+    @app.get("/articles/{pmid}/citation-relatedness")
+    async def get_citation_relatedness(
+        pmid: str,
+        method: str = Query("co_citation", pattern="^(co_citation|bibliographic_coupling)$",
+                            description="co_citation (cited together) or bibliographic_coupling (shared references)"),
+        limit: int = Query(20, ge=1, le=100, description="Maximum number of related articles"),
+        user_id: str = Header(..., alias="User-ID"),
+        db: Session = Depends(get_db)
+    ):
+        """
+        Get articles related to the specified article through citation structure.
+
+        Counts are computed from the in-memory citation index with a single
+        sparse row product, then article metadata is fetched in one query.
+        """
+        try:
+            from services.citation_graph_index import get_citation_graph_index
+            from utils.article_profiles import query_article_rows
+
+            index = get_citation_graph_index()
+            # The first request may have to load the index (a full edge scan): keep it off the loop
+            await run_in_threadpool(index.ensure_loaded, db)
+
+            if method == "co_citation":
+                scored = index.co_citation(pmid, limit)
+            else:
+                scored = index.bibliographic_coupling(pmid, limit)
+
+            rows = query_article_rows(db, "card").filter(
+                Article.pmid.in_([related_pmid for related_pmid, _ in scored])
+            ).all() if scored else []
+            articles = {row.pmid: row for row in rows}
+
+            related = []
+            for related_pmid, count in scored:
+                row = articles.get(related_pmid)
+                related.append({
+                    "pmid": related_pmid,
+                    "title": row.title if row else None,
+                    "authors": (row.authors or []) if row else [],
+                    "journal": row.journal if row else None,
+                    "year": row.publication_year if row else None,
+                    "citation_count": (row.citation_count or 0) if row else 0,
+                    "shared_count": count
+                })
+
+            return {
+                "source_pmid": pmid,
+                "method": method,
+                "related": related,
+                "total_count": len(related),
+                "index": index.get_stats()
+            }
+
+        except Exception as e:
+            logger.error(f"Error computing {method} for article {pmid}: {e}")
+            raise HTTPException(status_code=500, detail=f"Failed to compute citation relatedness: {str(e)}")
+
     @app.get("/articles/{pmid}/enrich-citations")
     async def get_enriched_citations_status(
         pmid: str,
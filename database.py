@@ -162,6 +162,10 @@ class Project(Base):
     report_count = Column(Integer, default=0)  # Total reports
     experiment_count = Column(Integer, default=0)  # Total experiments
 
+    # Bumped on every write to the project's research context (questions, hypotheses,
+    # triages, protocols, plans, results, decisions); keys the shared context snapshots
+    context_version = Column(Integer, nullable=False, default=0, server_default='0')
+
     # Relationships
     owner = relationship("User", back_populates="owned_projects")
     collaborators = relationship("ProjectCollaborator", back_populates="project", cascade="all, delete-orphan")
@@ -723,6 +727,53 @@ class ArticleCitation(Base):
         Index('idx_citation_type', 'citation_type'),
     )
 
+class CitationWork(Base):
+    """
+    Metadata for works that cite or are referenced by stored articles
+
+    Filled by services/citation_store.py during citation ingestion. Related
+    works are kept out of `articles` so they never show up in article-level
+    queries (recommendations, search, trending). Keyed by PMID, or by
+    "OA" + the full OpenAlex work number when OpenAlex has no PMID.
+    """
+    __tablename__ = "citation_works"
+
+    work_id = Column(String, primary_key=True)
+    openalex_id = Column(String, nullable=True)  # https://openalex.org/W...
+
+    title = Column(Text, nullable=True)
+    authors = Column(JSON, default=list)
+    journal = Column(String, nullable=True)
+    publication_year = Column(Integer, nullable=True)
+    doi = Column(String, nullable=True)
+    citation_count = Column(Integer, default=0)  # OpenAlex cited_by_count when stored
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class PaperSemanticFeatures(Base):
+    """
+    Persisted semantic analysis per PMID
+
+    Written by SemanticAnalysisService.analyze_papers; a row is reused while
+    the analyzed text and embedding model are unchanged.
+    """
+    __tablename__ = "paper_semantic_features"
+
+    pmid = Column(String, primary_key=True)
+    text_hash = Column(String, nullable=False)  # sha1 of the analyzed title/abstract/full text
+    model_name = Column(String, nullable=False)  # embedding model (scibert, minilm, basic)
+
+    methodology = Column(String, nullable=False)
+    complexity_score = Column(Float, nullable=False)
+    novelty_type = Column(String, nullable=False)
+    technical_terms = Column(JSON, default=list)
+    research_domains = Column(JSON, default=list)
+    confidence_scores = Column(JSON, default=dict)
+    embedding = Column(JSON, nullable=True)
+
+    analyzed_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
 class AuthorCollaboration(Base):
     """Author collaboration networks for research team discovery"""
     __tablename__ = "author_collaborations"
@@ -773,6 +824,12 @@ class NetworkGraph(Base):
     edges = Column(JSON, nullable=False)  # Network edges data
     graph_metadata = Column(JSON, default=dict)  # Additional graph metadata
 
+    # Incremental updates: nodes/edges carry the version they were last written at
+    version = Column(Integer, default=1)  # Bumped on every in-place patch
+    base_version = Column(Integer, default=1)  # Oldest version deltas can be served from
+    change_log = Column(JSON, default=list)  # Removed node/edge ids: [{version, kind, id}]
+    layout = Column(JSON, nullable=True)  # Server-side positions + communities: {version, positions, communities}
+
     # Cache management
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     expires_at = Column(DateTime(timezone=True), nullable=True)
@@ -782,6 +839,74 @@ class NetworkGraph(Base):
     __table_args__ = (
         Index('idx_network_source', 'source_type', 'source_id'),
         Index('idx_network_active', 'is_active', 'expires_at'),
+        Index('idx_network_source_version', 'source_type', 'source_id', 'version'),
+    )
+
+
+class NetworkGraphArticle(Base):
+    """
+    One row per (cached citation graph, article node)
+
+    Mirrors the article node ids of project/report network_graphs so that
+    "graphs containing PMID X" is an index lookup rather than a LIKE over
+    every graph's JSON nodes.
+    """
+    __tablename__ = "network_graph_articles"
+
+    graph_id = Column(String, ForeignKey("network_graphs.graph_id", ondelete="CASCADE"), primary_key=True)
+    pmid = Column(String, primary_key=True)
+
+    __table_args__ = (
+        Index('idx_network_graph_articles_pmid', 'pmid'),
+    )
+
+class SearchDocument(Base):
+    """Denormalized full-text search document for project content
+
+    One row per searchable item (paper in a collection, collection, note,
+    report, deep-dive analysis), maintained by write hooks in
+    services/project_search.py. PostgreSQL adds a generated `search_vector`
+    tsvector column with a GIN index; SQLite mirrors rows into an FTS5 table.
+    """
+    __tablename__ = "search_documents"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    doc_type = Column(String, nullable=False)  # paper, collection, note, report, analysis
+    doc_id = Column(String, nullable=False)  # Primary key of the source row
+    project_id = Column(String, nullable=False)
+    collection_id = Column(String, nullable=True)  # Papers/collections: hidden when the collection is inactive
+    pmid = Column(String, nullable=True)
+    title = Column(Text, nullable=True)
+    body = Column(Text, nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index('idx_search_doc_source', 'doc_type', 'doc_id', unique=True),
+        Index('idx_search_doc_project', 'project_id', 'doc_type'),
+    )
+
+class WeeklyRecommendationFeed(Base):
+    """Precomputed weekly recommendation feed per user (and optional project)
+
+    Built in the background by services/weekly_feed_builder.py so that
+    /recommendations/weekly is a single indexed read. Saving papers marks
+    the user's feeds stale, which queues them for a rebuild.
+    """
+    __tablename__ = "weekly_recommendation_feeds"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(String, nullable=False)  # Canonical users.user_id
+    project_id = Column(String, nullable=True)
+    scope_key = Column(String, nullable=False)  # project_id or 'global'
+    week_of = Column(DateTime(timezone=True), nullable=False)  # Monday the feed was built for
+    payload = Column(JSON, nullable=False)  # Response body of /recommendations/weekly
+    status = Column(String, nullable=False, default='ready')  # ready, stale
+    generated_at = Column(DateTime(timezone=True), nullable=False)
+    stale_since = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index('idx_weekly_feed_user_scope', 'user_id', 'scope_key', unique=True),
+        Index('idx_weekly_feed_due', 'status', 'week_of'),
     )
 
 class ActivityLog(Base):
@@ -814,6 +939,37 @@ class ActivityLog(Base):
     collection = relationship("Collection")
 
 
+class ProjectActivityEvent(Base):
+    """Append-only research journey events served by the project timeline
+
+    Rows are appended in the same transaction as the mutation that caused
+    them (see backend/app/services/activity_logging_service.py) and are
+    never updated. History from before the table existed is reconstructed
+    once by backend/scripts/backfill_activity_events.py.
+    """
+    __tablename__ = "activity_events"
+
+    event_id = Column(String, primary_key=True)  # UUID
+    project_id = Column(String, nullable=False)
+    activity_type = Column(String, nullable=False)  # question_created, triage_completed, ...
+    actor_type = Column(String, nullable=False)  # user, ai
+    actor_id = Column(String, nullable=False)
+    entity_type = Column(String, nullable=False)
+    entity_id = Column(String, nullable=False)
+    action = Column(String, nullable=False)
+    title = Column(String, nullable=False)
+    description = Column(Text, nullable=True)
+    event_metadata = Column(JSON, default=dict)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index('idx_activity_events_project_time', 'project_id', 'created_at', 'event_id'),
+        Index('idx_activity_events_project_type', 'project_id', 'activity_type', 'created_at'),
+        Index('idx_activity_events_project_actor', 'project_id', 'actor_type', 'created_at'),
+        Index('idx_activity_events_entity', 'entity_type', 'entity_id'),
+    )
+
+
 # ============================================================================
 # PRODUCT PIVOT: NEW TABLES FOR RESEARCH PROJECT OS
 # Added: November 17, 2025
@@ -918,9 +1074,10 @@ class Hypothesis(Base):
     status = Column(String, default='proposed')  # proposed, testing, supported, rejected, inconclusive
     confidence_level = Column(Integer, default=50)  # 0-100 scale
 
-    # Computed fields (updated by triggers)
+    # Computed fields (maintained by the HypothesisEvidence write hooks in stat_counters)
     supporting_evidence_count = Column(Integer, default=0)
     contradicting_evidence_count = Column(Integer, default=0)
+    neutral_evidence_count = Column(Integer, default=0)
 
     # Metadata
     created_by = Column(String, ForeignKey("users.user_id"), nullable=False)
@@ -1391,6 +1548,11 @@ class ProjectSummary(Base):
     last_updated = Column(DateTime(timezone=True), server_default=func.now())
     cache_valid_until = Column(DateTime(timezone=True), nullable=True)
 
+    # Delta regeneration
+    source_state = Column(JSON, nullable=True)  # {entity_type: {id: [fingerprint, label]}} the summary reflects
+    incremental_updates = Column(Integer, default=0)  # Delta updates since the last full rebuild
+    generation_stats = Column(JSON, nullable=True)  # Mode, sections and token usage of the last update
+
     # Metadata
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1524,6 +1686,40 @@ class ProjectAlert(Base):
     )
 
 
+class PaperTriageStat(Base):
+    """
+    Maintained triage counters for inbox stats
+
+    One row per scope and (context_type, triage_status, read_status) cell,
+    updated in the same transaction as paper_triage writes. Scope follows
+    inbox ownership: the project, else the collection, else the user of a
+    contextless triage.
+    """
+    __tablename__ = "paper_triage_stats"
+
+    scope_type = Column(String, primary_key=True)  # project, collection, user
+    scope_id = Column(String, primary_key=True)
+    context_type = Column(String, primary_key=True)
+    triage_status = Column(String, primary_key=True)
+    read_status = Column(String, primary_key=True)
+
+    paper_count = Column(Integer, nullable=False, default=0)
+    relevance_sum = Column(Float, nullable=False, default=0)
+
+
+class ProjectAlertStat(Base):
+    """Maintained alert counters per project and (type, severity, action, dismissed) cell"""
+    __tablename__ = "project_alert_stats"
+
+    project_id = Column(String, ForeignKey("projects.project_id", ondelete="CASCADE"), primary_key=True)
+    alert_type = Column(String, primary_key=True)
+    severity = Column(String, primary_key=True)
+    action_required = Column(Boolean, primary_key=True)
+    dismissed = Column(Boolean, primary_key=True)
+
+    alert_count = Column(Integer, nullable=False, default=0)
+
+
 class ConversationMemory(Base):
     """
     Conversation memory for AI context retention (Week 2: Memory System)
@@ -1549,6 +1745,9 @@ class ConversationMemory(Base):
     linked_protocol_ids = Column(JSON, default=list)  # Protocols involved
     linked_experiment_ids = Column(JSON, default=list)  # Experiments involved
 
+    # Semantic retrieval (see backend/app/services/memory_vector_index.py)
+    embedding = Column(JSON, nullable=True)  # L2-normalized vector of summary + content text
+
     # Relevance scoring (for retrieval)
     relevance_score = Column(Float, default=1.0)  # Base relevance (can be updated)
     access_count = Column(Integer, default=0)  # How many times this memory was retrieved
@@ -1576,6 +1775,31 @@ class ConversationMemory(Base):
         Index('idx_memory_archived', 'is_archived'),
         Index('idx_memory_expires', 'expires_at'),
         Index('idx_memory_project_type', 'project_id', 'interaction_type'),  # Composite index for common queries
+        Index('idx_memory_project_active_rank', 'project_id', 'is_archived', 'relevance_score', 'created_at'),
+    )
+
+    # Normalized copy of the linked_*_ids arrays, kept in sync by MemoryStore
+    entity_links = relationship("MemoryEntityLink", cascade="all, delete-orphan")
+
+
+class MemoryEntityLink(Base):
+    """
+    One row per (memory, linked entity) for indexed entity lookups
+
+    Mirrors the linked_*_ids JSON arrays of conversation_memory so that
+    "memories linked to question X" is an index range scan rather than a
+    LIKE over every memory's JSON text.
+    """
+    __tablename__ = "memory_entity_links"
+
+    memory_id = Column(String, ForeignKey("conversation_memory.memory_id", ondelete="CASCADE"), primary_key=True)
+    entity_type = Column(String, primary_key=True)  # question, hypothesis, paper, protocol, experiment
+    entity_id = Column(String, primary_key=True)
+    project_id = Column(String, nullable=False)  # Denormalized from conversation_memory for project-scoped lookups
+
+    __table_args__ = (
+        Index('idx_memory_links_project_entity', 'project_id', 'entity_type', 'entity_id'),
+        Index('idx_memory_links_entity', 'entity_type', 'entity_id'),
     )
 
 
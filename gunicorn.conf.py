@@ -0,0 +1,34 @@
+# Gunicorn + Uvicorn workers for multi-worker deployments
+#
+#   gunicorn -c gunicorn.conf.py main:app
+#
+# WEB_CONCURRENCY sets the worker count. With MODEL_PRELOAD=1 the app and its
+# read-only models are loaded once in the master and shared copy-on-write by
+# the forked workers (see services/model_preload.py); otherwise every worker
+# imports the app and warms its own models up after it starts.
+import os
+
+from services.model_preload import after_fork, preload_enabled, preload_models
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8080')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn.workers.UvicornWorker"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "300"))
+graceful_timeout = 30
+keepalive = 5
+loglevel = "info"
+
+preload_app = preload_enabled()
+
+
+def when_ready(server):
+    # Runs in the master after preload_app imported main, before any worker is forked
+    if preload_app:
+        import main
+        results = preload_models(main.model_preload_loaders())
+        server.log.info(f"Preloaded models for {workers} workers: {results}")
+
+
+def post_fork(server, worker):
+    if preload_app:
+        after_fork()
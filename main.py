@@ -39,19 +39,26 @@ import asyncio
 import random
 import requests
 import sys
-try:
-    # Optional lightweight PDF text extraction
-    import io
-    from pdfminer.high_level import extract_text as pdf_extract_text  # type: ignore
-    _HAS_PDF = True
-except Exception:
-    _HAS_PDF = False
+import io
+import importlib.util
 from jsonschema import validate as jsonschema_validate, ValidationError
-try:
-    from langgraph.graph import StateGraph, END
-except Exception:
-    StateGraph = None  # type: ignore
-    END = None  # type: ignore
+
+# Heavy optional dependencies (pdfminer, langgraph, sentence-transformers/torch,
+# langchain_community embeddings, pinecone) are imported on first use, so a
+# worker boots without paying for them. Availability is checked without importing.
+def _has_module(name: str) -> bool:
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+_HAS_PDF = _has_module("pdfminer")
+_HAS_LANGGRAPH = _has_module("langgraph")
+
+def pdf_extract_text(fp) -> str:
+    """Optional lightweight PDF text extraction (pdfminer imported on first use)"""
+    from pdfminer.high_level import extract_text  # type: ignore
+    return extract_text(fp)
 
 from tools import PubMedSearchTool, WebSearchTool, PatentsSearchTool
 from scientific_model_analyst import analyze_scientific_model
@@ -85,12 +92,20 @@ from models.annotation_models import (
 
 # AI Recommendations Service
 from services.ai_recommendations_service import get_spotify_recommendations_service
+from services.weekly_feed_builder import get_weekly_feed_builder
 
 # Background Processing Services
 from services.background_processor import background_processor, JobStatus
 from services.notification_service import notification_manager, websocket_endpoint, background_job_notification_callback
 from services.network_session_manager import network_session_manager
 
+# Full-text project search (importing registers the search_documents write hooks)
+from services.project_search import ensure_search_index, rebuild_index as rebuild_search_index
+
+# Background model warm-up after startup
+from services.warmup import get_warmup
+from services.model_preload import preload_status
+
 # Semantic Analysis Service (Phase 2A.1)
 print("🔧 Attempting to import semantic analysis service...")
 try:
@@ -114,21 +129,12 @@ except Exception as e:
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Embeddings and Pinecone
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from pinecone import Pinecone
-try:
-    # Optional: legacy/alternate Index constructor in some pinecone versions
-    from pinecone import Index as PineconeIndex  # type: ignore
-except Exception:  # pragma: no cover - optional import
-    PineconeIndex = None  # type: ignore
-try:
-    from sentence_transformers import CrossEncoder
-    _HAS_CROSS = True
-except Exception:
-    _HAS_CROSS = False
-except Exception:
-    CrossEncoder = None  # type: ignore
+# Embeddings, cross-encoders and Pinecone are loaded by their _get_* accessors
+_HAS_CROSS = _has_module("sentence_transformers")
+# INFERENCE_BACKEND=onnx: int8 ONNX Runtime models, PyTorch otherwise
+from services.onnx_inference import onnx_cross_encoder, onnx_embeddings, onnx_enabled
+from services.cross_rerank import RerankScoreCache, rerank as cross_rerank
+from services.nli_entailment import score_pairs as nli_score_pairs
 
 # Load environment variables
 load_dotenv()
@@ -558,7 +564,8 @@ async def analyze_paper(request: PaperAnalysisRequest):
         features = await semantic_analysis_service.analyze_paper(
             title=request.title,
             abstract=request.abstract,
-            full_text=request.full_text
+            full_text=request.full_text,
+            pmid=request.pmid
         )
         analysis_time = time.time() - analysis_start
         print(f"⏱️  [API] [{request_id}] Core analysis completed in {analysis_time:.3f}s")
@@ -621,6 +628,61 @@ async def analyze_paper(request: PaperAnalysisRequest):
         print(traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
+# One batch call pins spaCy and the embedding model for every paper in it
+SEMANTIC_BATCH_MAX_PAPERS = int(os.getenv("SEMANTIC_BATCH_MAX_PAPERS", "100"))
+
+@app.post("/api/semantic/analyze-papers")
+async def analyze_papers(papers: List[PaperAnalysisRequest], db: Session = Depends(get_db)):
+    """
+    Analyze a batch of research papers for semantic features
+
+    Papers are analyzed together (one spaCy pipe, one embedding batch) and
+    results are persisted per PMID, so papers analyzed before with the same
+    text are served without re-running the models. At most
+    SEMANTIC_BATCH_MAX_PAPERS papers per call.
+    """
+    if len(papers) > SEMANTIC_BATCH_MAX_PAPERS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Too many papers in one batch ({len(papers)}); the limit is {SEMANTIC_BATCH_MAX_PAPERS}"
+        )
+    if not SEMANTIC_ANALYSIS_AVAILABLE:
+        raise HTTPException(status_code=503, detail="Semantic analysis service not available")
+
+    try:
+        analysis_start = time.time()
+        features_list = await semantic_analysis_service.analyze_papers(
+            [paper.dict() for paper in papers], db=db
+        )
+        analysis_time = time.time() - analysis_start
+        print(f"✅ [API] Batch semantic analysis of {len(papers)} papers completed in {analysis_time:.3f}s")
+
+        return [
+            SemanticFeaturesResponse(
+                methodology=features.methodology.value,
+                complexity_score=features.complexity_score,
+                novelty_type=features.novelty_type.value,
+                technical_terms=features.technical_terms,
+                research_domains=features.research_domains,
+                confidence_scores=features.confidence_scores,
+                embedding_dimensions=len(features.embeddings),
+                analysis_metadata={
+                    "pmid": paper.pmid,
+                    "title_length": len(paper.title),
+                    "abstract_length": len(paper.abstract),
+                    "has_full_text": paper.full_text is not None,
+                    "service_initialized": semantic_analysis_service.is_initialized,
+                    "batch_size": len(papers),
+                    "analysis_time_seconds": analysis_time
+                }
+            )
+            for paper, features in zip(papers, features_list)
+        ]
+
+    except Exception as e:
+        print(f"❌ [API] Batch semantic analysis failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+
 @app.get("/api/semantic/service-status")
 async def get_semantic_service_status():
     """Get semantic analysis service status and capabilities"""
@@ -660,7 +722,8 @@ async def get_semantic_service_status():
                 "scibert_available": semantic_analysis_service.scibert_model is not None,
                 "sentence_transformer_available": semantic_analysis_service.sentence_transformer is not None,
                 "spacy_available": semantic_analysis_service.nlp is not None
-            }
+            },
+            "inference": semantic_analysis_service.get_inference_stats()
         }
 
         return status
@@ -1231,20 +1294,34 @@ _EMBEDDINGS_OBJ = None
 def _get_embeddings():
     global _EMBEDDINGS_OBJ
     if _EMBEDDINGS_OBJ is None:
+        _EMBEDDINGS_OBJ = onnx_embeddings(_EMBED_MODEL_NAME)
+    if _EMBEDDINGS_OBJ is None:
+        from langchain_community.embeddings import HuggingFaceEmbeddings
         try:
             _EMBEDDINGS_OBJ = HuggingFaceEmbeddings(model_name=_EMBED_MODEL_NAME)
         except Exception:
             _EMBEDDINGS_OBJ = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
     return _EMBEDDINGS_OBJ
+def _load_cross_encoder(model_name: str):
+    from sentence_transformers import CrossEncoder
+    return CrossEncoder(model_name)
+
 _CROSS_MODEL_NAME = os.getenv("CROSS_ENCODER_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
-_CROSS_ENCODER_ENABLED = os.getenv("CROSS_ENCODER_ENABLED", "0") not in ("0","false","False")
+_CROSS_ENCODER_ENABLED = os.getenv("CROSS_ENCODER_ENABLED", "1") not in ("0","false","False")
+# Reranking stage of _triage_rank (services/cross_rerank.py)
+CROSS_RERANK_TOP_N = int(os.getenv("CROSS_RERANK_TOP_N", "30"))
+CROSS_RERANK_BATCH = int(os.getenv("CROSS_RERANK_BATCH", "16"))
+CROSS_RERANK_BUDGET_S = float(os.getenv("CROSS_RERANK_BUDGET_S", "3.0"))
+CROSS_RERANK_RESERVE_S = float(os.getenv("CROSS_RERANK_RESERVE_S", "5.0"))  # time left for deep dives
+CROSS_RERANK_WEIGHT = float(os.getenv("CROSS_RERANK_WEIGHT", "0.3"))
+RERANK_CACHE = RerankScoreCache(int(os.getenv("CROSS_RERANK_CACHE_SIZE", "50000")))
 cross_encoder = None
 
 def _get_cross_encoder():
     global cross_encoder
-    if cross_encoder is None and _CROSS_ENCODER_ENABLED and _HAS_CROSS:
+    if cross_encoder is None and _CROSS_ENCODER_ENABLED and (_HAS_CROSS or onnx_enabled()):
         try:
-            cross_encoder = CrossEncoder(_CROSS_MODEL_NAME)
+            cross_encoder = onnx_cross_encoder(_CROSS_MODEL_NAME) or _load_cross_encoder(_CROSS_MODEL_NAME)
         except Exception:
             cross_encoder = None
     return cross_encoder
@@ -1255,9 +1332,9 @@ nli_encoder = None
 
 def _get_nli_encoder():
     global nli_encoder
-    if nli_encoder is None and _HAS_CROSS and _ENTAILMENT_ENABLED:
+    if nli_encoder is None and (_HAS_CROSS or onnx_enabled()) and _ENTAILMENT_ENABLED:
         try:
-            nli_encoder = CrossEncoder(_NLI_MODEL_NAME)
+            nli_encoder = onnx_cross_encoder(_NLI_MODEL_NAME) or _load_cross_encoder(_NLI_MODEL_NAME)
         except Exception:
             nli_encoder = None
     return nli_encoder
@@ -1274,9 +1351,15 @@ def _get_pinecone_index():
     host = os.getenv("PINECONE_HOST")
     index_name = os.getenv("PINECONE_INDEX", PINECONE_INDEX)
     try:
+        from pinecone import Pinecone
         pc = Pinecone(api_key=api_key)
     except Exception:
         return None
+    try:
+        # Optional: legacy/alternate Index constructor in some pinecone versions
+        from pinecone import Index as PineconeIndex  # type: ignore
+    except Exception:
+        PineconeIndex = None  # type: ignore
 
     # Try host-first path (new serverless style)
     if host:
@@ -1442,6 +1525,9 @@ DEEPDIVE_BUDGET_S = float(os.getenv("DEEPDIVE_BUDGET_S", "300"))  # 5 minutes in
 PER_ARTICLE_BUDGET_S = float(os.getenv("PER_ARTICLE_BUDGET_S", "60"))  # 1 minute instead of 7 seconds
 SYNTH_BUDGET_S = float(os.getenv("SYNTH_BUDGET_S", "30"))  # 30 seconds instead of 5
 ENTAILMENT_BUDGET_S = float(os.getenv("ENTAILMENT_BUDGET_S", "2.5"))
+ENTAILMENT_BATCH = int(os.getenv("ENTAILMENT_BATCH", "64"))
+ENTAILMENT_LABEL_INDEX = int(os.getenv("ENTAILMENT_LABEL_INDEX", "1"))  # entailment column of the NLI model output
+ENTAILMENT_CACHE = RerankScoreCache(int(os.getenv("ENTAILMENT_CACHE_SIZE", "50000")))
 PUBMED_POOL_MAX = int(os.getenv("PUBMED_POOL_MAX", "80"))
 TRIALS_POOL_MAX = int(os.getenv("TRIALS_POOL_MAX", "50"))
 PATENTS_POOL_MAX = int(os.getenv("PATENTS_POOL_MAX", "50"))
@@ -2042,38 +2128,48 @@ def _lightweight_entailment_filter(abstract: str, fact_anchors: list[dict]) -> l
         return (fact_anchors or [])[:5]
 
 
-def _nli_entailment_filter(abstract: str, fact_anchors: list[dict], deadline: float) -> list[dict]:
-    """Use CrossEncoder NLI model to keep anchors with high entailment confidence.
-    Fallback to lightweight filter if model/time not available.
+def _nli_entailment_filter_batch(items: list[tuple[str, list[dict]]], deadline: float,
+                                 diagnostics: Optional[dict] = None) -> list[list[dict]]:
+    """Entailment-filter the fact anchors of many articles with one batched NLI pass.
+    `items` are (abstract, fact_anchors) per article. Articles whose anchors could not all be
+    scored (NLI disabled, no time left, model error) use the lightweight filter instead.
+    Blocking (model load and inference): call it from async code via asyncio.to_thread.
     """
-    if not _ENTAILMENT_ENABLED or _get_nli_encoder() is None or _time_left(deadline) < ENTAILMENT_BUDGET_S:
-        return _lightweight_entailment_filter(abstract, fact_anchors)
-    try:
-        pairs = []
-        for fa in fact_anchors or []:
+    model = _get_nli_encoder() if _ENTAILMENT_ENABLED else None
+    budget = min(ENTAILMENT_BUDGET_S, _time_left(deadline) - 1.0)
+    if model is None or budget <= 0:
+        return [_lightweight_entailment_filter(abstract, anchors) for abstract, anchors in items]
+    pairs: list[tuple[str, str]] = []
+    owners: list[tuple[int, dict]] = []
+    for idx, (abstract, anchors) in enumerate(items):
+        for fa in anchors or []:
             claim = str(fa.get("claim", "")).strip()
             if claim:
-                pairs.append((abstract[:1500], claim[:300]))
-        if not pairs:
-            return fact_anchors
-        # Predict entailment confidence; normalize to [0,1] if needed
-        scores = _get_nli_encoder().predict(pairs)
-        kept = []
-        for fa, sc in zip(fact_anchors, scores):
-            try:
-                score = float(sc if not isinstance(sc, (list, tuple)) else sc[0])
-            except Exception:
-                score = 0.0
-            if score >= float(os.getenv("ENTAILMENT_KEEP_THRESHOLD", "0.5")):
-                kept.append(fa)
-        try:
-            _metrics_inc("anchors_entailment_kept", len(kept))
-            _metrics_inc("anchors_entailment_filtered", max(0, len(fact_anchors) - len(kept)))
-        except Exception:
-            pass
-        return kept[:5] if kept else _lightweight_entailment_filter(abstract, fact_anchors)
-    except Exception:
-        return _lightweight_entailment_filter(abstract, fact_anchors)
+                pairs.append(((abstract or "")[:1500], claim[:300]))
+                owners.append((idx, fa))
+    scores, report = nli_score_pairs(pairs, model, ENTAILMENT_CACHE, batch_size=ENTAILMENT_BATCH,
+                                     budget_s=budget, entailment_index=ENTAILMENT_LABEL_INDEX)
+    if diagnostics is not None:
+        diagnostics["entailment"] = report.to_dict()
+    _metrics_inc("entailment_ms_sum", int(report.latency_ms))
+
+    threshold = float(os.getenv("ENTAILMENT_KEEP_THRESHOLD", "0.5"))
+    scored: list[list[tuple[dict, Optional[float]]]] = [[] for _ in items]
+    for (idx, fa), score in zip(owners, scores):
+        scored[idx].append((fa, score))
+    results: list[list[dict]] = []
+    for (abstract, anchors), article_scores in zip(items, scored):
+        if not article_scores:
+            results.append(anchors)
+            continue
+        if any(score is None for _, score in article_scores):
+            results.append(_lightweight_entailment_filter(abstract, anchors))
+            continue
+        kept = [fa for fa, score in article_scores if score >= threshold]
+        _metrics_inc("anchors_entailment_kept", len(kept))
+        _metrics_inc("anchors_entailment_filtered", max(0, len(anchors) - len(kept)))
+        results.append(kept[:5] if kept else _lightweight_entailment_filter(abstract, anchors))
+    return results
 
 
 # ---------------------
@@ -2106,8 +2202,9 @@ async def _with_timeout(coro, timeout_s: float, name: str, retries: int = 0):
         raise err
 
 def _build_dag_app():
-    if StateGraph is None:
+    if not _HAS_LANGGRAPH:
         return None
+    from langgraph.graph import StateGraph, END
     graph = StateGraph(dict)
 
     async def node_plan(state: dict) -> dict:
@@ -2261,25 +2358,14 @@ def _build_dag_app():
                     mol_tokens = [mol] + _expand_molecule_synonyms(mol)
             except Exception:
                 mol_tokens = [mol] if mol else []
-            shortlist = _triage_rank(request.objective, norm, triage_cap, None, mol_tokens, getattr(request, "preference", None))
-            # Cross-encoder re-ranking for DAG shortlist if enabled and time remains (robustness: blend CE with heuristic)
+            triage_diag: dict = {}
+            shortlist = await asyncio.to_thread(_triage_rank, request.objective, norm, triage_cap, None, mol_tokens,
+                                                getattr(request, "preference", None), deadline=state["deadline"],
+                                                diagnostics=triage_diag)
+            state["rerank"] = triage_diag.get("rerank")
+            # Cross-encoder reranking happened inside _triage_rank; without it, rescore for stability
             try:
-                if _get_cross_encoder() is not None and time_left > 5.0:
-                    pairs = [(request.objective or "", (a.get('title') or '') + ". " + (a.get('abstract') or '')) for a in shortlist[:30]]
-                    scores = _get_cross_encoder().predict(pairs)
-                    # Blend + threshold to drop weak items without over-pruning
-                    ce_thresh = 0.2  # conservative
-                    keep: list[dict] = []
-                    for i, s in enumerate(scores):
-                        base = float(shortlist[i].get("score", 0.0))
-                        ce = float(s)
-                        blended = 0.7 * base + 0.3 * ce
-                        if ce >= ce_thresh or i < 8:  # keep top heuristics even if CE is slightly low
-                            item = dict(shortlist[i])
-                            item["score"] = blended
-                            keep.append(item)
-                    shortlist = sorted(keep, key=lambda x: x.get("score", 0.0), reverse=True)
-                else:
+                if not (state["rerank"] or {}).get("applied"):
                     # Lightweight LTR-style rescoring: combine normalized heuristic features for stability when CE is off
                     # Features: title hit, abstract hit, year recency, citations per year
                     nowy = datetime.utcnow().year
@@ -2307,7 +2393,8 @@ def _build_dag_app():
             if not shortlist and norm:
                 try:
                     # Blend gated with original norm to allow breadth, then re-rank
-                    shortlist_relaxed = _triage_rank(request.objective, norm, triage_cap, None, mol_tokens, getattr(request, "preference", None))
+                    shortlist_relaxed = await asyncio.to_thread(_triage_rank, request.objective, norm, triage_cap, None, mol_tokens,
+                                                                getattr(request, "preference", None), deadline=state["deadline"])
                     if shortlist_relaxed:
                         shortlist = shortlist_relaxed
                         deep_cap = min(len(shortlist), max(DEEPDIVE_TOP_K, deep_pref))
@@ -2325,8 +2412,10 @@ def _build_dag_app():
         t0 = _now_ms()
         try:
             request = state["request"]
-            deep = await _with_timeout(_deep_dive_articles(request.objective, state.get("top_k") or [], state.get("memories") or [], state["deadline"]), DEEPDIVE_BUDGET_S, "DeepDive", retries=0)
+            deep_diag: dict = {}
+            deep = await _with_timeout(_deep_dive_articles(request.objective, state.get("top_k") or [], state.get("memories") or [], state["deadline"], deep_diag), DEEPDIVE_BUDGET_S, "DeepDive", retries=0)
             state["deep"] = deep
+            state["entailment"] = deep_diag.get("entailment")
             _log_node_event("DeepDive", t0, True, {"deep": len(deep)})
             return state
         except Exception as e:
@@ -2476,7 +2565,7 @@ def _build_dag_app():
                         art_list += sec.get("articles") or []
                     except Exception:
                         pass
-                topped = _oa_backfill_topup(request.objective, art_list, minimum=9, deadline=_now_ms() + 8000.0)
+                topped = await asyncio.to_thread(_oa_backfill_topup, request.objective, art_list, minimum=9, deadline=time.time() + 8.0)
                 rebuilt = []
                 seen_titles = set()
                 for a in topped:
@@ -2503,8 +2592,12 @@ def _build_dag_app():
                 "deep_dive_count": int(len(results_sections)),
                 "timings_ms": {
                     # Provide coarse timings if available in state; otherwise leave empty
+                    **({"rerank_ms": (state.get("rerank") or {}).get("latency_ms", 0.0)} if state.get("rerank") else {}),
+                    **({"entailment_ms": state["entailment"].get("latency_ms", 0.0)} if state.get("entailment") else {}),
                 },
                 "pool_caps": {"pubmed": PUBMED_POOL_MAX, "trials": TRIALS_POOL_MAX, "patents": PATENTS_POOL_MAX},
+                "rerank": state.get("rerank"),
+                "entailment": state.get("entailment"),
             }
             # Flag top-up in diagnostics if we met or exceeded desired minimum via backfill
             try:
@@ -2992,7 +3085,12 @@ def _triage_rank(
     project_vec: Optional[np.ndarray] = None,
     molecule_tokens: Optional[List[str]] = None,
     preference: Optional[str] = None,
+    deadline: Optional[float] = None,
+    diagnostics: Optional[dict] = None,
 ) -> list[dict]:
+    """Heuristic bi-encoder ranking, then budgeted cross-encoder reranking of its head.
+    The rerank report is stored in `diagnostics["rerank"]` when a dict is passed.
+    Blocking (model load and inference): call it from async code via asyncio.to_thread."""
     # Use existing _score_article-like features; reuse embeddings cosine
     try:
         objective_vec = np.array(EMBED_CACHE.get_or_compute(objective or ""), dtype=float)
@@ -3106,6 +3204,20 @@ def _triage_rank(
         except Exception:
             a["score"] = 0.0
     ranked = sorted(candidates, key=lambda x: x.get("score", 0.0), reverse=True)
+    # Cross-encoder stage: bounded by its own budget and by the request deadline
+    budget = CROSS_RERANK_BUDGET_S
+    if deadline is not None:
+        budget = min(budget, _time_left(deadline) - CROSS_RERANK_RESERVE_S)
+    model = _get_cross_encoder() if budget > 0 else None
+    ranked, report = cross_rerank(objective, ranked, model, RERANK_CACHE, top_n=CROSS_RERANK_TOP_N,
+                                  batch_size=CROSS_RERANK_BATCH, budget_s=budget, weight=CROSS_RERANK_WEIGHT)
+    if report.applied:
+        _metrics_inc("rerank_requests")
+        _metrics_inc("rerank_ms_sum", int(report.latency_ms))
+        _metrics_inc("rerank_scored", report.scored)
+        _metrics_inc("rerank_cache_hits", report.cache_hits)
+    if diagnostics is not None:
+        diagnostics["rerank"] = report.to_dict()
     return ranked[:max_keep]
 
 
@@ -3215,9 +3327,12 @@ async def _calculate_contextual_match_batch(objective: str, items: list[dict], d
     return scores
 
 
-async def _deep_dive_articles(objective: str, items: list[dict], memories: list[dict], deadline: float) -> list[dict]:
+async def _deep_dive_articles(objective: str, items: list[dict], memories: list[dict], deadline: float,
+                              diagnostics: Optional[dict] = None) -> list[dict]:
     # Extraction, summarization, justification
     extracted_results: list[dict] = []
+    # (structured, abstract, article) whose fact anchors are entailment-checked together after the loop
+    pending_anchors: list[tuple[dict, str, dict]] = []
     # Pre-compute objective embedding for similarity scoring
     try:
         objective_vec = np.array(EMBED_CACHE.get_or_compute(objective or ""), dtype=float)
@@ -3288,22 +3403,8 @@ Abstract: {abstract}
                                 if not ev.get("quote"):
                                     ev["quote"] = (abstract or "")[:180]
                                 fa["evidence"] = ev
-                    # entailment filter (NLI if enabled, else lightweight)
-                    structured["fact_anchors"] = _nli_entailment_filter(abstract, structured["fact_anchors"], deadline)  # type: ignore
-                    # Normalize quotes to avoid ellipsis-truncated snippets
-                    try:
-                        structured["fact_anchors"] = _normalize_anchor_quotes(abstract, structured["fact_anchors"])  # type: ignore
-                    except Exception:
-                        pass
-                    # If anchors remain weak, synthesize light fallback anchors
-                    try:
-                        cur = structured.get("fact_anchors") or []
-                        if (not isinstance(cur, list)) or len(cur) < 3:
-                            fa_fb = _fallback_fact_anchors(abstract, art, max_items=3)
-                            if fa_fb:
-                                structured["fact_anchors"] = _lightweight_entailment_filter(abstract, fa_fb)
-                    except Exception:
-                        pass
+                    # entailment filter (NLI if enabled, else lightweight), batched across articles below
+                    pending_anchors.append((structured, abstract, art))
                 else:
                     # Fallback: synthesize simple anchors from abstract (cap to 3)
                     fa_fb = _fallback_fact_anchors(abstract, art, max_items=3)
@@ -3438,6 +3539,31 @@ Abstract: {abstract}
             "article": art,
             "top_article": top_article_payload,
         })
+    # One NLI pass for the fact anchors of all deep-dive articles
+    if pending_anchors:
+        try:
+            # Off the event loop: NLI model loading (first use) and inference block
+            filtered = await asyncio.to_thread(_nli_entailment_filter_batch,
+                                               [(ab, st["fact_anchors"]) for st, ab, _ in pending_anchors],
+                                               deadline, diagnostics)
+        except Exception:
+            filtered = [_lightweight_entailment_filter(ab, st["fact_anchors"]) for st, ab, _ in pending_anchors]
+        for (structured, abstract, art), anchors in zip(pending_anchors, filtered):
+            structured["fact_anchors"] = anchors
+            # Normalize quotes to avoid ellipsis-truncated snippets
+            try:
+                structured["fact_anchors"] = _normalize_anchor_quotes(abstract, structured["fact_anchors"])  # type: ignore
+            except Exception:
+                pass
+            # If anchors remain weak, synthesize light fallback anchors
+            try:
+                cur = structured.get("fact_anchors") or []
+                if (not isinstance(cur, list)) or len(cur) < 3:
+                    fa_fb = _fallback_fact_anchors(abstract, art, max_items=3)
+                    if fa_fb:
+                        structured["fact_anchors"] = _lightweight_entailment_filter(abstract, fa_fb)
+            except Exception:
+                pass
     return extracted_results
 
 async def orchestrate_v2(request, memories: list[dict]) -> dict:
@@ -3497,7 +3623,7 @@ async def orchestrate_v2(request, memories: list[dict]) -> dict:
     # Recall fallback: if nothing harvested, try Europe PMC OA by objective keywords
     try:
         if not norm and _time_left(deadline) > 6.0:
-            norm = _oa_backfill_topup(request.objective or "", [], 10, deadline)
+            norm = await asyncio.to_thread(_oa_backfill_topup, request.objective or "", [], 10, deadline)
     except Exception:
         pass
     # PubMed OA fallback if still empty
@@ -3568,25 +3694,11 @@ async def orchestrate_v2(request, memories: list[dict]) -> dict:
             mol_tokens = [mol_v2] + _expand_molecule_synonyms(mol_v2)
     except Exception:
         mol_tokens = []
-    shortlist = _triage_rank(request.objective, norm, triage_cap, proj_vec, mol_tokens, getattr(request, "preference", None))
-    # Cross-encoder re-ranking for V2 shortlist
-    try:
-        if _get_cross_encoder() is not None and _time_left(deadline) > 5.0:
-            pairs = [(request.objective or "", (a.get('title') or '') + ". " + (a.get('abstract') or '')) for a in shortlist[:30]]
-            scores = cross_encoder.predict(pairs)
-            ce_thresh = 0.2
-            keep: list[dict] = []
-            for i, s in enumerate(scores):
-                base = float(shortlist[i].get("score", 0.0))
-                ce = float(s)
-                blended = 0.8 * base + 0.2 * ce
-                if ce >= ce_thresh or i < 8:
-                    item = dict(shortlist[i])
-                    item["score"] = blended
-                    keep.append(item)
-            shortlist = sorted(keep, key=lambda x: x.get("score", 0.0), reverse=True)
-    except Exception:
-        pass
+    triage_diag: dict = {}
+    # Off the event loop: bi-encoder scoring and cross-encoder inference (and its first-use load) block
+    shortlist = await asyncio.to_thread(_triage_rank, request.objective, norm, triage_cap, proj_vec, mol_tokens,
+                                        getattr(request, "preference", None), deadline=deadline, diagnostics=triage_diag)
+    rerank_report = triage_diag.get("rerank") or {}
     # Controller for deep dive cap
     try:
         pref = str(getattr(request, "preference", "precision") or "precision").lower()
@@ -3606,7 +3718,7 @@ async def orchestrate_v2(request, memories: list[dict]) -> dict:
     try:
         need_min = 8
         if len(top_k) < need_min and _time_left(deadline) > 6.0:
-            topped = _oa_backfill_topup(request.objective or "", top_k, need_min, deadline)
+            topped = await asyncio.to_thread(_oa_backfill_topup, request.objective or "", top_k, need_min, deadline)
             if isinstance(topped, list) and len(topped) >= len(top_k):
                 top_k = topped[:max(need_min, len(top_k))]
     except Exception:
@@ -3615,7 +3727,8 @@ async def orchestrate_v2(request, memories: list[dict]) -> dict:
 
     # Deep-dive
     _t0 = _now_ms()
-    deep = await _deep_dive_articles(request.objective, top_k, memories, deadline)
+    deep_diag: dict = {}
+    deep = await _deep_dive_articles(request.objective, top_k, memories, deadline, deep_diag)
     deepdive_ms = _now_ms() - _t0
     # Assemble into sections compatible with UI (each as a primary section)
     results_sections: list[dict] = []
@@ -3647,9 +3760,13 @@ async def orchestrate_v2(request, memories: list[dict]) -> dict:
             "plan_ms": int(plan_ms),
             "harvest_ms": int(harvest_ms),
             "triage_ms": int(triage_ms),
+            "rerank_ms": rerank_report.get("latency_ms", 0.0),
             "deepdive_ms": int(deepdive_ms),
+            "entailment_ms": (deep_diag.get("entailment") or {}).get("latency_ms", 0.0),
         },
         "pool_caps": {"pubmed": PUBMED_POOL_MAX, "trials": TRIALS_POOL_MAX, "patents": PATENTS_POOL_MAX},
+        "rerank": rerank_report,
+        "entailment": deep_diag.get("entailment"),
     }
     return {
         "queries": [v for k, v in plan.items() if isinstance(v, str)],
@@ -4441,6 +4558,38 @@ async def startup_event():
             Base.metadata.create_all(bind=engine)
             print("✅ Database tables initialized successfully")
 
+            # Load the citation adjacency index used by multi-hop network endpoints
+            try:
+                from database import get_session_local
+                from services.citation_graph_index import get_citation_graph_index
+                index_db = get_session_local()()
+                try:
+                    stats = await run_in_threadpool(get_citation_graph_index().ensure_loaded, index_db)
+                    print(f"✅ Citation graph index loaded: {stats['nodes']} nodes, {stats['edges']} edges")
+                finally:
+                    index_db.close()
+            except Exception as e:
+                print(f"⚠️ Citation graph index load failed (will load on first use): {e}")
+
+            # Full-text search structures; backfill documents on first run
+            try:
+                backend = ensure_search_index(engine)
+                if backend:
+                    from database import get_session_local, SearchDocument
+                    search_db = get_session_local()()
+                    try:
+                        if search_db.query(SearchDocument.id).first() is None:
+                            await run_in_threadpool(rebuild_search_index, search_db)
+                    finally:
+                        search_db.close()
+                print(f"✅ Project search index ready ({backend or 'ilike fallback'})")
+            except Exception as e:
+                print(f"⚠️ Project search index setup failed (ILIKE fallback): {e}")
+
+            # Precompute weekly recommendation feeds in the background
+            get_weekly_feed_builder().start_scheduler()
+            print("✅ Weekly recommendation feed scheduler started")
+
             # Verify critical tables exist
             with engine.connect() as conn:
                 if engine.url.drivername.startswith('postgresql'):
@@ -4467,6 +4616,55 @@ async def startup_event():
     asyncio.create_task(init_database_background())
     print("✅ FastAPI app started - database initializing in background")
 
+    # Load models in the background instead of on the first requests; /health/ready reports progress
+    warmup = get_warmup()
+    for name, loader in model_warmup_loaders().items():
+        warmup.register(name, loader)
+    warmup.start()
+
+
+async def _warm_semantic_analysis():
+    await semantic_analysis_service.ensure_initialized()
+    return semantic_analysis_service.is_initialized
+
+
+def _warm_mesh_index():
+    from services.mesh_autocomplete_service import get_mesh_autocomplete_service
+    return get_mesh_autocomplete_service().index
+
+
+def model_warmup_loaders() -> dict:
+    """Models to preload, limited by WARMUP_MODELS and each model's own feature flag"""
+    wanted = {m.strip() for m in os.getenv("WARMUP_MODELS", "semantic_analysis,embeddings,cross_encoder,nli,mesh_index").split(",")}
+    loaders = {}
+    if "semantic_analysis" in wanted and SEMANTIC_ANALYSIS_AVAILABLE:
+        loaders["semantic_analysis"] = _warm_semantic_analysis
+    if "embeddings" in wanted:
+        loaders["embeddings"] = _get_embeddings
+    if "cross_encoder" in wanted and _CROSS_ENCODER_ENABLED:
+        loaders["cross_encoder"] = _get_cross_encoder
+    if "nli" in wanted and _ENTAILMENT_ENABLED:
+        loaders["nli"] = _get_nli_encoder
+    if "mesh_index" in wanted:
+        loaders["mesh_index"] = _warm_mesh_index
+    return loaders
+
+
+# Warm-up loaders that build ONNX Runtime sessions when INFERENCE_BACKEND=onnx
+ONNX_BACKED_MODELS = ("semantic_analysis", "embeddings", "cross_encoder", "nli")
+
+
+def model_preload_loaders() -> dict:
+    """Warm-up loaders that are safe to run in the gunicorn master before it forks workers"""
+    loaders = model_warmup_loaders()
+    if onnx_enabled():
+        # Creating an InferenceSession starts ONNX Runtime's thread pools (and exporting traces
+        # torch); workers forked after that can hang in session.run, so each worker's own
+        # warm-up builds these sessions after the fork
+        for name in ONNX_BACKED_MODELS:
+            loaders.pop(name, None)
+    return loaders
+
 @app.get("/")
 async def root():
     return {"status": "ok"}
@@ -4897,6 +5095,15 @@ async def health_check():
         "features": ["increased_recommendation_limits", "author_fixes", "citation_opportunities"]
     }
 
+@app.get("/health/ready")
+async def readiness_check(response: Response):
+    """Readiness: 503 while models are still warming up in the background, 200 after (also when some failed)"""
+    status = get_warmup().status()
+    if not status["ready"]:
+        response.status_code = 503
+    status["preload"] = preload_status()
+    return status
+
 @app.get("/admin/verify-phase1-migration")
 async def verify_phase1_migration(db: Session = Depends(get_db)):
     """
@@ -5497,7 +5704,7 @@ async def ready() -> dict:
             pass
         pc_ok = False
     keys_ok = bool(os.getenv("GOOGLE_API_KEY")) and bool(os.getenv("GOOGLE_CSE_ID")) and bool(os.getenv("PINECONE_API_KEY"))
-    return {"pinecone": pc_ok, "keys": keys_ok}
+    return {"pinecone": pc_ok, "keys": keys_ok, "models": get_warmup().status()["status"]}
 
 
 @app.get("/version")
@@ -7397,77 +7604,15 @@ async def get_annotation_thread(
     if not root_annotation:
         raise HTTPException(status_code=404, detail="Annotation not found")
 
-    # Helper function to parse JSON fields
-    def parse_json_field(field):
-        if isinstance(field, str):
-            return json.loads(field) if field else []
-        return field if field else []
-
-    # Helper function to build annotation dict
-    def build_annotation_dict(annotation):
-        return {
-            "annotation_id": annotation.annotation_id,
-            "project_id": annotation.project_id,
-            "content": annotation.content,
-            "article_pmid": annotation.article_pmid,
-            "report_id": annotation.report_id,
-            "analysis_id": annotation.analysis_id,
-            "note_type": annotation.note_type,
-            "priority": annotation.priority,
-            "status": annotation.status,
-            "parent_annotation_id": annotation.parent_annotation_id,
-            "related_pmids": parse_json_field(annotation.related_pmids),
-            "tags": parse_json_field(annotation.tags),
-            "action_items": parse_json_field(annotation.action_items),
-            "exploration_session_id": annotation.exploration_session_id,
-            "research_question": annotation.research_question,
-            "created_at": annotation.created_at.isoformat(),
-            "updated_at": annotation.updated_at.isoformat() if annotation.updated_at else annotation.updated_at.created_at.isoformat(),
-            "author_id": annotation.author_id,
-            "author_username": annotation.author.username if annotation.author else "Unknown",
-            "is_private": annotation.is_private,
-            # NEW: PDF annotation fields (Week 11 Day 1)
-            "pdf_page": annotation.pdf_page,
-            "pdf_coordinates": parse_json_field(annotation.pdf_coordinates) if annotation.pdf_coordinates else None,
-            "highlight_color": annotation.highlight_color,
-            "highlight_text": annotation.highlight_text
-        }
-
-    # Recursive function to get all children
-    def get_children_recursive(parent_id, depth=0, max_depth=10):
-        if depth >= max_depth:
-            return []
-
-        children = db.query(Annotation).filter(
-            Annotation.parent_annotation_id == parent_id,
-            Annotation.project_id == project_id
-        ).order_by(Annotation.created_at.asc()).all()
-
-        result = []
-        for child in children:
-            child_dict = build_annotation_dict(child)
-            child_dict["depth"] = depth + 1
-            child_dict["children"] = get_children_recursive(child.annotation_id, depth + 1, max_depth)
-            result.append(child_dict)
-
-        return result
-
-    # Build thread
-    root_dict = build_annotation_dict(root_annotation)
-    root_dict["depth"] = 0
-    root_dict["children"] = get_children_recursive(root_annotation.annotation_id)
+    # Whole reply tree in one recursive query
+    from services.annotation_threads import load_threads
+    thread = load_threads(db, project_id, [root_annotation])[0]
 
     return {
-        "thread": root_dict,
-        "total_annotations": 1 + sum(1 for _ in get_all_descendants(root_dict))
+        "thread": thread,
+        "total_annotations": thread["total_in_thread"]
     }
 
-def get_all_descendants(node):
-    """Helper to count all descendants"""
-    for child in node.get("children", []):
-        yield child
-        yield from get_all_descendants(child)
-
 @app.get("/projects/{project_id}/annotations/threads")
 async def get_all_annotation_threads(
     project_id: str,
@@ -7477,7 +7622,10 @@ async def get_all_annotation_threads(
     note_type: Optional[str] = Query(None, description="Filter by note type"),
     priority: Optional[str] = Query(None, description="Filter by priority"),
     status: Optional[str] = Query(None, description="Filter by status"),
-    article_pmid: Optional[str] = Query(None, description="Filter by article PMID")
+    article_pmid: Optional[str] = Query(None, description="Filter by article PMID"),
+    # Keyset pagination over root annotations (newest first); omit limit for all threads
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Root threads per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page")
 ):
     """Get all annotation threads for a project (grouped by root annotations)"""
     current_user = request.headers.get("User-ID", "default_user")
@@ -7498,92 +7646,32 @@ async def get_all_annotation_threads(
     if not has_access:
         raise HTTPException(status_code=403, detail="Access denied")
 
-    # Build query for root annotations (no parent)
-    query = db.query(Annotation).filter(
-        Annotation.project_id == project_id,
-        Annotation.parent_annotation_id == None
-    )
-
-    # Apply filters
+    # Filters apply to root annotations
+    filters = []
     if note_type:
-        query = query.filter(Annotation.note_type == note_type)
+        filters.append(Annotation.note_type == note_type)
     if priority:
-        query = query.filter(Annotation.priority == priority)
+        filters.append(Annotation.priority == priority)
     if status:
-        query = query.filter(Annotation.status == status)
+        filters.append(Annotation.status == status)
     if article_pmid:
-        query = query.filter(Annotation.article_pmid == article_pmid)
-
-    root_annotations = query.order_by(Annotation.created_at.desc()).all()
-
-    # Helper function to parse JSON fields
-    def parse_json_field(field):
-        if isinstance(field, str):
-            return json.loads(field) if field else []
-        return field if field else []
-
-    # Helper function to build annotation dict
-    def build_annotation_dict(annotation):
-        return {
-            "annotation_id": annotation.annotation_id,
-            "project_id": annotation.project_id,
-            "content": annotation.content,
-            "article_pmid": annotation.article_pmid,
-            "report_id": annotation.report_id,
-            "analysis_id": annotation.analysis_id,
-            "note_type": annotation.note_type,
-            "priority": annotation.priority,
-            "status": annotation.status,
-            "parent_annotation_id": annotation.parent_annotation_id,
-            "related_pmids": parse_json_field(annotation.related_pmids),
-            "tags": parse_json_field(annotation.tags),
-            "action_items": parse_json_field(annotation.action_items),
-            "exploration_session_id": annotation.exploration_session_id,
-            "research_question": annotation.research_question,
-            "created_at": annotation.created_at.isoformat(),
-            "updated_at": annotation.updated_at.isoformat() if annotation.updated_at else annotation.created_at.isoformat(),
-            "author_id": annotation.author_id,
-            "author_username": annotation.author.username if annotation.author else "Unknown",
-            "is_private": annotation.is_private,
-            # NEW: PDF annotation fields (Week 11 Day 1)
-            "pdf_page": annotation.pdf_page,
-            "pdf_coordinates": parse_json_field(annotation.pdf_coordinates) if annotation.pdf_coordinates else None,
-            "highlight_color": annotation.highlight_color,
-            "highlight_text": annotation.highlight_text
-        }
+        filters.append(Annotation.article_pmid == article_pmid)
 
-    # Recursive function to get all children
-    def get_children_recursive(parent_id, depth=0, max_depth=10):
-        if depth >= max_depth:
-            return []
+    from services.annotation_threads import page_root_annotations, load_threads
+    try:
+        root_annotations, next_cursor = page_root_annotations(db, project_id, filters, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-        children = db.query(Annotation).filter(
-            Annotation.parent_annotation_id == parent_id,
-            Annotation.project_id == project_id
-        ).order_by(Annotation.created_at.asc()).all()
-
-        result = []
-        for child in children:
-            child_dict = build_annotation_dict(child)
-            child_dict["depth"] = depth + 1
-            child_dict["children"] = get_children_recursive(child.annotation_id, depth + 1, max_depth)
-            result.append(child_dict)
-
-        return result
-
-    # Build all threads
-    threads = []
-    for root in root_annotations:
-        root_dict = build_annotation_dict(root)
-        root_dict["depth"] = 0
-        root_dict["children"] = get_children_recursive(root.annotation_id)
-        root_dict["total_in_thread"] = 1 + sum(1 for _ in get_all_descendants(root_dict))
-        threads.append(root_dict)
+    # All replies of the page's roots in one recursive query, assembled in O(n)
+    threads = load_threads(db, project_id, root_annotations)
 
     return {
         "threads": threads,
         "total_threads": len(threads),
-        "total_annotations": sum(thread["total_in_thread"] for thread in threads)
+        "total_annotations": sum(thread["total_in_thread"] for thread in threads),
+        "next_cursor": next_cursor,
+        "has_more": next_cursor is not None
     }
 
 # =============================================================================
@@ -8191,6 +8279,10 @@ async def search_project_content(
     """
     Global search across ALL project content.
 
+    Uses one ranked full-text query over the search_documents index (prefix
+    matching, so it also serves typeahead) and falls back to ILIKE scans when
+    no full-text backend is available.
+
     Searches:
     - Papers (title, abstract, authors, journal)
     - Collections (name, description)
@@ -8253,6 +8345,60 @@ async def search_project_content(
             "search_types": list(search_types)
         }
 
+    # Unified full-text query (tsvector/GIN on PostgreSQL, FTS5 on SQLite)
+    search_engine = "ilike"
+    try:
+        from services.project_search import search_project
+        found = search_project(db, project_id, q, search_types, limit=limit)
+    except Exception as e:
+        logger.error(f"Full-text search failed, falling back to ILIKE: {e}")
+        db.rollback()
+        found = None
+
+    ranked = []
+    if found is not None:
+        results = found["results"]
+        ranked = found["ranked"]
+        search_engine = "fulltext"
+    else:
+        results = _search_project_content_ilike(db, project_id, q, search_types, limit)
+
+    # Calculate total results
+    total_found = sum(len(v) for v in results.values())
+
+    logger.info(f"🔍 [Search Complete] Total found: {total_found} ({search_engine})")
+
+    return {
+        "query": q,
+        "results": results,
+        "ranked": ranked,
+        "total_found": total_found,
+        "search_types": list(search_types),
+        "search_engine": search_engine,
+        "counts": {
+            "papers": len(results["papers"]),
+            "collections": len(results["collections"]),
+            "notes": len(results["notes"]),
+            "reports": len(results["reports"]),
+            "analyses": len(results["analyses"])
+        }
+    }
+
+
+def _search_project_content_ilike(db: Session, project_id: str, q: str, search_types: set, limit: int) -> dict:
+    """
+    Substring search fallback for databases without a full-text index.
+
+    Runs one ILIKE scan per content type and builds highlights in Python.
+    """
+    results = {
+        "papers": [],
+        "collections": [],
+        "notes": [],
+        "reports": [],
+        "analyses": []
+    }
+
     query_pattern = f"%{q}%"
 
     # ═══════════════════════════════════════════════════════════
@@ -8504,42 +8650,7 @@ async def search_project_content(
         except Exception as e:
             logger.error(f"Error searching analyses: {e}")
 
-    # Calculate total results
-    total_found = sum(len(v) for v in results.values())
-
-    # 🐛 DEBUG: Add debug info to response (TEMPORARY)
-    debug_info = {
-        "project_collections_count": len(db.query(Collection).filter(
-            Collection.project_id == project_id,
-            Collection.is_active == True
-        ).all()),
-        "total_annotations_in_project": db.query(Annotation).filter(
-            Annotation.project_id == project_id
-        ).count(),
-        "query_pattern": query_pattern,
-        "search_types_requested": list(search_types),
-        "user_id_resolved": user_id,
-        "project_id": project_id
-    }
-
-    # 🐛 DEBUG: Log final results
-    logger.info(f"🔍 [Search Complete] Total found: {total_found}")
-    logger.info(f"🔍 [Search Complete] Notes: {len(results['notes'])}, Papers: {len(results['papers'])}, Collections: {len(results['collections'])}")
-
-    return {
-        "query": q,
-        "results": results,
-        "total_found": total_found,
-        "search_types": list(search_types),
-        "counts": {
-            "papers": len(results["papers"]),
-            "collections": len(results["collections"]),
-            "notes": len(results["notes"]),
-            "reports": len(results["reports"]),
-            "analyses": len(results["analyses"])
-        },
-        "debug": debug_info  # TEMPORARY: Remove after debugging
-    }
+    return results
 
 
 def _extract_highlight(text: str, query: str, context_length: int = 100) -> str:
@@ -9770,6 +9881,22 @@ async def enrich_article_with_citations(pmid: str, db: Session) -> bool:
             db.add(article)
 
         db.commit()
+
+        # Keep the in-memory citation index in step with the stored lists
+        try:
+            from services.citation_graph_index import get_citation_graph_index
+            get_citation_graph_index().update_article(pmid, references_pmids, cited_by_pmids)
+        except Exception as e:
+            print(f"⚠️ Failed to update citation graph index for {pmid}: {e}")
+
+        # Patch cached network graphs that contain this article
+        try:
+            from services.network_graph_cache import get_network_graph_cache
+            get_network_graph_cache().refresh_article(db, pmid)
+        except Exception as e:
+            print(f"⚠️ Failed to patch network graph cache for {pmid}: {e}")
+            db.rollback()
+
         return True
 
     except Exception as e:
@@ -9811,133 +9938,41 @@ def build_network_graph(articles: list, source_type: str = "unknown") -> dict:
     Build a network graph from a list of articles with citation relationships
 
     Args:
-        articles: List of Article objects or article dictionaries
+        articles: List of Article objects, Row tuples or article dictionaries
         source_type: Type of source ('project', 'report', 'collection')
 
     Returns:
         Dictionary with nodes, edges, and metadata
     """
     try:
+        from services.network_graph_cache import (
+            graph_article_fields, build_graph_node, build_reference_edge, compute_graph_metadata
+        )
+
         nodes = []
         edges = []
-        pmid_to_article = {}
+        article_fields = []
 
         # Create nodes from articles
         for article in articles:
-            # Handle both Article objects and dictionaries
-            if hasattr(article, 'pmid'):
-                pmid = article.pmid
-                title = article.title
-                authors = article.authors if isinstance(article.authors, list) else []
-                journal = article.journal or ""
-                year = article.publication_year or 0
-                citation_count = article.citation_count or 0
-                cited_by = article.cited_by_pmids if isinstance(article.cited_by_pmids, list) else []
-                references = article.references_pmids if isinstance(article.references_pmids, list) else []
-            else:
-                pmid = article.get('pmid', '')
-                title = article.get('title', '')
-                authors = article.get('authors', [])
-                if isinstance(authors, str):
-                    authors = [authors]
-                journal = article.get('journal', '')
-                year = article.get('pub_year', 0) or article.get('publication_year', 0)
-                citation_count = article.get('citation_count', 0)
-                cited_by = article.get('cited_by_pmids', [])
-                references = article.get('references_pmids', [])
-
-            if not pmid:
+            fields = graph_article_fields(article)
+            if not fields["pmid"]:
                 continue
-
-            pmid_to_article[pmid] = article
-
-            # Calculate node size based on citation count (min 20, max 100)
-            node_size = min(100, max(20, 20 + (citation_count * 2)))
-
-            # Determine node color based on publication year
-            current_year = 2024
-            if year >= current_year - 2:
-                color = "#4CAF50"  # Green for recent papers
-            elif year >= current_year - 5:
-                color = "#2196F3"  # Blue for moderately recent
-            elif year >= current_year - 10:
-                color = "#FF9800"  # Orange for older papers
-            else:
-                color = "#9E9E9E"  # Gray for very old papers
-
-            node = {
-                "id": pmid,
-                "label": title[:60] + "..." if len(title) > 60 else title,
-                "size": node_size,
-                "color": color,
-                "metadata": {
-                    "pmid": pmid,
-                    "title": title,
-                    "authors": authors,
-                    "journal": journal,
-                    "year": year,
-                    "citation_count": citation_count,
-                    "url": f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/"
-                }
-            }
-            nodes.append(node)
-
-        # Create edges from citation relationships
-        article_pmids = set(pmid_to_article.keys())
-
-        for article in articles:
-            if hasattr(article, 'pmid'):
-                source_pmid = article.pmid
-                references = article.references_pmids if isinstance(article.references_pmids, list) else []
-            else:
-                source_pmid = article.get('pmid', '')
-                references = article.get('references_pmids', [])
-
-            if not source_pmid or not references:
-                continue
-
-            # Create edges for references that are also in our article set
-            for ref_pmid in references:
+            article_fields.append(fields)
+            nodes.append(build_graph_node(fields))
+
+        # Create edges for references that are also in our article set
+        article_pmids = {fields["pmid"] for fields in article_fields}
+        for fields in article_fields:
+            source_pmid = fields["pmid"]
+            for ref_pmid in fields["references"]:
                 if ref_pmid in article_pmids and ref_pmid != source_pmid:
-                    edge = {
-                        "id": f"{source_pmid}->{ref_pmid}",
-                        "from": source_pmid,
-                        "to": ref_pmid,
-                        "arrows": "to",
-                        "color": "#666666",
-                        "width": 1,
-                        "relationship": "references"
-                    }
-                    edges.append(edge)
-
-        # Calculate network statistics
-        total_nodes = len(nodes)
-        total_edges = len(edges)
-        avg_citations = sum(node["metadata"]["citation_count"] for node in nodes) / total_nodes if total_nodes > 0 else 0
-
-        # Find most cited paper
-        most_cited = max(nodes, key=lambda n: n["metadata"]["citation_count"]) if nodes else None
-
-        metadata = {
-            "source_type": source_type,
-            "total_nodes": total_nodes,
-            "total_edges": total_edges,
-            "avg_citations": round(avg_citations, 2),
-            "most_cited": {
-                "pmid": most_cited["metadata"]["pmid"],
-                "title": most_cited["metadata"]["title"],
-                "citations": most_cited["metadata"]["citation_count"]
-            } if most_cited else None,
-            "year_range": {
-                "min": min(node["metadata"]["year"] for node in nodes if node["metadata"]["year"] > 0) if nodes else None,
-                "max": max(node["metadata"]["year"] for node in nodes if node["metadata"]["year"] > 0) if nodes else None
-            }
-        }
+                    edges.append(build_reference_edge(source_pmid, ref_pmid))
 
         return {
             "nodes": nodes,
             "edges": edges,
-            "metadata": metadata
+            "metadata": compute_graph_metadata(nodes, edges, source_type)
         }
 
     except Exception as e:
@@ -9948,7 +9983,7 @@ def build_network_graph(articles: list, source_type: str = "unknown") -> dict:
             "metadata": {"error": str(e)}
         }
 
-async def get_or_create_network_graph(source_type: str, source_id: str, db: Session) -> dict:
+async def get_or_create_network_graph(source_type: str, source_id: str, db: Session, since: Optional[int] = None) -> dict:
     """
     Get cached network graph or create new one
 
@@ -9956,29 +9991,28 @@ async def get_or_create_network_graph(source_type: str, source_id: str, db: Sess
         source_type: 'project', 'report', or 'collection'
         source_id: ID of the source
         db: Database session
+        since: Graph version already held by the client; when set, only the
+            changes after that version are returned
 
     Returns:
-        Network graph data
+        Network graph data (or a delta against `since`)
     """
     try:
-        import uuid
-        from datetime import datetime, timedelta
+        from services.network_graph_cache import (
+            get_network_graph_cache, collection_article_dict,
+            project_article_pmids, report_article_pmids
+        )
+        from utils.article_profiles import query_article_rows
+
+        graph_cache = get_network_graph_cache()
 
         # Check for existing cached graph
-        cached_graph = db.query(NetworkGraph).filter(
-            NetworkGraph.source_type == source_type,
-            NetworkGraph.source_id == source_id,
-            NetworkGraph.is_active == True,
-            NetworkGraph.expires_at > datetime.now()
-        ).first()
+        cached_graph = graph_cache.get_active_graph(db, source_type, source_id)
 
         if cached_graph:
-            return {
-                "nodes": cached_graph.nodes,
-                "edges": cached_graph.edges,
-                "metadata": cached_graph.graph_metadata,
-                "cached": True
-            }
+            if since is not None:
+                return graph_cache.get_delta(cached_graph, since)
+            return graph_cache.full_payload(cached_graph)
 
         # Fetch articles based on source type
         articles = []
@@ -9989,24 +10023,11 @@ async def get_or_create_network_graph(source_type: str, source_id: str, db: Sess
             if not project:
                 return {"nodes": [], "edges": [], "metadata": {"error": "Project not found"}}
 
-            # Get PMIDs from reports
-            pmids = set()
-            for report in project.reports:
-                if report.results and isinstance(report.results, dict):
-                    for section in report.results.get("results", []):
-                        for article in section.get("articles", []):
-                            if article.get("pmid"):
-                                pmids.add(article["pmid"])
-
-            # Get PMIDs from collections
-            for collection in project.collections:
-                for article_collection in collection.article_collections:
-                    if article_collection.article_pmid:
-                        pmids.add(article_collection.article_pmid)
-
-            # Fetch Article objects
+            pmids = project_article_pmids(project)
+
+            # Fetch graph rows (node metadata + reference lists only)
             if pmids:
-                articles = db.query(Article).filter(Article.pmid.in_(pmids)).all()
+                articles = query_article_rows(db, "graph").filter(Article.pmid.in_(pmids)).all()
 
         elif source_type == "report":
             # Get articles from specific report
@@ -10014,15 +10035,10 @@ async def get_or_create_network_graph(source_type: str, source_id: str, db: Sess
             if not report:
                 return {"nodes": [], "edges": [], "metadata": {"error": "Report not found"}}
 
-            pmids = set()
-            if report.results and isinstance(report.results, dict):
-                for section in report.results.get("results", []):
-                    for article in section.get("articles", []):
-                        if article.get("pmid"):
-                            pmids.add(article["pmid"])
+            pmids = report_article_pmids(report)
 
             if pmids:
-                articles = db.query(Article).filter(Article.pmid.in_(pmids)).all()
+                articles = query_article_rows(db, "graph").filter(Article.pmid.in_(pmids)).all()
 
         elif source_type == "collection":
             # Get articles from specific collection
@@ -10031,47 +10047,19 @@ async def get_or_create_network_graph(source_type: str, source_id: str, db: Sess
                 return {"nodes": [], "edges": [], "metadata": {"error": "Collection not found"}}
 
             # For collections, work directly with ArticleCollection data since articles may not exist in main Article table
-            article_collections = collection.article_collections
-            articles = []
-
-            for ac in article_collections:
-                # Create Article-like objects from ArticleCollection data
-                article_dict = {
-                    'pmid': ac.article_pmid or f"collection_{ac.id}",
-                    'title': ac.article_title,
-                    'authors': ac.article_authors or [],
-                    'journal': ac.article_journal,
-                    'publication_year': ac.article_year,
-                    'citation_count': 0,  # Default for collection articles
-                    'cited_by_pmids': [],  # No citation data for collection articles
-                    'references_pmids': [],  # No citation data for collection articles
-                    'abstract': None,
-                    'doi': None,
-                    'relevance_score': 0.0,
-                    'centrality_score': 0.0,
-                    'cluster_id': None
-                }
-                articles.append(article_dict)
+            articles = [collection_article_dict(ac) for ac in collection.article_collections]
 
         # Build network graph
         graph_data = build_network_graph(articles, source_type)
 
-        # Cache the graph (expires in 24 hours)
-        graph_id = str(uuid.uuid4())
-        cached_graph = NetworkGraph(
-            graph_id=graph_id,
-            source_type=source_type,
-            source_id=source_id,
-            nodes=graph_data["nodes"],
-            edges=graph_data["edges"],
-            graph_metadata=graph_data["metadata"],
-            expires_at=datetime.now() + timedelta(hours=24)
-        )
-
-        db.add(cached_graph)
-        db.commit()
+        # Cache the graph (expires in 24 hours); later changes are patched in place
+        stored_graph = graph_cache.store_graph(db, source_type, source_id, graph_data)
 
+        graph_data["version"] = stored_graph.version
         graph_data["cached"] = False
+        if since is not None:
+            graph_data["since"] = since
+            graph_data["full"] = True
         return graph_data
 
     except Exception as e:
@@ -10634,6 +10622,14 @@ async def add_article_to_collection(
         db.commit()
         db.refresh(article_collection)
 
+        # Patch cached network graphs in place instead of waiting for expiry
+        try:
+            from services.network_graph_cache import get_network_graph_cache
+            get_network_graph_cache().on_collection_article_added(db, project_id, article_collection)
+        except Exception as e:
+            print(f"⚠️ Failed to patch network graph cache: {e}")
+            db.rollback()
+
         # Log activity
         await log_activity(
             project_id=project_id,
@@ -11006,6 +11002,14 @@ async def remove_article_from_collection(
         db.delete(article_collection)
         db.commit()
 
+        # Patch cached network graphs in place instead of waiting for expiry
+        try:
+            from services.network_graph_cache import get_network_graph_cache
+            get_network_graph_cache().on_collection_article_removed(db, project_id, article_collection)
+        except Exception as e:
+            print(f"⚠️ Failed to patch network graph cache: {e}")
+            db.rollback()
+
         # Log activity
         await log_activity(
             project_id=project_id,
@@ -11671,7 +11675,8 @@ def _oa_backfill_topup(objective: str, current: list[dict], minimum: int, deadli
                 continue
         merged = current + harvested
         norm = _normalize_candidates(merged)
-        ranked = _triage_rank(objective, norm, max_keep=max(minimum+4, minimum), molecule_tokens=[], preference="precision")
+        ranked = _triage_rank(objective, norm, max_keep=max(minimum+4, minimum), molecule_tokens=[], preference="precision",
+                              deadline=deadline)
         keep, seen = [], set()
         for a in ranked:
             key = f"{a.get('pmid') or ''}||{a.get('title') or ''}"
@@ -12736,7 +12741,7 @@ async def generate_review_internal(request: ReviewRequest, db: Session, current_
             log_event({"event": "v2_error_fallback_v1", "error": str(e)[:200]})
 
     # If DAG requested but graph unavailable, run V2 instead
-    if getattr(request, "dag_mode", False) and (StateGraph is None) and MULTISOURCE_ENABLED:
+    if getattr(request, "dag_mode", False) and not _HAS_LANGGRAPH and MULTISOURCE_ENABLED:
         try:
             v2 = await orchestrate_v2(request, memories)
             resp = {
@@ -12757,7 +12762,7 @@ async def generate_review_internal(request: ReviewRequest, db: Session, current_
             log_event({"event": "v2_error_dag_unavailable", "error": str(e)[:200]})
 
     # Optional: DAG orchestration path
-    if getattr(request, "dag_mode", False) and StateGraph is not None:
+    if getattr(request, "dag_mode", False) and _HAS_LANGGRAPH:
         try:
             # Build and run the DAG
             global _DAG_APP
@@ -14566,6 +14571,9 @@ async def create_collection_hypothesis(
 @app.get("/projects/{project_id}/network")
 async def get_project_network(
     project_id: str,
+    since: Optional[int] = Query(None, ge=0, description="Return only changes after this graph version"),
+    max_nodes: int = Query(300, ge=20, le=5000, description="Node budget; larger graphs are collapsed into community super-nodes"),
+    cluster: Optional[str] = Query(None, description="Community id to drill into"),
     user_id: str = Header(..., alias="User-ID"),
     db: Session = Depends(get_db)
 ):
@@ -14589,7 +14597,7 @@ async def get_project_network(
                 raise HTTPException(status_code=403, detail="Access denied")
 
         # Get or create network graph
-        graph_data = await get_or_create_network_graph("project", project_id, db)
+        graph_data = await get_or_create_network_graph("project", project_id, db, since=since)
 
         # Week 24: Enrich network with research context (triage scores, protocol status, hypothesis links)
         try:
@@ -14601,6 +14609,14 @@ async def get_project_network(
             # Don't fail the request if enrichment fails, just log it
             print(f"⚠️ Failed to enrich network with context: {e}")
 
+        # Server-side layout + level of detail (deltas are already bounded)
+        if since is None:
+            try:
+                from services.network_layout import apply_level_of_detail
+                graph_data = await apply_level_of_detail(db, "project", project_id, graph_data, max_nodes, cluster)
+            except Exception as e:
+                print(f"⚠️ Failed to apply network layout: {e}")
+
         # Log activity
         await log_activity(
             project_id, resolved_user_id,
@@ -14620,6 +14636,7 @@ async def get_project_network(
 @app.get("/reports/{report_id}/network")
 async def get_report_network(
     report_id: str,
+    since: Optional[int] = Query(None, ge=0, description="Return only changes after this graph version"),
     user_id: str = Header(..., alias="User-ID"),
     db: Session = Depends(get_db)
 ):
@@ -14644,7 +14661,7 @@ async def get_report_network(
                 raise HTTPException(status_code=403, detail="Access denied")
 
         # Get or create network graph
-        graph_data = await get_or_create_network_graph("report", report_id, db)
+        graph_data = await get_or_create_network_graph("report", report_id, db, since=since)
 
         # Log activity
         await log_activity(
@@ -14665,6 +14682,9 @@ async def get_report_network(
 @app.get("/collections/{collection_id}/network")
 async def get_collection_network(
     collection_id: str,
+    since: Optional[int] = Query(None, ge=0, description="Return only changes after this graph version"),
+    max_nodes: int = Query(300, ge=20, le=5000, description="Node budget; larger graphs are collapsed into community super-nodes"),
+    cluster: Optional[str] = Query(None, description="Community id to drill into"),
     user_id: str = Header(..., alias="User-ID"),
     db: Session = Depends(get_db)
 ):
@@ -14689,7 +14709,15 @@ async def get_collection_network(
                 raise HTTPException(status_code=403, detail="Access denied")
 
         # Get or create network graph
-        graph_data = await get_or_create_network_graph("collection", collection_id, db)
+        graph_data = await get_or_create_network_graph("collection", collection_id, db, since=since)
+
+        # Server-side layout + level of detail (deltas are already bounded)
+        if since is None:
+            try:
+                from services.network_layout import apply_level_of_detail
+                graph_data = await apply_level_of_detail(db, "collection", collection_id, graph_data, max_nodes, cluster)
+            except Exception as e:
+                print(f"⚠️ Failed to apply network layout: {e}")
 
         # Log activity
         await log_activity(
@@ -14727,9 +14755,13 @@ async def get_similar_articles(
     try:
         # Import similarity engine
         from services.similarity_engine import get_similarity_engine
+        from utils.article_profiles import article_load_options
+
+        # Candidate checks only need card columns, never abstracts or citation lists
+        card_query = db.query(Article).options(article_load_options("card"))
 
         # Get base article
-        base_article = db.query(Article).filter(Article.pmid == pmid).first()
+        base_article = card_query.filter(Article.pmid == pmid).first()
         if not base_article:
             raise HTTPException(status_code=404, detail=f"Article with PMID {pmid} not found")
 
@@ -14739,7 +14771,7 @@ async def get_similar_articles(
 
         # First try: Same journal
         if base_article.journal:
-            same_journal_candidates = db.query(Article).filter(
+            same_journal_candidates = card_query.filter(
                 Article.pmid != pmid,
                 Article.journal == base_article.journal
             ).limit(100).all()
@@ -14750,7 +14782,7 @@ async def get_similar_articles(
             journal_keywords = base_article.journal.split()[:2]  # First 2 words
             for keyword in journal_keywords:
                 if len(keyword) > 3:  # Skip short words
-                    similar_journal_candidates = db.query(Article).filter(
+                    similar_journal_candidates = card_query.filter(
                         Article.pmid != pmid,
                         Article.journal.ilike(f"%{keyword}%"),
                         Article.journal != base_article.journal  # Exclude already found
@@ -14759,7 +14791,7 @@ async def get_similar_articles(
 
         # Third try: Recent articles in any field if still not enough candidates
         if len(candidates) < 20:
-            recent_candidates = db.query(Article).filter(
+            recent_candidates = card_query.filter(
                 Article.pmid != pmid,
                 Article.publication_year >= 2020
             ).limit(100).all()
@@ -14767,7 +14799,7 @@ async def get_similar_articles(
 
         # Fourth try: Any articles if still not enough
         if len(candidates) < 10:
-            any_candidates = db.query(Article).filter(
+            any_candidates = card_query.filter(
                 Article.pmid != pmid
             ).limit(50).all()
             candidates.extend(any_candidates)
@@ -15041,6 +15073,11 @@ async def get_article_references(
                 "url": f"https://pubmed.ncbi.nlm.nih.gov/{article.pmid}/" if article.pmid else None
             })
 
+        # Related works without an article row are kept in citation_works
+        from services.citation_store import citation_work_dicts
+        found = {a["pmid"] for a in reference_articles}
+        reference_articles.extend(citation_work_dicts(db, [p for p in reference_pmids if p not in found]))
+
         return {
             "base_article": {
                 "pmid": base_article.pmid,
@@ -15064,10 +15101,90 @@ async def get_article_references(
         print(f"References fetch error: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to fetch references: {str(e)}")
 
+def _build_multi_hop_network(pmid: str, direction: str, depth: int, limit: int, db: Session) -> dict:
+    """
+    Build a multi-hop citation network from the in-memory CSR citation index
+
+    Hop expansion and edges come from the index; node metadata is fetched in
+    a single IN query, so there are no per-node or per-hop SQL round trips.
+    Blocking (the first call may load the index): run it in the threadpool.
+    """
+    from services.citation_graph_index import get_citation_graph_index
+    from utils.article_profiles import query_article_rows
+    import math
+
+    index = get_citation_graph_index()
+    index.ensure_loaded(db)
+
+    hops = index.k_hop(pmid, k=depth, direction=direction, max_nodes=limit * depth + 1)
+    rows = query_article_rows(db, "card").filter(Article.pmid.in_(list(hops) or [pmid])).all()
+    articles = {row.pmid: row for row in rows}
+    if pmid not in articles:
+        raise HTTPException(status_code=404, detail=f"Article with PMID {pmid} not found")
+
+    node_type = "reference_article" if direction == "references" else "citing_article"
+    nodes = []
+    ring_members: Dict[int, List[str]] = {}
+    for node_pmid, hop in sorted(hops.items(), key=lambda item: item[1]):
+        if node_pmid in articles:
+            ring_members.setdefault(hop, []).append(node_pmid)
+
+    for hop, members in ring_members.items():
+        for i, node_pmid in enumerate(members):
+            article = articles[node_pmid]
+            angle = (2 * math.pi * i) / len(members)
+            radius = 200 * hop
+            title = article.title or ""
+            nodes.append({
+                "id": node_pmid,
+                "type": "article",
+                "position": {"x": radius * math.cos(angle), "y": radius * math.sin(angle)},
+                "data": {
+                    "label": title[:50] + ("..." if len(title) > 50 else ""),
+                    "pmid": node_pmid,
+                    "title": title,
+                    "authors": article.authors or [],
+                    "journal": article.journal or "",
+                    "year": article.publication_year,
+                    "citation_count": article.citation_count or 0,
+                    "hop": hop,
+                    "node_type": "base_article" if hop == 0 else node_type
+                }
+            })
+
+    edges = []
+    for citing, cited in index.subgraph_edges(articles.keys()):
+        edges.append({
+            "id": f"{citing}-{cited}",
+            "source": citing,
+            "target": cited,
+            "type": "default",
+            "data": {"label": "cites", "relationship": "citation"},
+            "markerEnd": {"type": "arrowclosed", "color": "#9ca3af"}
+        })
+
+    years = [n["data"]["year"] for n in nodes if n["data"]["year"]]
+    return {
+        "nodes": nodes,
+        "edges": edges,
+        "metadata": {
+            "source_type": direction,
+            "base_pmid": pmid,
+            "depth": depth,
+            "total_nodes": len(nodes),
+            "total_edges": len(edges),
+            "avg_year": round(sum(years) / len(years)) if years else 0,
+            "year_range": {"min": min(years) if years else 0, "max": max(years) if years else 0},
+            "search_parameters": {"limit": limit, "depth": depth, "source": "citation_index"}
+        },
+        "cached": False
+    }
+
 @app.get("/articles/{pmid}/references-network")
 async def get_article_references_network(
     pmid: str,
     limit: int = Query(20, ge=1, le=50, description="Maximum number of references in network"),
+    depth: int = Query(1, ge=1, le=3, description="Number of citation hops to expand"),
     user_id: str = Header(..., alias="User-ID"),
     db: Session = Depends(get_db)
 ):
@@ -15077,6 +15194,9 @@ async def get_article_references_network(
     Returns React Flow compatible network data for Earlier Work Discovery visualization.
     """
     try:
+        if depth > 1:
+            return await run_in_threadpool(_build_multi_hop_network, pmid, "references", depth, limit, db)
+
         # Get references data
         references_data = await get_article_references(pmid, limit, user_id, db)
 
@@ -15264,6 +15384,11 @@ async def get_article_citations(
                 "url": f"https://pubmed.ncbi.nlm.nih.gov/{article.pmid}/" if article.pmid else None
             })
 
+        # Related works without an article row are kept in citation_works
+        from services.citation_store import citation_work_dicts
+        found = {a["pmid"] for a in citing_articles}
+        citing_articles.extend(citation_work_dicts(db, [p for p in citing_pmids if p not in found]))
+
         return {
             "base_article": {
                 "pmid": base_article.pmid,
@@ -15291,6 +15416,7 @@ async def get_article_citations(
 async def get_article_citations_network(
     pmid: str,
     limit: int = Query(20, ge=1, le=50, description="Maximum number of citations in network"),
+    depth: int = Query(1, ge=1, le=3, description="Number of citation hops to expand"),
     user_id: str = Header(..., alias="User-ID"),
     db: Session = Depends(get_db)
 ):
@@ -15300,6 +15426,9 @@ async def get_article_citations_network(
     Returns React Flow compatible network data for Later Work Discovery visualization.
     """
     try:
+        if depth > 1:
+            return await run_in_threadpool(_build_multi_hop_network, pmid, "citations", depth, limit, db)
+
         # Get citations data
         citations_data = await get_article_citations(pmid, limit, user_id, db)
 
@@ -16346,7 +16475,8 @@ async def analyze_paper(request: PaperAnalysisRequest):
         features = await semantic_analysis_service.analyze_paper(
             title=request.title,
             abstract=request.abstract,
-            full_text=request.full_text
+            full_text=request.full_text,
+            pmid=request.pmid
         )
 
         # Convert to response format
@@ -16405,7 +16535,8 @@ async def get_semantic_service_status():
                 "scibert_available": semantic_analysis_service.scibert_model is not None,
                 "sentence_transformer_available": semantic_analysis_service.sentence_transformer is not None,
                 "spacy_available": semantic_analysis_service.nlp is not None
-            }
+            },
+            "inference": semantic_analysis_service.get_inference_stats()
         }
 
         return status
@@ -17779,10 +17910,14 @@ async def mesh_health_check():
         # Test basic functionality
         test_suggestions = await mesh_service.get_suggestions("cancer", 1)
 
+        # The basic-terms fallback answers queries but covers only a handful of descriptors
+        fallback = mesh_service.using_fallback_vocabulary
         return {
-            "status": "healthy",
+            "status": "degraded" if fallback else "healthy",
             "service": "MeSH Autocomplete",
-            "mesh_terms_loaded": len(mesh_service.mesh_terms),
+            "vocabulary": "fallback" if fallback else mesh_service.vocabulary_path,
+            "mesh_terms_loaded": len(mesh_service.index.descriptors),
+            "entry_terms_loaded": mesh_service.index.term_count,
             "test_query_results": test_suggestions["total_suggestions"],
             "timestamp": datetime.now().isoformat()
         }
@@ -17813,6 +17948,10 @@ async def get_weekly_recommendations(
     - Trending in Your Field: Hot topics
     - Cross-pollination: Interdisciplinary discoveries
     - Citation Opportunities: Papers that could cite your work
+
+    Feeds are precomputed by the weekly feed scheduler; this reads the stored
+    feed. A stale feed (papers saved since) is served while a rebuild runs in
+    the background; a missing one is built once inline and stored.
     """
     try:
         # Get current user from headers (for auth)
@@ -17820,15 +17959,24 @@ async def get_weekly_recommendations(
 
         # Get recommendations service
         recommendations_service = get_spotify_recommendations_service()
+        feed_builder = get_weekly_feed_builder()
 
-        # Generate weekly recommendations
-        result = await recommendations_service.get_weekly_recommendations(
-            user_id=current_user,
-            project_id=project_id,
-            force_refresh=force_refresh
-        )
+        db_gen = get_db()
+        db = next(db_gen)
 
-        return result
+        try:
+            feed_user_id = await recommendations_service._resolve_user_id(current_user, db)
+
+            feed = None if force_refresh else feed_builder.get_feed(db, feed_user_id, project_id)
+            if feed is not None and feed_builder.is_current(feed):
+                if feed.status == "stale":
+                    feed_builder.schedule_refresh(feed_user_id, project_id)
+                return feed_builder.serve(feed)
+
+            # No feed for this week yet: generate and store it
+            return await feed_builder.build_feed(db, feed_user_id, project_id)
+        finally:
+            db.close()
 
     except Exception as e:
         logger.error(f"Error getting weekly recommendations: {e}")
@@ -148,7 +148,8 @@ async def health_check():
         return {
             "status": "healthy",
             "service": "MeSH Autocomplete",
-            "mesh_terms_loaded": len(mesh_service.mesh_terms),
+            "mesh_terms_loaded": len(mesh_service.index.descriptors),
+            "entry_terms_loaded": mesh_service.index.term_count,
             "test_query_results": test_suggestions["total_suggestions"],
             "timestamp": "2024-01-15T10:00:00Z"
         }
@@ -39,5 +39,9 @@ echo "✅ All migrations completed successfully!"
 
 # Start the FastAPI server
 echo "🚀 Starting FastAPI server..."
+if [ "${MODEL_PRELOAD:-0}" = "1" ] || [ "${WEB_CONCURRENCY:-1}" -gt 1 ]; then
+    # Multiple workers (models preloaded in the master with MODEL_PRELOAD=1)
+    exec gunicorn -c gunicorn.conf.py main:app
+fi
 exec python -m uvicorn main:app --host 0.0.0.0 --port ${PORT:-8080}
 
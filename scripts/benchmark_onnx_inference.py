@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Benchmark the int8 ONNX Runtime backend against the PyTorch models.
+
+For the sentence embedding model, the reranking cross-encoder and the NLI
+cross-encoder, loads both backends and runs them on the same fixed corpus
+(seeded synthetic biomedical sentences), reporting load time, resident memory
+added by the model, single-request latency (p50 / p95), batch throughput and
+score drift of ONNX against PyTorch:
+
+- embeddings: cosine similarity of the two backends' vectors (mean / min)
+- reranker: max absolute score difference and Spearman rank correlation
+- NLI: argmax label agreement and max absolute logit difference
+
+The first run exports the models into ONNX_CACHE_DIR (not included in the
+load time). Requires sentence-transformers, optimum[onnxruntime].
+
+    python scripts/benchmark_onnx_inference.py --corpus 512 --batch 32
+    python scripts/benchmark_onnx_inference.py --models embeddings --json results.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services import onnx_inference
+
+MODELS = {
+    "embeddings": os.getenv("EMBED_MODEL", "sentence-transformers/all-MiniLM-L6-v2"),
+    "reranker": os.getenv("CROSS_ENCODER_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2"),
+    "nli": os.getenv("NLI_CROSS_ENCODER_MODEL", "cross-encoder/nli-deberta-v3-base"),
+}
+
+SUBJECTS = ["Metformin", "CRISPR screening", "Tau aggregation", "Gut microbiota", "PD-1 blockade",
+            "Statin therapy", "Single-cell RNA sequencing", "Deep brain stimulation", "mTOR inhibition",
+            "Exercise training", "Vitamin D supplementation", "Fecal transplantation"]
+EFFECTS = ["reduces", "increases", "does not change", "is associated with", "predicts", "modulates"]
+OUTCOMES = ["all-cause mortality", "tumour growth", "insulin resistance", "cognitive decline",
+            "inflammatory markers", "hospital readmission", "neuronal survival", "bone density"]
+SETTINGS = ["in a randomized controlled trial", "in a prospective cohort", "in mouse models",
+            "in a meta-analysis of 40 studies", "in patient-derived organoids", "in a retrospective analysis"]
+
+
+def corpus(n, seed=13):
+    rng = random.Random(seed)
+    return [f"{rng.choice(SUBJECTS)} {rng.choice(EFFECTS)} {rng.choice(OUTCOMES)} {rng.choice(SETTINGS)}."
+            for _ in range(n)]
+
+
+def pairs(texts, seed=17):
+    rng = random.Random(seed)
+    return [(text, rng.choice(texts)) for text in texts]
+
+
+def rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def load(kind, backend, name):
+    if backend == "onnx":
+        loader = onnx_inference.OnnxSentenceEncoder if kind == "embeddings" else onnx_inference.OnnxCrossEncoder
+        task = onnx_inference.FEATURE_EXTRACTION if kind == "embeddings" else onnx_inference.SEQUENCE_CLASSIFICATION
+        onnx_inference.export_model(name, task)  # export outside the timed load
+        return lambda: loader.load(name)
+    from sentence_transformers import CrossEncoder, SentenceTransformer
+    return lambda: SentenceTransformer(name, device="cpu") if kind == "embeddings" else CrossEncoder(name, device="cpu")
+
+
+def run(kind, model, inputs, batch_size):
+    if kind == "embeddings":
+        return np.asarray(model.encode(inputs, batch_size=batch_size, show_progress_bar=False))
+    return np.asarray(model.predict(inputs, batch_size=batch_size, show_progress_bar=False))
+
+
+def measure(kind, backend, name, inputs, batch_size, single_requests):
+    gc.collect()
+    before = rss_mb()
+    start = time.perf_counter()
+    model = load(kind, backend, name)()
+    load_s = time.perf_counter() - start
+    memory = rss_mb() - before
+
+    run(kind, model, inputs[:batch_size], batch_size)  # warm-up
+    latencies = []
+    for item in inputs[:single_requests]:
+        start = time.perf_counter()
+        run(kind, model, [item], 1)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    outputs = run(kind, model, inputs, batch_size)
+    batch_s = time.perf_counter() - start
+
+    del model
+    gc.collect()
+    return {
+        "load_s": round(load_s, 2),
+        "memory_mb": round(memory, 1),
+        "p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 2),
+        "p95_ms": round(float(np.percentile(latencies, 95)) * 1000, 2),
+        "throughput_per_s": round(len(inputs) / batch_s, 1),
+    }, outputs
+
+
+def ranks(values):
+    order = np.argsort(values)
+    result = np.empty(len(values))
+    result[order] = np.arange(len(values))
+    return result
+
+
+def drift(kind, reference, candidate):
+    if kind == "embeddings":
+        norms = np.linalg.norm(reference, axis=1) * np.linalg.norm(candidate, axis=1)
+        cosine = (reference * candidate).sum(axis=1) / np.clip(norms, 1e-12, None)
+        return {"cosine_mean": round(float(cosine.mean()), 5), "cosine_min": round(float(cosine.min()), 5)}
+    if reference.ndim == 2:
+        return {"label_agreement": round(float((reference.argmax(1) == candidate.argmax(1)).mean()), 4),
+                "max_abs_diff": round(float(np.abs(reference - candidate).max()), 4)}
+    spearman = np.corrcoef(ranks(reference), ranks(candidate))[0, 1]
+    return {"max_abs_diff": round(float(np.abs(reference - candidate).max()), 4),
+            "spearman": round(float(spearman), 5)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--corpus", type=int, default=512, help="texts (or text pairs) per model")
+    parser.add_argument("--batch", type=int, default=32)
+    parser.add_argument("--single", type=int, default=50, help="single-request latency samples")
+    parser.add_argument("--models", nargs="+", choices=list(MODELS), default=list(MODELS))
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    texts = corpus(args.corpus)
+    results = {}
+    print(f"📊 {args.corpus} inputs, batch {args.batch}, "
+          f"quantization {onnx_inference.quantization_mode()}, cache {onnx_inference.cache_dir()}")
+    for kind in args.models:
+        name = MODELS[kind]
+        inputs = texts if kind == "embeddings" else pairs(texts)
+        torch_stats, torch_out = measure(kind, "torch", name, inputs, args.batch, args.single)
+        onnx_stats, onnx_out = measure(kind, "onnx", name, inputs, args.batch, args.single)
+        results[kind] = {"model": name, "torch": torch_stats, "onnx": onnx_stats,
+                         "drift": drift(kind, torch_out, onnx_out)}
+
+        print(f"\n{kind}: {name}")
+        print(f"   {'':8}{'load s':>9}{'mem MB':>9}{'p50 ms':>9}{'p95 ms':>9}{'items/s':>10}")
+        for backend, stats in (("torch", torch_stats), ("onnx", onnx_stats)):
+            print(f"   {backend:8}{stats['load_s']:9.2f}{stats['memory_mb']:9.1f}{stats['p50_ms']:9.2f}"
+                  f"{stats['p95_ms']:9.2f}{stats['throughput_per_s']:10.1f}")
+        print(f"   speedup {onnx_stats['throughput_per_s'] / max(torch_stats['throughput_per_s'], 1e-9):.2f}x, "
+              f"drift {results[kind]['drift']}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
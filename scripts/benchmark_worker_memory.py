@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-worker memory and throughput with and without model preloading.
+
+For each worker count (default 2, 4, 8) and mode (preload: MODEL_PRELOAD=1,
+models loaded in the gunicorn master and shared copy-on-write; fork: every
+worker loads its own models), starts `gunicorn -c gunicorn.conf.py main:app`,
+waits for /health/ready, and reports
+
+- per-worker RSS, PSS (shared pages split between the processes mapping them)
+  and USS (private pages), from /proc/<pid>/smaps_rollup, after warm-up and
+  again after the load test (copy-on-write pages touched by inference show up
+  as USS growth)
+- total PSS of master + workers, the memory the node actually pays
+- throughput and p50 / p95 latency of POST /api/semantic/analyze-paper at the
+  given client concurrency
+
+Linux only (/proc). Run from the repository root with the app's environment:
+
+    python scripts/benchmark_worker_memory.py --workers 2 4 8 --duration 30 --concurrency 16
+"""
+
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+import requests
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+PAPER = {
+    "title": "Metformin reduces tumour growth in patient-derived organoids",
+    "abstract": ("We performed a randomized controlled trial and a computational analysis of gene expression "
+                 "in patient-derived organoids. Metformin treatment significantly reduced tumour growth and "
+                 "modulated mTOR signalling, suggesting a novel therapeutic approach."),
+}
+
+
+def memory_kb(pid):
+    """(rss, pss, uss) in kB"""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                values[parts[0].rstrip(":")] = int(parts[1])
+    return (values.get("Rss", 0), values.get("Pss", 0),
+            values.get("Private_Clean", 0) + values.get("Private_Dirty", 0))
+
+
+def children(pid):
+    found = []
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    if int(f.read().rsplit(")", 1)[1].split()[1]) == pid:
+                        found.append(int(entry))
+            except (OSError, IndexError, ValueError):
+                continue
+    return found
+
+
+def wait_ready(base, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(f"{base}/health/ready", timeout=2).status_code == 200:
+                return True
+        except requests.RequestException:
+            pass
+        time.sleep(1)
+    return False
+
+
+def snapshot(master):
+    workers = children(master)
+    per_worker = [memory_kb(pid) for pid in workers]
+    master_pss = memory_kb(master)[1]
+    mb = lambda kb: round(kb / 1024, 1)
+    n = max(len(per_worker), 1)
+    return {
+        "workers": len(workers),
+        "rss_mb": mb(sum(m[0] for m in per_worker) / n),
+        "pss_mb": mb(sum(m[1] for m in per_worker) / n),
+        "uss_mb": mb(sum(m[2] for m in per_worker) / n),
+        "total_pss_mb": mb(master_pss + sum(m[1] for m in per_worker)),
+    }
+
+
+def load_test(base, duration, concurrency):
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    stop = time.time() + duration
+
+    def client():
+        session = requests.Session()
+        while time.time() < stop:
+            started = time.perf_counter()
+            try:
+                ok = session.post(f"{base}/api/semantic/analyze-paper", json=PAPER, timeout=60).status_code == 200
+            except requests.RequestException:
+                ok = False
+            with lock:
+                if ok:
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    errors[0] += 1
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    latencies.sort()
+    pick = lambda q: round(latencies[int(q * (len(latencies) - 1))] * 1000, 1) if latencies else None
+    return {"requests_per_s": round(len(latencies) / duration, 1), "p50_ms": pick(0.5), "p95_ms": pick(0.95),
+            "errors": errors[0]}
+
+
+def run(workers, mode, args):
+    port = args.port
+    env = {**os.environ, "WEB_CONCURRENCY": str(workers), "PORT": str(port),
+           "MODEL_PRELOAD": "1" if mode == "preload" else "0"}
+    server = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "main:app"],
+                              cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base = f"http://127.0.0.1:{port}"
+    try:
+        if not wait_ready(base, args.ready_timeout):
+            return {"error": "not ready"}
+        while len(children(server.pid)) < workers:
+            time.sleep(0.5)
+        result = {"idle": snapshot(server.pid)}
+        result["load"] = load_test(base, args.duration, args.concurrency)
+        result["after_load"] = snapshot(server.pid)
+        return result
+    finally:
+        server.send_signal(signal.SIGTERM)
+        try:
+            server.wait(timeout=60)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, 8])
+    parser.add_argument("--modes", nargs="+", choices=["fork", "preload"], default=["fork", "preload"])
+    parser.add_argument("--duration", type=float, default=30, help="load test seconds")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent clients")
+    parser.add_argument("--port", type=int, default=18080)
+    parser.add_argument("--ready-timeout", type=float, default=600)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'workers':>7} {'mode':>8} {'RSS/w':>8} {'PSS/w':>8} {'USS/w':>8} {'PSS tot':>9} "
+          f"{'USS/w*':>8} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8}")
+    for workers in args.workers:
+        for mode in args.modes:
+            result = results[f"{workers}-{mode}"] = run(workers, mode, args)
+            if "error" in result:
+                print(f"{workers:>7} {mode:>8}  {result['error']}")
+                continue
+            idle, load, after = result["idle"], result["load"], result["after_load"]
+            print(f"{workers:>7} {mode:>8} {idle['rss_mb']:8.1f} {idle['pss_mb']:8.1f} {idle['uss_mb']:8.1f} "
+                  f"{idle['total_pss_mb']:9.1f} {after['uss_mb']:8.1f} {load['requests_per_s']:7.1f} "
+                  f"{load['p50_ms'] or 0:8.1f} {load['p95_ms'] or 0:8.1f}")
+    print("(MB per worker after warm-up; USS/w* after the load test)")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Build the compact MeSH vocabulary file used by the autocomplete index.
+
+Reads the NLM descriptor XML (desc20XX.xml or .xml.gz from
+https://www.nlm.nih.gov/databases/download/mesh.html) and writes one TSV line
+per descriptor with its entry terms and a precomputed popularity score to
+data/mesh/mesh_descriptors.tsv.gz (the default MESH_VOCABULARY_PATH), which
+loads much faster than the XML.
+
+Popularity is log-scaled PubMed usage when --counts is given (TSV of
+mesh_id <tab> number of citations indexed with it), and the tree-depth /
+synonym-count heuristic of services.mesh_index.default_popularity otherwise.
+
+    python scripts/build_mesh_vocabulary.py desc2025.xml.gz --counts mesh_counts.tsv
+"""
+
+import argparse
+import math
+import os
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from services.mesh_index import MeshIndex, iter_descriptor_xml, write_descriptor_tsv  # noqa: E402
+
+
+def read_counts(path):
+    counts = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            parts = line.rstrip("\n").split("\t")
+            if len(parts) >= 2 and parts[1].isdigit():
+                counts[parts[0]] = int(parts[1])
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("xml", help="NLM descriptor XML (.xml or .xml.gz)")
+    parser.add_argument("--counts", help="TSV of mesh_id and PubMed citation count")
+    parser.add_argument("--out", default=os.path.join(ROOT, "data", "mesh", "mesh_descriptors.tsv.gz"))
+    args = parser.parse_args()
+
+    started = time.monotonic()
+    descriptors = list(iter_descriptor_xml(args.xml))
+    if args.counts:
+        counts = read_counts(args.counts)
+        top = math.log1p(max(counts.values(), default=1))
+        for d in descriptors:
+            d.popularity = math.log1p(counts.get(d.mesh_id, 0)) / top
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    write_descriptor_tsv(descriptors, args.out)
+    print(f"Wrote {len(descriptors)} descriptors to {args.out} in {time.monotonic() - started:.1f}s")
+
+    started = time.monotonic()
+    index = MeshIndex(descriptors)
+    print(f"Index: {index.term_count} terms, built in {time.monotonic() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
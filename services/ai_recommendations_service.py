@@ -22,10 +22,16 @@ from datetime import datetime, timedelta, timezone
 from collections import defaultdict, Counter
 import json
 import re
+import numpy as np
 import requests
 import xml.etree.ElementTree as ET
+from contextlib import contextmanager
+from contextvars import ContextVar
 
 from database import get_db, Article, Collection, Project, User, ArticleCollection
+from utils.article_profiles import query_article_rows
+from services.domain_candidate_pool import DomainCandidatePoolService, embed_texts, paper_text
+from services import recommendation_ranking as ranking
 from sqlalchemy.orm import Session
 from sqlalchemy import func, desc, and_, or_, text
 
@@ -49,6 +55,10 @@ except ImportError as e:
 
 logger = logging.getLogger(__name__)
 
+# PubMed results shared by the feeds of one batch (see pubmed_batch)
+_pubmed_batch_cache: ContextVar[Optional[Dict[Tuple[str, int, str], List[Dict[str, Any]]]]] = \
+    ContextVar("pubmed_batch_cache", default=None)
+
 class SpotifyInspiredRecommendationsService:
     """Spotify-inspired AI-powered paper recommendations and discovery service"""
 
@@ -86,6 +96,7 @@ class SpotifyInspiredRecommendationsService:
                 logger.error(f"❌ Failed to initialize AI agents: {e}")
                 self.ai_orchestrator = None
         self.user_behavior_cache = {}
+        self.candidate_pools = DomainCandidatePoolService(self._search_pubmed)  # Shared per-domain PubMed pools
         self.cache_ttl = timedelta(hours=6)  # Cache recommendations for 6 hours
         self.behavior_cache_ttl = timedelta(hours=1)  # Cache user behavior for 1 hour
 
@@ -864,7 +875,7 @@ class SpotifyInspiredRecommendationsService:
             # Get recent papers from the database (last 2 years)
             cutoff_date = datetime.now(timezone.utc).year - 2
 
-            query = db.query(Article).filter(
+            query = query_article_rows(db, "pool").filter(
                 Article.publication_year >= cutoff_date,
                 Article.citation_count.isnot(None)
             ).order_by(desc(Article.citation_count)).limit(200)
@@ -1600,20 +1611,6 @@ class SpotifyInspiredRecommendationsService:
                 primary_domains = ["medicine", "biology", "neuroscience", "genetics"]
                 logger.info(f"💡 Papers-for-You: Using personalized default domains: {primary_domains}")
 
-            # Enhanced domain keyword mapping for better personalization
-            domain_keywords = {
-                "nephrology": ["kidney", "renal", "dialysis", "creatinine", "nephrology"],
-                "diabetes": ["diabetic", "glucose", "insulin", "glycemic", "diabetes"],
-                "cardiovascular": ["heart", "cardiac", "hypertension", "blood pressure", "cardiovascular"],
-                "pharmacology": ["drug", "medication", "therapeutic", "treatment", "pharmacology"],
-                "machine learning": ["AI", "artificial intelligence", "algorithm", "neural", "machine learning"],
-                "oncology": ["cancer", "tumor", "chemotherapy", "malignant", "oncology"],
-                "neurology": ["brain", "neurological", "alzheimer", "neurology", "cognitive"],
-                "medicine": ["medical", "clinical", "patient", "treatment", "therapy"],
-                "biology": ["biological", "molecular", "cellular", "genetic", "protein"],
-                "chemistry": ["chemical", "compound", "synthesis", "molecular", "reaction"]
-            }
-
             # Track seen PMIDs to avoid duplicates within this method
             seen_pmids = set()
             # Also avoid PMIDs already used by other methods
@@ -1621,41 +1618,20 @@ class SpotifyInspiredRecommendationsService:
                 used_pmids = set()
             global_used_pmids = used_pmids.copy()
 
-            # 🚀 BACK TO PUBMED: Search PubMed for fresh, NEW papers you haven't seen
+            # 🚀 Rank each domain's shared PubMed pool (refreshed once per interval for all users)
             for domain in primary_domains[:3]:  # Top 3 domains
-                keywords = domain_keywords.get(domain.lower(), [domain])
-                logger.info(f"💡 Processing domain '{domain}' with keywords: {keywords}")
-
                 domain_papers = []
 
                 try:
-                    # Strategy 1: Recent papers (last 2 years) - most relevant and fresh
-                    recent_query = f"({' OR '.join(keywords[:3])}) AND (\"2023\"[Date - Publication]:\"2025\"[Date - Publication])"
-                    logger.info(f"💡 PubMed Query 1: {recent_query}")
-                    domain_papers = await self._search_pubmed(recent_query, max_results=8, sort="relevance")
-
-                    if domain_papers:
-                        logger.info(f"💡 Strategy 1 (Recent): Found {len(domain_papers)} recent papers for {domain}")
-                    else:
-                        # Strategy 2: Expand to last 3 years if needed
-                        expanded_query = f"({' OR '.join(keywords[:3])}) AND (\"2022\"[Date - Publication]:\"2025\"[Date - Publication])"
-                        logger.info(f"💡 PubMed Query 2: {expanded_query}")
-                        domain_papers = await self._search_pubmed(expanded_query, max_results=8, sort="relevance")
-
-                        if domain_papers:
-                            logger.info(f"💡 Strategy 2 (Expanded): Found {len(domain_papers)} papers for {domain}")
-                        else:
-                            # Strategy 3: Simple keyword search (no date restriction)
-                            simple_query = f"({' OR '.join(keywords[:2])})"
-                            logger.info(f"💡 PubMed Query 3: {simple_query}")
-                            domain_papers = await self._search_pubmed(simple_query, max_results=6, sort="relevance")
-                            logger.info(f"💡 Strategy 3 (Simple): Found {len(domain_papers)} papers for {domain}")
-
+                    pool = await self.candidate_pools.get_pool(domain, "recent", db)
+                    for paper, score in self.candidate_pools.rank(pool, user_profile, exclude=global_used_pmids, limit=8):
+                        paper["relevance_score"] = score
+                        domain_papers.append(paper)
                 except Exception as e:
-                    logger.error(f"❌ PubMed search failed for domain {domain}: {e}")
+                    logger.error(f"❌ Candidate pool ranking failed for domain {domain}: {e}")
                     domain_papers = []
 
-                logger.info(f"💡 Final result: {len(domain_papers)} NEW papers from PubMed for domain '{domain}'")
+                logger.info(f"💡 Final result: {len(domain_papers)} ranked papers from the '{domain}' pool")
 
                 # Process found papers (with deduplication) - PubMed dictionaries
                 for paper in domain_papers:
@@ -1808,20 +1784,6 @@ class SpotifyInspiredRecommendationsService:
                 primary_domains = ["artificial intelligence", "immunology", "cancer research", "climate science"]
                 logger.info(f"🔥 Trending: Using hot topic domains: {primary_domains}")
 
-            # Enhanced domain keyword mapping for better search
-            domain_keywords = {
-                "nephrology": ["kidney", "renal", "dialysis", "creatinine", "nephrology"],
-                "diabetes": ["diabetic", "glucose", "insulin", "glycemic", "diabetes"],
-                "cardiovascular": ["heart", "cardiac", "hypertension", "blood pressure", "cardiovascular"],
-                "pharmacology": ["drug", "medication", "therapeutic", "treatment", "pharmacology"],
-                "machine learning": ["AI", "artificial intelligence", "algorithm", "neural", "machine learning"],
-                "oncology": ["cancer", "tumor", "chemotherapy", "malignant", "oncology"],
-                "neurology": ["brain", "neurological", "alzheimer", "neurology", "cognitive"],
-                "medicine": ["medical", "clinical", "patient", "treatment", "therapy"],
-                "biology": ["biological", "molecular", "cellular", "genetic", "protein"],
-                "chemistry": ["chemical", "compound", "synthesis", "molecular", "reaction"]
-            }
-
             # Track seen PMIDs to avoid duplicates within this method
             seen_pmids = set()
             # Also avoid PMIDs already used by other methods
@@ -1831,41 +1793,22 @@ class SpotifyInspiredRecommendationsService:
 
             logger.info(f"🔥 Trending: Starting with {len(global_used_pmids)} used PMIDs: {list(global_used_pmids)[:5]}{'...' if len(global_used_pmids) > 5 else ''}")
 
-            # 🚀 PUBMED APPROACH: Search PubMed for trending papers in user's research fields
+            # 🚀 Rank each domain's shared trending pool by citation velocity, recency and fit
             for domain in primary_domains[:3]:  # Top 3 domains
                 trending_papers = []
-                keywords = domain_keywords.get(domain.lower(), [domain])
-
-                logger.info(f"🔥 Processing domain '{domain}' with keywords: {keywords}")
 
                 try:
-                    # Strategy 1: Very recent papers (last 1 year) - most trending
-                    recent_query = f"({' OR '.join(keywords[:3])}) AND (\"2024\"[Date - Publication]:\"2025\"[Date - Publication])"
-                    logger.info(f"🔥 PubMed Query 1: {recent_query}")
-                    trending_papers = await self._search_pubmed(recent_query, max_results=8, sort="date")
-
-                    if trending_papers:
-                        logger.info(f"🔥 Strategy 1 (Very Recent): Found {len(trending_papers)} trending papers for {domain}")
-                    else:
-                        # Strategy 2: Last 2 years if very recent has no results
-                        expanded_query = f"({' OR '.join(keywords[:3])}) AND (\"2023\"[Date - Publication]:\"2025\"[Date - Publication])"
-                        logger.info(f"🔥 PubMed Query 2: {expanded_query}")
-                        trending_papers = await self._search_pubmed(expanded_query, max_results=8, sort="date")
-
-                        if trending_papers:
-                            logger.info(f"🔥 Strategy 2 (Recent): Found {len(trending_papers)} papers for {domain}")
-                        else:
-                            # Strategy 3: Any recent papers in domain
-                            general_query = f"({' OR '.join(keywords[:2])}) AND (\"2022\"[Date - Publication]:\"2025\"[Date - Publication])"
-                            logger.info(f"🔥 PubMed Query 3: {general_query}")
-                            trending_papers = await self._search_pubmed(general_query, max_results=6, sort="date")
-                            logger.info(f"🔥 Strategy 3 (General Recent): Found {len(trending_papers)} papers for {domain}")
-
+                    pool = await self.candidate_pools.get_pool(domain, "trending", db)
+                    ranked = self.candidate_pools.rank(pool, user_profile, exclude=global_used_pmids,
+                                                       limit=8, weights=(0.2, 0.5, 0.3))
+                    for paper, score in ranked:
+                        paper["trending_score"] = score
+                        trending_papers.append(paper)
                 except Exception as e:
-                    logger.error(f"❌ PubMed search failed for trending domain {domain}: {e}")
+                    logger.error(f"❌ Trending pool ranking failed for domain {domain}: {e}")
                     trending_papers = []
 
-                logger.info(f"🔥 Final result: {len(trending_papers)} NEW trending papers from PubMed for domain '{domain}'")
+                logger.info(f"🔥 Final result: {len(trending_papers)} ranked trending papers from the '{domain}' pool")
 
                 # Process found papers (with deduplication) - PubMed dictionaries
                 for paper in trending_papers:
@@ -2098,17 +2041,16 @@ class SpotifyInspiredRecommendationsService:
                         ).order_by(desc(Article.citation_count)).limit(2).all()
                         logger.info(f"🔬 Strategy 4 (high-quality papers): Found {len(cross_papers)} papers")
 
-                    for paper in cross_papers:
-                        # Skip if we've already seen this paper OR if it's used by other methods
-                        if paper.pmid in seen_pmids or paper.pmid in global_used_pmids:
+                    cross_papers = [p for p in cross_papers if p.pmid not in seen_pmids and p.pmid not in global_used_pmids]
+                    cross_scores = self._interdisciplinary_scores(cross_papers, primary_domain, adjacent_field)
+
+                    for paper, cross_pollination_score in zip(cross_papers, cross_scores):
+                        # Skip papers repeated within this batch
+                        if paper.pmid in seen_pmids:
                             continue
 
                         seen_pmids.add(paper.pmid)
 
-                        cross_pollination_score = self._calculate_interdisciplinary_score(
-                            paper, primary_domain, adjacent_field
-                        )
-
                         recommendations.append({
                             "pmid": paper.pmid,
                             "title": paper.title,
@@ -2230,17 +2172,17 @@ class SpotifyInspiredRecommendationsService:
                         ~Article.title.like("Reference Article%")
                     ).order_by(desc(Article.publication_year), desc(Article.citation_count)).limit(15).all()
 
+                fresh_papers = []
                 for paper in recent_papers:
                     # Skip if we've already seen this paper OR if it's used by other methods
                     if paper.pmid in seen_pmids or paper.pmid in global_used_pmids:
                         logger.info(f"💡 Citation Opportunities: Skipping duplicate PMID {paper.pmid} (seen: {paper.pmid in seen_pmids}, global: {paper.pmid in global_used_pmids})")
                         continue
-
                     seen_pmids.add(paper.pmid)
-                    citation_opportunity_score = self._calculate_citation_opportunity_score(
-                        paper, user_profile
-                    )
+                    fresh_papers.append(paper)
 
+                opportunity_scores = self._citation_opportunity_scores(fresh_papers, user_profile)
+                for paper, citation_opportunity_score in zip(fresh_papers, opportunity_scores):
                     recommendations.append({
                         "pmid": paper.pmid,
                         "title": paper.title,
@@ -2313,99 +2255,45 @@ class SpotifyInspiredRecommendationsService:
     
     def _calculate_personalized_relevance(self, paper: Article, user_profile: Dict) -> float:
         """Calculate personalized relevance score for a paper"""
-        try:
-            score = 0.0
-
-            # Base score from citation count
-            score += min((paper.citation_count or 0) / 100, 0.3)
-
-            # Recency bonus
-            years_old = datetime.now(timezone.utc).year - (paper.publication_year or datetime.now(timezone.utc).year)
-            recency_score = max(0, (5 - years_old) / 5) * 0.2
-            score += recency_score
-
-            # Domain relevance
-            primary_domains = user_profile.get("primary_domains", [])
-            title_lower = (paper.title or "").lower()
-
-            for domain in primary_domains[:3]:
-                if domain.lower() in title_lower:
-                    score += 0.3
-                    break
-
-            # Activity level adjustment
-            activity_level = user_profile.get("activity_level", "moderate")
-            if activity_level == "high":
-                score += 0.1
-            elif activity_level == "low":
-                score -= 0.1
-
-            return min(score, 1.0)
-
-        except Exception as e:
-            logger.error(f"Error calculating personalized relevance: {e}")
-            return 0.5
+        return self._personalized_relevance_scores([paper], user_profile)[0]
 
     # Additional helper methods
     def _calculate_interdisciplinary_score(self, paper: Article, domain1: str, domain2: str) -> float:
         """Calculate interdisciplinary relevance score"""
-        try:
-            title_lower = (paper.title or "").lower()
-            abstract_lower = (paper.abstract or "").lower()
+        return self._interdisciplinary_scores([paper], domain1, domain2)[0]
 
-            # Check presence of both domains
-            domain1_present = domain1.lower() in title_lower or domain1.lower() in abstract_lower
-            domain2_present = domain2.lower() in title_lower or domain2.lower() in abstract_lower
-
-            if domain1_present and domain2_present:
-                base_score = 0.8
-            elif domain1_present or domain2_present:
-                base_score = 0.4
-            else:
-                base_score = 0.1
-
-            # Citation bonus
-            citation_bonus = min((paper.citation_count or 0) / 50, 0.2)
+    def _calculate_citation_opportunity_score(self, paper: Article, user_profile: Dict) -> float:
+        """Calculate citation opportunity score"""
+        return self._citation_opportunity_scores([paper], user_profile)[0]
 
-            return min(base_score + citation_bonus, 1.0)
+    def _personalized_relevance_scores(self, papers: List, user_profile: Dict) -> List[float]:
+        """Personalized relevance for a batch of papers, scored in one pass"""
+        try:
+            candidates = ranking.build_candidate_matrix(papers, user_profile.get("primary_domains", [])[:3])
+            users = ranking.build_profile_matrix(candidates, [user_profile])
+            return ranking.personalized_relevance(candidates, users)[0].tolist()
+        except Exception as e:
+            logger.error(f"Error calculating personalized relevance: {e}")
+            return [0.5] * len(papers)
 
+    def _interdisciplinary_scores(self, papers: List, domain1: str, domain2: str) -> List[float]:
+        """Interdisciplinary relevance for a batch of papers, scored in one pass"""
+        try:
+            candidates = ranking.build_candidate_matrix(papers, [domain1, domain2])
+            return ranking.interdisciplinary(candidates, domain1, domain2).tolist()
         except Exception as e:
             logger.error(f"Error calculating interdisciplinary score: {e}")
-            return 0.3
+            return [0.3] * len(papers)
 
-    def _calculate_citation_opportunity_score(self, paper: Article, user_profile: Dict) -> float:
-        """Calculate citation opportunity score"""
+    def _citation_opportunity_scores(self, papers: List, user_profile: Dict) -> List[float]:
+        """Citation opportunity for a batch of papers, scored in one pass"""
         try:
-            score = 0.0
-
-            # Recency is key for citation opportunities
-            years_old = datetime.now(timezone.utc).year - (paper.publication_year or datetime.now(timezone.utc).year)
-            if years_old == 0:  # Current year
-                score += 0.5
-            elif years_old == 1:  # Last year
-                score += 0.3
-
-            # Low citation count means opportunity
-            citation_count = paper.citation_count or 0
-            if citation_count < 5:
-                score += 0.3
-            elif citation_count < 15:
-                score += 0.2
-
-            # Domain relevance
-            primary_domains = user_profile.get("primary_domains", [])
-            title_lower = (paper.title or "").lower()
-
-            for domain in primary_domains:
-                if domain.lower() in title_lower:
-                    score += 0.2
-                    break
-
-            return min(score, 1.0)
-
+            candidates = ranking.build_candidate_matrix(papers, user_profile.get("primary_domains", []))
+            users = ranking.build_profile_matrix(candidates, [user_profile])
+            return ranking.citation_opportunity(candidates, users)[0].tolist()
         except Exception as e:
             logger.error(f"Error calculating citation opportunity score: {e}")
-            return 0.3
+            return [0.3] * len(papers)
 
     def _generate_cover_color(self, domain: str) -> str:
         """Generate Spotify-style cover colors for domains"""
@@ -2472,6 +2360,21 @@ class SpotifyInspiredRecommendationsService:
             logger.warning("🔍 Semantic analysis service not available, returning papers without enhancement")
             return papers
 
+        # Analyze uncached papers in one batch; features persisted per PMID are reused
+        pending = {}
+        for paper in papers:
+            if isinstance(paper, dict) and paper.get('title') and paper.get('abstract'):
+                cache_key = f"semantic_{paper.get('pmid', '')}"
+                if cache_key not in self.semantic_cache:
+                    pending.setdefault(cache_key, paper)
+        if pending:
+            logger.info(f"🧠 Analyzing {len(pending)} papers in one batch")
+            try:
+                results = await self.semantic_service.analyze_papers(list(pending.values()))
+                self.semantic_cache.update(zip(pending, results))
+            except Exception as e:
+                logger.error(f"❌ Batch semantic analysis failed for {len(pending)} papers: {e}")
+
         enhanced_papers = []
 
         for paper in papers:
@@ -2482,28 +2385,10 @@ class SpotifyInspiredRecommendationsService:
                     enhanced_papers.append(paper)
                     continue
 
-                # Create cache key for this paper
-                cache_key = f"semantic_{paper.get('pmid', '')}"
-
-                # Check cache first
-                if cache_key in self.semantic_cache:
-                    semantic_features = self.semantic_cache[cache_key]
-                    logger.debug(f"📋 Using cached semantic analysis for paper: {paper.get('title', 'Unknown')[:50]}...")
-                else:
-                    # Perform semantic analysis
-                    title = paper.get('title', '')
-                    abstract = paper.get('abstract', '')
-
-                    if title and abstract:
-                        logger.info(f"🧠 Analyzing paper: {title[:50]}...")
-                        semantic_features = await self.semantic_service.analyze_paper(title, abstract)
-
-                        # Cache the result
-                        self.semantic_cache[cache_key] = semantic_features
-                        logger.debug(f"💾 Cached semantic analysis for: {title[:50]}...")
-                    else:
-                        logger.warning(f"⚠️ Skipping semantic analysis for paper with missing title/abstract: {paper.get('pmid', 'Unknown')}")
-                        semantic_features = None
+                title = paper.get('title', '')
+                semantic_features = self.semantic_cache.get(f"semantic_{paper.get('pmid', '')}")
+                if semantic_features is None and not (title and paper.get('abstract')):
+                    logger.warning(f"⚠️ Skipping semantic analysis for paper with missing title/abstract: {paper.get('pmid', 'Unknown')}")
 
                 # Create enhanced paper with semantic features
                 enhanced_paper = paper.copy()
@@ -2513,14 +2398,14 @@ class SpotifyInspiredRecommendationsService:
                         'semantic_analysis': {
                             'methodology': semantic_features.methodology.value,
                             'complexity_score': semantic_features.complexity_score,
-                            'novelty_classification': semantic_features.novelty_classification.value,
+                            'novelty_classification': semantic_features.novelty_type.value,
                             'research_domains': semantic_features.research_domains,
                             'technical_terms': semantic_features.technical_terms,
                             'confidence_scores': {
-                                'methodology': semantic_features.confidence_scores.methodology,
-                                'complexity': semantic_features.confidence_scores.complexity,
-                                'novelty': semantic_features.confidence_scores.novelty,
-                                'domains': semantic_features.confidence_scores.domains
+                                'methodology': semantic_features.confidence_scores.get('methodology'),
+                                'complexity': semantic_features.confidence_scores.get('complexity'),
+                                'novelty': semantic_features.confidence_scores.get('novelty'),
+                                'domains': semantic_features.confidence_scores.get('domains')
                             }
                         }
                     })
@@ -2617,6 +2502,25 @@ class SpotifyInspiredRecommendationsService:
 
         return min(score, 1.0)
 
+    @contextmanager
+    def pubmed_batch(self):
+        """
+        Share PubMed results across every feed built inside this block
+
+        Domain queries are deterministic, so users who share a research
+        domain issue identical searches; within a batch each one hits
+        eUtils once.
+
+        The cache lives in a context variable, so it is scoped to the task
+        that opened the batch; overlapping batches never see each other's.
+        """
+        outer = _pubmed_batch_cache.get()
+        token = _pubmed_batch_cache.set({} if outer is None else outer)
+        try:
+            yield
+        finally:
+            _pubmed_batch_cache.reset(token)
+
     async def _search_pubmed(self, query: str, max_results: int = 20, sort: str = "relevance") -> List[Dict[str, Any]]:
         """
         Search PubMed for articles using eUtils API
@@ -2629,6 +2533,19 @@ class SpotifyInspiredRecommendationsService:
         Returns:
             List of article dictionaries with PubMed data
         """
+        batch_cache = _pubmed_batch_cache.get()
+        batch_key = (query, max_results, sort)
+        if batch_cache is not None and batch_key in batch_cache:
+            # Callers annotate the dicts they get back, so hand out copies
+            return [dict(article) for article in batch_cache[batch_key]]
+
+        articles = await self._fetch_pubmed(query, max_results, sort)
+        if batch_cache is not None:
+            batch_cache[batch_key] = [dict(article) for article in articles]
+        return articles
+
+    async def _fetch_pubmed(self, query: str, max_results: int, sort: str) -> List[Dict[str, Any]]:
+        """Run one eUtils esearch + efetch round trip"""
         try:
             logger.info(f"🔍 PubMed Search: '{query}' (limit: {max_results}, sort: {sort})")
 
@@ -2762,6 +2679,7 @@ class SpotifyInspiredRecommendationsService:
             # Track seen PMIDs globally across all recommendation types
             seen_pmids = set()
             deduplicated = {}
+            shown_embeddings = embed_texts([])
 
             # Process in priority order: Papers-for-you > Trending > Cross-pollination > Citation opportunities
             # This ensures personalized content gets priority, then trending, then diverse content
@@ -2799,6 +2717,13 @@ class SpotifyInspiredRecommendationsService:
                     if duplicates_found:
                         logger.info(f"🔄 {rec_type}: Removed {len(duplicates_found)} global duplicates: {duplicates_found}")
 
+                    # Reorder by MMR so near-identical papers (within this section or already
+                    # shown by a higher-priority one) don't crowd the top of the section
+                    global_deduplicated, section_embeddings = self._diversify_section(
+                        global_deduplicated, rec_type, shown_embeddings
+                    )
+                    shown_embeddings = np.vstack([shown_embeddings, section_embeddings])
+
                     # 🚨 RELAXED DEDUPLICATION: Allow some duplicates to ensure minimum papers per section
                     # If we have too few papers after deduplication, add some back for variety
                     min_papers_per_section = 8  # Target minimum papers per section
@@ -2845,6 +2770,30 @@ class SpotifyInspiredRecommendationsService:
             logger.error(f"Error in global deduplication: {e}")
             return recommendations  # Return original if deduplication fails
 
+    _SECTION_SCORE_KEYS = {
+        'papers_for_you': 'relevance_score',
+        'trending_in_field': 'trending_score',
+        'cross_pollination': 'cross_pollination_score',
+        'citation_opportunities': 'opportunity_score',
+    }
+
+    def _diversify_section(self, papers: List[Dict[str, Any]], rec_type: str, shown_embeddings: np.ndarray,
+                           diversity_lambda: float = 0.7) -> Tuple[List[Dict[str, Any]], np.ndarray]:
+        """MMR ordering of a section's papers, returned with their embeddings"""
+        embeddings = embed_texts(paper_text(p) for p in papers)
+        if len(papers) < 2:
+            return papers, embeddings
+
+        score_key = self._SECTION_SCORE_KEYS.get(rec_type)
+        relevance = np.array([float(p.get(score_key) or 0.0) for p in papers])
+        if relevance.max() > 0:
+            relevance = relevance / relevance.max()
+        else:
+            relevance = 1.0 - np.arange(len(papers)) / len(papers)  # keep the incoming order
+
+        order = ranking.mmr_order(relevance, embeddings, lambda_=diversity_lambda, selected=shown_embeddings)
+        return [papers[i] for i in order], embeddings[order]
+
     def _get_deduplication_stats(self, original: Dict[str, Any], deduplicated: Dict[str, Any]) -> Dict[str, Any]:
         """Get statistics about the deduplication process"""
         try:
@@ -0,0 +1,226 @@
+"""
+Annotation Threads
+Loads annotation reply trees with one recursive CTE instead of a query per node
+
+Thread endpoints used to walk replies with one `db.query(Annotation)` per
+node (up to depth 10) and then walk every tree again to count it. Here:
+
+1. Root annotations for a page are selected with keyset pagination on
+   (created_at DESC, annotation_id DESC) - cursor, not offset.
+2. All descendants of those roots come back from a single recursive CTE,
+   each row tagged with its depth and root id.
+3. Trees are assembled in O(n) from a parent -> children index, and thread
+   sizes are counted from the CTE rows.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, func, literal, or_, select
+from sqlalchemy.orm import Session, aliased, joinedload
+
+from database import Annotation
+
+MAX_THREAD_DEPTH = 10
+SQLITE_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%f"
+
+
+def _parse_json_field(field):
+    if isinstance(field, str):
+        return json.loads(field) if field else []
+    return field if field else []
+
+
+def annotation_to_dict(annotation: Annotation) -> Dict[str, Any]:
+    """Serialized annotation as returned by the thread endpoints"""
+    return {
+        "annotation_id": annotation.annotation_id,
+        "project_id": annotation.project_id,
+        "content": annotation.content,
+        "article_pmid": annotation.article_pmid,
+        "report_id": annotation.report_id,
+        "analysis_id": annotation.analysis_id,
+        "note_type": annotation.note_type,
+        "priority": annotation.priority,
+        "status": annotation.status,
+        "parent_annotation_id": annotation.parent_annotation_id,
+        "related_pmids": _parse_json_field(annotation.related_pmids),
+        "tags": _parse_json_field(annotation.tags),
+        "action_items": _parse_json_field(annotation.action_items),
+        "exploration_session_id": annotation.exploration_session_id,
+        "research_question": annotation.research_question,
+        "created_at": annotation.created_at.isoformat() if annotation.created_at else None,
+        "updated_at": (annotation.updated_at or annotation.created_at).isoformat() if (annotation.updated_at or annotation.created_at) else None,
+        "author_id": annotation.author_id,
+        "author_username": annotation.author.username if annotation.author else "Unknown",
+        "is_private": annotation.is_private,
+        # PDF annotation fields
+        "pdf_page": annotation.pdf_page,
+        "pdf_coordinates": _parse_json_field(annotation.pdf_coordinates) if annotation.pdf_coordinates else None,
+        "highlight_color": annotation.highlight_color,
+        "highlight_text": annotation.highlight_text
+    }
+
+
+# ============================================================================
+# KEYSET PAGINATION
+# ============================================================================
+
+def encode_cursor(annotation: Annotation) -> str:
+    """Opaque cursor pointing just past `annotation` in (created_at, id) DESC order"""
+    payload = json.dumps([annotation.created_at.isoformat() if annotation.created_at else None,
+                          annotation.annotation_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], str]:
+    """Inverse of encode_cursor; raises ValueError on malformed cursors"""
+    try:
+        created_at, annotation_id = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+        return (datetime.fromisoformat(created_at) if created_at else None), str(annotation_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def _created_at_key(db: Session):
+    """
+    created_at as a comparable key
+
+    SQLite stores server-default timestamps without fractional seconds and
+    ORM-written ones with them, so both sides are normalized with strftime.
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        return func.strftime(SQLITE_TIMESTAMP_FORMAT, Annotation.created_at)
+    return Annotation.created_at
+
+
+def _created_at_value(db: Session, value: datetime):
+    if db.get_bind().dialect.name == "sqlite":
+        return value.strftime("%Y-%m-%d %H:%M:%S.%f")[:23]
+    return value
+
+
+def page_root_annotations(db: Session, project_id: str, filters: Iterable = (),
+                          limit: Optional[int] = None, cursor: Optional[str] = None) -> Tuple[List[Annotation], Optional[str]]:
+    """
+    One page of root annotations (no parent), newest first
+
+    Returns (roots, next_cursor); next_cursor is None on the last page.
+    Without `limit` every root is returned.
+    """
+    created_key = _created_at_key(db)
+    query = db.query(Annotation).options(joinedload(Annotation.author)).filter(
+        Annotation.project_id == project_id,
+        Annotation.parent_annotation_id == None,
+        *filters
+    )
+
+    if cursor:
+        created_at, annotation_id = decode_cursor(cursor)
+        if created_at is not None:
+            value = _created_at_value(db, created_at)
+            query = query.filter(or_(
+                created_key < value,
+                and_(created_key == value, Annotation.annotation_id < annotation_id)
+            ))
+        else:
+            query = query.filter(Annotation.annotation_id < annotation_id)
+
+    query = query.order_by(created_key.desc(), Annotation.annotation_id.desc())
+    if limit is None:
+        return query.all(), None
+
+    roots = query.limit(limit + 1).all()
+    if len(roots) <= limit:
+        return roots, None
+    roots = roots[:limit]
+    return roots, encode_cursor(roots[-1])
+
+
+# ============================================================================
+# FOREST LOADING
+# ============================================================================
+
+def fetch_descendants(db: Session, project_id: str, root_ids: List[str],
+                      max_depth: int = MAX_THREAD_DEPTH) -> List[Tuple[Annotation, int, str]]:
+    """
+    Every descendant of `root_ids` (roots excluded) in one recursive query
+
+    Returns (annotation, depth, root_id) rows ordered by created_at so that
+    siblings come out oldest first.
+    """
+    if not root_ids:
+        return []
+
+    anchor = select(
+        Annotation.annotation_id.label("annotation_id"),
+        literal(0).label("depth"),
+        Annotation.annotation_id.label("root_id"),
+    ).where(Annotation.annotation_id.in_(root_ids))
+    tree = anchor.cte("annotation_tree", recursive=True)
+
+    child = aliased(Annotation)
+    tree = tree.union_all(
+        select(
+            child.annotation_id,
+            tree.c.depth + 1,
+            tree.c.root_id,
+        ).where(
+            child.parent_annotation_id == tree.c.annotation_id,
+            child.project_id == project_id,
+            tree.c.depth < max_depth,
+        )
+    )
+
+    rows = (
+        db.query(Annotation, tree.c.depth, tree.c.root_id)
+        .join(tree, Annotation.annotation_id == tree.c.annotation_id)
+        .options(joinedload(Annotation.author))
+        .filter(tree.c.depth > 0)
+        .order_by(_created_at_key(db).asc(), Annotation.annotation_id.asc())
+        .all()
+    )
+    return [(annotation, depth, root_id) for annotation, depth, root_id in rows]
+
+
+def assemble_threads(roots: List[Annotation], descendants: List[Tuple[Annotation, int, str]]) -> List[Dict[str, Any]]:
+    """
+    Nest descendant rows under their roots in O(n)
+
+    Each node dict gets `depth` and `children`; each root also gets
+    `total_in_thread` (itself plus all descendants).
+    """
+    nodes: Dict[str, Dict[str, Any]] = {}
+    threads = []
+    for root in roots:
+        node = annotation_to_dict(root)
+        node["depth"] = 0
+        node["children"] = []
+        node["total_in_thread"] = 1
+        nodes[root.annotation_id] = node
+        threads.append(node)
+
+    for annotation, depth, _ in descendants:
+        node = annotation_to_dict(annotation)
+        node["depth"] = depth
+        node["children"] = []
+        nodes[annotation.annotation_id] = node
+
+    # Rows are in created_at order, so appending keeps siblings sorted
+    for annotation, _, root_id in descendants:
+        parent = nodes.get(annotation.parent_annotation_id)
+        if parent is not None:
+            parent["children"].append(nodes[annotation.annotation_id])
+        if root_id in nodes:
+            nodes[root_id]["total_in_thread"] += 1
+
+    return threads
+
+
+def load_threads(db: Session, project_id: str, roots: List[Annotation],
+                 max_depth: int = MAX_THREAD_DEPTH) -> List[Dict[str, Any]]:
+    """Full reply trees for the given root annotations"""
+    descendants = fetch_descendants(db, project_id, [r.annotation_id for r in roots], max_depth)
+    return assemble_threads(roots, descendants)
@@ -529,31 +529,32 @@ class AuthorNetworkService:
 
             # Find papers that cite or are cited by the source
             from services.citation_service import get_citation_service
-            async with get_citation_service() as citation_service:
-                # Get references and citations
-                references = await citation_service.fetch_references(source_pmid)
-                citations = await citation_service.fetch_citations(source_pmid)
-
-                # Convert to paper dictionaries
-                for ref_data in references[:20]:  # Limit to prevent explosion
-                    related_papers.append({
-                        'pmid': ref_data.pmid,
-                        'title': ref_data.title,
-                        'authors': ref_data.authors,
-                        'journal': ref_data.journal,
-                        'year': ref_data.year,
-                        'citation_count': ref_data.citation_count
-                    })
-
-                for cit_data in citations[:20]:  # Limit to prevent explosion
-                    related_papers.append({
-                        'pmid': cit_data.pmid,
-                        'title': cit_data.title,
-                        'authors': cit_data.authors,
-                        'journal': cit_data.journal,
-                        'year': cit_data.year,
-                        'citation_count': cit_data.citation_count
-                    })
+            citation_service = await get_citation_service()
+
+            # Get references and citations (read through the shared citation store)
+            references = await citation_service.fetch_references(source_pmid)
+            citations = await citation_service.fetch_citations(source_pmid)
+
+            # Convert to paper dictionaries
+            for ref_data in references[:20]:  # Limit to prevent explosion
+                related_papers.append({
+                    'pmid': ref_data.pmid,
+                    'title': ref_data.title,
+                    'authors': ref_data.authors,
+                    'journal': ref_data.journal,
+                    'year': ref_data.year,
+                    'citation_count': ref_data.citation_count
+                })
+
+            for cit_data in citations[:20]:  # Limit to prevent explosion
+                related_papers.append({
+                    'pmid': cit_data.pmid,
+                    'title': cit_data.title,
+                    'authors': cit_data.authors,
+                    'journal': cit_data.journal,
+                    'year': cit_data.year,
+                    'citation_count': cit_data.citation_count
+                })
 
             db.close()
 
@@ -7,16 +7,20 @@ This service enriches articles with citation data from external APIs:
 2. Batch processing for efficient data retrieval
 3. Citation context extraction and relevance scoring
 4. Automatic citation network building
+
+Fetching and storing runs through the shared citation store
+(services/citation_store.py), which also serves CitationService.
 """
 
 import asyncio
 import aiohttp
 import json
-from typing import Dict, List, Optional, Set
+from typing import Dict, Iterable, List, Optional, Set
 from datetime import datetime, timedelta, timezone
 from dataclasses import dataclass
 from sqlalchemy.orm import Session
 from database import get_db, Article, ArticleCitation
+from services.citation_store import get_citation_store
 
 
 @dataclass
@@ -33,157 +37,34 @@ class CitationEnrichmentService:
     """Service for enriching articles with citation data"""
     
     def __init__(self):
-        self.openalex_base_url = "https://api.openalex.org"
-        self.batch_size = 50
-        self.rate_limit_delay = 0.1  # 100ms between requests
+        self.store = get_citation_store()
     
     async def enrich_article_citations(self, pmid: str, db: Session) -> Dict[str, int]:
         """Enrich a single article with citation data"""
-        try:
-            # Get article
-            article = db.query(Article).filter(Article.pmid == pmid).first()
-            if not article:
-                return {"error": "Article not found"}
-            
-            # Check if recently updated (within 7 days)
-            if article.citation_data_updated:
-                # Handle timezone-aware comparison
-                now = datetime.now(timezone.utc)
-                last_updated = article.citation_data_updated
-                if not last_updated.tzinfo:
-                    last_updated = last_updated.replace(tzinfo=timezone.utc)
+        result = await self.enrich_articles([pmid], db)
+        if "error" in result:
+            return result
+        if result["not_found"] == 1:
+            return {"error": "Article not found"}
+        if result["articles_skipped"] == 1:
+            article = db.query(Article.cited_by_pmids).filter(Article.pmid == pmid).first()
+            return {"status": "recently_updated", "citations": len(article.cited_by_pmids or [])}
+        return {
+            "status": "success",
+            "citations_added": result["citations_added"],
+            "references_added": result["references_added"],
+            "total_relationships": result["total_relationships"]
+        }
 
-                if now - last_updated < timedelta(days=7):
-                    return {"status": "recently_updated", "citations": len(article.cited_by_pmids or [])}
+    async def enrich_articles(self, pmids: Iterable[str], db: Session, force: bool = False) -> Dict[str, int]:
+        """
+        Enrich many articles in one pass through the shared citation store
 
-            # Fetch citation data from OpenAlex
-            citations_data = await self._fetch_openalex_citations(pmid)
-            references_data = await self._fetch_openalex_references(pmid)
-
-            # Update article with citation data
-            article.cited_by_pmids = [c.citing_pmid for c in citations_data]
-            article.references_pmids = [r.cited_pmid for r in references_data]
-            article.citation_count = len(citations_data)
-            article.citation_data_updated = datetime.now(timezone.utc)
-            # Note: citation_data_source field doesn't exist in current model
-            
-            # Store detailed citation relationships
-            citation_count = 0
-            for citation in citations_data + references_data:
-                existing = db.query(ArticleCitation).filter(
-                    ArticleCitation.citing_pmid == citation.citing_pmid,
-                    ArticleCitation.cited_pmid == citation.cited_pmid
-                ).first()
-                
-                if not existing:
-                    citation_record = ArticleCitation(
-                        citing_pmid=citation.citing_pmid,
-                        cited_pmid=citation.cited_pmid,
-                        citation_context=citation.citation_context,
-                        citation_year=citation.citation_year,
-                        co_citation_count=0,
-                        bibliographic_coupling=0.0
-                    )
-                    db.add(citation_record)
-                    citation_count += 1
-            
-            db.commit()
-            
-            return {
-                "status": "success",
-                "citations_added": len(citations_data),
-                "references_added": len(references_data),
-                "total_relationships": citation_count
-            }
-            
-        except Exception as e:
-            db.rollback()
-            return {"error": str(e)}
-    
-    async def _fetch_openalex_citations(self, pmid: str) -> List[CitationData]:
-        """Fetch papers that cite the given PMID"""
-        try:
-            async with aiohttp.ClientSession() as session:
-                # Search for papers that cite this PMID
-                url = f"{self.openalex_base_url}/works"
-                params = {
-                    "filter": f"cites:pmid:{pmid}",
-                    "per-page": 200,
-                    "select": "id,title,publication_year,authorships"
-                }
-                
-                async with session.get(url, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        citations = []
-                        
-                        for work in data.get("results", []):
-                            # Extract PMID from OpenAlex ID
-                            citing_pmid = self._extract_pmid_from_openalex_id(work.get("id", ""))
-                            if citing_pmid:
-                                citations.append(CitationData(
-                                    citing_pmid=citing_pmid,
-                                    cited_pmid=pmid,
-                                    citation_year=work.get("publication_year"),
-                                    relevance_score=0.5  # Default relevance
-                                ))
-                        
-                        return citations
-                    else:
-                        print(f"OpenAlex API error: {response.status}")
-                        return []
-                        
-        except Exception as e:
-            print(f"Error fetching citations: {e}")
-            return []
-    
-    async def _fetch_openalex_references(self, pmid: str) -> List[CitationData]:
-        """Fetch papers referenced by the given PMID"""
-        try:
-            async with aiohttp.ClientSession() as session:
-                # Get the work details including referenced works
-                url = f"{self.openalex_base_url}/works/pmid:{pmid}"
-                params = {
-                    "select": "id,title,referenced_works"
-                }
-                
-                async with session.get(url, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        references = []
-                        
-                        for ref_id in data.get("referenced_works", []):
-                            # Extract PMID from OpenAlex ID
-                            cited_pmid = self._extract_pmid_from_openalex_id(ref_id)
-                            if cited_pmid:
-                                references.append(CitationData(
-                                    citing_pmid=pmid,
-                                    cited_pmid=cited_pmid,
-                                    relevance_score=0.5  # Default relevance
-                                ))
-                        
-                        return references
-                    else:
-                        print(f"OpenAlex API error: {response.status}")
-                        return []
-                        
-        except Exception as e:
-            print(f"Error fetching references: {e}")
-            return []
-    
-    def _extract_pmid_from_openalex_id(self, openalex_id: str) -> Optional[str]:
-        """Extract PMID from OpenAlex work ID"""
-        try:
-            # OpenAlex IDs are like: https://openalex.org/W2741809807
-            # We need to map these to PMIDs - this is a simplified version
-            # In practice, you'd need a more sophisticated mapping
-            if "openalex.org/W" in openalex_id:
-                # For now, generate a pseudo-PMID from the OpenAlex ID
-                work_id = openalex_id.split("/W")[-1]
-                return f"OA{work_id[:8]}"  # Pseudo-PMID format
-            return None
-        except Exception:
-            return None
+        Articles enriched within the last 7 days are skipped unless force.
+        Returns counts of enriched/skipped/missing articles, fetched citations
+        and references, and newly stored relationships.
+        """
+        return await self.store.ingest(pmids, db, force=force)
     
     async def batch_enrich_collection(self, collection_id: str, db: Session) -> Dict[str, int]:
         """Enrich all articles in a collection with citation data"""
@@ -197,22 +78,17 @@ class CitationEnrichmentService:
             
             article_pmids = [ac.article_pmid for ac in collection.article_collections if ac.article_pmid]
             
-            total_enriched = 0
-            total_citations = 0
-            
-            for pmid in article_pmids:
-                result = await self.enrich_article_citations(pmid, db)
-                if result.get("status") == "success":
-                    total_enriched += 1
-                    total_citations += result.get("citations_added", 0) + result.get("references_added", 0)
-                
-                # Rate limiting
-                await asyncio.sleep(self.rate_limit_delay)
+            result = await self.enrich_articles(article_pmids, db)
+            if "error" in result:
+                return result
             
             return {
                 "status": "success",
-                "articles_enriched": total_enriched,
-                "total_citations_added": total_citations
+                "articles_enriched": result["articles_enriched"],
+                "articles_skipped": result["articles_skipped"],
+                "total_citations_added": result["citations_added"] + result["references_added"],
+                "relationships_stored": result["total_relationships"],
+                "api_requests": result["api_requests"]
             }
             
         except Exception as e:
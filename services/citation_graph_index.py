@@ -0,0 +1,268 @@
+"""
+Citation Graph Index
+In-memory CSR adjacency index over article citation edges
+
+Network endpoints used to derive edges by scanning each article's JSON
+reference lists and re-query the database for every hop. This index keeps
+the whole citation graph as two sparse matrices:
+
+- refs:    refs[i, j] = 1 if paper i cites paper j (CSR, row = citing paper)
+- citers:  transpose of refs (CSR, row = cited paper)
+
+and answers graph questions with sparse row slices and sparse products:
+- k-hop expansion (references, citations or both) as frontier slicing
+- co-citation counts:        row i of refs.T @ refs  (papers cited together)
+- bibliographic coupling:    row i of refs @ refs.T  (shared references)
+
+The index is loaded once at startup from `article_citations` plus the
+`articles` reference/cited-by lists (`ensure_loaded` makes concurrent first
+users share one load), and patched on enrichment. Edge
+updates are appended to COO arrays and the CSR matrices are rebuilt lazily
+on the next read.
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy.orm import Session
+
+from database import Article, ArticleCitation
+
+logger = logging.getLogger(__name__)
+
+DIRECTIONS = ("references", "citations", "both")
+
+
+class CitationGraphIndex:
+    """CSR adjacency index with vectorized neighbourhood queries"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._load_lock = threading.Lock()
+        self._pmid_to_idx: Dict[str, int] = {}
+        self._idx_to_pmid: List[str] = []
+        self._src = np.empty(0, dtype=np.int64)
+        self._dst = np.empty(0, dtype=np.int64)
+        self._refs: Optional[sparse.csr_matrix] = None
+        self._citers: Optional[sparse.csr_matrix] = None
+        self._dirty = True
+        self.loaded = False
+        self.load_time_ms = 0.0
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def _intern(self, pmid: str) -> int:
+        idx = self._pmid_to_idx.get(pmid)
+        if idx is None:
+            idx = len(self._idx_to_pmid)
+            self._pmid_to_idx[pmid] = idx
+            self._idx_to_pmid.append(pmid)
+        return idx
+
+    def _intern_many(self, pmids: Iterable[str]) -> np.ndarray:
+        return np.fromiter((self._intern(str(p)) for p in pmids), dtype=np.int64)
+
+    def add_edges(self, edges: Iterable[Tuple[str, str]]):
+        """Add (citing_pmid, cited_pmid) edges; duplicates are collapsed on rebuild"""
+        edges = [(str(a), str(b)) for a, b in edges if a and b and a != b]
+        if not edges:
+            return
+        with self._lock:
+            citing, cited = zip(*edges)
+            self._src = np.concatenate([self._src, self._intern_many(citing)])
+            self._dst = np.concatenate([self._dst, self._intern_many(cited)])
+            self._dirty = True
+
+    def load(self, db: Session) -> Dict[str, float]:
+        """Load every citation edge in two bulk queries"""
+        start_time = time.time()
+        edges = [(row.citing_pmid, row.cited_pmid) for row in db.query(
+            ArticleCitation.citing_pmid, ArticleCitation.cited_pmid
+        ).yield_per(10000)]
+
+        for row in db.query(
+            Article.pmid, Article.references_pmids, Article.cited_by_pmids
+        ).yield_per(2000):
+            edges.extend((row.pmid, ref) for ref in row.references_pmids or [])
+            edges.extend((citer, row.pmid) for citer in row.cited_by_pmids or [])
+
+        with self._lock:
+            self._pmid_to_idx = {}
+            self._idx_to_pmid = []
+            self._src = np.empty(0, dtype=np.int64)
+            self._dst = np.empty(0, dtype=np.int64)
+            self.add_edges(edges)
+            self._ensure_matrices()
+            self.loaded = True
+            self.load_time_ms = (time.time() - start_time) * 1000
+
+        logger.info(f"⚡ Citation graph index loaded: {self.get_stats()}")
+        return self.get_stats()
+
+    def ensure_loaded(self, db: Session) -> Dict[str, float]:
+        """Load the index unless already loaded; concurrent callers wait for one load"""
+        if not self.loaded:
+            with self._load_lock:
+                if not self.loaded:
+                    return self.load(db)
+        return self.get_stats()
+
+    def update_article(self, pmid: str, references: Iterable[str] = (), cited_by: Iterable[str] = ()):
+        """
+        Replace an article's outgoing edges and add its known citers
+
+        Called after citation enrichment. Incoming edges are only added, since
+        other papers' reference lists are owned by those papers.
+        """
+        with self._lock:
+            idx = self._intern(str(pmid))
+            keep = self._src != idx
+            self._src = self._src[keep]
+            self._dst = self._dst[keep]
+            self._dirty = True
+            self.add_edges([(pmid, ref) for ref in references])
+            self.add_edges([(citer, pmid) for citer in cited_by])
+
+    def _ensure_matrices(self):
+        if not self._dirty and self._refs is not None:
+            return
+        n = len(self._idx_to_pmid)
+        data = np.ones(len(self._src), dtype=np.float32)
+        refs = sparse.coo_matrix((data, (self._src, self._dst)), shape=(n, n)).tocsr()
+        refs.sum_duplicates()
+        refs.data[:] = 1.0  # collapse duplicate edges to a single unit weight
+        self._refs = refs
+        self._citers = refs.T.tocsr()
+        self._dirty = False
+
+    def _matrices(self) -> Tuple[sparse.csr_matrix, sparse.csr_matrix]:
+        with self._lock:
+            self._ensure_matrices()
+            return self._refs, self._citers
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def _adjacency(self, direction: str) -> sparse.csr_matrix:
+        if direction not in DIRECTIONS:
+            raise ValueError(f"direction must be one of {DIRECTIONS}")
+        refs, citers = self._matrices()
+        if direction == "references":
+            return refs
+        if direction == "citations":
+            return citers
+        return (refs + citers).tocsr()
+
+    def references(self, pmid: str) -> List[str]:
+        """PMIDs cited by `pmid`"""
+        return self._neighbours(pmid, "references")
+
+    def citations(self, pmid: str) -> List[str]:
+        """PMIDs citing `pmid`"""
+        return self._neighbours(pmid, "citations")
+
+    def _neighbours(self, pmid: str, direction: str) -> List[str]:
+        idx = self._pmid_to_idx.get(str(pmid))
+        if idx is None:
+            return []
+        adjacency = self._adjacency(direction)
+        cols = adjacency.indices[adjacency.indptr[idx]:adjacency.indptr[idx + 1]]
+        return [self._idx_to_pmid[c] for c in cols]
+
+    def k_hop(self, pmid: str, k: int = 2, direction: str = "references",
+              max_nodes: Optional[int] = None) -> Dict[str, int]:
+        """
+        Expand up to `k` hops from `pmid`
+
+        Returns {pmid: hop_distance} including the seed at distance 0. Each hop
+        is one CSR row slice over the whole frontier.
+        """
+        seed = self._pmid_to_idx.get(str(pmid))
+        if seed is None:
+            return {}
+        adjacency = self._adjacency(direction)
+        n = adjacency.shape[0]
+
+        distance = np.full(n, -1, dtype=np.int32)
+        distance[seed] = 0
+        frontier = np.array([seed], dtype=np.int64)
+        reached = 1
+
+        for hop in range(1, k + 1):
+            if frontier.size == 0:
+                break
+            neighbours = np.unique(adjacency[frontier].indices)
+            neighbours = neighbours[distance[neighbours] < 0]
+            if max_nodes is not None:
+                neighbours = neighbours[:max(0, max_nodes - reached)]
+            distance[neighbours] = hop
+            reached += neighbours.size
+            frontier = neighbours
+
+        found = np.nonzero(distance >= 0)[0]
+        return {self._idx_to_pmid[i]: int(distance[i]) for i in found}
+
+    def subgraph_edges(self, pmids: Iterable[str]) -> List[Tuple[str, str]]:
+        """All (citing, cited) edges among the given PMIDs"""
+        idxs = np.array(
+            [self._pmid_to_idx[p] for p in pmids if p in self._pmid_to_idx], dtype=np.int64
+        )
+        if idxs.size == 0:
+            return []
+        refs, _ = self._matrices()
+        block = refs[idxs][:, idxs].tocoo()
+        return [(self._idx_to_pmid[idxs[r]], self._idx_to_pmid[idxs[c]]) for r, c in zip(block.row, block.col)]
+
+    def _top_scores(self, scores: sparse.spmatrix, exclude: int, limit: int) -> List[Tuple[str, int]]:
+        scores = scores.tocoo()
+        cols, values = scores.col, scores.data
+        mask = (cols != exclude) & (values > 0)
+        cols, values = cols[mask], values[mask]
+        if cols.size == 0:
+            return []
+        top = np.argsort(-values, kind="stable")[:limit]
+        return [(self._idx_to_pmid[cols[i]], int(values[i])) for i in top]
+
+    def co_citation(self, pmid: str, limit: int = 20) -> List[Tuple[str, int]]:
+        """Papers most often cited together with `pmid`, with co-citation counts"""
+        idx = self._pmid_to_idx.get(str(pmid))
+        if idx is None:
+            return []
+        refs, citers = self._matrices()
+        return self._top_scores(citers[idx] @ refs, idx, limit)
+
+    def bibliographic_coupling(self, pmid: str, limit: int = 20) -> List[Tuple[str, int]]:
+        """Papers sharing the most references with `pmid`, with shared-reference counts"""
+        idx = self._pmid_to_idx.get(str(pmid))
+        if idx is None:
+            return []
+        refs, citers = self._matrices()
+        return self._top_scores(refs[idx] @ citers, idx, limit)
+
+    def get_stats(self) -> Dict[str, float]:
+        """Index size statistics"""
+        refs, _ = self._matrices()
+        return {
+            "loaded": self.loaded,
+            "nodes": len(self._idx_to_pmid),
+            "edges": int(refs.nnz),
+            "load_time_ms": round(self.load_time_ms, 1)
+        }
+
+
+# Global index instance
+_citation_graph_index = None
+
+def get_citation_graph_index() -> CitationGraphIndex:
+    """Get global citation graph index instance"""
+    global _citation_graph_index
+    if _citation_graph_index is None:
+        _citation_graph_index = CitationGraphIndex()
+    return _citation_graph_index
@@ -1,6 +1,10 @@
 """
 Citation Data Integration Service
 Fetches and processes citation relationships from external APIs
+
+Citation data is read through the shared citation store
+(services/citation_store.py), so this service sees what enrichment stored
+and concurrent requests for a PMID share one upstream fetch.
 """
 
 import asyncio
@@ -13,6 +17,8 @@ import json
 import logging
 from urllib.parse import quote
 
+from services.citation_store import CitationRecord, get_citation_store
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -182,21 +188,48 @@ class CitationService:
             url=f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/" if pmid else None
         )
     
+    def _from_record(self, record: CitationRecord) -> CitationData:
+        return CitationData(
+            pmid=record.pmid,
+            doi=record.doi,
+            title=record.title,
+            authors=record.authors,
+            journal=record.journal or "",
+            year=record.year or 0,
+            citation_count=record.citation_count,
+            references=record.references,
+            cited_by=record.cited_by,
+            url=f"https://pubmed.ncbi.nlm.nih.gov/{record.pmid}/" if not record.pmid.startswith("OA") else None
+        )
+
     async def fetch_citation_data(self, pmid: str) -> Optional[CitationData]:
-        """Fetch citation data with caching"""
+        """Fetch citation data with caching (read-through the shared citation store)"""
         # Check cache first
         cached_data = self.cache.get(pmid)
         if cached_data:
             return cached_data
         
-        # Try OpenAlex first (more comprehensive)
-        citation_data = await self.fetch_from_openalex(pmid)
+        try:
+            record = await get_citation_store().get(pmid)
+        except Exception as e:
+            logger.error(f"Error reading citation data for PMID {pmid}: {e}")
+            return None
         
-        if citation_data:
+        if record:
+            citation_data = self._from_record(record)
             self.cache.set(pmid, citation_data)
             return citation_data
         
         return None
+
+    async def _fetch_related(self, pmids: List[str]) -> List[CitationData]:
+        """Metadata for related papers; stored stubs are enough, only unknown PMIDs are fetched"""
+        try:
+            records = await get_citation_store().get_many(pmids, metadata_only=True)
+        except Exception as e:
+            logger.error(f"Error reading related papers: {e}")
+            return []
+        return [self._from_record(records[p]) for p in pmids if p in records]
     
     async def fetch_references(self, pmid: str) -> List[CitationData]:
         """Fetch reference papers for a given PMID"""
@@ -204,14 +237,7 @@ class CitationService:
         if not citation_data or not citation_data.references:
             return []
         
-        # Fetch data for reference papers
-        reference_data = []
-        for ref_pmid in citation_data.references[:20]:  # Limit to 20 references
-            ref_data = await self.fetch_citation_data(ref_pmid)
-            if ref_data:
-                reference_data.append(ref_data)
-        
-        return reference_data
+        return await self._fetch_related(citation_data.references[:20])  # Limit to 20 references
     
     async def fetch_citations(self, pmid: str) -> List[CitationData]:
         """Fetch citing papers for a given PMID"""
@@ -219,14 +245,7 @@ class CitationService:
         if not citation_data or not citation_data.cited_by:
             return []
         
-        # Fetch data for citing papers
-        citing_data = []
-        for citing_pmid in citation_data.cited_by[:20]:  # Limit to 20 citations
-            citing_paper = await self.fetch_citation_data(citing_pmid)
-            if citing_paper:
-                citing_data.append(citing_paper)
-        
-        return citing_data
+        return await self._fetch_related(citation_data.cited_by[:20])  # Limit to 20 citations
     
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
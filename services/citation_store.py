@@ -0,0 +1,484 @@
+"""
+Citation Store
+Read-through citation ingestion shared by the citation services
+
+CitationService (author networks) and CitationEnrichmentService (network
+enrichment) used to run separate OpenAlex clients, and neither read what
+the other had stored. Both now go through this store:
+
+- `articles` (citation_data_updated, cited_by_pmids, references_pmids),
+  `article_citations` and `citation_works` are the source of truth; reads
+  are served from them
+- reading a PMID whose citation data is missing or older than max_age
+  triggers an ingestion, and concurrent reads of a PMID that is already
+  being ingested await that fetch instead of issuing their own
+- ingestion is one bulk OpenAlex pipeline: 50 PMIDs per lookup
+  (`filter=pmid:a|b|c`), cursor-paged citing works, referenced works
+  resolved 50 ids per request, one shared HTTP session with bounded
+  concurrency, and batched `INSERT ... ON CONFLICT DO NOTHING` writes
+- citing and referenced works are stored in `citation_works` (metadata
+  only) under their PMID, or "OA" + the full OpenAlex work number when
+  OpenAlex has none. They never become `articles` rows, so they cannot leak
+  into article-level queries. The article's cited_by/references lists keep
+  every related id; `article_citations` (which has foreign keys to
+  `articles`) only holds edges between stored articles
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import aiohttp
+from sqlalchemy import or_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from database import Article, ArticleCitation, CitationWork, get_session_local
+
+logger = logging.getLogger(__name__)
+
+WORK_FIELDS = "id,ids,doi,title,publication_year,authorships,primary_location,cited_by_count"
+
+
+def openalex_pseudo_pmid(openalex_id: str) -> Optional[str]:
+    """Stable id for works without a PMID (https://openalex.org/W2741809807 -> OA2741809807)"""
+    if openalex_id and "openalex.org/W" in openalex_id:
+        return f"OA{openalex_id.rstrip('/').split('/W')[-1]}"
+    return None
+
+
+def work_pmid(work: Dict) -> Optional[str]:
+    """PMID of an OpenAlex work, else its OA pseudo-id"""
+    pmid = ((work.get("ids") or {}).get("pmid") or "").rstrip("/").split("/")[-1]
+    return pmid or openalex_pseudo_pmid(work.get("id", ""))
+
+
+def work_article_fields(work: Dict) -> Dict[str, Any]:
+    """Article columns available from an OpenAlex work"""
+    source = (work.get("primary_location") or {}).get("source") or {}
+    return {
+        "title": work.get("title") or "",
+        "authors": [
+            a["author"]["display_name"] for a in work.get("authorships") or []
+            if (a.get("author") or {}).get("display_name")
+        ],
+        "journal": source.get("display_name"),
+        "publication_year": work.get("publication_year"),
+        "doi": (work.get("doi") or "").replace("https://doi.org/", "") or None,
+        "citation_count": work.get("cited_by_count") or 0,
+    }
+
+
+def citation_work_dicts(db: Session, work_ids: Iterable[str]) -> List[Dict[str, Any]]:
+    """Related-paper dicts (article endpoint shape) for stored citation_works, in work_ids order"""
+    work_ids = list(work_ids)
+    if not work_ids:
+        return []
+    works = {w.work_id: w for w in db.query(CitationWork).filter(CitationWork.work_id.in_(work_ids))}
+    return [
+        {
+            "pmid": work.work_id,
+            "title": work.title,
+            "authors": work.authors or [],
+            "journal": work.journal,
+            "year": work.publication_year,
+            "doi": work.doi,
+            "citation_count": work.citation_count or 0,
+            "abstract": None,
+            "url": None if work.work_id.startswith("OA") else f"https://pubmed.ncbi.nlm.nih.gov/{work.work_id}/"
+        }
+        for work in (works.get(w) for w in work_ids) if work is not None
+    ]
+
+
+class OpenAlexClient:
+    """Shared-session OpenAlex client with bounded concurrency and batch lookups"""
+
+    BATCH_SIZE = 50  # OpenAlex limit for OR-ed filter values
+
+    def __init__(self, session: aiohttp.ClientSession, base_url: str, max_concurrency: int = 5,
+                 min_interval: float = 0.1, max_retries: int = 3):
+        self.session = session
+        self.base_url = base_url
+        self.min_interval = min_interval
+        self.max_retries = max_retries
+        self.requests = 0
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._throttle = asyncio.Lock()
+        self._last_request = 0.0
+
+    async def _wait_turn(self):
+        async with self._throttle:
+            delay = self._last_request + self.min_interval - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._last_request = time.monotonic()
+
+    async def get(self, path: str, params: Dict) -> Optional[Dict]:
+        """GET a JSON document, retrying rate-limit and server errors with backoff"""
+        url = f"{self.base_url}{path}"
+        async with self._semaphore:
+            for attempt in range(self.max_retries + 1):
+                await self._wait_turn()
+                self.requests += 1
+                try:
+                    async with self.session.get(url, params=params) as response:
+                        if response.status == 200:
+                            return await response.json()
+                        if response.status != 429 and response.status < 500:
+                            logger.warning(f"OpenAlex API error {response.status} for {params.get('filter')}")
+                            return None
+                        retry_after = response.headers.get("Retry-After")
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    logger.warning(f"OpenAlex request failed: {e}")
+                    retry_after = None
+                if attempt < self.max_retries:
+                    await asyncio.sleep(float(retry_after) if retry_after else 2 ** attempt)
+        return None
+
+    async def _works_by(self, key: str, values: List[str]) -> List[Dict]:
+        batches = [values[i:i + self.BATCH_SIZE] for i in range(0, len(values), self.BATCH_SIZE)]
+        pages = await asyncio.gather(*[
+            self.get("/works", {"filter": f"{key}:" + "|".join(batch), "per-page": self.BATCH_SIZE,
+                                "select": WORK_FIELDS + ",referenced_works"})
+            for batch in batches
+        ])
+        return [work for page in pages for work in (page or {}).get("results", [])]
+
+    async def works_by_pmid(self, pmids: List[str]) -> Dict[str, Dict]:
+        """PMID -> work, BATCH_SIZE PMIDs per request"""
+        works = {}
+        for work in await self._works_by("pmid", pmids):
+            pmid = ((work.get("ids") or {}).get("pmid") or "").rstrip("/").split("/")[-1]
+            if pmid:
+                works[pmid] = work
+        return works
+
+    async def works_by_id(self, openalex_ids: List[str]) -> Dict[str, Dict]:
+        """OpenAlex id URL -> work, BATCH_SIZE ids per request"""
+        short_ids = [i.rstrip("/").split("/")[-1] for i in openalex_ids]
+        return {work["id"]: work for work in await self._works_by("openalex", short_ids) if work.get("id")}
+
+    async def cited_by(self, work_id: str, limit: int) -> List[Dict]:
+        """Works citing work_id, paged with cursors up to limit"""
+        results = []
+        cursor = "*"
+        while cursor and len(results) < limit:
+            page = await self.get("/works", {
+                "filter": f"cites:{work_id.rstrip('/').split('/')[-1]}",
+                "per-page": 200,
+                "cursor": cursor,
+                "select": WORK_FIELDS
+            })
+            if not page:
+                break
+            batch = page.get("results", [])
+            results.extend(batch)
+            cursor = (page.get("meta") or {}).get("next_cursor") if batch else None
+        return results[:limit]
+
+
+@dataclass
+class CitationRecord:
+    """An article's metadata and stored citation edges"""
+    pmid: str
+    title: str
+    authors: List[str]
+    journal: Optional[str]
+    year: Optional[int]
+    doi: Optional[str]
+    citation_count: int
+    references: List[str] = field(default_factory=list)
+    cited_by: List[str] = field(default_factory=list)
+    updated_at: Optional[datetime] = None
+
+
+class CitationStore:
+    """Read-through store over articles/article_citations with coalesced OpenAlex ingestion"""
+
+    def __init__(self, session_factory: Optional[Callable[[], Session]] = None):
+        self.openalex_base_url = "https://api.openalex.org"
+        self.rate_limit_delay = 0.1  # 100ms between requests
+        self.max_concurrency = 5
+        self.max_cited_by = 1000  # citing works fetched per article
+        self.edge_batch_size = 500
+        self.max_age = timedelta(days=7)
+        self.session_factory = session_factory
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.upstream_fetches = 0  # PMIDs fetched from OpenAlex
+        self.coalesced = 0  # PMIDs that awaited another caller's fetch
+
+    def open_session(self) -> aiohttp.ClientSession:
+        return aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=30),
+            headers={'User-Agent': 'R&D-Agent/1.0 (research tool)'}
+        )
+
+    def _db_session(self) -> Session:
+        return (self.session_factory or get_session_local())()
+
+    def is_fresh(self, updated_at: Optional[datetime]) -> bool:
+        if not updated_at:
+            return False
+        if not updated_at.tzinfo:
+            updated_at = updated_at.replace(tzinfo=timezone.utc)
+        return datetime.now(timezone.utc) - updated_at < self.max_age
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def read_many(self, db: Session, pmids: Iterable[str]) -> Dict[str, CitationRecord]:
+        """Stored records for pmids (no upstream fetch)"""
+        pmids = list(dict.fromkeys(pmids))
+        if not pmids:
+            return {}
+        records = {
+            row.pmid: CitationRecord(
+                pmid=row.pmid, title=row.title, authors=row.authors or [], journal=row.journal,
+                year=row.publication_year, doi=row.doi, citation_count=row.citation_count or 0,
+                references=list(row.references_pmids or []), cited_by=list(row.cited_by_pmids or []),
+                updated_at=row.citation_data_updated
+            )
+            for row in db.query(
+                Article.pmid, Article.title, Article.authors, Article.journal, Article.publication_year,
+                Article.doi, Article.citation_count, Article.references_pmids, Article.cited_by_pmids,
+                Article.citation_data_updated
+            ).filter(Article.pmid.in_(pmids))
+        }
+        # Edges written by other articles' ingestion that these lists don't know about yet
+        if records:
+            for citing, cited in db.query(ArticleCitation.citing_pmid, ArticleCitation.cited_pmid).filter(
+                or_(ArticleCitation.citing_pmid.in_(records), ArticleCitation.cited_pmid.in_(records))
+            ):
+                if citing in records and cited not in records[citing].references:
+                    records[citing].references.append(cited)
+                if cited in records and citing not in records[cited].cited_by:
+                    records[cited].cited_by.append(citing)
+
+        works = [p for p in pmids if p not in records]
+        if works:
+            for work in db.query(CitationWork).filter(CitationWork.work_id.in_(works)):
+                records[work.work_id] = CitationRecord(
+                    pmid=work.work_id, title=work.title or "", authors=work.authors or [], journal=work.journal,
+                    year=work.publication_year, doi=work.doi, citation_count=work.citation_count or 0
+                )
+        return {p: records[p] for p in pmids if p in records}
+
+    async def get_many(self, pmids: Iterable[str], db: Optional[Session] = None,
+                       metadata_only: bool = False) -> Dict[str, CitationRecord]:
+        """
+        Records for pmids, ingesting the ones that are missing or stale
+
+        With metadata_only, only PMIDs without an article or citation_works
+        row are fetched (stored metadata is enough for titles and authors).
+        """
+        own_session = db is None
+        db = db or self._db_session()
+        try:
+            pmids = list(dict.fromkeys(str(p) for p in pmids if p))
+            stored = dict(db.query(Article.pmid, Article.citation_data_updated).filter(Article.pmid.in_(pmids)).all()) \
+                if pmids else {}
+            needed = [p for p in pmids if p not in stored or (not metadata_only and not self.is_fresh(stored[p]))]
+            if needed and metadata_only:
+                known = {w for (w,) in db.query(CitationWork.work_id).filter(CitationWork.work_id.in_(needed))}
+                needed = [p for p in needed if p not in known]
+            if needed:
+                await self.ingest(needed, db, force=True, create_missing=True)
+            return self.read_many(db, pmids)
+        finally:
+            if own_session:
+                db.close()
+
+    async def get(self, pmid: str, db: Optional[Session] = None) -> Optional[CitationRecord]:
+        return (await self.get_many([pmid], db)).get(str(pmid))
+
+    # ------------------------------------------------------------------
+    # Ingestion
+    # ------------------------------------------------------------------
+
+    async def ingest(self, pmids: Iterable[str], db: Session, force: bool = False,
+                     create_missing: bool = False) -> Dict[str, int]:
+        """
+        Fetch and store citation data for pmids in one bulk pass
+
+        Articles fetched within max_age are skipped unless force. PMIDs
+        without an article row are created from OpenAlex metadata when
+        create_missing, else reported as not_found. PMIDs another caller is
+        already fetching are awaited rather than fetched again.
+        """
+        pmids = list(dict.fromkeys(str(p) for p in pmids if p))
+        articles = {a.pmid: a for a in db.query(Article).filter(Article.pmid.in_(pmids)).all()} if pmids else {}
+        candidates = [
+            p for p in pmids
+            if (p in articles or create_missing)
+            and (force or p not in articles or not self.is_fresh(articles[p].citation_data_updated))
+        ]
+        result = {
+            "status": "success",
+            "articles_enriched": 0,
+            "articles_skipped": sum(1 for p in pmids if p in articles) - sum(1 for p in candidates if p in articles),
+            "articles_coalesced": 0,
+            "not_found": sum(1 for p in pmids if p not in articles and not create_missing),
+            "citations_added": 0,
+            "references_added": 0,
+            "total_relationships": 0,
+            "api_requests": 0
+        }
+
+        waiting = {p: self._inflight[p] for p in candidates if p in self._inflight}
+        mine = [p for p in candidates if p not in waiting]
+        loop = asyncio.get_running_loop()
+        futures = {p: loop.create_future() for p in mine}
+        self._inflight.update(futures)
+        try:
+            if mine:
+                self.upstream_fetches += len(mine)
+                await self._fetch_and_store(mine, articles, db, result)
+        except Exception as e:
+            logger.error(f"Citation ingestion failed for {len(mine)} articles: {e}")
+            db.rollback()
+            return {"error": str(e)}
+        finally:
+            for pmid, future in futures.items():
+                self._inflight.pop(pmid, None)
+                if not future.done():
+                    future.set_result(None)
+
+        if waiting:
+            await asyncio.gather(*waiting.values())
+            self.coalesced += len(waiting)
+            result["articles_coalesced"] = len(waiting)
+        return result
+
+    async def _fetch_and_store(self, pmids: List[str], articles: Dict[str, Article], db: Session,
+                               result: Dict[str, int]):
+        async with self.open_session() as session:
+            client = OpenAlexClient(session, self.openalex_base_url, self.max_concurrency, self.rate_limit_delay)
+            works = await client.works_by_pmid(pmids)
+            cited = [p for p in pmids if (works.get(p) or {}).get("cited_by_count")]
+            citing_works = dict(zip(cited, await asyncio.gather(*[
+                client.cited_by(works[p]["id"], self.max_cited_by) for p in cited
+            ])))
+            reference_ids = list(dict.fromkeys(r for w in works.values() for r in w.get("referenced_works") or []))
+            referenced = await client.works_by_id(reference_ids)
+            result["api_requests"] = client.requests
+
+        related: Dict[str, Dict] = {}
+        edges: Dict[tuple, Dict] = {}
+        enriched = []
+        now = datetime.now(timezone.utc)
+        for pmid in pmids:
+            # Works missing from OpenAlex are stamped with empty lists, like any other result
+            work = works.get(pmid) or {}
+            article = articles.get(pmid)
+            if article is None:
+                if not work:
+                    result["not_found"] += 1
+                    continue
+                article = Article(pmid=pmid, **work_article_fields(work))
+                db.add(article)
+                articles[pmid] = article
+
+            citations = []
+            for citing in citing_works.get(pmid, []):
+                citing_pmid = work_pmid(citing)
+                if citing_pmid and citing_pmid != pmid:
+                    related.setdefault(citing_pmid, citing)
+                    citations.append(citing_pmid)
+                    edges.setdefault((citing_pmid, pmid), {"citation_year": citing.get("publication_year")})
+            references = []
+            for ref_id in work.get("referenced_works") or []:
+                ref = referenced.get(ref_id)
+                ref_pmid = work_pmid(ref) if ref else None
+                if ref_pmid and ref_pmid != pmid:  # unresolved references are picked up on the next refresh
+                    related.setdefault(ref_pmid, ref)
+                    references.append(ref_pmid)
+                    edges.setdefault((pmid, ref_pmid), {"citation_year": work.get("publication_year")})
+
+            article.cited_by_pmids = citations
+            article.references_pmids = references
+            article.citation_count = work.get("cited_by_count") or len(citations)
+            article.citation_data_updated = now
+            enriched.append(pmid)
+            result["articles_enriched"] += 1
+            result["citations_added"] += len(citations)
+            result["references_added"] += len(references)
+
+        db.flush()
+        related_ids = [p for p in related if p not in articles]
+        stored_articles = self._stored_article_pmids(db, related_ids)
+        self._insert_ignore(db, CitationWork.__table__, ["work_id"], [
+            {"work_id": work_id, "openalex_id": related[work_id].get("id"), **work_article_fields(related[work_id])}
+            for work_id in related_ids if work_id not in stored_articles
+        ])
+        # article_citations references articles.pmid, so only article-to-article edges are stored
+        known = set(articles) | stored_articles
+        result["total_relationships"] = self._insert_ignore(
+            db, ArticleCitation.__table__, ["citing_pmid", "cited_pmid"],
+            [{"citing_pmid": citing, "cited_pmid": cited, "citation_context": None,
+              "co_citation_count": 0, "bibliographic_coupling": 0.0, **extra}
+             for (citing, cited), extra in edges.items() if citing in known and cited in known]
+        )
+        db.commit()
+        self._after_ingest(db, enriched, articles)
+
+    def _stored_article_pmids(self, db: Session, pmids: List[str]) -> set:
+        """Subset of pmids that have an article row"""
+        stored = set()
+        for i in range(0, len(pmids), self.edge_batch_size):
+            batch = pmids[i:i + self.edge_batch_size]
+            stored.update(pmid for (pmid,) in db.query(Article.pmid).filter(Article.pmid.in_(batch)))
+        return stored
+
+    def _insert_ignore(self, db: Session, table, keys: List[str], rows: List[Dict]) -> int:
+        """Insert rows in batches, skipping ones whose keys already exist; returns rows inserted"""
+        dialect = db.get_bind().dialect.name
+        inserted = 0
+        for i in range(0, len(rows), self.edge_batch_size):
+            batch = rows[i:i + self.edge_batch_size]
+            if dialect in ("postgresql", "sqlite"):
+                insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+                stmt = insert(table).values(batch).on_conflict_do_nothing(index_elements=[table.c[k] for k in keys])
+            else:
+                existing = set(db.query(*[table.c[k] for k in keys]).filter(
+                    *[table.c[k].in_({row[k] for row in batch}) for k in keys]
+                ).all())
+                batch = [row for row in batch if tuple(row[k] for k in keys) not in existing]
+                if not batch:
+                    continue
+                stmt = table.insert().values(batch)
+            inserted += db.execute(stmt).rowcount or 0
+        return inserted
+
+    def _after_ingest(self, db: Session, pmids: List[str], articles: Dict[str, Article]):
+        """Keep the in-memory citation index and cached network graphs in step with the stored edges"""
+        from services.citation_graph_index import get_citation_graph_index
+        index = get_citation_graph_index()
+        for pmid in pmids:
+            article = articles[pmid]
+            try:
+                index.update_article(pmid, article.references_pmids, article.cited_by_pmids)
+            except Exception as e:
+                logger.error(f"Error updating citation graph index for {pmid}: {e}")
+        try:
+            from services.network_graph_cache import get_network_graph_cache
+            get_network_graph_cache().refresh_articles(db, pmids)
+        except Exception as e:
+            logger.error(f"Error patching network graph cache for {len(pmids)} articles: {e}")
+            db.rollback()
+
+
+# Global store instance
+_citation_store: Optional[CitationStore] = None
+
+
+def get_citation_store() -> CitationStore:
+    """Get global citation store instance"""
+    global _citation_store
+    if _citation_store is None:
+        _citation_store = CitationStore()
+    return _citation_store
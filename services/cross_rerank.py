@@ -0,0 +1,164 @@
+"""
+Cross-Encoder Reranking
+Budgeted second-stage reranking of triage shortlists
+
+`_triage_rank` orders candidates with bi-encoder cosine and lexicon
+heuristics. This stage rescores the top N of that ordering with a
+cross-encoder (objective, title + abstract), which reads both texts together
+and is much better at relevance, but costs a forward pass per pair. To keep
+that affordable:
+
+- pairs are scored in batches (one `predict` call per batch), in bi-encoder
+  rank order, so the most promising candidates are scored first
+- scores are cached per (objective hash, PMID); repeat reviews of the same
+  objective and re-ranks of overlapping pools only score new papers
+- a time budget bounds the stage: before each batch the elapsed time plus the
+  slowest batch so far must fit, otherwise scoring stops
+
+Scored candidates get `score = (1 - weight) * score + weight * ce_score` and
+are re-sorted among themselves; everything after the first unscored
+candidate keeps its bi-encoder order, so an exhausted budget degrades to the
+bi-encoder ranking rather than mixing incomparable scores. No model means
+the input order is returned unchanged.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RerankReport:
+    """What the reranking stage did, for review diagnostics"""
+    applied: bool = False
+    reason: str = ""
+    candidates: int = 0
+    scored: int = 0
+    cache_hits: int = 0
+    batches: int = 0
+    latency_ms: float = 0.0
+    budget_ms: float = 0.0
+    budget_exhausted: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class RerankScoreCache:
+    """Thread-safe LRU of cross-encoder scores keyed by (objective hash, paper key)"""
+
+    def __init__(self, max_size: int = 50000):
+        self.max_size = max_size
+        self._scores: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, str]) -> Optional[float]:
+        with self._lock:
+            score = self._scores.get(key)
+            if score is not None:
+                self._scores.move_to_end(key)
+            return score
+
+    def put(self, key: Tuple[str, str], score: float):
+        with self._lock:
+            self._scores[key] = score
+            self._scores.move_to_end(key)
+            while len(self._scores) > self.max_size:
+                self._scores.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._scores.clear()
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+
+def objective_hash(objective: str) -> str:
+    return hashlib.sha1(" ".join((objective or "").lower().split()).encode("utf-8")).hexdigest()[:16]
+
+
+def paper_key(paper: Dict[str, Any]) -> str:
+    pmid = paper.get("pmid")
+    if pmid:
+        return str(pmid)
+    return "t:" + hashlib.sha1((paper.get("title") or "").lower().encode("utf-8")).hexdigest()[:16]
+
+
+def pair_text(paper: Dict[str, Any], max_chars: int = 2000) -> str:
+    return ((paper.get("title") or "") + ". " + (paper.get("abstract") or ""))[:max_chars]
+
+
+def rerank(objective: str, ranked: List[Dict[str, Any]], model, cache: RerankScoreCache,
+           top_n: int = 30, batch_size: int = 16, budget_s: float = 3.0,
+           weight: float = 0.3) -> Tuple[List[Dict[str, Any]], RerankReport]:
+    """
+    Rescore the top `top_n` of a bi-encoder ordering with a cross-encoder
+
+    Args:
+        objective: Review objective (the query side of every pair)
+        ranked: Candidates sorted by their heuristic `score`, best first
+        model: Object with CrossEncoder-style `predict(pairs, batch_size=...)`, or None
+        cache: Score cache shared across requests
+        budget_s: Wall-clock budget for scoring
+
+    Returns:
+        (reordered candidates, RerankReport)
+    """
+    report = RerankReport(candidates=min(top_n, len(ranked)), budget_ms=round(budget_s * 1000, 1))
+    if model is None:
+        report.reason = "no_model"
+        return ranked, report
+    if not ranked or top_n <= 0:
+        report.reason = "empty"
+        return ranked, report
+    if budget_s <= 0:
+        report.reason = "no_time"
+        report.budget_exhausted = True
+        return ranked, report
+
+    started = time.monotonic()
+    obj_key = objective_hash(objective)
+    head = ranked[:top_n]
+    scores: List[Optional[float]] = [cache.get((obj_key, paper_key(p))) for p in head]
+    report.cache_hits = sum(1 for s in scores if s is not None)
+
+    missing = [i for i, s in enumerate(scores) if s is None]
+    slowest_batch = 0.0
+    for start in range(0, len(missing), max(1, batch_size)):
+        elapsed = time.monotonic() - started
+        if elapsed + slowest_batch > budget_s:
+            report.budget_exhausted = True
+            break
+        batch = missing[start:start + batch_size]
+        batch_started = time.monotonic()
+        try:
+            predicted = model.predict([(objective or "", pair_text(head[i])) for i in batch], batch_size=len(batch))
+        except Exception as e:
+            logger.warning(f"⚠️ Cross-encoder rerank batch failed: {e}")
+            report.reason = "model_error"
+            break
+        slowest_batch = max(slowest_batch, time.monotonic() - batch_started)
+        report.batches += 1
+        for i, value in zip(batch, predicted):
+            scores[i] = float(value)
+            cache.put((obj_key, paper_key(head[i])), scores[i])
+        report.scored += len(batch)
+
+    # Only the fully scored prefix is reordered; the rest keeps the bi-encoder order
+    prefix = next((i for i, s in enumerate(scores) if s is None), len(head))
+    for paper, ce in zip(head[:prefix], scores[:prefix]):
+        paper["cross_encoder_score"] = round(ce, 4)
+        paper["score"] = round((1.0 - weight) * float(paper.get("score", 0.0)) + weight * ce, 3)
+    reordered = sorted(head[:prefix], key=lambda p: p.get("score", 0.0), reverse=True) + head[prefix:] + ranked[top_n:]
+
+    report.applied = prefix > 0
+    report.reason = report.reason or ("ok" if prefix == len(head) else "partial")
+    report.latency_ms = round((time.monotonic() - started) * 1000, 1)
+    return reordered, report
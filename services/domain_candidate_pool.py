@@ -0,0 +1,274 @@
+"""
+Domain Candidate Pools
+Shared per-domain paper pools for recommendation generation
+
+"Papers for You" and "Trending in Your Field" used to run fresh PubMed
+searches for every user and every domain, with date windows hard-coded to
+2022-2025. Most users share a handful of domains ("oncology", "diabetes"),
+so this module keeps one candidate pool per (domain, kind):
+
+- recent:   relevance-sorted papers from a rolling two-year window
+- trending: date-sorted papers from a rolling one-year window
+
+Each pool is refreshed at most once per interval (concurrent requests for
+the same pool wait on one refresh) and stored with precomputed, L2
+normalized hashed text embeddings and citation velocity. A refresh that
+fails or finds nothing (PubMed errors come back as empty results) keeps the
+previous pool and is retried after a short interval. Per-user ranking
+is then a matrix-vector product against the pool, so PubMed traffic scales
+with distinct domains rather than users x domains.
+"""
+
+import asyncio
+import logging
+import re
+import time
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from database import Article
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DIM = 1024
+POOL_SIZE = 40
+REFRESH_INTERVAL_SECONDS = 6 * 3600
+RETRY_INTERVAL_SECONDS = 60  # after a failed or empty refresh
+
+DOMAIN_KEYWORDS = {
+    "nephrology": ["kidney", "renal", "dialysis", "creatinine", "nephrology"],
+    "diabetes": ["diabetic", "glucose", "insulin", "glycemic", "diabetes"],
+    "cardiovascular": ["heart", "cardiac", "hypertension", "blood pressure", "cardiovascular"],
+    "pharmacology": ["drug", "medication", "therapeutic", "treatment", "pharmacology"],
+    "machine learning": ["AI", "artificial intelligence", "algorithm", "neural", "machine learning"],
+    "oncology": ["cancer", "tumor", "chemotherapy", "malignant", "oncology"],
+    "neurology": ["brain", "neurological", "alzheimer", "neurology", "cognitive"],
+    "medicine": ["medical", "clinical", "patient", "treatment", "therapy"],
+    "biology": ["biological", "molecular", "cellular", "genetic", "protein"],
+    "chemistry": ["chemical", "compound", "synthesis", "molecular", "reaction"]
+}
+
+# (sort, [(years back, keyword count), ...]) - later windows are fallbacks when earlier ones are empty
+POOL_KINDS = {
+    "recent": ("relevance", [(2, 3), (3, 3), (None, 2)]),
+    "trending": ("date", [(1, 3), (2, 3), (3, 2)]),
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_hash_memo: Dict[str, int] = {}
+
+
+def domain_keywords(domain: str) -> List[str]:
+    return DOMAIN_KEYWORDS.get(domain.lower(), [domain])
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall((text or "").lower()) if len(t) > 2]
+
+
+def _token_hash(token: str) -> int:
+    h = _hash_memo.get(token)
+    if h is None:
+        h = _hash_memo[token] = zlib.crc32(token.encode())
+    return h
+
+
+def embed_texts(texts: Iterable[str], dim: int = EMBEDDING_DIM) -> np.ndarray:
+    """
+    Signed feature-hashing embeddings, one L2-normalized row per text
+
+    Deterministic and model-free, so pool vectors can be computed once at
+    refresh time and user vectors at request time land in the same space.
+    """
+    texts = list(texts)
+    matrix = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for token in tokenize(text):
+            h = _token_hash(token)
+            matrix[row, h % dim] += 1.0 if (h >> 16) & 1 else -1.0
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+def paper_text(paper: Dict[str, Any]) -> str:
+    abstract = paper.get("abstract") or ""
+    if abstract == "No abstract available":
+        abstract = ""
+    return f"{paper.get('title') or ''} {abstract}"
+
+
+def pool_queries(domain: str, kind: str, year: Optional[int] = None) -> List[Tuple[str, str]]:
+    """PubMed (query, sort) pairs for a pool, with rolling date windows"""
+    sort, windows = POOL_KINDS[kind]
+    year = year or datetime.now(timezone.utc).year
+    keywords = domain_keywords(domain)
+    queries = []
+    for years_back, keyword_count in windows:
+        query = f"({' OR '.join(keywords[:keyword_count])})"
+        if years_back is not None:
+            query += f" AND (\"{year - years_back}\"[Date - Publication]:\"{year}\"[Date - Publication])"
+        queries.append((query, sort))
+    return queries
+
+
+@dataclass
+class DomainPool:
+    """Candidate papers for one (domain, kind) with precomputed features"""
+    domain: str
+    kind: str
+    papers: List[Dict[str, Any]] = field(default_factory=list)
+    embeddings: np.ndarray = field(default_factory=lambda: np.zeros((0, EMBEDDING_DIM), dtype=np.float32))
+    velocity: np.ndarray = field(default_factory=lambda: np.zeros(0))  # citations per month since publication
+    recency: np.ndarray = field(default_factory=lambda: np.zeros(0))  # 1.0 newest .. 0.0 oldest
+    refreshed_at: float = 0.0
+
+    def __len__(self):
+        return len(self.papers)
+
+
+class DomainCandidatePoolService:
+    """Refreshes and ranks shared per-domain candidate pools"""
+
+    def __init__(self, search_fn: Callable[..., Awaitable[List[Dict[str, Any]]]],
+                 refresh_interval: float = REFRESH_INTERVAL_SECONDS, pool_size: int = POOL_SIZE,
+                 retry_interval: float = RETRY_INTERVAL_SECONDS):
+        self.search_fn = search_fn
+        self.refresh_interval = refresh_interval
+        self.retry_interval = retry_interval
+        self.pool_size = pool_size
+        self._pools: Dict[Tuple[str, str], DomainPool] = {}
+        self._locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+        self._retry_at: Dict[Tuple[str, str], float] = {}  # next refresh attempt after a failed one
+        self.refresh_count = 0
+
+    def _is_fresh(self, key: Tuple[str, str], pool: Optional[DomainPool]) -> bool:
+        if pool is None:
+            return False
+        if key in self._retry_at:
+            return time.monotonic() < self._retry_at[key]
+        return time.monotonic() - pool.refreshed_at < self.refresh_interval
+
+    async def get_pool(self, domain: str, kind: str = "recent", db: Optional[Session] = None) -> DomainPool:
+        """Pool for a domain, refreshing it first if it is missing or expired"""
+        key = (domain.lower(), kind)
+        pool = self._pools.get(key)
+        if self._is_fresh(key, pool):
+            return pool
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            pool = self._pools.get(key)
+            if self._is_fresh(key, pool):
+                return pool
+            try:
+                refreshed = await self._refresh(key[0], kind, db)
+            except Exception as e:
+                logger.error(f"❌ Candidate pool refresh failed for {key}: {e}")
+                refreshed = None
+            if refreshed is not None and len(refreshed):
+                self._pools[key] = refreshed
+                self._retry_at.pop(key, None)
+                return refreshed
+            # Keep serving the previous pool (if any) and retry soon rather than in REFRESH_INTERVAL_SECONDS
+            pool = self._pools.setdefault(key, DomainPool(domain=key[0], kind=kind))
+            self._retry_at[key] = time.monotonic() + self.retry_interval
+            return pool
+
+    async def _refresh(self, domain: str, kind: str, db: Optional[Session]) -> DomainPool:
+        papers = []
+        for query, sort in pool_queries(domain, kind):
+            papers = await self.search_fn(query, max_results=self.pool_size, sort=sort)
+            if papers:
+                break
+        self.refresh_count += 1
+
+        now = datetime.now(timezone.utc)
+        citations = self._known_citations(db, [p.get("pmid") for p in papers])
+        velocity = np.zeros(len(papers))
+        for i, paper in enumerate(papers):
+            count = max(paper.get("citation_count") or 0, citations.get(paper.get("pmid"), 0))
+            paper["citation_count"] = count
+            year = paper.get("publication_year") or now.year
+            months = max(1, (now.year - year) * 12 + now.month)
+            velocity[i] = count / months
+
+        n = len(papers)
+        if kind == "trending":
+            # Results are date-sorted: earlier rows are newer
+            recency = 1.0 - np.arange(n) / max(n, 1)
+        else:
+            years = np.array([p.get("publication_year") or now.year for p in papers], dtype=float)
+            recency = np.clip(1.0 - (now.year - years) / 5.0, 0.0, 1.0)
+
+        logger.info(f"🗂️ Candidate pool refreshed: {domain}/{kind} ({n} papers)")
+        return DomainPool(
+            domain=domain, kind=kind, papers=papers,
+            embeddings=embed_texts(paper_text(p) for p in papers),
+            velocity=velocity, recency=recency, refreshed_at=time.monotonic()
+        )
+
+    def _known_citations(self, db: Optional[Session], pmids: List[str]) -> Dict[str, int]:
+        """Citation counts we already hold locally (PubMed eUtils has none)"""
+        pmids = [p for p in pmids if p]
+        if db is None or not pmids:
+            return {}
+        try:
+            rows = db.query(Article.pmid, Article.citation_count).filter(Article.pmid.in_(pmids)).all()
+            return {pmid: count or 0 for pmid, count in rows}
+        except Exception as e:
+            logger.warning(f"⚠️ Could not load citation counts for pool: {e}")
+            return {}
+
+    # ------------------------------------------------------------------
+    # Ranking
+    # ------------------------------------------------------------------
+
+    def profile_vector(self, user_profile: Dict[str, Any]) -> np.ndarray:
+        """Embedding of a user's domains, their keywords and topic preferences"""
+        terms = []
+        for domain in user_profile.get("primary_domains", []):
+            terms.append(domain)
+            terms.extend(domain_keywords(domain))
+        terms.extend(user_profile.get("topic_preferences", {}) or {})
+        return embed_texts([" ".join(terms)])[0]
+
+    def rank(self, pool: DomainPool, user_profile: Dict[str, Any], exclude: Iterable[str] = (),
+             limit: int = 8, weights: Tuple[float, float, float] = (0.6, 0.25, 0.15)) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Top papers of a pool for one user as (paper copy, score)
+
+        score = w_sim * cosine(profile, paper) + w_vel * normalized citation
+        velocity + w_rec * recency, computed for the whole pool at once.
+        """
+        if not len(pool):
+            return []
+        w_sim, w_vel, w_rec = weights
+        similarity = np.clip(pool.embeddings @ self.profile_vector(user_profile), 0.0, 1.0)
+        velocity = np.log1p(pool.velocity)
+        if velocity.max() > 0:
+            velocity = velocity / velocity.max()
+        scores = w_sim * similarity + w_vel * velocity + w_rec * pool.recency
+
+        excluded = set(exclude)
+        ranked = []
+        for i in np.argsort(-scores, kind="stable"):
+            paper = pool.papers[i]
+            if paper.get("pmid") in excluded:
+                continue
+            ranked.append((dict(paper), float(round(scores[i], 4))))
+            if len(ranked) >= limit:
+                break
+        return ranked
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pools": len(self._pools),
+            "refreshes": self.refresh_count,
+            "papers": sum(len(p) for p in self._pools.values()),
+        }
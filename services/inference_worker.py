@@ -0,0 +1,199 @@
+"""
+Inference Worker
+Micro-batching in-process model inference
+
+Encoding one text at a time inside an `async def` blocks the event loop for
+the whole forward pass and wastes the model's batch throughput. An
+InferenceWorker owns a request queue and one or more worker threads:
+
+- callers submit single texts and get a future back (`submit`, or
+  `await encode(...)` from async code, which never blocks the loop)
+- a worker takes the first queued request, keeps collecting until it has
+  max_batch_size texts or max_latency_ms has passed since that request
+  arrived, and runs the whole batch through the model in one call
+- results (or the batch's exception) are delivered to each future
+
+Defaults come from INFERENCE_BATCH_SIZE, INFERENCE_MAX_LATENCY_MS and
+INFERENCE_THREADS. `get_stats()` reports throughput, batch sizes and
+queueing latency.
+"""
+
+import asyncio
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = int(os.getenv("INFERENCE_BATCH_SIZE", "32"))
+DEFAULT_MAX_LATENCY_MS = float(os.getenv("INFERENCE_MAX_LATENCY_MS", "5"))
+DEFAULT_THREADS = int(os.getenv("INFERENCE_THREADS", "1"))
+
+_STOP = object()
+
+
+class InferenceWorker:
+    """Queue-fed worker threads that micro-batch encode requests"""
+
+    def __init__(self, encode_batch: Callable[[List[Any]], Sequence[Any]],
+                 max_batch_size: int = DEFAULT_BATCH_SIZE,
+                 max_latency_ms: float = DEFAULT_MAX_LATENCY_MS,
+                 num_threads: int = DEFAULT_THREADS,
+                 name: str = "inference"):
+        self.encode_batch = encode_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_latency = max(0.0, max_latency_ms) / 1000
+        self.num_threads = max(1, num_threads)
+        self.name = name
+        self._queue: "queue.Queue" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._requests = 0
+        self._batches = 0
+        self._items = 0
+        self._failed_batches = 0
+        self._busy_seconds = 0.0
+        self._wait_seconds = 0.0
+        self._max_batch_seen = 0
+        self._started_at: Optional[float] = None
+
+    # ------------------------------------------------------------------
+    # Submission
+    # ------------------------------------------------------------------
+
+    def _ensure_started(self):
+        if self._threads:
+            return
+        with self._start_lock:
+            if self._threads:
+                return
+            self._started_at = time.time()
+            for i in range(self.num_threads):
+                thread = threading.Thread(target=self._run, name=f"{self.name}-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            logger.info(f"🧵 {self.name} inference worker started: {self.num_threads} threads, "
+                        f"batch {self.max_batch_size}, max latency {self.max_latency * 1000:.1f}ms")
+
+    def submit(self, item: Any) -> Future:
+        """Queue one input; the future resolves to its model output"""
+        self._ensure_started()
+        future: Future = Future()
+        with self._stats_lock:
+            self._requests += 1
+        self._queue.put((item, future, time.monotonic()))
+        return future
+
+    async def encode(self, item: Any) -> Any:
+        """Await one model output without blocking the event loop"""
+        return await asyncio.wrap_future(self.submit(item))
+
+    async def encode_many(self, items: Iterable[Any]) -> List[Any]:
+        """Submit every input at once so they share batches"""
+        futures = [self.submit(item) for item in items]
+        return list(await asyncio.gather(*[asyncio.wrap_future(f) for f in futures]))
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker threads after the queued requests are served"""
+        threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(_STOP)
+        if wait:
+            for thread in threads:
+                thread.join()
+
+    # ------------------------------------------------------------------
+    # Worker loop
+    # ------------------------------------------------------------------
+
+    def _collect(self, first) -> List[tuple]:
+        """The first request plus whatever arrives before the batch fills or its deadline passes"""
+        batch = [first]
+        deadline = first[2] + self.max_latency
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                request = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is _STOP:
+                self._queue.put(_STOP)  # let this thread finish the batch, then stop
+                break
+            batch.append(request)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            batch = [r for r in self._collect(first) if r[1].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            started = time.monotonic()
+            try:
+                outputs = self.encode_batch([item for item, _, _ in batch])
+                if len(outputs) != len(batch):
+                    raise ValueError(f"{self.name}: model returned {len(outputs)} outputs for {len(batch)} inputs")
+                error = None
+            except Exception as e:
+                logger.error(f"❌ {self.name} batch of {len(batch)} failed: {e}")
+                error = e
+            finished = time.monotonic()
+
+            with self._stats_lock:
+                self._batches += 1
+                self._items += len(batch)
+                self._busy_seconds += finished - started
+                self._wait_seconds += sum(started - enqueued for _, _, enqueued in batch)
+                self._max_batch_seen = max(self._max_batch_seen, len(batch))
+                if error is not None:
+                    self._failed_batches += 1
+
+            for i, (_, future, _) in enumerate(batch):
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(outputs[i])
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            batches, items = self._batches, self._items
+            return {
+                "name": self.name,
+                "threads": self.num_threads,
+                "max_batch_size": self.max_batch_size,
+                "max_latency_ms": self.max_latency * 1000,
+                "requests": self._requests,
+                "batches": batches,
+                "items": items,
+                "failed_batches": self._failed_batches,
+                "queue_depth": self._queue.qsize(),
+                "avg_batch_size": round(items / batches, 2) if batches else 0.0,
+                "max_batch_seen": self._max_batch_seen,
+                "avg_queue_wait_ms": round(self._wait_seconds / items * 1000, 3) if items else 0.0,
+                "avg_batch_ms": round(self._busy_seconds / batches * 1000, 3) if batches else 0.0,
+                "items_per_busy_second": round(items / self._busy_seconds, 1) if self._busy_seconds else 0.0,
+                "uptime_seconds": round(time.time() - self._started_at, 1) if self._started_at else 0.0,
+            }
+
+
+def sentence_encoder(model, name: str = "embeddings", **kwargs) -> InferenceWorker:
+    """InferenceWorker around a SentenceTransformer-style model.encode(list) -> 2D array"""
+
+    def encode_batch(texts: List[str]) -> np.ndarray:
+        return np.asarray(model.encode(texts, batch_size=len(texts), show_progress_bar=False))
+
+    return InferenceWorker(encode_batch, name=name, **kwargs)
@@ -6,21 +6,35 @@ terms and trending keywords from PubMed. Integrates with existing search and gen
 functionality to enhance research discovery.
 
 This service is designed to complement (not replace) existing functionality.
+
+MeSH lookups go through services.mesh_index.MeshIndex, built from the full
+descriptor set at MESH_VOCABULARY_PATH (NLM desc XML or the compact TSV from
+scripts/build_mesh_vocabulary.py). Without that file the index holds the basic
+terms below.
 """
 
 import asyncio
 import logging
 import json
+import os
 import re
+import threading
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 import aiohttp
 from collections import defaultdict, Counter
 
+from services.mesh_index import MeshDescriptor, MeshIndex, load_descriptors
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+DEFAULT_VOCABULARY_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "mesh", "mesh_descriptors.tsv.gz")
+
+# relevance_score per match kind
+MATCH_RELEVANCE = {"exact": 1.0, "prefix": 0.9, "word_prefix": 0.8, "infix": 0.7}
+
 class MeSHAutocompleteService:
     """
     Intelligent autocomplete service for medical research terms.
@@ -32,16 +46,56 @@ class MeSHAutocompleteService:
     - Integration with generate-review workflow
     """
     
-    def __init__(self):
+    def __init__(self, vocabulary_path: Optional[str] = None):
         self.mesh_terms = {}
         self.trending_cache = {}
         self.cache_expiry = timedelta(hours=24)
         self.last_cache_update = None
+        self.vocabulary_path = vocabulary_path or os.getenv("MESH_VOCABULARY_PATH", DEFAULT_VOCABULARY_PATH)
+        self._index: Optional[MeshIndex] = None
+        self.using_fallback_vocabulary = False
+        self._index_lock = threading.Lock()
         
-        # Initialize with basic medical terms (will be expanded)
+        # Basic medical terms, used when the full vocabulary file is missing
         self._initialize_basic_mesh_terms()
         
         logger.info("🔍 MeSH Autocomplete Service initialized")
+
+    @property
+    def index(self) -> MeshIndex:
+        """Autocomplete index, built on first use (or by the startup warm-up)"""
+        if self._index is None:
+            with self._index_lock:
+                if self._index is None:
+                    self._index = self._build_index()
+        return self._index
+
+    async def get_index(self) -> MeshIndex:
+        """`index` for async callers: a build (or wait on one) runs off the event loop"""
+        if self._index is not None:
+            return self._index
+        return await asyncio.to_thread(lambda: self.index)
+
+    def _build_index(self) -> MeshIndex:
+        descriptors: List[MeshDescriptor] = []
+        if os.path.exists(self.vocabulary_path):
+            try:
+                descriptors = load_descriptors(self.vocabulary_path)
+            except Exception as e:
+                logger.error(f"❌ Failed to load MeSH vocabulary from {self.vocabulary_path}: {e}")
+        else:
+            logger.warning(f"⚠️ MeSH vocabulary not found at {self.vocabulary_path}; autocomplete is limited to "
+                           f"{len(self.mesh_terms)} basic terms (build it with scripts/build_mesh_vocabulary.py)")
+        self.using_fallback_vocabulary = not descriptors
+        if not descriptors:
+            descriptors = [
+                MeshDescriptor(mesh_id=data["mesh_id"], name=term, entry_terms=data.get("synonyms", []),
+                               category=data["category"])
+                for term, data in self.mesh_terms.items()
+            ]
+        index = MeshIndex(descriptors)
+        logger.info(f"📚 MeSH index: {len(index.descriptors)} descriptors, {index.term_count} terms")
+        return index
     
     def _initialize_basic_mesh_terms(self):
         """Initialize with essential medical terms for immediate functionality"""
@@ -166,35 +220,23 @@ class MeSHAutocompleteService:
         }
     
     async def _search_mesh_terms(self, query: str, limit: int) -> List[Dict[str, Any]]:
-        """Search for matching MeSH terms"""
+        """Search for matching MeSH terms (best term per descriptor, by match kind then popularity)"""
         matches = []
-        
-        for term, data in self.mesh_terms.items():
-            # Check main term
-            if query in term.lower():
-                matches.append({
-                    "term": term,
-                    "mesh_id": data["mesh_id"],
-                    "category": data["category"],
-                    "type": "mesh_term",
-                    "relevance_score": self._calculate_relevance(query, term)
-                })
-            
-            # Check synonyms
-            for synonym in data.get("synonyms", []):
-                if query in synonym.lower() and len(matches) < limit:
-                    matches.append({
-                        "term": synonym,
-                        "mesh_id": data["mesh_id"],
-                        "category": data["category"],
-                        "type": "mesh_synonym",
-                        "main_term": term,
-                        "relevance_score": self._calculate_relevance(query, synonym)
-                    })
-        
-        # Sort by relevance and return top matches
-        matches.sort(key=lambda x: x["relevance_score"], reverse=True)
-        return matches[:limit]
+        index = await self.get_index()
+        for match in index.search(query, limit):
+            descriptor = match.descriptor
+            item = {
+                "term": match.term,
+                "mesh_id": descriptor.mesh_id,
+                "category": descriptor.category,
+                "type": "mesh_term" if match.is_main_term else "mesh_synonym",
+                "relevance_score": MATCH_RELEVANCE[match.match],
+                "popularity": round(descriptor.popularity, 4),
+            }
+            if not match.is_main_term:
+                item["main_term"] = descriptor.name
+            matches.append(item)
+        return matches
     
     async def _search_trending_keywords(self, query: str, limit: int) -> List[Dict[str, Any]]:
         """Search for trending keywords (mock implementation for now)"""
@@ -289,16 +331,16 @@ class MeSHAutocompleteService:
     
     async def get_mesh_term_details(self, mesh_id: str) -> Optional[Dict[str, Any]]:
         """Get detailed information about a specific MeSH term"""
-        for term, data in self.mesh_terms.items():
-            if data["mesh_id"] == mesh_id:
-                return {
-                    "term": term,
-                    "mesh_id": mesh_id,
-                    "synonyms": data.get("synonyms", []),
-                    "category": data["category"],
-                    "description": f"MeSH term for {term} research"
-                }
-        return None
+        descriptor = (await self.get_index()).descriptor(mesh_id)
+        if descriptor is None:
+            return None
+        return {
+            "term": descriptor.name,
+            "mesh_id": mesh_id,
+            "synonyms": descriptor.entry_terms,
+            "category": descriptor.category,
+            "description": f"MeSH term for {descriptor.name} research"
+        }
 
 # Global service instance
 _mesh_service = None
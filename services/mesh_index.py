@@ -0,0 +1,335 @@
+"""
+MeSH Index
+Compact in-memory autocomplete index over MeSH descriptors and entry terms
+
+The full MeSH vocabulary has ~30k descriptors and ~300k entry terms, far too
+many for a linear `query in term` scan per keystroke. The index keeps:
+
+- every normalized term concatenated into one string (`\\0`-separated), with
+  `array` offsets, instead of 300k small Python strings
+- two sorted position arrays over that string (a suffix array restricted to
+  term starts and to word starts); a prefix is a contiguous range found by
+  binary search
+- for prefixes whose range is large (short queries such as "ca"), the top
+  entries by popularity, precomputed at build time, so no query scans more
+  than `dense_range` positions
+- a trigram index (posting arrays) for infix matches ("plasm" in
+  "Neoplasms"), used only when prefix matches do not fill the limit
+
+Entries are numbered in descending popularity, so any ascending list of entry
+ids is already in popularity order and posting-list scans can stop early.
+Popularity is precomputed per descriptor, from PubMed usage counts when the
+vocabulary file has them and from tree depth and synonym count otherwise.
+
+Vocabulary files (`load_descriptors`):
+- NLM descriptor XML (desc20XX.xml[.gz], https://www.nlm.nih.gov/databases/download/mesh.html)
+- the compact TSV written by scripts/build_mesh_vocabulary.py:
+  mesh_id, name, tree numbers (|), popularity, entry terms (|)
+"""
+
+import csv
+import gzip
+import heapq
+import math
+import re
+import xml.etree.ElementTree as ET
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+SEP = "\0"
+_NON_WORD = re.compile(r"[\W_]+")
+
+# Tree-number prefixes mapped to the categories the autocomplete UI already uses
+TREE_CATEGORIES = [
+    ("C04", "oncology"),
+    ("C10", "neurology"),
+    ("C14", "cardiology"),
+    ("C19", "endocrinology"),
+    ("C18", "endocrinology"),
+    ("C01", "infectious_diseases"),
+    ("G05", "genetics"),
+    ("A", "anatomy"),
+    ("B", "organisms"),
+    ("C", "diseases"),
+    ("D", "chemicals_and_drugs"),
+    ("E", "techniques_and_equipment"),
+    ("F", "psychiatry_and_psychology"),
+    ("G", "phenomena_and_processes"),
+    ("H", "disciplines_and_occupations"),
+    ("N", "health_care"),
+]
+
+
+def normalize(text: str) -> str:
+    """Case-folded words separated by single spaces ("Alzheimer's" -> "alzheimer s")"""
+    return _NON_WORD.sub(" ", (text or "").casefold()).strip()
+
+
+def category_of(tree_numbers: Iterable[str]) -> str:
+    for prefix, category in TREE_CATEGORIES:
+        if any(t.startswith(prefix) for t in tree_numbers):
+            return category
+    return "other"
+
+
+@dataclass
+class MeshDescriptor:
+    mesh_id: str
+    name: str
+    entry_terms: List[str] = field(default_factory=list)
+    tree_numbers: List[str] = field(default_factory=list)
+    popularity: Optional[float] = None
+    category: Optional[str] = None
+
+    def __post_init__(self):
+        if self.category is None:
+            self.category = category_of(self.tree_numbers)
+
+
+def default_popularity(descriptor: MeshDescriptor) -> float:
+    """Broad, well-known headings first: shallow tree position and many entry terms"""
+    depth = min((t.count(".") + 1 for t in descriptor.tree_numbers), default=6)
+    return 0.7 / depth + 0.3 * min(1.0, math.log1p(len(descriptor.entry_terms)) / math.log1p(50))
+
+
+def _open_text(path: str):
+    return gzip.open(path, "rt", encoding="utf-8") if path.endswith(".gz") else open(path, encoding="utf-8")
+
+
+def iter_descriptor_xml(path: str) -> Iterator[MeshDescriptor]:
+    """Stream descriptors from an NLM DescriptorRecordSet file without loading the whole tree"""
+    with (gzip.open(path, "rb") if path.endswith(".gz") else open(path, "rb")) as f:
+        for _, elem in ET.iterparse(f, events=("end",)):
+            if elem.tag != "DescriptorRecord":
+                continue
+            name = elem.findtext("DescriptorName/String") or ""
+            terms = []
+            for term in elem.iterfind("ConceptList/Concept/TermList/Term/String"):
+                if term.text and term.text != name and term.text not in terms:
+                    terms.append(term.text)
+            yield MeshDescriptor(
+                mesh_id=elem.findtext("DescriptorUI") or "",
+                name=name,
+                entry_terms=terms,
+                tree_numbers=[t.text for t in elem.iterfind("TreeNumberList/TreeNumber") if t.text],
+            )
+            elem.clear()
+
+
+def iter_descriptor_tsv(path: str) -> Iterator[MeshDescriptor]:
+    with _open_text(path) as f:
+        for row in csv.reader(f, delimiter="\t", quoting=csv.QUOTE_NONE):
+            if not row or row[0].startswith("#"):
+                continue
+            row += [""] * (5 - len(row))
+            yield MeshDescriptor(
+                mesh_id=row[0],
+                name=row[1],
+                tree_numbers=[t for t in row[2].split("|") if t],
+                popularity=float(row[3]) if row[3] else None,
+                entry_terms=[t for t in row[4].split("|") if t],
+            )
+
+
+def load_descriptors(path: str) -> List[MeshDescriptor]:
+    if path.endswith((".xml", ".xml.gz")):
+        return list(iter_descriptor_xml(path))
+    return list(iter_descriptor_tsv(path))
+
+
+def write_descriptor_tsv(descriptors: Iterable[MeshDescriptor], path: str):
+    with (gzip.open(path, "wt", encoding="utf-8") if path.endswith(".gz") else open(path, "w", encoding="utf-8")) as f:
+        f.write("# mesh_id\tname\ttree_numbers\tpopularity\tentry_terms\n")
+        for d in descriptors:
+            popularity = d.popularity if d.popularity is not None else default_popularity(d)
+            clean = lambda s: s.replace("\t", " ").replace("|", " ")
+            f.write(f"{d.mesh_id}\t{clean(d.name)}\t{'|'.join(d.tree_numbers)}\t{popularity:.6f}\t"
+                    f"{'|'.join(clean(t) for t in d.entry_terms)}\n")
+
+
+@dataclass
+class MeshMatch:
+    term: str
+    descriptor: MeshDescriptor
+    match: str  # exact, prefix, word_prefix, infix
+
+    @property
+    def is_main_term(self) -> bool:
+        return self.term == self.descriptor.name
+
+
+class MeshIndex:
+    """Prefix / word-prefix / infix lookup over MeSH terms, ranked by precomputed popularity"""
+
+    def __init__(self, descriptors: Iterable[MeshDescriptor], top_k: int = 32, dense_range: int = 64,
+                 infix_scan_limit: int = 2000):
+        self.top_k = top_k
+        self.dense_range = dense_range
+        self.infix_scan_limit = infix_scan_limit
+        self.descriptors: List[MeshDescriptor] = []
+        self._by_id: Dict[str, int] = {}
+
+        entries: List[Tuple[float, int, int, str, str]] = []  # (-popularity, order, descriptor, display, norm)
+        for d in descriptors:
+            if not d.mesh_id or d.mesh_id in self._by_id:
+                continue
+            if d.popularity is None:
+                d.popularity = default_popularity(d)
+            idx = len(self.descriptors)
+            self._by_id[d.mesh_id] = idx
+            self.descriptors.append(d)
+            seen = set()
+            for order, term in enumerate([d.name] + list(d.entry_terms)):
+                norm = normalize(term)
+                if norm and norm not in seen:
+                    seen.add(norm)
+                    entries.append((-d.popularity, order, idx, term, norm))
+        entries.sort(key=lambda e: (e[0], e[1], e[4]))
+
+        self._display = SEP.join(e[3] for e in entries) + SEP
+        self._text = SEP.join(e[4] for e in entries) + SEP
+        self._entry_descriptor = array("I", (e[2] for e in entries))
+        self._display_start = array("I")
+        self._text_start = array("I")
+        pos = 0
+        for e in entries:
+            self._display_start.append(pos)
+            pos += len(e[3]) + 1
+        term_pos: List[Tuple[int, int]] = []  # (text position, entry)
+        word_pos: List[Tuple[int, int]] = []
+        pos = 0
+        for entry, e in enumerate(entries):
+            self._text_start.append(pos)
+            term_pos.append((pos, entry))
+            for m in re.finditer(" ", e[4]):
+                word_pos.append((pos + m.end(), entry))
+            pos += len(e[4]) + 1
+
+        self._term_sa, self._term_entry, self._term_top = self._build_sorted(term_pos)
+        self._word_sa, self._word_entry, self._word_top = self._build_sorted(word_pos)
+        self._trigrams = self._build_trigrams(entries)
+
+    def __len__(self) -> int:
+        return len(self._entry_descriptor)
+
+    @property
+    def term_count(self) -> int:
+        return len(self._entry_descriptor)
+
+    # ----- build
+
+    def _build_sorted(self, positions: List[Tuple[int, int]]):
+        text = self._text
+        positions.sort(key=lambda p: text[p[0]:text.index(SEP, p[0])])
+        sa = array("I", (p[0] for p in positions))
+        entries = array("I", (p[1] for p in positions))
+        top: Dict[str, array] = {}
+        self._refine(sa, entries, 0, len(sa), 0, top)
+        return sa, entries, top
+
+    def _refine(self, sa: array, entries: array, lo: int, hi: int, depth: int, top: Dict[str, array]):
+        """Precompute popularity top-k for every prefix whose range exceeds dense_range"""
+        text = self._text
+        stack = [(lo, hi, depth)]
+        while stack:
+            lo, hi, depth = stack.pop()
+            if hi - lo <= self.dense_range:
+                continue
+            if depth > 0:
+                prefix = text[sa[lo]:sa[lo] + depth]
+                top[prefix] = array("I", heapq.nsmallest(self.top_k, set(entries[lo:hi])))
+            start = lo
+            while start < hi:
+                ch = text[sa[start] + depth]
+                end = start + 1
+                while end < hi and text[sa[end] + depth] == ch:
+                    end += 1
+                if ch != SEP:
+                    stack.append((start, end, depth + 1))
+                start = end
+
+    def _build_trigrams(self, entries) -> Dict[str, array]:
+        postings: Dict[str, array] = {}
+        for entry, e in enumerate(entries):
+            norm = e[4]
+            for gram in {norm[i:i + 3] for i in range(len(norm) - 2)}:
+                if " " not in gram:
+                    posting = postings.get(gram)
+                    if posting is None:
+                        posting = postings[gram] = array("I")
+                    posting.append(entry)
+        return postings
+
+    # ----- lookup
+
+    def display_term(self, entry: int) -> str:
+        start = self._display_start[entry]
+        return self._display[start:self._display.index(SEP, start)]
+
+    def descriptor(self, mesh_id: str) -> Optional[MeshDescriptor]:
+        idx = self._by_id.get(mesh_id)
+        return self.descriptors[idx] if idx is not None else None
+
+    def _exact_entries(self, q: str) -> List[int]:
+        """Entries whose whole term is q; they sort first in the prefix range (SEP < any character)"""
+        text, n = self._text, len(q)
+        i = bisect_left(self._term_sa, q, key=lambda p: text[p:p + n])
+        found = []
+        while i < len(self._term_sa) and text[self._term_sa[i]:self._term_sa[i] + n + 1] == q + SEP:
+            found.append(self._term_entry[i])
+            i += 1
+        return sorted(found)
+
+    def _prefix_entries(self, sa: array, entries: array, top: Dict[str, array], q: str) -> List[int]:
+        """Entry ids (popularity order) with a key starting with q"""
+        text, n = self._text, len(q)
+        key = lambda p: text[p:p + n]
+        lo = bisect_left(sa, q, key=key)
+        hi = bisect_right(sa, q, lo=lo, key=key)
+        if hi - lo > self.dense_range:
+            return list(top.get(q, ()))
+        return sorted(set(entries[lo:hi]))
+
+    def _infix_entries(self, q: str) -> Iterator[int]:
+        grams = {g for g in (q[i:i + 3] for i in range(len(q) - 2)) if " " not in g}
+        if not grams:
+            return
+        postings = [self._trigrams.get(g) for g in grams]
+        if any(p is None for p in postings):
+            return
+        text, starts = self._text, self._text_start
+        for entry in min(postings, key=len)[:self.infix_scan_limit]:
+            start = starts[entry]
+            if text.find(q, start, text.index(SEP, start)) != -1:
+                yield entry
+
+    def search(self, query: str, limit: int = 8) -> List[MeshMatch]:
+        """Best matches, one per descriptor: term prefix, then word prefix, then infix"""
+        q = normalize(query)
+        if not q or limit <= 0:
+            return []
+        matches: List[MeshMatch] = []
+        seen = set()
+
+        def add(candidates: Iterable[int], kind: str) -> bool:
+            for entry in candidates:
+                idx = self._entry_descriptor[entry]
+                if idx in seen:
+                    continue
+                seen.add(idx)
+                matches.append(MeshMatch(self.display_term(entry), self.descriptors[idx], kind))
+                if len(matches) >= limit:
+                    return True
+            return False
+
+        if add(self._exact_entries(q), "exact"):
+            return matches
+        if add(self._prefix_entries(self._term_sa, self._term_entry, self._term_top, q), "prefix"):
+            return matches
+        if add(self._prefix_entries(self._word_sa, self._word_entry, self._word_top, q), "word_prefix"):
+            return matches
+        if len(q) >= 3:
+            add(self._infix_entries(q), "infix")
+        return matches
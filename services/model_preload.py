@@ -0,0 +1,115 @@
+"""
+Model Preload
+Load read-only models once in the server master and share them with forked workers
+
+Without preloading, every Uvicorn worker loads its own SentenceTransformer,
+cross-encoders and spaCy pipeline, so model memory grows linearly with the
+worker count. With MODEL_PRELOAD=1, gunicorn.conf.py imports the app in the
+gunicorn master (preload_app) and calls `preload_models` before forking:
+
+- the background warm-up's loaders that are fork-safe
+  (main.model_preload_loaders) run in the master, so the model globals are
+  already set in every worker and the per-worker warm-up finds them ready
+- `gc.freeze()` then moves every object allocated so far to the permanent
+  generation, so the workers' garbage collector never writes to (and thereby
+  copies) the pages that hold the models; weights stay shared copy-on-write
+- `after_fork` runs in each worker: it drops database connections inherited
+  from the master and caps per-worker inference threads
+
+No inference runs in the master: torch thread pools are created lazily in
+the workers, which avoids forking an initialized OpenMP runtime. ONNX Runtime
+starts its thread pools as soon as a session is created, so with
+INFERENCE_BACKEND=onnx the ONNX-backed models are left out of the master
+preload and each worker's warm-up creates their sessions after the fork.
+Inference workers (services.inference_worker) start their threads on first
+use, i.e. after the fork.
+
+scripts/benchmark_worker_memory.py measures per-worker RSS/PSS and throughput
+with and without preloading.
+"""
+
+import asyncio
+import gc
+import inspect
+import logging
+import os
+import sys
+import time
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+_preloaded: Dict[str, Dict[str, Any]] = {}
+
+
+def preload_enabled() -> bool:
+    return os.getenv("MODEL_PRELOAD", "0") not in ("0", "false", "False")
+
+
+def rss_mb(pid: str = "self") -> float:
+    """Resident set size of a process in MB (0 when /proc is unavailable)"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def preload_models(loaders: Dict[str, Callable[[], Any]], freeze: bool = True) -> Dict[str, Dict[str, Any]]:
+    """
+    Run model loaders in the current (master) process
+
+    Sync loaders are called directly and async loaders run to completion on a
+    temporary event loop. A failing loader is logged and left to the workers'
+    warm-up. Returns per-model load time and RSS growth.
+    """
+    # Tokenizer thread pools must not be started before the fork
+    os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+    for name, loader in loaders.items():
+        before, started = rss_mb(), time.monotonic()
+        try:
+            result = asyncio.run(loader()) if inspect.iscoroutinefunction(loader) else loader()
+            ok = bool(result)
+            error = None if ok else "loader returned no model"
+        except Exception as e:
+            ok, error = False, str(e)[:300]
+        _preloaded[name] = {
+            "loaded": ok,
+            "error": error,
+            "seconds": round(time.monotonic() - started, 2),
+            "rss_mb": round(rss_mb() - before, 1),
+        }
+        if ok:
+            logger.info(f"📦 Preloaded {name} in {_preloaded[name]['seconds']}s (+{_preloaded[name]['rss_mb']} MB)")
+        else:
+            logger.warning(f"⚠️ Preloading {name} failed, workers will load it: {error}")
+
+    if freeze:
+        gc.collect()
+        gc.freeze()
+        logger.info(f"🧊 gc.freeze(): {gc.get_freeze_count()} objects kept out of worker collections")
+    return dict(_preloaded)
+
+
+def after_fork():
+    """Per-worker cleanup after forking from a preloaded master"""
+    try:
+        import database
+        if database.engine is not None:
+            database.engine.dispose(close=False)  # connections belong to the master
+    except Exception as e:
+        logger.warning(f"⚠️ Could not reset inherited database connections: {e}")
+
+    threads = int(os.getenv("WORKER_TORCH_THREADS", "0"))
+    if threads > 0:
+        torch = sys.modules.get("torch")  # only if the preloaded models imported it
+        if torch is not None:
+            torch.set_num_threads(threads)
+
+
+def preload_status() -> Dict[str, Any]:
+    return {"enabled": preload_enabled(), "models": dict(_preloaded)}
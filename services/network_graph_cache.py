@@ -0,0 +1,514 @@
+"""
+Incremental Network Graph Cache
+Maintains cached NetworkGraph rows in place instead of rebuilding them
+
+Every cached graph carries a monotonically increasing `version`. Each node
+and edge records the version at which it was last written, and removals are
+kept in a bounded `change_log`. Clients that already hold a graph pass
+`?since=<version>` and receive only what changed:
+
+- nodes / edges:              upserted since that version
+- removed_nodes / removed_edges: ids deleted since that version
+- full=True:                  the delta could not be served (graph rebuilt
+                              or change log truncated) - payload is complete
+
+Mutations patch the stored graph directly:
+- article added to / removed from a collection -> collection + project graphs
+- citation enrichment of articles -> every active graph containing them,
+  found through the network_graph_articles link table (one query per batch)
+"""
+
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy.orm import Session, object_session
+from sqlalchemy.orm.attributes import flag_modified
+
+from database import Article, ArticleCollection, NetworkGraph, NetworkGraphArticle, Project, Report
+from utils.article_profiles import query_article_rows
+
+logger = logging.getLogger(__name__)
+
+GRAPH_TTL_HOURS = 24
+CHANGE_LOG_LIMIT = 500
+CURRENT_YEAR = 2024  # Reference year for node colouring (matches original builder)
+CITATION_GRAPH_TYPES = ("project", "report")  # Graphs patched by citation enrichment
+
+
+# ============================================================================
+# NODE / EDGE CONSTRUCTION
+# ============================================================================
+
+def graph_article_fields(article: Any) -> Dict[str, Any]:
+    """Normalize an Article object, Row or dictionary into graph fields"""
+    if hasattr(article, 'pmid'):
+        authors = article.authors if isinstance(article.authors, list) else []
+        references = getattr(article, 'references_pmids', None)
+        return {
+            "pmid": article.pmid,
+            "title": article.title or "",
+            "authors": authors,
+            "journal": article.journal or "",
+            "year": article.publication_year or 0,
+            "citation_count": article.citation_count or 0,
+            "references": references if isinstance(references, list) else [],
+        }
+
+    authors = article.get('authors', [])
+    if isinstance(authors, str):
+        authors = [authors]
+    return {
+        "pmid": article.get('pmid', ''),
+        "title": article.get('title', '') or "",
+        "authors": authors or [],
+        "journal": article.get('journal', '') or "",
+        "year": article.get('pub_year', 0) or article.get('publication_year', 0) or 0,
+        "citation_count": article.get('citation_count', 0) or 0,
+        "references": article.get('references_pmids', []) or [],
+    }
+
+
+def build_graph_node(fields: Dict[str, Any], version: int = 1) -> Dict[str, Any]:
+    """Build a single graph node from normalized article fields"""
+    pmid = fields["pmid"]
+    title = fields["title"]
+    year = fields["year"]
+    citation_count = fields["citation_count"]
+
+    # Calculate node size based on citation count (min 20, max 100)
+    node_size = min(100, max(20, 20 + (citation_count * 2)))
+
+    # Determine node color based on publication year
+    if year >= CURRENT_YEAR - 2:
+        color = "#4CAF50"  # Green for recent papers
+    elif year >= CURRENT_YEAR - 5:
+        color = "#2196F3"  # Blue for moderately recent
+    elif year >= CURRENT_YEAR - 10:
+        color = "#FF9800"  # Orange for older papers
+    else:
+        color = "#9E9E9E"  # Gray for very old papers
+
+    return {
+        "id": pmid,
+        "label": title[:60] + "..." if len(title) > 60 else title,
+        "size": node_size,
+        "color": color,
+        "version": version,
+        "metadata": {
+            "pmid": pmid,
+            "title": title,
+            "authors": fields["authors"],
+            "journal": fields["journal"],
+            "year": year,
+            "citation_count": citation_count,
+            "url": f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/"
+        }
+    }
+
+
+def build_reference_edge(source_pmid: str, ref_pmid: str, version: int = 1) -> Dict[str, Any]:
+    """Build a 'references' edge between two graph nodes"""
+    return {
+        "id": f"{source_pmid}->{ref_pmid}",
+        "from": source_pmid,
+        "to": ref_pmid,
+        "arrows": "to",
+        "color": "#666666",
+        "width": 1,
+        "relationship": "references",
+        "version": version,
+    }
+
+
+def compute_graph_metadata(nodes: List[Dict], edges: List[Dict], source_type: str) -> Dict[str, Any]:
+    """Compute summary statistics for a graph"""
+    total_nodes = len(nodes)
+    total_edges = len(edges)
+    avg_citations = sum(node["metadata"]["citation_count"] for node in nodes) / total_nodes if total_nodes > 0 else 0
+
+    # Find most cited paper
+    most_cited = max(nodes, key=lambda n: n["metadata"]["citation_count"]) if nodes else None
+    years = [node["metadata"]["year"] for node in nodes if node["metadata"]["year"] > 0]
+
+    return {
+        "source_type": source_type,
+        "total_nodes": total_nodes,
+        "total_edges": total_edges,
+        "avg_citations": round(avg_citations, 2),
+        "most_cited": {
+            "pmid": most_cited["metadata"]["pmid"],
+            "title": most_cited["metadata"]["title"],
+            "citations": most_cited["metadata"]["citation_count"]
+        } if most_cited else None,
+        "year_range": {
+            "min": min(years) if years else None,
+            "max": max(years) if years else None
+        }
+    }
+
+
+def collection_article_dict(ac: ArticleCollection) -> Dict[str, Any]:
+    """Article-like dictionary for an ArticleCollection row (collection graphs)"""
+    return {
+        'pmid': ac.article_pmid or f"collection_{ac.id}",
+        'title': ac.article_title,
+        'authors': ac.article_authors or [],
+        'journal': ac.article_journal,
+        'publication_year': ac.article_year,
+        'citation_count': 0,  # Default for collection articles
+        'cited_by_pmids': [],  # No citation data for collection articles
+        'references_pmids': [],  # No citation data for collection articles
+        'abstract': None,
+        'doi': None,
+        'relevance_score': 0.0,
+        'centrality_score': 0.0,
+        'cluster_id': None
+    }
+
+
+def report_article_pmids(report: Report) -> set:
+    """PMIDs referenced by a report's result sections"""
+    pmids = set()
+    if report.results and isinstance(report.results, dict):
+        for section in report.results.get("results", []):
+            for article in section.get("articles", []):
+                if article.get("pmid"):
+                    pmids.add(article["pmid"])
+    return pmids
+
+
+def project_article_pmids(project: Project) -> set:
+    """PMIDs from all reports and collections of a project"""
+    pmids = set()
+    for report in project.reports:
+        pmids |= report_article_pmids(report)
+    for collection in project.collections:
+        for article_collection in collection.article_collections:
+            if article_collection.article_pmid:
+                pmids.add(article_collection.article_pmid)
+    return pmids
+
+
+# ============================================================================
+# CACHE SERVICE
+# ============================================================================
+
+class NetworkGraphCache:
+    """Versioned NetworkGraph cache with in-place delta updates"""
+
+    def get_active_graph(self, db: Session, source_type: str, source_id: str) -> Optional[NetworkGraph]:
+        """Return the active, unexpired cached graph for a source"""
+        return db.query(NetworkGraph).filter(
+            NetworkGraph.source_type == source_type,
+            NetworkGraph.source_id == source_id,
+            NetworkGraph.is_active == True,
+            NetworkGraph.expires_at > datetime.now()
+        ).order_by(NetworkGraph.version.desc()).first()
+
+    def store_graph(self, db: Session, source_type: str, source_id: str, graph_data: Dict) -> NetworkGraph:
+        """
+        Store a freshly built graph, continuing the source's version sequence
+
+        Older rows for the same source are deactivated so exactly one graph is
+        patched by later deltas.
+        """
+        previous = db.query(NetworkGraph).filter(
+            NetworkGraph.source_type == source_type,
+            NetworkGraph.source_id == source_id
+        ).all()
+        version = max((g.version or 1 for g in previous), default=0) + 1
+        latest = max(previous, key=lambda g: g.version or 1, default=None)
+        for old in previous:
+            old.is_active = False
+        if previous:
+            # Only active graphs are patched, so their article links can go
+            db.query(NetworkGraphArticle).filter(
+                NetworkGraphArticle.graph_id.in_([old.graph_id for old in previous])
+            ).delete(synchronize_session=False)
+
+        nodes = [{**node, "version": version} for node in graph_data["nodes"]]
+        edges = [{**edge, "version": version} for edge in graph_data["edges"]]
+        metadata = {**graph_data["metadata"], "version": version}
+
+        graph = NetworkGraph(
+            graph_id=str(uuid.uuid4()),
+            source_type=source_type,
+            source_id=source_id,
+            nodes=nodes,
+            edges=edges,
+            graph_metadata=metadata,
+            version=version,
+            base_version=version,
+            change_log=[],
+            layout=latest.layout if latest else None,  # warm start for the layout stage
+            expires_at=datetime.now() + timedelta(hours=GRAPH_TTL_HOURS)
+        )
+        db.add(graph)
+        self._link_articles(db, graph, {node["id"] for node in nodes}, set())
+        db.commit()
+
+        graph_data["nodes"] = nodes
+        graph_data["edges"] = edges
+        graph_data["metadata"] = metadata
+        return graph
+
+    # ------------------------------------------------------------------
+    # Serving
+    # ------------------------------------------------------------------
+
+    def full_payload(self, graph: NetworkGraph) -> Dict[str, Any]:
+        """Complete graph payload for a cached row"""
+        return {
+            "nodes": graph.nodes,
+            "edges": graph.edges,
+            "metadata": graph.graph_metadata,
+            "version": graph.version,
+            "cached": True
+        }
+
+    def get_delta(self, graph: NetworkGraph, since: int) -> Dict[str, Any]:
+        """Changes to a cached graph after version `since`"""
+        version = graph.version or 1
+        base_version = graph.base_version or version
+
+        if since < base_version or since > version:
+            # Client is older than what the change log covers (or from another
+            # build lineage) - fall back to the full graph
+            payload = self.full_payload(graph)
+            payload.update({"since": since, "full": True})
+            return payload
+
+        removed_nodes = []
+        removed_edges = []
+        for change in graph.change_log or []:
+            if change["version"] <= since:
+                continue
+            if change["kind"] == "node":
+                removed_nodes.append(change["id"])
+            else:
+                removed_edges.append(change["id"])
+
+        return {
+            "nodes": [n for n in graph.nodes if n.get("version", base_version) > since],
+            "edges": [e for e in graph.edges if e.get("version", base_version) > since],
+            "removed_nodes": removed_nodes,
+            "removed_edges": removed_edges,
+            "metadata": graph.graph_metadata,
+            "since": since,
+            "version": version,
+            "full": False,
+            "cached": True
+        }
+
+    # ------------------------------------------------------------------
+    # Patching
+    # ------------------------------------------------------------------
+
+    def _link_articles(self, db: Optional[Session], graph: NetworkGraph, added: set, removed: set):
+        """Keep network_graph_articles in step with a citation graph's article nodes"""
+        if db is None or graph.source_type not in CITATION_GRAPH_TYPES:
+            return
+        added = {pmid for pmid in added if pmid and not pmid.startswith("collection_")}
+        if removed:
+            db.query(NetworkGraphArticle).filter(
+                NetworkGraphArticle.graph_id == graph.graph_id,
+                NetworkGraphArticle.pmid.in_(removed)
+            ).delete(synchronize_session=False)
+        db.add_all(NetworkGraphArticle(graph_id=graph.graph_id, pmid=pmid) for pmid in sorted(added))
+
+    def _save_patch(self, graph: NetworkGraph, nodes: List[Dict], edges: List[Dict],
+                    removals: List[Dict], version: int):
+        old_ids = {n["id"] for n in graph.nodes or []}
+        new_ids = {n["id"] for n in nodes}
+        self._link_articles(object_session(graph), graph, new_ids - old_ids, old_ids - new_ids)
+
+        change_log = list(graph.change_log or []) + removals
+        base_version = graph.base_version or 1
+        if len(change_log) > CHANGE_LOG_LIMIT:
+            dropped = change_log[:-CHANGE_LOG_LIMIT]
+            change_log = change_log[-CHANGE_LOG_LIMIT:]
+            base_version = max(base_version, max(c["version"] for c in dropped))
+
+        graph.nodes = nodes
+        graph.edges = edges
+        graph.change_log = change_log
+        graph.version = version
+        graph.base_version = base_version
+        graph.graph_metadata = {
+            **compute_graph_metadata(nodes, edges, graph.source_type),
+            "version": version
+        }
+        for column in ("nodes", "edges", "change_log", "graph_metadata"):
+            flag_modified(graph, column)
+
+    def add_articles(self, db: Session, graph: NetworkGraph, articles: Iterable[Any]) -> int:
+        """Upsert article nodes and their reference edges into a cached graph"""
+        version = (graph.version or 1) + 1
+        new_fields = [f for f in (graph_article_fields(a) for a in articles) if f["pmid"]]
+        if not new_fields:
+            return graph.version
+
+        new_pmids = {f["pmid"] for f in new_fields}
+        nodes = [n for n in graph.nodes if n["id"] not in new_pmids]
+        nodes.extend(build_graph_node(f, version) for f in new_fields)
+        node_ids = {n["id"] for n in nodes}
+
+        edges = list(graph.edges)
+        edge_ids = {e["id"] for e in edges}
+
+        # Outgoing edges from the new articles
+        for fields in new_fields:
+            for ref_pmid in fields["references"]:
+                edge_id = f"{fields['pmid']}->{ref_pmid}"
+                if ref_pmid in node_ids and ref_pmid != fields["pmid"] and edge_id not in edge_ids:
+                    edges.append(build_reference_edge(fields["pmid"], ref_pmid, version))
+                    edge_ids.add(edge_id)
+
+        # Incoming edges from articles already in the graph (citation graphs only)
+        existing_pmids = [pmid for pmid in node_ids - new_pmids if not pmid.startswith("collection_")]
+        if graph.source_type != "collection" and existing_pmids:
+            rows = query_article_rows(db, "graph").filter(Article.pmid.in_(existing_pmids)).all()
+            for row in rows:
+                for ref_pmid in row.references_pmids or []:
+                    edge_id = f"{row.pmid}->{ref_pmid}"
+                    if ref_pmid in new_pmids and ref_pmid != row.pmid and edge_id not in edge_ids:
+                        edges.append(build_reference_edge(row.pmid, ref_pmid, version))
+                        edge_ids.add(edge_id)
+
+        self._save_patch(graph, nodes, edges, [], version)
+        return version
+
+    def remove_articles(self, graph: NetworkGraph, pmids: Iterable[str]) -> int:
+        """Remove article nodes and all incident edges from a cached graph"""
+        pmids = set(pmids)
+        if not any(n["id"] in pmids for n in graph.nodes):
+            return graph.version
+
+        version = (graph.version or 1) + 1
+        nodes = [n for n in graph.nodes if n["id"] not in pmids]
+        edges = []
+        removals = [{"version": version, "kind": "node", "id": pmid} for pmid in sorted(pmids)]
+        for edge in graph.edges:
+            if edge["from"] in pmids or edge["to"] in pmids:
+                removals.append({"version": version, "kind": "edge", "id": edge["id"]})
+            else:
+                edges.append(edge)
+
+        self._save_patch(graph, nodes, edges, removals, version)
+        return version
+
+    def refresh_article(self, db: Session, pmid: str) -> int:
+        """Patch every active citation graph containing `pmid` after enrichment"""
+        return self.refresh_articles(db, [pmid])
+
+    def refresh_articles(self, db: Session, pmids: Iterable[str]) -> int:
+        """
+        Patch every active citation graph containing any of `pmids` after enrichment
+
+        Updates each node (citation count/size) and replaces its outgoing
+        reference edges. Graphs are found with one indexed link-table query
+        and patched once per batch. Returns the number of graphs patched.
+        """
+        pmids = list(dict.fromkeys(p for p in pmids if p))
+        if not pmids:
+            return 0
+        articles = {row.pmid: row for row in query_article_rows(db, "graph").filter(Article.pmid.in_(pmids)).all()}
+        if not articles:
+            return 0
+
+        graph_ids = db.query(NetworkGraphArticle.graph_id).filter(NetworkGraphArticle.pmid.in_(list(articles)))
+        candidates = db.query(NetworkGraph).filter(
+            NetworkGraph.graph_id.in_(graph_ids),
+            NetworkGraph.source_type.in_(CITATION_GRAPH_TYPES),
+            NetworkGraph.is_active == True,
+            NetworkGraph.expires_at > datetime.now()
+        ).all()
+
+        patched = 0
+        for graph in candidates:
+            node_ids = {n["id"] for n in graph.nodes}
+            present = [pmid for pmid in articles if pmid in node_ids]
+            if not present:
+                continue
+            version = (graph.version or 1) + 1
+            fields = {pmid: graph_article_fields(articles[pmid]) for pmid in present}
+
+            nodes = [build_graph_node(fields[n["id"]], version) if n["id"] in fields else n for n in graph.nodes]
+            wanted = {
+                f"{pmid}->{ref}" for pmid in present for ref in fields[pmid]["references"]
+                if ref in node_ids and ref != pmid
+            }
+            edges = []
+            removals = []
+            for edge in graph.edges:
+                if edge["from"] in fields and edge["id"] not in wanted:
+                    removals.append({"version": version, "kind": "edge", "id": edge["id"]})
+                    continue
+                edges.append(edge)
+            existing_ids = {e["id"] for e in edges}
+            for pmid in present:
+                for ref in fields[pmid]["references"]:
+                    edge_id = f"{pmid}->{ref}"
+                    if edge_id in wanted and edge_id not in existing_ids:
+                        edges.append(build_reference_edge(pmid, ref, version))
+                        existing_ids.add(edge_id)
+
+            self._save_patch(graph, nodes, edges, removals, version)
+            patched += 1
+
+        if patched:
+            db.commit()
+        return patched
+
+    # ------------------------------------------------------------------
+    # Collection mutation hooks
+    # ------------------------------------------------------------------
+
+    def on_collection_article_added(self, db: Session, project_id: str, article_collection: ArticleCollection):
+        """Patch collection and project graphs after an article is added"""
+        collection_graph = self.get_active_graph(db, "collection", article_collection.collection_id)
+        if collection_graph:
+            self.add_articles(db, collection_graph, [collection_article_dict(article_collection)])
+
+        project_graph = self.get_active_graph(db, "project", project_id)
+        if project_graph and article_collection.article_pmid:
+            row = query_article_rows(db, "graph").filter(
+                Article.pmid == article_collection.article_pmid
+            ).first()
+            if row:
+                self.add_articles(db, project_graph, [row])
+
+        db.commit()
+
+    def on_collection_article_removed(self, db: Session, project_id: str, article_collection: ArticleCollection):
+        """Patch collection and project graphs after an article is removed"""
+        node_id = article_collection.article_pmid or f"collection_{article_collection.id}"
+        collection_graph = self.get_active_graph(db, "collection", article_collection.collection_id)
+        if collection_graph:
+            still_in_collection = article_collection.article_pmid and db.query(ArticleCollection).filter(
+                ArticleCollection.collection_id == article_collection.collection_id,
+                ArticleCollection.article_pmid == article_collection.article_pmid
+            ).first() is not None
+            if not still_in_collection:
+                self.remove_articles(collection_graph, [node_id])
+
+        project_graph = self.get_active_graph(db, "project", project_id)
+        if project_graph and article_collection.article_pmid:
+            project = db.query(Project).filter(Project.project_id == project_id).first()
+            if project and article_collection.article_pmid not in project_article_pmids(project):
+                self.remove_articles(project_graph, [article_collection.article_pmid])
+
+        db.commit()
+
+
+# Global cache instance
+_network_graph_cache = None
+
+def get_network_graph_cache() -> NetworkGraphCache:
+    """Get global network graph cache instance"""
+    global _network_graph_cache
+    if _network_graph_cache is None:
+        _network_graph_cache = NetworkGraphCache()
+    return _network_graph_cache
@@ -0,0 +1,442 @@
+"""
+Network Layout and Level-of-Detail Service
+Server-side layout for large project/collection networks
+
+Large projects used to ship every node and edge to the browser, which then
+ran its own physics layout over thousands of nodes. This service moves that
+work to the server:
+
+1. Layout: spectral initialisation + vectorized Fruchterman-Reingold
+   refinement (NumPy/SciPy), computed in a worker thread and cached on the
+   NetworkGraph row (`layout`) keyed by graph version. Stale layouts are
+   warm-started from the previous positions so incremental patches do not
+   reshuffle the picture.
+2. Communities: sparse label propagation over the citation edges; papers
+   without edges are grouped by publication-year band.
+3. Level of detail: graphs above `max_nodes` are returned as one super-node
+   per community (centroid position, member count, top papers) with
+   aggregated super-edges. `cluster=<id>` drills into a single community.
+"""
+
+import logging
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import flag_modified
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_NODES = 300
+MAX_CLUSTERS = 60
+LAYOUT_SCALE = 1000.0
+OTHER_CLUSTER = "other"
+
+
+# ============================================================================
+# LAYOUT
+# ============================================================================
+
+def _adjacency(n: int, rows: np.ndarray, cols: np.ndarray) -> sparse.csr_matrix:
+    """Symmetric, unweighted adjacency matrix"""
+    data = np.ones(len(rows), dtype=np.float64)
+    adjacency = sparse.coo_matrix((data, (rows, cols)), shape=(n, n)).tocsr()
+    adjacency = adjacency + adjacency.T
+    adjacency.data[:] = 1.0
+    return adjacency
+
+
+def _spectral_init(adjacency: sparse.csr_matrix, rng: np.random.Generator) -> np.ndarray:
+    """Initial positions from the two smallest non-trivial Laplacian eigenvectors"""
+    n = adjacency.shape[0]
+    if n < 4 or adjacency.nnz == 0:
+        return rng.uniform(-1.0, 1.0, (n, 2))
+    try:
+        from scipy.sparse.linalg import eigsh
+        degree = np.asarray(adjacency.sum(axis=1)).ravel()
+        laplacian = sparse.diags(degree) - adjacency
+        _, vectors = eigsh(laplacian.astype(np.float64), k=3, sigma=-1e-3, which="LM")
+        pos = vectors[:, 1:3]
+        pos = pos / (np.abs(pos).max(axis=0) + 1e-9)
+        # Jitter so disconnected pieces sharing eigenvector values separate
+        return pos + rng.normal(0.0, 0.05, pos.shape)
+    except Exception as e:
+        logger.warning(f"Spectral initialisation failed, using random layout: {e}")
+        return rng.uniform(-1.0, 1.0, (n, 2))
+
+
+def force_directed_layout(n: int, rows: np.ndarray, cols: np.ndarray,
+                          init: Optional[np.ndarray] = None,
+                          iterations: Optional[int] = None,
+                          seed: int = 42, block_size: int = 512) -> np.ndarray:
+    """
+    Fruchterman-Reingold layout with blocked, vectorized repulsion
+
+    Repulsion is evaluated in row blocks so memory stays O(block_size * n).
+    Returns an (n, 2) array scaled to [-LAYOUT_SCALE, LAYOUT_SCALE].
+    """
+    if n == 0:
+        return np.zeros((0, 2))
+    if n == 1:
+        return np.zeros((1, 2))
+
+    rng = np.random.default_rng(seed)
+    adjacency = _adjacency(n, rows, cols)
+    pos = init.astype(np.float64).copy() if init is not None else _spectral_init(adjacency, rng)
+
+    if iterations is None:
+        # Keep total pair evaluations roughly bounded for very large graphs
+        iterations = int(max(15, min(100, 4e7 / (n * n))))
+
+    edge_rows, edge_cols = adjacency.nonzero()
+    upper = edge_rows < edge_cols
+    edge_rows, edge_cols = edge_rows[upper], edge_cols[upper]
+
+    k = math.sqrt(4.0 / n)  # ideal edge length in the unit box [-1, 1]^2
+    temperature = 0.2 if init is None else 0.05
+    cooling = temperature / (iterations + 1)
+
+    for _ in range(iterations):
+        displacement = np.zeros_like(pos)
+
+        # Repulsion between all pairs, one row block at a time
+        x, y = pos[:, 0], pos[:, 1]
+        for start in range(0, n, block_size):
+            stop = min(start + block_size, n)
+            dx = x[start:stop, None] - x[None, :]
+            dy = y[start:stop, None] - y[None, :]
+            strength = (k * k) / (dx * dx + dy * dy + 1e-9)
+            displacement[start:stop, 0] += (dx * strength).sum(axis=1)
+            displacement[start:stop, 1] += (dy * strength).sum(axis=1)
+
+        # Attraction along edges
+        if edge_rows.size:
+            delta = pos[edge_rows] - pos[edge_cols]
+            dist = np.sqrt(np.einsum("ij,ij->i", delta, delta)) + 1e-9
+            force = (delta * (dist / k)[:, None])
+            np.add.at(displacement, edge_rows, -force)
+            np.add.at(displacement, edge_cols, force)
+
+        # Limit step length by temperature
+        length = np.sqrt(np.einsum("ij,ij->i", displacement, displacement)) + 1e-9
+        pos += displacement * (np.minimum(length, temperature) / length)[:, None]
+        temperature = max(temperature - cooling, 1e-3)
+
+    pos -= pos.mean(axis=0)
+    extent = np.abs(pos).max() or 1.0
+    return pos * (LAYOUT_SCALE / extent)
+
+
+# ============================================================================
+# COMMUNITIES
+# ============================================================================
+
+def label_propagation(n: int, rows: np.ndarray, cols: np.ndarray,
+                      max_iterations: int = 30, seed: int = 42) -> np.ndarray:
+    """
+    Community labels via semi-synchronous label propagation
+
+    Each round updates two random halves of the nodes in turn; a half-update
+    is one sparse product (A + I) @ onehot(labels) followed by a row-wise
+    argmax. Small seeded noise breaks ties, so results are deterministic but
+    do not collapse onto the smallest label id. Isolated nodes keep their
+    own label.
+    """
+    labels = np.arange(n)
+    if n == 0 or rows.size == 0:
+        return labels
+
+    rng = np.random.default_rng(seed)
+    adjacency = _adjacency(n, rows, cols) + sparse.identity(n, format="csr")
+    for _ in range(max_iterations):
+        changed = False
+        half = rng.random(n) < 0.5
+        for active in (half, ~half):
+            onehot = sparse.csr_matrix((np.ones(n), (np.arange(n), labels)), shape=(n, n))
+            counts = (adjacency[active] @ onehot).tocsr()
+            counts.data += rng.random(counts.data.size) * 1e-3
+            new_labels = np.asarray(counts.argmax(axis=1)).ravel()
+            if not np.array_equal(new_labels, labels[active]):
+                changed = True
+                labels[active] = new_labels
+        if not changed:
+            break
+    return _merge_small_communities(adjacency, labels)
+
+
+def _merge_small_communities(adjacency: sparse.csr_matrix, labels: np.ndarray,
+                             min_size: int = 5, rounds: int = 3) -> np.ndarray:
+    """
+    Fold communities below `min_size` into their best-connected neighbour
+
+    Label propagation stalls on sparse citation graphs and leaves many tiny
+    communities. Inter-community edge counts are one sparse product
+    M.T @ A @ M with M the membership matrix.
+    """
+    n = labels.size
+    for _ in range(rounds):
+        _, labels = np.unique(labels, return_inverse=True)
+        count = labels.max() + 1
+        sizes = np.bincount(labels, minlength=count)
+        small = sizes < min_size
+        if not small.any():
+            break
+        membership = sparse.csr_matrix((np.ones(n), (np.arange(n), labels)), shape=(n, count))
+        links = (membership.T @ adjacency @ membership).tolil()
+        links.setdiag(0)
+        links = links.tocsr()
+        target = np.arange(count)
+        has_links = np.diff(links.indptr) > 0
+        best = np.asarray(links.argmax(axis=1)).ravel()
+        merge = small & has_links
+        # Of two small communities pointing at each other, only the higher id moves
+        ids = np.arange(count)
+        merge &= ~(small[best] & (best[best] == ids) & (ids < best))
+        if not merge.any():
+            break
+        target[merge] = best[merge]
+        labels = target[labels]
+    return labels
+
+
+def detect_communities(node_ids: List[str], rows: np.ndarray, cols: np.ndarray,
+                       fallback_keys: List[str], max_clusters: int = MAX_CLUSTERS) -> List[str]:
+    """
+    Community id per node
+
+    Connected papers are clustered by label propagation. Papers with no
+    edges are grouped by `fallback_keys` (e.g. year band). Beyond
+    `max_clusters`, the smallest communities are merged into 'other'.
+    """
+    n = len(node_ids)
+    labels = label_propagation(n, rows, cols)
+
+    degree = np.zeros(n, dtype=np.int64)
+    np.add.at(degree, rows, 1)
+    np.add.at(degree, cols, 1)
+
+    raw = [f"c{labels[i]}" if degree[i] > 0 else f"g{fallback_keys[i]}" for i in range(n)]
+
+    sizes: Dict[str, int] = {}
+    for label in raw:
+        sizes[label] = sizes.get(label, 0) + 1
+    ranked = sorted(sizes, key=lambda label: (-sizes[label], label))
+    keep = set(ranked[:max_clusters - 1]) if len(ranked) > max_clusters else set(ranked)
+
+    # Stable, compact ids ordered by community size
+    rename = {label: str(i) for i, label in enumerate(l for l in ranked if l in keep)}
+    return [rename.get(label, OTHER_CLUSTER) for label in raw]
+
+
+# ============================================================================
+# LAYOUT CACHE
+# ============================================================================
+
+def _edge_arrays(nodes: List[Dict], edges: List[Dict]) -> Tuple[Dict[str, int], np.ndarray, np.ndarray]:
+    index = {node["id"]: i for i, node in enumerate(nodes)}
+    pairs = [(index[e["from"]], index[e["to"]]) for e in edges if e["from"] in index and e["to"] in index]
+    if not pairs:
+        return index, np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    rows, cols = zip(*pairs)
+    return index, np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64)
+
+
+def compute_graph_layout(nodes: List[Dict], edges: List[Dict],
+                         previous: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Positions and communities for a graph
+
+    `previous` is an earlier layout for the same graph; known nodes keep
+    their positions and new nodes start at the centroid of their placed
+    neighbours, followed by a short refinement.
+    """
+    index, rows, cols = _edge_arrays(nodes, edges)
+    n = len(nodes)
+
+    init = None
+    iterations = None
+    old_positions = (previous or {}).get("positions") or {}
+    if old_positions and n:
+        rng = np.random.default_rng(7)
+        init = np.zeros((n, 2))
+        placed = np.zeros(n, dtype=bool)
+        for node_id, i in index.items():
+            if node_id in old_positions:
+                init[i] = np.array(old_positions[node_id]) / LAYOUT_SCALE
+                placed[i] = True
+        for i in np.nonzero(~placed)[0]:
+            neighbours = np.concatenate([cols[rows == i], rows[cols == i]])
+            neighbours = neighbours[placed[neighbours]]
+            base = init[neighbours].mean(axis=0) if neighbours.size else np.zeros(2)
+            init[i] = base + rng.normal(0.0, 0.05, 2)
+        iterations = 15
+
+    positions = force_directed_layout(n, rows, cols, init=init, iterations=iterations)
+    fallback_keys = [node.get("color", "") for node in nodes]  # year band colour
+    communities = detect_communities([node["id"] for node in nodes], rows, cols, fallback_keys)
+
+    return {
+        "positions": {node["id"]: [round(float(x), 2), round(float(y), 2)]
+                      for node, (x, y) in zip(nodes, positions)},
+        "communities": {node["id"]: community for node, community in zip(nodes, communities)},
+    }
+
+
+async def get_or_compute_layout(db: Session, graph) -> Dict[str, Any]:
+    """Cached layout for a NetworkGraph row, recomputed in a worker thread when stale"""
+    from fastapi.concurrency import run_in_threadpool
+
+    layout = graph.layout or {}
+    if layout.get("version") == graph.version and layout.get("positions"):
+        return layout
+
+    computed = await run_in_threadpool(compute_graph_layout, graph.nodes, graph.edges, layout)
+    computed["version"] = graph.version
+    graph.layout = computed
+    flag_modified(graph, "layout")
+    db.commit()
+    return computed
+
+
+# ============================================================================
+# LEVEL OF DETAIL
+# ============================================================================
+
+def _cluster_node(cluster_id: str, members: List[Dict], positions: Dict[str, List[float]]) -> Dict[str, Any]:
+    coords = np.array([positions[m["id"]] for m in members if m["id"] in positions] or [[0.0, 0.0]])
+    cx, cy = coords.mean(axis=0)
+    top = sorted(members, key=lambda m: m["metadata"].get("citation_count", 0), reverse=True)[:3]
+    years = [m["metadata"].get("year") for m in members if m["metadata"].get("year")]
+    label = top[0]["metadata"].get("title", "") if top else ""
+    label = (label[:40] + "...") if len(label) > 40 else label
+
+    return {
+        "id": f"cluster:{cluster_id}",
+        "label": f"{label} (+{len(members) - 1})" if len(members) > 1 else label,
+        "size": int(min(150, 30 + 10 * math.log2(len(members) + 1))),
+        "color": top[0].get("color", "#9E9E9E") if top else "#9E9E9E",
+        "x": round(float(cx), 2),
+        "y": round(float(cy), 2),
+        "is_cluster": True,
+        "metadata": {
+            "cluster_id": cluster_id,
+            "member_count": len(members),
+            "top_papers": [{"pmid": m["id"], "title": m["metadata"].get("title", "")} for m in top],
+            "year_range": {"min": min(years) if years else None, "max": max(years) if years else None},
+        }
+    }
+
+
+def _aggregate_edges(edges: List[Dict], group_of: Dict[str, str]) -> List[Dict]:
+    counts: Dict[Tuple[str, str], int] = {}
+    for edge in edges:
+        a, b = group_of.get(edge["from"]), group_of.get(edge["to"])
+        if a is None or b is None or a == b:
+            continue
+        counts[(a, b)] = counts.get((a, b), 0) + 1
+    return [
+        {
+            "id": f"{a}->{b}",
+            "from": a,
+            "to": b,
+            "arrows": "to",
+            "color": "#999999",
+            "width": round(1 + math.log2(count), 2),
+            "relationship": "aggregated",
+            "edge_count": count,
+        }
+        for (a, b), count in sorted(counts.items())
+    ]
+
+
+def build_lod_payload(graph_data: Dict[str, Any], layout: Dict[str, Any],
+                      max_nodes: int = DEFAULT_MAX_NODES, cluster: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Bounded network payload
+
+    - graph fits in max_nodes: every node, with server-computed x/y
+    - otherwise: one super-node per community plus aggregated edges
+    - cluster given: members of that community (top max_nodes by citations),
+      their internal edges, and the other communities as super-nodes
+    """
+    nodes = graph_data.get("nodes", [])
+    edges = graph_data.get("edges", [])
+    positions = layout.get("positions", {})
+    communities = layout.get("communities", {})
+    metadata = dict(graph_data.get("metadata") or {})
+
+    def placed(node: Dict) -> Dict:
+        x, y = positions.get(node["id"], [0.0, 0.0])
+        return {**node, "x": x, "y": y, "cluster_id": communities.get(node["id"])}
+
+    if cluster is None and len(nodes) <= max_nodes:
+        metadata["lod"] = {"level": "full", "total_nodes": len(nodes), "max_nodes": max_nodes}
+        return {**graph_data, "nodes": [placed(n) for n in nodes], "edges": edges, "metadata": metadata}
+
+    members_by_cluster: Dict[str, List[Dict]] = {}
+    for node in nodes:
+        members_by_cluster.setdefault(communities.get(node["id"], OTHER_CLUSTER), []).append(node)
+
+    if cluster is None:
+        group_of = {node["id"]: f"cluster:{communities.get(node['id'], OTHER_CLUSTER)}" for node in nodes}
+        cluster_nodes = [_cluster_node(cid, members, positions) for cid, members in members_by_cluster.items()]
+        metadata["lod"] = {
+            "level": "clusters",
+            "total_nodes": len(nodes),
+            "total_edges": len(edges),
+            "clusters": len(cluster_nodes),
+            "max_nodes": max_nodes,
+        }
+        return {**graph_data, "nodes": cluster_nodes, "edges": _aggregate_edges(edges, group_of), "metadata": metadata}
+
+    members = members_by_cluster.get(cluster, [])
+    ranked = sorted(members, key=lambda m: m["metadata"].get("citation_count", 0), reverse=True)
+    shown = ranked[:max_nodes]
+    shown_ids = {m["id"] for m in shown}
+
+    group_of = {m["id"]: m["id"] for m in shown}
+    for node in nodes:
+        node_cluster = communities.get(node["id"], OTHER_CLUSTER)
+        if node_cluster != cluster:
+            group_of[node["id"]] = f"cluster:{node_cluster}"
+
+    internal_edges = [e for e in edges if e["from"] in shown_ids and e["to"] in shown_ids]
+    neighbour_edges = _aggregate_edges(
+        [e for e in edges if (e["from"] in shown_ids) != (e["to"] in shown_ids)], group_of
+    )
+    neighbour_ids = {e["from"] for e in neighbour_edges} | {e["to"] for e in neighbour_edges}
+    neighbour_clusters = [
+        _cluster_node(cid, cluster_members, positions)
+        for cid, cluster_members in members_by_cluster.items()
+        if f"cluster:{cid}" in neighbour_ids
+    ]
+
+    metadata["lod"] = {
+        "level": "cluster_detail",
+        "cluster_id": cluster,
+        "member_count": len(members),
+        "shown_members": len(shown),
+        "truncated": len(members) > len(shown),
+        "max_nodes": max_nodes,
+    }
+    return {
+        **graph_data,
+        "nodes": [placed(m) for m in shown] + neighbour_clusters,
+        "edges": internal_edges + neighbour_edges,
+        "metadata": metadata,
+    }
+
+
+async def apply_level_of_detail(db: Session, source_type: str, source_id: str, graph_data: Dict[str, Any],
+                                max_nodes: int = DEFAULT_MAX_NODES, cluster: Optional[str] = None) -> Dict[str, Any]:
+    """Attach the cached server-side layout and bound the payload for a network response"""
+    from services.network_graph_cache import get_network_graph_cache
+
+    graph = get_network_graph_cache().get_active_graph(db, source_type, source_id)
+    if graph is None or not graph.nodes:
+        return graph_data
+
+    layout = await get_or_compute_layout(db, graph)
+    return build_lod_payload(graph_data, layout, max_nodes=max_nodes, cluster=cluster)
@@ -0,0 +1,129 @@
+"""
+NLI Entailment
+Batched entailment scoring of fact anchors against their abstracts
+
+The deep dive used to check each article's fact anchors with a separate NLI
+cross-encoder call inside the article loop, and skipped NLI for an article as
+soon as less than ENTAILMENT_BUDGET_S was left, so under load most reviews
+fell back to the lexical filter. Instead, `_deep_dive_articles` collects the
+(abstract, claim) pairs of all articles and scores them here in one pass:
+
+- pairs are deduplicated and looked up in a cache keyed by
+  (premise hash, hypothesis hash), so re-running a review or re-summarizing an
+  article only scores new claims
+- the remaining pairs go to the model in chunks of `batch_size` (normally a
+  single `predict` call per review); before each chunk the elapsed time plus
+  the slowest chunk so far must fit the budget
+- NLI models return one logit row per pair (contradiction / entailment /
+  neutral for the default model); rows are softmaxed and the entailment
+  column is taken. Single-score models are used as-is (sigmoid if needed)
+
+Pairs left unscored (no time, model error) get None, and callers fall back to
+the lexical filter for those articles.
+"""
+
+import hashlib
+import logging
+import math
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from services.cross_rerank import RerankScoreCache
+
+logger = logging.getLogger(__name__)
+
+Pair = Tuple[str, str]
+
+
+@dataclass
+class EntailmentReport:
+    """What a batched entailment pass did, for review diagnostics"""
+    pairs: int = 0
+    unique: int = 0
+    scored: int = 0
+    cache_hits: int = 0
+    batches: int = 0
+    latency_ms: float = 0.0
+    budget_exhausted: bool = False
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha1((text or "").encode("utf-8")).hexdigest()[:16]
+
+
+def pair_key(pair: Pair) -> Tuple[str, str]:
+    return text_hash(pair[0]), text_hash(pair[1])
+
+
+def entailment_probability(output: Any, entailment_index: int = 1) -> float:
+    """Entailment probability from one row of NLI model output"""
+    try:
+        values = [float(v) for v in output]
+    except TypeError:
+        value = float(output)
+        return value if 0.0 <= value <= 1.0 else 1.0 / (1.0 + math.exp(-value))
+    if len(values) == 1:
+        return entailment_probability(values[0])
+    top = max(values)
+    exps = [math.exp(v - top) for v in values]
+    return exps[min(entailment_index, len(values) - 1)] / sum(exps)
+
+
+def score_pairs(pairs: Sequence[Pair], model, cache: RerankScoreCache, batch_size: int = 64,
+                budget_s: float = 2.5, entailment_index: int = 1) -> Tuple[List[Optional[float]], EntailmentReport]:
+    """
+    Entailment probabilities for (premise, hypothesis) pairs
+
+    Args:
+        pairs: (abstract, claim) pairs, possibly from many articles
+        model: Object with CrossEncoder-style `predict(pairs, batch_size=...)`
+        cache: Scores shared across requests, keyed by (premise hash, hypothesis hash)
+        budget_s: Wall-clock budget for model calls
+
+    Returns:
+        (probability or None per pair, EntailmentReport)
+    """
+    report = EntailmentReport(pairs=len(pairs))
+    started = time.monotonic()
+    keys = [pair_key(p) for p in pairs]
+    known: Dict[Tuple[str, str], float] = {}
+    missing: Dict[Tuple[str, str], Pair] = {}
+    for key, pair in zip(keys, pairs):
+        if key in known or key in missing:
+            continue
+        cached = cache.get(key)
+        if cached is not None:
+            known[key] = cached
+            report.cache_hits += 1
+        else:
+            missing[key] = pair
+    report.unique = len(known) + len(missing)
+
+    todo = list(missing.items())
+    slowest_batch = 0.0
+    for start in range(0, len(todo), max(1, batch_size)):
+        if time.monotonic() - started + slowest_batch > budget_s:
+            report.budget_exhausted = True
+            break
+        chunk = todo[start:start + batch_size]
+        batch_started = time.monotonic()
+        try:
+            outputs = model.predict([pair for _, pair in chunk], batch_size=len(chunk))
+        except Exception as e:
+            logger.warning(f"⚠️ NLI entailment batch failed: {e}")
+            report.error = str(e)[:200]
+            break
+        slowest_batch = max(slowest_batch, time.monotonic() - batch_started)
+        report.batches += 1
+        for (key, _), output in zip(chunk, outputs):
+            known[key] = round(entailment_probability(output, entailment_index), 4)
+            cache.put(key, known[key])
+        report.scored += len(chunk)
+
+    report.latency_ms = round((time.monotonic() - started) * 1000, 1)
+    return [known.get(key) for key in keys], report
@@ -0,0 +1,295 @@
+"""
+ONNX Inference Backend
+Int8-quantized ONNX Runtime versions of the embedding and cross-encoder models
+
+Our nodes are CPU-only. With INFERENCE_BACKEND=onnx the sentence embedding
+models (SciBERT / MiniLM in SemanticAnalysisService, the langchain embeddings
+in main.py) and the cross-encoders (reranker, NLI) are
+
+- exported from the Hugging Face checkpoint to ONNX with optimum,
+- dynamically quantized to int8 (weights int8, activations quantized at run
+  time; no calibration data needed), and
+- cached under ONNX_CACHE_DIR, one directory per model and quantization mode,
+  so the export runs once per node (or at image build time).
+
+Inference then only needs onnxruntime and a tokenizer. The wrappers keep the
+call signatures the rest of the code uses (`encode`, `predict`,
+`embed_documents` / `embed_query`), so callers only change how the model is
+loaded:
+
+    model = onnx_sentence_encoder(name) or SentenceTransformer(name)
+
+The `onnx_*` loaders return None when the backend is not selected or the
+export / load fails, and the PyTorch path is used as before.
+
+Settings:
+- INFERENCE_BACKEND: "torch" (default) or "onnx"
+- ONNX_CACHE_DIR: exported model cache (default ~/.cache/rd-agent/onnx)
+- ONNX_QUANTIZATION: "avx2" (default), "avx512", "avx512_vnni", "arm64", or
+  "none" for an fp32 export
+- ONNX_THREADS: intra-op threads per session (0 = onnxruntime default)
+
+scripts/benchmark_onnx_inference.py compares both backends on a fixed corpus.
+"""
+
+import json
+import logging
+import os
+import re
+import shutil
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+QUANTIZATION_MODES = ("avx2", "avx512", "avx512_vnni", "arm64", "none")
+QUANTIZED_FILE = "model_quantized.onnx"
+EXPORTED_FILE = "model.onnx"
+POOLING_FILE = "pooling.json"
+
+FEATURE_EXTRACTION = "feature-extraction"
+SEQUENCE_CLASSIFICATION = "text-classification"
+
+
+def inference_backend() -> str:
+    return os.getenv("INFERENCE_BACKEND", "torch").strip().lower()
+
+
+def onnx_enabled() -> bool:
+    return inference_backend() == "onnx"
+
+
+def quantization_mode() -> str:
+    mode = os.getenv("ONNX_QUANTIZATION", "avx2").strip().lower()
+    if mode not in QUANTIZATION_MODES:
+        logger.warning(f"⚠️ Unknown ONNX_QUANTIZATION '{mode}', using avx2")
+        return "avx2"
+    return mode
+
+
+def onnx_variant(mode: Optional[str] = None) -> str:
+    """Numerics label of an ONNX model, e.g. onnx-int8-avx2 or onnx-fp32 (keys persisted features)"""
+    mode = mode or quantization_mode()
+    return "onnx-fp32" if mode == "none" else f"onnx-int8-{mode}"
+
+
+def cache_dir() -> str:
+    return os.getenv("ONNX_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "rd-agent", "onnx"))
+
+
+def model_dir(model_name: str, task: str, mode: Optional[str] = None) -> str:
+    """Cache directory of one exported model, e.g. cross-encoder__ms-marco-MiniLM-L-6-v2.text-classification.avx2"""
+    slug = re.sub(r"[^A-Za-z0-9._-]+", "_", model_name.replace("/", "__"))
+    return os.path.join(cache_dir(), f"{slug}.{task}.{mode or quantization_mode()}")
+
+
+# ----------------------------------------------------------------------
+# Export
+# ----------------------------------------------------------------------
+
+def _pooling_config(model_name: str) -> Dict[str, Any]:
+    """Pooling and normalization of a sentence-transformers checkpoint (mean, unnormalized otherwise)"""
+    config = {"mode": "mean", "normalize": False}
+    try:
+        from huggingface_hub import hf_hub_download
+
+        with open(hf_hub_download(model_name, "modules.json")) as f:
+            modules = json.load(f)
+        config["normalize"] = any(m.get("type", "").endswith("Normalize") for m in modules)
+        pooling = next((m for m in modules if m.get("type", "").endswith("Pooling")), None)
+        if pooling:
+            with open(hf_hub_download(model_name, f"{pooling['path']}/config.json")) as f:
+                pooling_config = json.load(f)
+            if pooling_config.get("pooling_mode_cls_token"):
+                config["mode"] = "cls"
+    except Exception:
+        pass  # plain transformers checkpoint (e.g. SciBERT): SentenceTransformer mean-pools it
+    return config
+
+
+def export_model(model_name: str, task: str) -> str:
+    """
+    Export and quantize a checkpoint into the cache unless already there
+
+    Returns the model directory. Exports go to a temporary directory that is
+    renamed into place, so concurrent workers never load a half-written model.
+    """
+    target = model_dir(model_name, task)
+    mode = quantization_mode()
+    if os.path.exists(os.path.join(target, QUANTIZED_FILE if mode != "none" else EXPORTED_FILE)):
+        return target
+
+    from optimum.onnxruntime import (
+        ORTModelForFeatureExtraction, ORTModelForSequenceClassification, ORTQuantizer
+    )
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+
+    logger.info(f"📦 Exporting {model_name} ({task}) to ONNX, quantization {mode}")
+    tmp = f"{target}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    model_cls = ORTModelForFeatureExtraction if task == FEATURE_EXTRACTION else ORTModelForSequenceClassification
+    model = model_cls.from_pretrained(model_name, export=True)
+    model.save_pretrained(tmp)
+    AutoTokenizer.from_pretrained(model_name).save_pretrained(tmp)
+
+    if mode != "none":
+        qconfig = getattr(AutoQuantizationConfig, mode)(is_static=False, per_channel=False)
+        ORTQuantizer.from_pretrained(model).quantize(save_dir=tmp, quantization_config=qconfig)
+    if task == FEATURE_EXTRACTION:
+        with open(os.path.join(tmp, POOLING_FILE), "w") as f:
+            json.dump(_pooling_config(model_name), f)
+
+    try:
+        os.replace(tmp, target)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)  # another worker finished first
+    logger.info(f"✅ ONNX model cached at {target}")
+    return target
+
+
+def _load_session(model_name: str, task: str):
+    """(InferenceSession, tokenizer, model directory, variant) for an exported model"""
+    import onnxruntime as ort
+    from transformers import AutoTokenizer
+
+    path = export_model(model_name, task)
+    model_file = QUANTIZED_FILE if os.path.exists(os.path.join(path, QUANTIZED_FILE)) else EXPORTED_FILE
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    threads = int(os.getenv("ONNX_THREADS", "0"))
+    if threads > 0:
+        options.intra_op_num_threads = threads
+    session = ort.InferenceSession(os.path.join(path, model_file), options, providers=["CPUExecutionProvider"])
+    variant = onnx_variant() if model_file == QUANTIZED_FILE else onnx_variant("none")
+    return session, AutoTokenizer.from_pretrained(path), path, variant
+
+
+# ----------------------------------------------------------------------
+# Models
+# ----------------------------------------------------------------------
+
+class _OnnxModel:
+    def __init__(self, session, tokenizer, max_length: int = 512, variant: Optional[str] = None):
+        self.session = session
+        self.variant = variant or onnx_variant()
+        self.tokenizer = tokenizer
+        self.max_length = max_length
+        self.input_names = {i.name for i in session.get_inputs()}
+
+    def _run(self, *texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        features = self.tokenizer(*texts, padding=True, truncation=True,
+                                  max_length=self.max_length, return_tensors="np")
+        inputs = {k: np.asarray(v, dtype=np.int64) for k, v in features.items() if k in self.input_names}
+        return self.session.run(None, inputs)[0], inputs["attention_mask"]
+
+
+class OnnxSentenceEncoder(_OnnxModel):
+    """SentenceTransformer-compatible `encode` over an ONNX feature-extraction model"""
+
+    def __init__(self, session, tokenizer, pooling: str = "mean", normalize: bool = False,
+                 max_length: int = 512, variant: Optional[str] = None):
+        super().__init__(session, tokenizer, max_length, variant)
+        self.pooling = pooling
+        self.normalize = normalize
+
+    @classmethod
+    def load(cls, model_name: str) -> "OnnxSentenceEncoder":
+        session, tokenizer, path, variant = _load_session(model_name, FEATURE_EXTRACTION)
+        with open(os.path.join(path, POOLING_FILE)) as f:
+            pooling = json.load(f)
+        return cls(session, tokenizer, pooling=pooling["mode"], normalize=pooling["normalize"], variant=variant)
+
+    def _pool(self, token_embeddings: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        if self.pooling == "cls":
+            pooled = token_embeddings[:, 0]
+        else:
+            mask = attention_mask[..., None].astype(token_embeddings.dtype)
+            pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        if self.normalize:
+            pooled = pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled
+
+    def encode(self, sentences, batch_size: int = 32, show_progress_bar: bool = False,
+               convert_to_numpy: bool = True, normalize_embeddings: bool = False, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        batch_size = max(1, batch_size)
+        chunks = []
+        for start in range(0, len(texts), batch_size):
+            token_embeddings, attention_mask = self._run(texts[start:start + batch_size])
+            chunks.append(self._pool(token_embeddings, attention_mask))
+        embeddings = np.concatenate(chunks).astype(np.float32) if chunks else np.zeros((0, 0), np.float32)
+        if normalize_embeddings and not self.normalize:
+            embeddings = embeddings / np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings[0] if single else embeddings
+
+
+class OnnxCrossEncoder(_OnnxModel):
+    """sentence_transformers.CrossEncoder-compatible `predict` over an ONNX sequence classifier"""
+
+    @classmethod
+    def load(cls, model_name: str) -> "OnnxCrossEncoder":
+        session, tokenizer, _, variant = _load_session(model_name, SEQUENCE_CLASSIFICATION)
+        return cls(session, tokenizer, variant=variant)
+
+    def predict(self, sentences, batch_size: int = 32, show_progress_bar: bool = False, **kwargs):
+        single = isinstance(sentences[0], str) if sentences else False
+        pairs = [sentences] if single else list(sentences)
+        batch_size = max(1, batch_size)
+        chunks = []
+        for start in range(0, len(pairs), batch_size):
+            batch = pairs[start:start + batch_size]
+            logits, _ = self._run([p[0] for p in batch], [p[1] for p in batch])
+            chunks.append(logits)
+        if not chunks:
+            return np.zeros(0, np.float32)
+        scores = np.concatenate(chunks).astype(np.float32)
+        if scores.shape[1] == 1:
+            # CrossEncoder's default activation for single-label models
+            scores = 1 / (1 + np.exp(-scores[:, 0]))
+        return scores[0] if single else scores
+
+
+class OnnxEmbeddings:
+    """langchain Embeddings interface (embed_documents / embed_query) over OnnxSentenceEncoder"""
+
+    def __init__(self, encoder: OnnxSentenceEncoder, batch_size: int = 32):
+        self.encoder = encoder
+        self.batch_size = batch_size
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.encoder.encode(list(texts), batch_size=self.batch_size).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.encoder.encode([text])[0].tolist()
+
+
+# ----------------------------------------------------------------------
+# Loaders (None unless INFERENCE_BACKEND=onnx and the model loads)
+# ----------------------------------------------------------------------
+
+def _load(loader, model_name: str):
+    if not onnx_enabled():
+        return None
+    try:
+        model = loader(model_name)
+        logger.info(f"⚡ Using ONNX Runtime ({quantization_mode()}) for {model_name}")
+        return model
+    except Exception as e:
+        logger.warning(f"⚠️ ONNX backend unavailable for {model_name}, using PyTorch: {e}")
+        return None
+
+
+def onnx_sentence_encoder(model_name: str) -> Optional[OnnxSentenceEncoder]:
+    return _load(OnnxSentenceEncoder.load, model_name)
+
+
+def onnx_cross_encoder(model_name: str) -> Optional[OnnxCrossEncoder]:
+    return _load(OnnxCrossEncoder.load, model_name)
+
+
+def onnx_embeddings(model_name: str) -> Optional[OnnxEmbeddings]:
+    encoder = onnx_sentence_encoder(model_name)
+    return OnnxEmbeddings(encoder) if encoder is not None else None
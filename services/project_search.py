@@ -0,0 +1,592 @@
+"""
+Project Search Index
+Full-text search over project content with ranked, snippet-bearing results
+
+`search_project_content` used to run five `ILIKE '%q%'` scans (papers,
+collections, notes, reports, analyses) on every keystroke and build
+highlights in Python. Searchable content is now denormalized into a single
+`search_documents` table and queried once:
+
+- PostgreSQL: generated `search_vector` tsvector column (title weighted A,
+  body weighted B) with a GIN index; ranking with ts_rank and snippets with
+  ts_headline.
+- SQLite (local runs): external-content FTS5 table kept in sync by SQLite
+  triggers on `search_documents`; ranking with bm25() and snippet().
+
+Rows in `search_documents` are written by SQLAlchemy mapper hooks whenever
+a source row is inserted, updated or deleted, and `rebuild_index` backfills
+existing data. Every query token is a prefix match, so the same query
+serves typeahead.
+"""
+
+import logging
+import re
+import weakref
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import event, func, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from database import (
+    Annotation, Article, ArticleCollection, Collection, DeepDiveAnalysis, Report, SearchDocument
+)
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPES = {
+    "papers": "paper",
+    "collections": "collection",
+    "notes": "note",
+    "reports": "report",
+    "analyses": "analysis",
+}
+MAX_QUERY_TOKENS = 8
+SNIPPET_WORDS = 24
+
+_documents = SearchDocument.__table__
+
+# Per-engine cache: does search_documents exist / which full-text backend is ready
+_table_ready: "weakref.WeakKeyDictionary[Engine, bool]" = weakref.WeakKeyDictionary()
+_backend_ready: "weakref.WeakKeyDictionary[Engine, Optional[str]]" = weakref.WeakKeyDictionary()
+
+
+# ============================================================================
+# INDEX SETUP
+# ============================================================================
+
+POSTGRES_SETUP = [
+    """
+    ALTER TABLE search_documents ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(body, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_search_doc_vector ON search_documents USING GIN (search_vector)",
+]
+
+SQLITE_SETUP = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS search_documents_fts USING fts5(
+        title, body, content='search_documents', content_rowid='id',
+        tokenize='porter unicode61', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_documents_ai AFTER INSERT ON search_documents BEGIN
+        INSERT INTO search_documents_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_documents_ad AFTER DELETE ON search_documents BEGIN
+        INSERT INTO search_documents_fts(search_documents_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_documents_au AFTER UPDATE ON search_documents BEGIN
+        INSERT INTO search_documents_fts(search_documents_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO search_documents_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+]
+
+
+def ensure_search_index(engine: Engine) -> Optional[str]:
+    """
+    Create the full-text structures for this engine (idempotent)
+
+    Returns the backend name ('postgres' or 'sqlite_fts5'), or None when
+    full-text search is unavailable and callers should fall back to ILIKE.
+    """
+    if engine in _backend_ready:
+        return _backend_ready[engine]
+
+    backend = None
+    try:
+        SearchDocument.__table__.create(bind=engine, checkfirst=True)
+        with engine.begin() as conn:
+            if conn.dialect.name == "postgresql":
+                for statement in POSTGRES_SETUP:
+                    conn.execute(text(statement))
+                backend = "postgres"
+            elif conn.dialect.name == "sqlite":
+                for statement in SQLITE_SETUP:
+                    conn.execute(text(statement))
+                # Index rows written before the FTS table existed
+                conn.execute(text("INSERT INTO search_documents_fts(search_documents_fts) VALUES ('rebuild')"))
+                backend = "sqlite_fts5"
+        _table_ready[engine] = True
+    except Exception as e:
+        logger.warning(f"⚠️ Full-text search index unavailable, using ILIKE search: {e}")
+
+    _backend_ready[engine] = backend
+    return backend
+
+
+def _indexing_enabled(connection: Connection) -> bool:
+    engine = connection.engine
+    ready = _table_ready.get(engine)
+    if ready is None:
+        ready = inspect(connection).has_table("search_documents")
+        _table_ready[engine] = ready
+    return ready
+
+
+# ============================================================================
+# DOCUMENT CONSTRUCTION
+# ============================================================================
+
+def _join(*parts: Any) -> str:
+    values = []
+    for part in parts:
+        if isinstance(part, (list, tuple)):
+            values.extend(str(p.get("name", p)) if isinstance(p, dict) else str(p) for p in part)
+        elif part:
+            values.append(str(part))
+    return " ".join(values)
+
+
+def _paper_document(connection: Connection, paper: Any) -> Optional[Dict[str, Any]]:
+    project_id = connection.execute(
+        select(Collection.project_id).where(Collection.collection_id == paper.collection_id)
+    ).scalar()
+    if project_id is None:
+        return None
+    abstract = None
+    if paper.article_pmid:
+        abstract = connection.execute(
+            select(Article.abstract).where(Article.pmid == paper.article_pmid)
+        ).scalar()
+    return {
+        "doc_type": "paper",
+        "doc_id": str(paper.id),
+        "project_id": project_id,
+        "collection_id": paper.collection_id,
+        "pmid": paper.article_pmid,
+        "title": paper.article_title,
+        "body": _join(paper.article_journal, paper.article_authors, abstract),
+    }
+
+
+def _collection_document(connection: Connection, collection: Collection) -> Dict[str, Any]:
+    return {
+        "doc_type": "collection",
+        "doc_id": collection.collection_id,
+        "project_id": collection.project_id,
+        "collection_id": collection.collection_id,
+        "pmid": None,
+        "title": collection.collection_name,
+        "body": collection.description,
+    }
+
+
+def _note_document(connection: Connection, note: Annotation) -> Dict[str, Any]:
+    return {
+        "doc_type": "note",
+        "doc_id": note.annotation_id,
+        "project_id": note.project_id,
+        "collection_id": None,
+        "pmid": note.article_pmid,
+        "title": None,
+        "body": _join(note.content, note.highlight_text, note.research_question, note.note_type, note.tags),
+    }
+
+
+def _report_document(connection: Connection, report: Report) -> Dict[str, Any]:
+    return {
+        "doc_type": "report",
+        "doc_id": report.report_id,
+        "project_id": report.project_id,
+        "collection_id": None,
+        "pmid": None,
+        "title": report.title,
+        "body": _join(report.objective, report.molecule),
+    }
+
+
+def _analysis_document(connection: Connection, analysis: DeepDiveAnalysis) -> Dict[str, Any]:
+    return {
+        "doc_type": "analysis",
+        "doc_id": analysis.analysis_id,
+        "project_id": analysis.project_id,
+        "collection_id": None,
+        "pmid": analysis.article_pmid,
+        "title": analysis.article_title,
+        "body": _join(analysis.article_journal, analysis.article_authors),
+    }
+
+
+DOCUMENT_BUILDERS = {
+    ArticleCollection: ("paper", lambda row: str(row.id), _paper_document),
+    Collection: ("collection", lambda row: row.collection_id, _collection_document),
+    Annotation: ("note", lambda row: row.annotation_id, _note_document),
+    Report: ("report", lambda row: row.report_id, _report_document),
+    DeepDiveAnalysis: ("analysis", lambda row: row.analysis_id, _analysis_document),
+}
+
+
+def _write_document(connection: Connection, doc_type: str, doc_id: str, document: Optional[Dict[str, Any]]):
+    connection.execute(
+        _documents.delete().where(_documents.c.doc_type == doc_type, _documents.c.doc_id == doc_id)
+    )
+    if document is not None:
+        connection.execute(_documents.insert().values(**document))
+
+
+# ============================================================================
+# WRITE HOOKS
+# ============================================================================
+
+def _on_upsert(mapper, connection: Connection, target):
+    if not _indexing_enabled(connection):
+        return
+    doc_type, get_id, build = DOCUMENT_BUILDERS[mapper.class_]
+    _write_document(connection, doc_type, get_id(target), build(connection, target))
+
+
+def _on_delete(mapper, connection: Connection, target):
+    if not _indexing_enabled(connection):
+        return
+    doc_type, get_id, _ = DOCUMENT_BUILDERS[mapper.class_]
+    _write_document(connection, doc_type, get_id(target), None)
+
+
+def _on_article_change(mapper, connection: Connection, target: Article):
+    """A changed abstract/title re-indexes every collection entry of that paper"""
+    if not target.pmid or not _indexing_enabled(connection):
+        return
+    papers = connection.execute(
+        select(ArticleCollection.__table__).where(ArticleCollection.article_pmid == target.pmid)
+    ).fetchall()
+    for paper in papers:
+        _write_document(connection, "paper", str(paper.id), _paper_document(connection, paper))
+
+
+for _model in DOCUMENT_BUILDERS:
+    event.listen(_model, "after_insert", _on_upsert)
+    event.listen(_model, "after_update", _on_upsert)
+    event.listen(_model, "after_delete", _on_delete)
+event.listen(Article, "after_insert", _on_article_change)
+event.listen(Article, "after_update", _on_article_change)
+
+
+def rebuild_index(db: Session, project_id: Optional[str] = None) -> int:
+    """Backfill search documents from the source tables; returns rows indexed"""
+    connection = db.connection()
+    delete = _documents.delete()
+    if project_id:
+        delete = delete.where(_documents.c.project_id == project_id)
+    connection.execute(delete)
+
+    scoped = {
+        Collection: Collection.project_id,
+        Annotation: Annotation.project_id,
+        Report: Report.project_id,
+        DeepDiveAnalysis: DeepDiveAnalysis.project_id,
+    }
+    documents = []
+    for model, (_, _, build) in DOCUMENT_BUILDERS.items():
+        query = db.query(model)
+        if project_id:
+            if model is ArticleCollection:
+                query = query.join(Collection, ArticleCollection.collection_id == Collection.collection_id)
+                query = query.filter(Collection.project_id == project_id)
+            else:
+                query = query.filter(scoped[model] == project_id)
+        for row in query.yield_per(1000):
+            document = build(connection, row)
+            if document is not None:
+                documents.append(document)
+
+    for start in range(0, len(documents), 1000):
+        connection.execute(_documents.insert(), documents[start:start + 1000])
+    db.commit()
+    logger.info(f"✅ Search index rebuilt: {len(documents)} documents")
+    return len(documents)
+
+
+# ============================================================================
+# QUERY
+# ============================================================================
+
+def query_tokens(q: str) -> List[str]:
+    """Lower-cased word tokens of a user query (punctuation and operators dropped)"""
+    return re.findall(r"\w+", (q or "").lower())[:MAX_QUERY_TOKENS]
+
+
+def postgres_tsquery(tokens: Iterable[str]) -> str:
+    """to_tsquery() input with every token as a prefix term"""
+    return " & ".join(f"{token}:*" for token in tokens)
+
+
+def fts5_query(tokens: Iterable[str]) -> str:
+    """FTS5 MATCH expression with every token as a quoted prefix term"""
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+ACTIVE_COLLECTION_FILTER = """
+    AND (sd.collection_id IS NULL OR EXISTS (
+        SELECT 1 FROM collections c WHERE c.collection_id = sd.collection_id AND c.is_active
+    ))
+"""
+
+POSTGRES_SEARCH_SQL = """
+    SELECT ranked.doc_type, ranked.doc_id, ranked.pmid, ranked.rank,
+           ts_headline('english', coalesce(ranked.title, '') || ' ' || coalesce(ranked.body, ''),
+                       to_tsquery('english', :tsquery),
+                       'StartSel="", StopSel="", MaxWords={words}, MinWords=8') AS snippet
+    FROM (
+        SELECT sd.doc_type, sd.doc_id, sd.pmid, sd.title, sd.body,
+               ts_rank(sd.search_vector, query) AS rank,
+               ROW_NUMBER() OVER (PARTITION BY sd.doc_type ORDER BY ts_rank(sd.search_vector, query) DESC) AS rn
+        FROM search_documents sd, to_tsquery('english', :tsquery) query
+        WHERE sd.project_id = :project_id
+          AND sd.doc_type IN ({types})
+          AND sd.search_vector @@ query
+          {active}
+    ) ranked
+    WHERE ranked.rn <= :limit
+    ORDER BY ranked.rank DESC
+"""
+
+SQLITE_SEARCH_SQL = """
+    WITH hits AS MATERIALIZED (
+        SELECT sd.doc_type, sd.doc_id, sd.pmid,
+               -bm25(search_documents_fts, 2.0, 1.0) AS rank,
+               snippet(search_documents_fts, -1, '', '', '...', {words}) AS snippet
+        FROM search_documents_fts
+        JOIN search_documents sd ON sd.id = search_documents_fts.rowid
+        WHERE search_documents_fts MATCH :match
+          AND sd.project_id = :project_id
+          AND sd.doc_type IN ({types})
+          {active}
+    )
+    SELECT doc_type, doc_id, pmid, rank, snippet FROM (
+        SELECT hits.*, ROW_NUMBER() OVER (PARTITION BY doc_type ORDER BY rank DESC) AS rn
+        FROM hits
+    )
+    WHERE rn <= :limit
+    ORDER BY rank DESC
+"""
+
+
+def search_documents(db: Session, project_id: str, q: str, doc_types: Iterable[str],
+                     limit: int = 50) -> Optional[List[Dict[str, Any]]]:
+    """
+    One ranked full-text query across all requested content types
+
+    Returns [{doc_type, doc_id, pmid, rank, snippet}] ordered by rank, at most
+    `limit` per type, or None when no full-text backend is available.
+    """
+    backend = ensure_search_index(db.get_bind())
+    tokens = query_tokens(q)
+    doc_types = sorted(set(doc_types))
+    if backend is None:
+        return None
+    if not tokens or not doc_types:
+        return []
+
+    params: Dict[str, Any] = {"project_id": project_id, "limit": limit}
+    type_params = []
+    for i, doc_type in enumerate(doc_types):
+        params[f"type_{i}"] = doc_type
+        type_params.append(f":type_{i}")
+    types = ", ".join(type_params)
+
+    if backend == "postgres":
+        params["tsquery"] = postgres_tsquery(tokens)
+        sql = POSTGRES_SEARCH_SQL.format(types=types, active=ACTIVE_COLLECTION_FILTER, words=SNIPPET_WORDS)
+    else:
+        params["match"] = fts5_query(tokens)
+        sql = SQLITE_SEARCH_SQL.format(types=types, active=ACTIVE_COLLECTION_FILTER, words=SNIPPET_WORDS)
+
+    rows = db.execute(text(sql), params).fetchall()
+    return [
+        {
+            "doc_type": row.doc_type,
+            "doc_id": row.doc_id,
+            "pmid": row.pmid,
+            "rank": float(row.rank or 0.0),
+            "snippet": row.snippet or "",
+        }
+        for row in rows
+    ]
+
+
+def hydrate_results(db: Session, hits: List[Dict[str, Any]], limit: int = 50) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Turn ranked hits into the categorized result payload of the search endpoint
+
+    Source rows are loaded with one query per content type; hits whose source
+    row no longer exists are dropped.
+    """
+    results: Dict[str, List[Dict[str, Any]]] = {category: [] for category in CONTENT_TYPES}
+    ids_by_type: Dict[str, List[str]] = {}
+    for hit in hits:
+        ids_by_type.setdefault(hit["doc_type"], []).append(hit["doc_id"])
+
+    papers = {}
+    if ids_by_type.get("paper"):
+        paper_ids = [int(i) for i in ids_by_type["paper"]]
+        papers = {str(p.id): p for p in db.query(ArticleCollection).filter(ArticleCollection.id.in_(paper_ids))}
+
+    collections = {}
+    paper_counts: Dict[str, int] = {}
+    if ids_by_type.get("collection"):
+        collections = {
+            c.collection_id: c for c in
+            db.query(Collection).filter(Collection.collection_id.in_(ids_by_type["collection"]))
+        }
+        paper_counts = dict(
+            db.query(ArticleCollection.collection_id, func.count(ArticleCollection.id))
+            .filter(ArticleCollection.collection_id.in_(list(collections)))
+            .group_by(ArticleCollection.collection_id)
+            .all()
+        )
+
+    notes = {}
+    note_collection_names: Dict[str, str] = {}
+    if ids_by_type.get("note"):
+        notes = {n.annotation_id: n for n in db.query(Annotation).filter(Annotation.annotation_id.in_(ids_by_type["note"]))}
+        collection_ids = {n.collection_id for n in notes.values() if n.collection_id}
+        if collection_ids:
+            note_collection_names = dict(
+                db.query(Collection.collection_id, Collection.collection_name)
+                .filter(Collection.collection_id.in_(collection_ids)).all()
+            )
+
+    reports = {}
+    if ids_by_type.get("report"):
+        reports = {r.report_id: r for r in db.query(Report).filter(Report.report_id.in_(ids_by_type["report"]))}
+
+    analyses = {}
+    if ids_by_type.get("analysis"):
+        analyses = {
+            a.analysis_id: a for a in
+            db.query(DeepDiveAnalysis).filter(DeepDiveAnalysis.analysis_id.in_(ids_by_type["analysis"]))
+        }
+
+    seen_pmids = set()
+    for hit in hits:
+        doc_type, doc_id, snippet = hit["doc_type"], hit["doc_id"], hit["snippet"]
+        score = round(hit["rank"], 4)
+
+        if doc_type == "paper" and doc_id in papers:
+            paper = papers[doc_id]
+            if not paper.article_pmid or paper.article_pmid in seen_pmids:
+                continue
+            seen_pmids.add(paper.article_pmid)
+            results["papers"].append({
+                "type": "paper",
+                "id": paper.article_pmid,
+                "pmid": paper.article_pmid,
+                "title": paper.article_title,
+                "subtitle": f"{paper.article_journal or 'Unknown Journal'} ({paper.article_year or 'N/A'})",
+                "authors": paper.article_authors if isinstance(paper.article_authors, list) else [],
+                "collection_id": paper.collection_id,
+                "added_at": paper.added_at,
+                "highlight": snippet,
+                "score": score,
+            })
+
+        elif doc_type == "collection" and doc_id in collections:
+            collection = collections[doc_id]
+            paper_count = paper_counts.get(doc_id, 0)
+            results["collections"].append({
+                "type": "collection",
+                "id": collection.collection_id,
+                "title": collection.collection_name,
+                "subtitle": f"{paper_count} papers",
+                "description": collection.description,
+                "color": collection.color,
+                "icon": collection.icon,
+                "created_at": collection.created_at,
+                "paper_count": paper_count,
+                "highlight": snippet,
+                "score": score,
+            })
+
+        elif doc_type == "note" and doc_id in notes:
+            note = notes[doc_id]
+            context_parts = []
+            if note.article_pmid:
+                context_parts.append(f"Paper: {note.article_pmid}")
+            if note.collection_id in note_collection_names:
+                context_parts.append(f"Collection: {note_collection_names[note.collection_id]}")
+            if note.report_id:
+                context_parts.append("Report")
+            if note.analysis_id:
+                context_parts.append("Analysis")
+
+            results["notes"].append({
+                "type": "note",
+                "id": note.annotation_id,
+                "title": note.content[:100] + ("..." if len(note.content) > 100 else ""),
+                "subtitle": " • ".join(context_parts) if context_parts else "General note",
+                "content": note.content,
+                "note_type": note.note_type,
+                "priority": note.priority,
+                "status": note.status,
+                "tags": note.tags if isinstance(note.tags, list) else [],
+                "created_at": note.created_at,
+                "article_pmid": note.article_pmid,
+                "collection_id": note.collection_id,
+                "highlight": snippet,
+                "score": score,
+            })
+
+        elif doc_type == "report" and doc_id in reports:
+            report = reports[doc_id]
+            results["reports"].append({
+                "type": "report",
+                "id": report.report_id,
+                "title": report.title,
+                "subtitle": f"{report.molecule} - {report.objective}",
+                "status": report.status,
+                "created_at": report.created_at,
+                "article_count": report.article_count,
+                "highlight": snippet,
+                "score": score,
+            })
+
+        elif doc_type == "analysis" and doc_id in analyses:
+            analysis = analyses[doc_id]
+            results["analyses"].append({
+                "type": "analysis",
+                "id": analysis.analysis_id,
+                "title": analysis.article_title,
+                "subtitle": f"PMID: {analysis.article_pmid}",
+                "status": analysis.processing_status,
+                "created_at": analysis.created_at,
+                "pmid": analysis.article_pmid,
+                "has_results": (
+                    analysis.scientific_model_analysis is not None and
+                    analysis.experimental_methods_analysis is not None and
+                    analysis.results_interpretation_analysis is not None
+                ),
+                "highlight": snippet,
+                "score": score,
+            })
+
+    for category in results:
+        results[category] = results[category][:limit]
+    return results
+
+
+def search_project(db: Session, project_id: str, q: str, search_types: Iterable[str],
+                   limit: int = 50) -> Optional[Dict[str, Any]]:
+    """Ranked, categorized search results, or None if full-text search is unavailable"""
+    doc_types = [CONTENT_TYPES[t] for t in search_types if t in CONTENT_TYPES]
+    hits = search_documents(db, project_id, q, doc_types, limit=limit)
+    if hits is None:
+        return None
+    results = hydrate_results(db, hits, limit=limit)
+    ranked = [
+        {"type": category, "id": item["id"], "score": item["score"]}
+        for category, items in results.items() for item in items
+    ]
+    ranked.sort(key=lambda item: item["score"], reverse=True)
+    return {"results": results, "ranked": ranked}
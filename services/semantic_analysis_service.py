@@ -12,28 +12,26 @@ from enum import Enum
 import json
 import re
 import time
+import hashlib
+import importlib.util
+import os
 
-# Import available NLP libraries
-try:
-    import nltk
-    import spacy
-    BASIC_NLP_AVAILABLE = True
-    print("✅ Basic NLP libraries (NLTK, spaCy) imported successfully")
-except ImportError as e:
-    BASIC_NLP_AVAILABLE = False
-    print(f"❌ Basic NLP libraries import failed: {e}")
-
-# Advanced NLP libraries (optional)
-try:
-    from transformers import AutoTokenizer, AutoModel
-    from sentence_transformers import SentenceTransformer
-    import torch
-    ADVANCED_NLP_AVAILABLE = True
-    print("✅ Advanced NLP libraries (Transformers, SentenceTransformers) imported successfully")
-except ImportError as e:
-    ADVANCED_NLP_AVAILABLE = False
-    print(f"⚠️  Advanced NLP libraries not available: {e}")
-    print("🔧 Using basic NLP functionality only")
+from sqlalchemy.orm import Session
+
+from database import PaperSemanticFeatures, get_session_local
+from services.inference_worker import sentence_encoder
+from services.onnx_inference import onnx_enabled, onnx_sentence_encoder
+
+# NLP libraries are imported when the models load (initialize), not with this
+# module: spaCy/NLTK and torch/transformers take seconds to import.
+def _has_modules(*names: str) -> bool:
+    try:
+        return all(importlib.util.find_spec(name) is not None for name in names)
+    except (ImportError, ValueError):
+        return False
+
+BASIC_NLP_AVAILABLE = _has_modules("nltk", "spacy")
+ADVANCED_NLP_AVAILABLE = _has_modules("transformers", "sentence_transformers", "torch")
 
 logger = logging.getLogger(__name__)
 
@@ -82,12 +80,34 @@ class SemanticAnalysisService:
     - Technical complexity scoring
     - Novelty detection
     """
+
+    # Domain keywords mapping
+    DOMAIN_KEYWORDS = {
+        'machine_learning': ['machine learning', 'neural network', 'deep learning', 'ai', 'artificial intelligence'],
+        'medicine': ['medical', 'clinical', 'patient', 'disease', 'treatment', 'therapy'],
+        'biology': ['biological', 'gene', 'protein', 'cell', 'molecular', 'organism'],
+        'chemistry': ['chemical', 'molecule', 'reaction', 'synthesis', 'compound'],
+        'physics': ['quantum', 'particle', 'energy', 'force', 'wave', 'field'],
+        'computer_science': ['algorithm', 'software', 'programming', 'computation', 'system'],
+        'mathematics': ['mathematical', 'equation', 'theorem', 'proof', 'formula'],
+        'engineering': ['engineering', 'design', 'optimization', 'system', 'technology']
+    }
+
+    CONFIDENCE_SCORES = {
+        'methodology': 0.8,  # Pattern-based detection confidence
+        'complexity': 0.7,
+        'novelty': 0.6
+    }
+
+    SPACY_BATCH_SIZE = 64
     
     def __init__(self):
         self.scibert_model = None
         self.sentence_transformer = None
         self.nlp = None
         self.is_initialized = False
+        self.encoder = None  # micro-batching worker around the active embedding model
+        self._init_lock = asyncio.Lock()
         
         # Methodology detection patterns
         self.methodology_patterns = {
@@ -146,8 +166,23 @@ class SemanticAnalysisService:
             ]
         }
 
+        # Patterns are compiled once and matched against lower-cased text
+        self._methodology_regexes = self._compile(self.methodology_patterns)
+        self._complexity_regexes = self._compile(self.complexity_indicators)
+        self._novelty_regexes = self._compile(self.novelty_patterns)
+
+        # spaCy worker processes for batch term extraction (1 = in-process)
+        self.spacy_processes = max(1, int(os.getenv("SEMANTIC_SPACY_PROCESSES", "1")))
+
+    @staticmethod
+    def _compile(patterns: Dict[Any, List[str]]) -> Dict[Any, List["re.Pattern"]]:
+        return {key: [re.compile(p) for p in group] for key, group in patterns.items()}
+
     async def initialize(self) -> bool:
-        """Initialize NLP models and resources"""
+        """Initialize NLP models and resources (loaded on a worker thread, off the event loop)"""
+        return await asyncio.to_thread(self._load_models)
+
+    def _load_models(self) -> bool:
         if not BASIC_NLP_AVAILABLE:
             logger.error("Basic NLP libraries not available. Cannot initialize semantic analysis.")
             print("❌ Basic NLP libraries not available")
@@ -156,6 +191,8 @@ class SemanticAnalysisService:
         try:
             print("🚀 Initializing semantic analysis models...")
             logger.info("Initializing semantic analysis models...")
+            import nltk
+            import spacy
 
             # Initialize spaCy for NLP processing (basic functionality)
             try:
@@ -178,16 +215,16 @@ class SemanticAnalysisService:
                 logger.warning(f"NLTK download failed: {e}")
                 print(f"⚠️  NLTK download failed: {e}")
 
-            # Initialize advanced models if available
-            if ADVANCED_NLP_AVAILABLE:
+            # Initialize advanced models if available (ONNX Runtime with INFERENCE_BACKEND=onnx)
+            if ADVANCED_NLP_AVAILABLE or onnx_enabled():
                 try:
                     print("🔬 Loading advanced NLP models...")
                     # Initialize SciBERT for scientific text understanding
-                    self.scibert_model = SentenceTransformer('allenai/scibert_scivocab_uncased')
+                    self.scibert_model = self._load_sentence_model('allenai/scibert_scivocab_uncased')
                     print("✅ SciBERT model loaded")
 
                     # Initialize sentence transformer for general embeddings
-                    self.sentence_transformer = SentenceTransformer('all-MiniLM-L6-v2')
+                    self.sentence_transformer = self._load_sentence_model('sentence-transformers/all-MiniLM-L6-v2')
                     print("✅ Sentence transformer loaded")
 
                     logger.info("Advanced NLP models loaded successfully")
@@ -211,10 +248,29 @@ class SemanticAnalysisService:
             print(f"❌ Failed to initialize semantic analysis service: {e}")
             return False
 
+    def _load_sentence_model(self, model_name: str):
+        model = onnx_sentence_encoder(model_name)
+        if model is None:
+            if not ADVANCED_NLP_AVAILABLE:
+                raise RuntimeError(f"No inference backend available for {model_name}")
+            from sentence_transformers import SentenceTransformer
+            model = SentenceTransformer(model_name)
+        return model
+
+    async def ensure_initialized(self):
+        """Load the models once; concurrent callers (first requests, startup warm-up) share the load"""
+        if not self.is_initialized:
+            async with self._init_lock:  # concurrent analyses load the models once
+                if not self.is_initialized:
+                    print("🔧 [INIT] Service not initialized, attempting auto-initialization...")
+                    logger.info("Service not initialized, attempting auto-initialization")
+                    await self.initialize()
+
     async def analyze_paper(self, 
                           title: str, 
                           abstract: str, 
-                          full_text: Optional[str] = None) -> SemanticFeatures:
+                          full_text: Optional[str] = None,
+                          pmid: Optional[str] = None) -> SemanticFeatures:
         """
         Perform comprehensive semantic analysis of a research paper
         
@@ -222,198 +278,259 @@ class SemanticAnalysisService:
             title: Paper title
             abstract: Paper abstract
             full_text: Full paper text (optional)
+            pmid: PubMed ID (optional); features are persisted and reused per PMID
             
         Returns:
             SemanticFeatures object with analysis results
         """
-        analysis_start_time = time.time()
         logger.info(f"🔬 Starting semantic analysis for paper: '{title[:100]}...'")
         print(f"🔬 [ANALYSIS START] Paper: '{title[:50]}...' | Abstract length: {len(abstract)} chars")
+        features = await self.analyze_papers([
+            {'pmid': pmid, 'title': title, 'abstract': abstract, 'full_text': full_text}
+        ])
+        return features[0]
 
-        if not self.is_initialized:
-            print("🔧 [INIT] Service not initialized, attempting auto-initialization...")
-            logger.info("Service not initialized, attempting auto-initialization")
-            await self.initialize()
+    async def analyze_papers(self, papers: List[Dict[str, Any]],
+                             db: Optional[Session] = None) -> List[SemanticFeatures]:
+        """
+        Analyze a batch of papers in one pass
+
+        Args:
+            papers: Dicts with title, abstract and optional pmid and full_text
+            db: Session for the persisted features (a short-lived one is opened if omitted)
+
+        Returns:
+            SemanticFeatures per paper, in input order
+
+        Papers with a PMID whose text and embedding model are unchanged since
+        their last analysis are served from paper_semantic_features. The rest
+        run through spaCy as one nlp.pipe batch, through the embedding model as
+        one encode batch, and through the precompiled pattern detectors; their
+        results are persisted.
+        """
+        analysis_start_time = time.time()
+        await self.ensure_initialized()
 
         if not self.is_initialized:
             print("⚠️  [ERROR] Service initialization failed, returning default features")
             logger.error("Service initialization failed, returning default semantic features")
-            # Return basic features if models aren't available
-            return SemanticFeatures(
-                embeddings=np.zeros(384),  # Default embedding size
-                methodology=ResearchMethodology.THEORETICAL,
-                complexity_score=0.5,
-                novelty_type=NoveltyType.INCREMENTAL,
-                technical_terms=[],
-                research_domains=[],
-                confidence_scores={}
-            )
-        
+            return [self._default_features() for _ in papers]
+
+        texts = [self._combined_text(p) for p in papers]
+        encoder = self._embedding_encoder()
+        model_name = encoder.name if encoder is not None else "basic"
+        keys = {
+            str(p['pmid']): hashlib.sha1(text.encode('utf-8')).hexdigest()
+            for p, text in zip(papers, texts) if p.get('pmid')
+        }
+
+        # Persisted-feature reads and writes are blocking DB I/O, so they run off the event loop
+        own_session = db is None and bool(keys)
+        if own_session:
+            db = get_session_local()()
         try:
-            print(f"🔬 [ANALYSIS] Starting analysis for: {title[:50]}...")
-            logger.info(f"Starting detailed analysis for paper: {title}")
-
-            # Combine text for analysis
-            combined_text = f"{title}. {abstract}"
-            if full_text:
-                combined_text += f" {full_text[:5000]}"  # Limit text length
-                print(f"📝 [TEXT] Combined text with full text: {len(combined_text)} characters")
-                logger.info(f"Combined text length with full text: {len(combined_text)} characters")
-            else:
-                print(f"📝 [TEXT] Combined text (title + abstract): {len(combined_text)} characters")
-                logger.info(f"Combined text length (title + abstract): {len(combined_text)} characters")
-
-            # Generate embeddings
-            print("🧮 [EMBEDDINGS] Generating semantic embeddings...")
-            embeddings_start = time.time()
-            embeddings = await self._generate_embeddings(combined_text)
-            embeddings_time = time.time() - embeddings_start
-            print(f"🧮 [EMBEDDINGS] Generated embeddings: {embeddings.shape} in {embeddings_time:.3f}s")
-            logger.info(f"Generated embeddings shape: {embeddings.shape} in {embeddings_time:.3f}s")
-
-            # Detect methodology
-            print("🔬 [METHODOLOGY] Detecting research methodology...")
-            methodology_start = time.time()
-            methodology = await self._detect_methodology(combined_text)
-            methodology_time = time.time() - methodology_start
-            print(f"🔬 [METHODOLOGY] Detected: {methodology.value} in {methodology_time:.3f}s")
-            logger.info(f"Detected methodology: {methodology.value} in {methodology_time:.3f}s")
-
-            # Score complexity
-            print("📊 [COMPLEXITY] Calculating technical complexity...")
-            complexity_start = time.time()
-            complexity_score = await self._score_complexity(combined_text)
-            complexity_time = time.time() - complexity_start
-            print(f"📊 [COMPLEXITY] Score: {complexity_score:.3f} in {complexity_time:.3f}s")
-            logger.info(f"Complexity score: {complexity_score:.3f} in {complexity_time:.3f}s")
-
-            # Detect novelty
-            print("✨ [NOVELTY] Detecting novelty type...")
-            novelty_start = time.time()
-            novelty_type = await self._detect_novelty(combined_text)
-            novelty_time = time.time() - novelty_start
-            print(f"✨ [NOVELTY] Type: {novelty_type.value} in {novelty_time:.3f}s")
-            logger.info(f"Novelty type: {novelty_type.value} in {novelty_time:.3f}s")
-
-            # Extract technical terms
-            print("🏷️  [TERMS] Extracting technical terms...")
-            terms_start = time.time()
-            technical_terms = await self._extract_technical_terms(combined_text)
-            terms_time = time.time() - terms_start
-            print(f"🏷️  [TERMS] Found {len(technical_terms)} terms in {terms_time:.3f}s: {technical_terms[:10]}")
-            logger.info(f"Extracted {len(technical_terms)} technical terms in {terms_time:.3f}s")
-
-            # Identify research domains
-            print("🎯 [DOMAINS] Identifying research domains...")
-            domains_start = time.time()
-            research_domains = await self._identify_research_domains(combined_text)
-            domains_time = time.time() - domains_start
-            print(f"🎯 [DOMAINS] Identified: {research_domains} in {domains_time:.3f}s")
-            logger.info(f"Research domains: {research_domains} in {domains_time:.3f}s")
-
-            # Calculate confidence scores
-            print("🎯 [CONFIDENCE] Calculating confidence scores...")
-            confidence_scores = {
-                'methodology': 0.8,  # Placeholder - would be calculated from model confidence
-                'complexity': 0.7,
-                'novelty': 0.6
-            }
-            print(f"🎯 [CONFIDENCE] Scores: {confidence_scores}")
-            logger.info(f"Confidence scores: {confidence_scores}")
-            
-            # Create final results
-            total_analysis_time = time.time() - analysis_start_time
-            print(f"✅ [SUCCESS] Analysis complete in {total_analysis_time:.3f}s")
-            print(f"📊 [SUMMARY] Methodology: {methodology.value} | Complexity: {complexity_score:.3f} | Novelty: {novelty_type.value}")
-            print(f"📊 [SUMMARY] Terms: {len(technical_terms)} | Domains: {len(research_domains)} | Embeddings: {embeddings.shape}")
-
-            logger.info(f"Semantic analysis completed successfully in {total_analysis_time:.3f}s")
-            logger.info(f"Results - Methodology: {methodology.value}, Complexity: {complexity_score:.3f}, Novelty: {novelty_type.value}")
-
-            return SemanticFeatures(
-                embeddings=embeddings,
-                methodology=methodology,
-                complexity_score=complexity_score,
-                novelty_type=novelty_type,
-                technical_terms=technical_terms,
-                research_domains=research_domains,
-                confidence_scores=confidence_scores
-            )
+            persisted, rows = await asyncio.to_thread(self._load_persisted, db, keys, model_name) \
+                if keys else ({}, {})
+            results: List[Optional[SemanticFeatures]] = [
+                persisted.get(str(p.get('pmid'))) if p.get('pmid') else None for p in papers
+            ]
+            todo = [i for i, features in enumerate(results) if features is None]
 
+            if todo:
+                try:
+                    todo_texts = [texts[i] for i in todo]
+                    embeddings, terms = await asyncio.gather(
+                        self._embed_batch(todo_texts),
+                        asyncio.to_thread(self._technical_terms_batch, todo_texts)
+                    )
+                    for i, text, embedding, technical_terms in zip(todo, todo_texts, embeddings, terms):
+                        text_lower = text.lower()
+                        results[i] = SemanticFeatures(
+                            embeddings=np.asarray(embedding),
+                            methodology=self._methodology_of(text_lower),
+                            complexity_score=self._complexity_of(text_lower),
+                            novelty_type=self._novelty_of(text_lower),
+                            technical_terms=technical_terms,
+                            research_domains=self._domains_of(text_lower),
+                            confidence_scores=dict(self.CONFIDENCE_SCORES)
+                        )
+                except Exception as e:
+                    logger.error(f"Semantic analysis of {len(todo)} papers failed: {e}")
+                    print(f"❌ [ERROR] Batch analysis failed: {e}")
+                    return [r if r is not None else self._default_features() for r in results]
+
+                if keys:
+                    await asyncio.to_thread(self._persist, db, rows, model_name, [
+                        (str(papers[i]['pmid']), keys[str(papers[i]['pmid'])], results[i])
+                        for i in todo if papers[i].get('pmid')
+                    ])
+        finally:
+            if own_session:
+                await asyncio.to_thread(db.close)
+
+        total_analysis_time = time.time() - analysis_start_time
+        print(f"✅ [SUCCESS] Analyzed {len(papers)} papers ({len(papers) - len(todo)} cached) in {total_analysis_time:.3f}s")
+        logger.info(f"Semantic analysis of {len(papers)} papers completed in {total_analysis_time:.3f}s "
+                    f"({len(papers) - len(todo)} from persisted features)")
+        return results
+
+    def _default_features(self) -> SemanticFeatures:
+        return SemanticFeatures(
+            embeddings=np.zeros(384),  # Default embedding size
+            methodology=ResearchMethodology.THEORETICAL,
+            complexity_score=0.5,
+            novelty_type=NoveltyType.INCREMENTAL,
+            technical_terms=[],
+            research_domains=[],
+            confidence_scores={}
+        )
+
+    def _combined_text(self, paper: Dict[str, Any]) -> str:
+        combined_text = f"{paper.get('title') or ''}. {paper.get('abstract') or ''}"
+        if paper.get('full_text'):
+            combined_text += f" {paper['full_text'][:5000]}"  # Limit text length
+        return combined_text
+
+    # ------------------------------------------------------------------
+    # Persisted features
+    # ------------------------------------------------------------------
+
+    def _load_persisted(self, db: Session, keys: Dict[str, str], model_name: str):
+        """(features reusable for their text hash and model, stored rows) by PMID"""
+        try:
+            rows = {
+                row.pmid: row for row in
+                db.query(PaperSemanticFeatures).filter(PaperSemanticFeatures.pmid.in_(list(keys))).all()
+            }
+        except Exception as e:
+            logger.warning(f"Could not read persisted semantic features: {e}")
+            db.rollback()
+            return {}, {}
+
+        features = {}
+        for pmid, row in rows.items():
+            if row.text_hash != keys[pmid] or row.model_name != model_name:
+                continue
+            try:
+                features[pmid] = SemanticFeatures(
+                    embeddings=np.asarray(row.embedding or [], dtype=float),
+                    methodology=ResearchMethodology(row.methodology),
+                    complexity_score=row.complexity_score,
+                    novelty_type=NoveltyType(row.novelty_type),
+                    technical_terms=list(row.technical_terms or []),
+                    research_domains=list(row.research_domains or []),
+                    confidence_scores=dict(row.confidence_scores or {})
+                )
+            except (ValueError, TypeError) as e:
+                # Unreadable row (e.g. an enum value that no longer exists): re-analyze the paper
+                logger.warning(f"Ignoring persisted semantic features for {pmid}: {e}")
+        return features, rows
+
+    def _persist(self, db: Session, rows: Dict[str, Any], model_name: str, analyzed: List[tuple]):
+        try:
+            for pmid, text_hash, features in analyzed:
+                row = rows.get(pmid)
+                if row is None:
+                    row = PaperSemanticFeatures(pmid=pmid)
+                    db.add(row)
+                    rows[pmid] = row
+                row.text_hash = text_hash
+                row.model_name = model_name
+                row.methodology = features.methodology.value
+                row.complexity_score = features.complexity_score
+                row.novelty_type = features.novelty_type.value
+                row.technical_terms = features.technical_terms
+                row.research_domains = features.research_domains
+                row.confidence_scores = features.confidence_scores
+                row.embedding = [float(x) for x in features.embeddings]
+            db.commit()
         except Exception as e:
-            total_analysis_time = time.time() - analysis_start_time
-            print(f"❌ [ERROR] Analysis failed after {total_analysis_time:.3f}s: {e}")
-            logger.error(f"Semantic analysis failed after {total_analysis_time:.3f}s: {e}")
-            import traceback
-            logger.error(f"Full traceback: {traceback.format_exc()}")
-
-            # Return default features on error
-            return SemanticFeatures(
-                embeddings=np.zeros(384),
-                methodology=ResearchMethodology.THEORETICAL,
-                complexity_score=0.5,
-                novelty_type=NoveltyType.INCREMENTAL,
-                technical_terms=[],
-                research_domains=[],
-                confidence_scores={}
-            )
+            logger.warning(f"Could not persist semantic features: {e}")
+            db.rollback()
+
+    # ------------------------------------------------------------------
+    # Embeddings
+    # ------------------------------------------------------------------
+
+    def _embedding_encoder(self):
+        """
+        Micro-batching worker around the active embedding model (SciBERT, else MiniLM)
+
+        Encodes from concurrent analyses share model batches and run off the
+        event loop.
+        """
+        if self.encoder is None:
+            # The ONNX variant is part of the name so persisted features are not mixed across backends
+            if self.scibert_model is not None:
+                self.encoder = sentence_encoder(self.scibert_model, name=self._model_label("scibert", self.scibert_model))
+            elif self.sentence_transformer is not None:
+                self.encoder = sentence_encoder(self.sentence_transformer,
+                                                name=self._model_label("minilm", self.sentence_transformer))
+        return self.encoder
+
+    @staticmethod
+    def _model_label(name: str, model) -> str:
+        variant = getattr(model, "variant", None)
+        return f"{name}-{variant}" if isinstance(variant, str) else name
+
+    def get_inference_stats(self) -> Optional[Dict[str, Any]]:
+        """Throughput and batching metrics of the embedding worker"""
+        return self.encoder.get_stats() if self.encoder is not None else None
+
+    async def _embed_batch(self, texts: List[str]) -> List[np.ndarray]:
+        encoder = self._embedding_encoder()
+        if encoder is not None:
+            return await encoder.encode_many(texts)
+        return [self._basic_embedding(text) for text in texts]
 
     async def _generate_embeddings(self, text: str) -> np.ndarray:
         """Generate semantic embeddings using available models"""
         try:
-            if self.scibert_model is not None:
-                print("🧮 [EMBEDDINGS] Using SciBERT for scientific text embeddings")
-                logger.info("Using SciBERT model for embeddings generation")
-                embeddings = self.scibert_model.encode(text)
-                print(f"🧮 [EMBEDDINGS] SciBERT generated {embeddings.shape} embeddings")
-                return embeddings
-            elif self.sentence_transformer is not None:
-                print("🧮 [EMBEDDINGS] Using sentence transformer for general embeddings")
-                logger.info("Using sentence transformer model for embeddings generation")
-                embeddings = self.sentence_transformer.encode(text)
-                print(f"🧮 [EMBEDDINGS] Sentence transformer generated {embeddings.shape} embeddings")
+            encoder = self._embedding_encoder()
+            if encoder is not None:
+                print(f"🧮 [EMBEDDINGS] Using {encoder.name} inference worker for embeddings")
+                logger.info(f"Using {encoder.name} inference worker for embeddings generation")
+                embeddings = await encoder.encode(text)
+                print(f"🧮 [EMBEDDINGS] {encoder.name} generated {embeddings.shape} embeddings")
                 return embeddings
             else:
                 print("🧮 [EMBEDDINGS] Using basic text-based feature extraction")
                 logger.info("Using basic text features for embeddings (no advanced models available)")
-                # Create simple embeddings based on text features
-                words = text.lower().split()
-                word_count = len(words)
-                unique_words = len(set(words))
-                avg_word_length = sum(len(word) for word in words) / max(word_count, 1)
-
-                # Simple feature vector with more sophisticated features
-                features = [
-                    len(text) / 1000,  # Normalized text length
-                    unique_words / max(word_count, 1),  # Vocabulary diversity
-                    avg_word_length,  # Average word length
-                    word_count / max(len(text), 1),  # Word density
-                    len([w for w in words if len(w) > 6]) / max(word_count, 1),  # Complex word ratio
-                ]
-
-                print(f"🧮 [EMBEDDINGS] Basic features: length={len(text)}, words={word_count}, unique={unique_words}, avg_len={avg_word_length:.2f}")
-                logger.info(f"Basic embedding features: text_length={len(text)}, word_count={word_count}, unique_words={unique_words}")
-
-                # Pad to 384 dimensions with zeros
-                embeddings = np.array(features + [0.0] * (384 - len(features)))
-                print(f"🧮 [EMBEDDINGS] Generated basic embeddings: {embeddings.shape}")
-                return embeddings
+                return self._basic_embedding(text)
         except Exception as e:
             logger.error(f"Error generating embeddings: {e}")
             print(f"❌ [EMBEDDINGS] Error generating embeddings: {e}")
             return np.zeros(384)  # Default embedding size
 
-    async def _detect_methodology(self, text: str) -> ResearchMethodology:
+    def _basic_embedding(self, text: str) -> np.ndarray:
+        """Simple text-feature vector used when no embedding model is available"""
+        words = text.lower().split()
+        word_count = len(words)
+        unique_words = len(set(words))
+        avg_word_length = sum(len(word) for word in words) / max(word_count, 1)
+
+        # Simple feature vector with more sophisticated features
+        features = [
+            len(text) / 1000,  # Normalized text length
+            unique_words / max(word_count, 1),  # Vocabulary diversity
+            avg_word_length,  # Average word length
+            word_count / max(len(text), 1),  # Word density
+            len([w for w in words if len(w) > 6]) / max(word_count, 1),  # Complex word ratio
+        ]
+
+        # Pad to 384 dimensions with zeros
+        return np.array(features + [0.0] * (384 - len(features)))
+
+    # ------------------------------------------------------------------
+    # Detectors (text is lower-cased once per paper)
+    # ------------------------------------------------------------------
+
+    def _methodology_of(self, text_lower: str) -> ResearchMethodology:
         """Detect research methodology using pattern matching"""
-        text_lower = text.lower()
-        methodology_scores = {}
-        
-        for methodology, patterns in self.methodology_patterns.items():
-            score = 0
-            for pattern in patterns:
-                matches = len(re.findall(pattern, text_lower))
-                score += matches
-            methodology_scores[methodology] = score
+        methodology_scores = {
+            methodology: sum(len(regex.findall(text_lower)) for regex in regexes)
+            for methodology, regexes in self._methodology_regexes.items()
+        }
         
         # Return methodology with highest score
         if methodology_scores:
@@ -423,36 +540,25 @@ class SemanticAnalysisService:
         
         return ResearchMethodology.THEORETICAL  # Default
 
-    async def _score_complexity(self, text: str) -> float:
+    def _complexity_of(self, text_lower: str) -> float:
         """Score technical complexity of the paper"""
-        text_lower = text.lower()
         complexity_score = 0.5  # Base score
+        weights = {'high': 0.1, 'medium': 0.05, 'low': -0.05}
         
         # Check for complexity indicators
-        for level, patterns in self.complexity_indicators.items():
-            for pattern in patterns:
-                matches = len(re.findall(pattern, text_lower))
-                if level == 'high':
-                    complexity_score += matches * 0.1
-                elif level == 'medium':
-                    complexity_score += matches * 0.05
-                elif level == 'low':
-                    complexity_score -= matches * 0.05
+        for level, regexes in self._complexity_regexes.items():
+            for regex in regexes:
+                complexity_score += len(regex.findall(text_lower)) * weights.get(level, 0)
         
         # Normalize to 0-1 range
         return max(0.0, min(1.0, complexity_score))
 
-    async def _detect_novelty(self, text: str) -> NoveltyType:
+    def _novelty_of(self, text_lower: str) -> NoveltyType:
         """Detect type of research novelty"""
-        text_lower = text.lower()
-        novelty_scores = {}
-        
-        for novelty_type, patterns in self.novelty_patterns.items():
-            score = 0
-            for pattern in patterns:
-                matches = len(re.findall(pattern, text_lower))
-                score += matches
-            novelty_scores[novelty_type] = score
+        novelty_scores = {
+            novelty_type: sum(len(regex.findall(text_lower)) for regex in regexes)
+            for novelty_type, regexes in self._novelty_regexes.items()
+        }
         
         # Return novelty type with highest score
         if novelty_scores:
@@ -462,47 +568,35 @@ class SemanticAnalysisService:
         
         return NoveltyType.INCREMENTAL  # Default
 
-    async def _extract_technical_terms(self, text: str) -> List[str]:
-        """Extract technical terms from the text"""
+    def _technical_terms_batch(self, texts: List[str]) -> List[List[str]]:
+        """Extract technical terms for a batch of texts with one spaCy pipe"""
         if not self.nlp:
-            return []
+            return [[] for _ in texts]
         
         try:
-            doc = self.nlp(text[:1000])  # Limit text length
-            technical_terms = []
-            
-            for token in doc:
-                # Extract technical terms (nouns, proper nouns, technical abbreviations)
-                if (token.pos_ in ['NOUN', 'PROPN'] and 
-                    len(token.text) > 3 and 
-                    token.text.isalpha()):
-                    technical_terms.append(token.text.lower())
-            
-            # Remove duplicates and return top terms
-            return list(set(technical_terms))[:20]
-            
+            docs = self.nlp.pipe([text[:1000] for text in texts],  # Limit text length
+                                 batch_size=self.SPACY_BATCH_SIZE, n_process=self.spacy_processes)
+            return [self._technical_terms_of(doc) for doc in docs]
         except Exception as e:
             logger.error(f"Error extracting technical terms: {e}")
-            return []
+            return [[] for _ in texts]
+
+    def _technical_terms_of(self, doc) -> List[str]:
+        technical_terms = []
+        for token in doc:
+            # Extract technical terms (nouns, proper nouns, technical abbreviations)
+            if (token.pos_ in ['NOUN', 'PROPN'] and 
+                len(token.text) > 3 and 
+                token.text.isalpha()):
+                technical_terms.append(token.text.lower())
+        
+        # Remove duplicates and return top terms
+        return list(set(technical_terms))[:20]
 
-    async def _identify_research_domains(self, text: str) -> List[str]:
+    def _domains_of(self, text_lower: str) -> List[str]:
         """Identify research domains from the text"""
-        text_lower = text.lower()
-        
-        # Domain keywords mapping
-        domain_keywords = {
-            'machine_learning': ['machine learning', 'neural network', 'deep learning', 'ai', 'artificial intelligence'],
-            'medicine': ['medical', 'clinical', 'patient', 'disease', 'treatment', 'therapy'],
-            'biology': ['biological', 'gene', 'protein', 'cell', 'molecular', 'organism'],
-            'chemistry': ['chemical', 'molecule', 'reaction', 'synthesis', 'compound'],
-            'physics': ['quantum', 'particle', 'energy', 'force', 'wave', 'field'],
-            'computer_science': ['algorithm', 'software', 'programming', 'computation', 'system'],
-            'mathematics': ['mathematical', 'equation', 'theorem', 'proof', 'formula'],
-            'engineering': ['engineering', 'design', 'optimization', 'system', 'technology']
-        }
-        
         identified_domains = []
-        for domain, keywords in domain_keywords.items():
+        for domain, keywords in self.DOMAIN_KEYWORDS.items():
             for keyword in keywords:
                 if keyword in text_lower:
                     identified_domains.append(domain)
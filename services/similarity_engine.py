@@ -23,6 +23,7 @@ from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
 from sqlalchemy.orm import Session
 from database import get_db, Article, ArticleCitation
+from utils.article_profiles import query_article_rows
 
 
 @dataclass
@@ -224,14 +225,14 @@ class SimilarityEngine:
             db = next(get_db())
         
         try:
-            # Get the base article
-            base_article = db.query(Article).filter(Article.pmid == pmid).first()
+            # Get the base article (similarity columns only - no PDF text or summaries)
+            base_article = query_article_rows(db, "similarity").filter(Article.pmid == pmid).first()
             if not base_article:
                 return []
             
             # Get candidate articles (same journal or related field)
             # Limit to reasonable number for performance
-            candidates_query = db.query(Article).filter(
+            candidates_query = query_article_rows(db, "similarity").filter(
                 Article.pmid != pmid
             )
             
@@ -0,0 +1,129 @@
+"""
+Startup Warm-up
+Background loading of models after the app starts serving
+
+Models (semantic analysis, embeddings, cross-encoders) are loaded on first use,
+so boot no longer waits for them. To keep the first user requests from paying
+the load instead, startup registers each enabled model here and `start()`
+loads them in the background, at most WARMUP_CONCURRENCY at a time:
+
+- sync loaders run on worker threads, async loaders on the event loop
+- a loader is the same first-use accessor request handlers call, so a request
+  arriving mid-load shares the load (or finds the model ready)
+- each component is pending -> loading -> ready / failed; a failed component
+  leaves its feature on the fallback path it already has
+
+`status()` backs the readiness endpoint: the app is ready once no component is
+pending or loading ("degraded" if some failed). WARMUP_ENABLED=0 skips the
+warm-up; models then load on first use and readiness is reported immediately.
+"""
+
+import asyncio
+import inspect
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+
+@dataclass
+class WarmupComponent:
+    name: str
+    loader: Callable[[], Any]
+    state: str = PENDING
+    error: Optional[str] = None
+    started_at: Optional[float] = None
+    duration_ms: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"state": self.state, "duration_ms": self.duration_ms, "error": self.error}
+
+
+class Warmup:
+    """Named model loaders run in the background after startup"""
+
+    def __init__(self, concurrency: Optional[int] = None, enabled: Optional[bool] = None):
+        self.concurrency = max(1, concurrency or int(os.getenv("WARMUP_CONCURRENCY", "2")))
+        self.enabled = enabled if enabled is not None else os.getenv("WARMUP_ENABLED", "1") not in ("0", "false", "False")
+        self.components: Dict[str, WarmupComponent] = {}
+        self.started_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, name: str, loader: Callable[[], Any]):
+        """Add a loader (sync or async); a falsy result counts as a failed load"""
+        self.components[name] = WarmupComponent(name, loader)
+
+    def start(self) -> Optional[asyncio.Task]:
+        """Schedule the warm-up on the running loop; returns immediately"""
+        if not self.enabled or self._task is not None:
+            return self._task
+        self.started_at = time.time()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        return self._task
+
+    async def wait(self, timeout: Optional[float] = None):
+        if self._task is not None:
+            await asyncio.wait_for(asyncio.shield(self._task), timeout)
+
+    async def _run(self):
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def load(component: WarmupComponent):
+            async with semaphore:
+                component.state = LOADING
+                component.started_at = time.monotonic()
+                try:
+                    if inspect.iscoroutinefunction(component.loader):
+                        result = await component.loader()
+                    else:
+                        result = await asyncio.to_thread(component.loader)
+                    if not result:
+                        raise RuntimeError("loader returned no model")
+                    component.state = READY
+                except Exception as e:
+                    component.state = FAILED
+                    component.error = str(e)[:300]
+                component.duration_ms = round((time.monotonic() - component.started_at) * 1000, 1)
+                if component.state == READY:
+                    logger.info(f"🔥 Warm-up: {component.name} ready in {component.duration_ms:.0f}ms")
+                else:
+                    logger.warning(f"⚠️ Warm-up: {component.name} failed after {component.duration_ms:.0f}ms: {component.error}")
+
+        await asyncio.gather(*[load(c) for c in self.components.values()])
+        logger.info(f"✅ Warm-up finished in {time.time() - self.started_at:.1f}s")
+
+    def status(self) -> Dict[str, Any]:
+        components = {name: c.to_dict() for name, c in self.components.items()}
+        if not self.enabled:
+            status = "ready"
+        elif any(c.state in (PENDING, LOADING) for c in self.components.values()):
+            status = "warming_up"
+        elif any(c.state == FAILED for c in self.components.values()):
+            status = "degraded"
+        else:
+            status = "ready"
+        return {
+            "status": status,
+            "ready": status != "warming_up",
+            "warmup_enabled": self.enabled,
+            "elapsed_seconds": round(time.time() - self.started_at, 1) if self.started_at else 0.0,
+            "components": components,
+        }
+
+
+_warmup = None
+
+
+def get_warmup() -> Warmup:
+    global _warmup
+    if _warmup is None:
+        _warmup = Warmup()
+    return _warmup
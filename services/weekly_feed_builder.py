@@ -0,0 +1,287 @@
+"""
+Weekly Feed Builder
+Precomputes weekly recommendation feeds offline and serves them from a table
+
+`get_weekly_recommendations` builds a user profile, runs several PubMed
+searches per domain and optionally four LLM agents. Doing that inside the
+request made /recommendations/weekly slow and the only cache was an
+in-process dict. Here:
+
+1. A background scheduler finds feeds that are due - active users with no
+   feed for the current week, or whose feed was marked stale - and builds
+   them in batches. Each batch runs inside `pubmed_batch()`, so users who
+   share a research domain reuse one set of PubMed results.
+2. Feeds are upserted into `weekly_recommendation_feeds` (one row per user
+   and scope) and the endpoint serves them with one indexed read.
+3. Saving a paper to a collection marks the saver's feeds stale (mapper
+   hook below); the endpoint keeps serving the old feed and queues a
+   rebuild, and the scheduler picks up anything left.
+
+Every web worker starts the scheduler, so on PostgreSQL each tick first
+takes a session-level advisory lock; workers that lose the race skip the
+tick instead of rebuilding the same due feeds.
+"""
+
+import asyncio
+import logging
+import os
+import weakref
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import and_, event, inspect, or_, text, update
+from sqlalchemy.orm import Session
+
+from database import ArticleCollection, WeeklyRecommendationFeed, get_session_local
+from services.ai_recommendations_service import get_spotify_recommendations_service
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_SCOPE = "global"
+SCHEDULER_INTERVAL_SECONDS = int(os.getenv("WEEKLY_FEED_INTERVAL_SECONDS", "900"))
+SCHEDULER_BATCH_SIZE = int(os.getenv("WEEKLY_FEED_BATCH_SIZE", "50"))
+ACTIVE_USER_DAYS = 90
+SCHEDULER_LOCK_KEY = 0x5746454544  # pg advisory lock id for scheduler ticks ("WFEED")
+
+
+def scope_key(project_id: Optional[str]) -> str:
+    return project_id or GLOBAL_SCOPE
+
+
+def week_start(now: Optional[datetime] = None) -> datetime:
+    """Monday 00:00 UTC of the week containing `now`"""
+    now = now or datetime.now(timezone.utc)
+    monday = now - timedelta(days=now.weekday())
+    return monday.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # SQLite hands back naive datetimes even for timezone-aware columns
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+@contextmanager
+def scheduler_lock(db: Session):
+    """
+    Claim one scheduler tick across processes
+
+    Yields True when this process should build. On PostgreSQL this is a
+    non-blocking advisory lock held on a dedicated connection for the whole
+    tick (feed builds commit, so a transaction-scoped lock would not last);
+    other databases are single-process and always get the tick.
+    """
+    bind = db.get_bind()
+    if bind.dialect.name != "postgresql":
+        yield True
+        return
+
+    engine = getattr(bind, "engine", bind)
+    with engine.connect() as conn:
+        acquired = bool(conn.execute(
+            text("SELECT pg_try_advisory_lock(:key)"), {"key": SCHEDULER_LOCK_KEY}
+        ).scalar())
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": SCHEDULER_LOCK_KEY})
+
+
+class WeeklyFeedBuilder:
+    """Builds, stores and serves precomputed weekly recommendation feeds"""
+
+    def __init__(self, recommendations_service=None):
+        self.recommendations_service = recommendations_service or get_spotify_recommendations_service()
+        self._in_flight: Set[Tuple[str, str]] = set()
+        self._scheduler_task: Optional[asyncio.Task] = None
+
+    # ------------------------------------------------------------------
+    # Serving
+    # ------------------------------------------------------------------
+
+    def get_feed(self, db: Session, user_id: str, project_id: Optional[str] = None) -> Optional[WeeklyRecommendationFeed]:
+        """Stored feed for a user and scope (one indexed lookup)"""
+        return db.query(WeeklyRecommendationFeed).filter(
+            WeeklyRecommendationFeed.user_id == user_id,
+            WeeklyRecommendationFeed.scope_key == scope_key(project_id)
+        ).first()
+
+    def is_current(self, feed: WeeklyRecommendationFeed, now: Optional[datetime] = None) -> bool:
+        return _as_utc(feed.week_of) >= week_start(now)
+
+    def serve(self, feed: WeeklyRecommendationFeed) -> Dict[str, Any]:
+        """Response body for a stored feed"""
+        result = dict(feed.payload)
+        result["feed_status"] = feed.status
+        result["served_from"] = "precomputed"
+        return result
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    async def build_feed(self, db: Session, user_id: str, project_id: Optional[str] = None) -> Dict[str, Any]:
+        """Generate one feed now and store it; returns the stored payload"""
+        result = await self.recommendations_service.get_weekly_recommendations(
+            user_id=user_id, project_id=project_id, force_refresh=True
+        )
+        if result.get("status") == "success":
+            self._store(db, user_id, project_id, result)
+        return result
+
+    async def build_feeds(self, db: Session, targets: List[Tuple[str, Optional[str]]]) -> Dict[str, int]:
+        """
+        Build a batch of (user_id, project_id) feeds with shared PubMed results
+
+        Failures are logged and counted; they never stop the batch.
+        """
+        stats = {"built": 0, "failed": 0}
+        with self.recommendations_service.pubmed_batch():
+            for user_id, project_id in targets:
+                key = (user_id, scope_key(project_id))
+                if key in self._in_flight:
+                    continue
+                self._in_flight.add(key)
+                try:
+                    result = await self.build_feed(db, user_id, project_id)
+                    stats["built" if result.get("status") == "success" else "failed"] += 1
+                except Exception as e:
+                    db.rollback()
+                    stats["failed"] += 1
+                    logger.error(f"❌ Weekly feed build failed for {user_id}: {e}")
+                finally:
+                    self._in_flight.discard(key)
+        return stats
+
+    def _store(self, db: Session, user_id: str, project_id: Optional[str], payload: Dict[str, Any]):
+        now = datetime.now(timezone.utc)
+        feed = self.get_feed(db, user_id, project_id)
+        if feed is None:
+            feed = WeeklyRecommendationFeed(user_id=user_id, project_id=project_id, scope_key=scope_key(project_id))
+            db.add(feed)
+        feed.payload = payload
+        feed.week_of = week_start(now)
+        feed.status = "ready"
+        feed.generated_at = now
+        feed.stale_since = None
+        db.commit()
+
+    # ------------------------------------------------------------------
+    # Scheduling
+    # ------------------------------------------------------------------
+
+    def due_feeds(self, db: Session, limit: int = SCHEDULER_BATCH_SIZE,
+                  now: Optional[datetime] = None) -> List[Tuple[str, Optional[str]]]:
+        """
+        Feeds to build next: stale or last week's feeds, then active users
+        (saved a paper in the last ACTIVE_USER_DAYS) that have no feed yet
+        """
+        current_week = week_start(now)
+        due = [
+            (feed.user_id, feed.project_id)
+            for feed in db.query(WeeklyRecommendationFeed).filter(or_(
+                WeeklyRecommendationFeed.status == "stale",
+                WeeklyRecommendationFeed.week_of < current_week
+            )).order_by(WeeklyRecommendationFeed.week_of, WeeklyRecommendationFeed.stale_since).limit(limit)
+        ]
+        if len(due) >= limit:
+            return due
+
+        since = (now or datetime.now(timezone.utc)) - timedelta(days=ACTIVE_USER_DAYS)
+        has_feed = db.query(WeeklyRecommendationFeed.id).filter(
+            WeeklyRecommendationFeed.user_id == ArticleCollection.added_by,
+            WeeklyRecommendationFeed.scope_key == GLOBAL_SCOPE
+        ).exists()
+        new_users = db.query(ArticleCollection.added_by).filter(
+            ArticleCollection.added_at >= since,
+            ~has_feed
+        ).distinct().limit(limit - len(due)).all()
+        return due + [(user_id, None) for (user_id,) in new_users]
+
+    async def run_once(self, limit: int = SCHEDULER_BATCH_SIZE) -> Dict[str, int]:
+        """Build one batch of due feeds (skipped if another worker holds the tick)"""
+        db = get_session_local()()
+        try:
+            with scheduler_lock(db) as acquired:
+                if not acquired:
+                    logger.debug("📅 Weekly feed tick claimed by another worker, skipping")
+                    return {"built": 0, "failed": 0, "skipped": 1}
+                targets = self.due_feeds(db, limit)
+                if not targets:
+                    return {"built": 0, "failed": 0}
+                stats = await self.build_feeds(db, targets)
+                logger.info(f"📅 Weekly feeds: built {stats['built']}, failed {stats['failed']}")
+                return stats
+        finally:
+            db.close()
+
+    async def run_scheduler(self, interval_seconds: int = SCHEDULER_INTERVAL_SECONDS):
+        """Build due feeds forever, one batch per interval"""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"❌ Weekly feed scheduler tick failed: {e}")
+
+    def start_scheduler(self):
+        if self._scheduler_task is None or self._scheduler_task.done():
+            self._scheduler_task = asyncio.create_task(self.run_scheduler())
+
+    def schedule_refresh(self, user_id: str, project_id: Optional[str] = None):
+        """Rebuild one feed in the background (no-op if already building)"""
+        if (user_id, scope_key(project_id)) in self._in_flight:
+            return
+
+        async def refresh():
+            db = get_session_local()()
+            try:
+                await self.build_feeds(db, [(user_id, project_id)])
+            finally:
+                db.close()
+
+        asyncio.create_task(refresh())
+
+
+# ============================================================================
+# Event-driven invalidation: saving papers marks the saver's feeds stale
+# ============================================================================
+
+_feeds_table = WeeklyRecommendationFeed.__table__
+_table_ready: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def _feeds_enabled(connection) -> bool:
+    engine = connection.engine
+    ready = _table_ready.get(engine)
+    if ready is None:
+        ready = inspect(connection).has_table(_feeds_table.name)
+        _table_ready[engine] = ready
+    return ready
+
+
+def _on_paper_saved(mapper, connection, target: ArticleCollection):
+    if not target.added_by or not _feeds_enabled(connection):
+        return
+    connection.execute(
+        update(_feeds_table)
+        .where(and_(_feeds_table.c.user_id == target.added_by, _feeds_table.c.status == "ready"))
+        .values(status="stale", stale_since=datetime.now(timezone.utc))
+    )
+
+
+event.listen(ArticleCollection, "after_insert", _on_paper_saved)
+
+
+# Global builder instance
+_weekly_feed_builder = None
+
+def get_weekly_feed_builder() -> WeeklyFeedBuilder:
+    """Get the global weekly feed builder instance"""
+    global _weekly_feed_builder
+    if _weekly_feed_builder is None:
+        _weekly_feed_builder = WeeklyFeedBuilder()
+    return _weekly_feed_builder
@@ -0,0 +1,146 @@
+"""
+Tests for the append-only activity event store and keyset-paginated timeline
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, ResearchQuestion, Hypothesis, PaperTriage, ProjectActivityEvent
+from backend.app.services.activity_logging_service import (
+    ActivityLoggingService, ActivityEvent, decode_cursor
+)
+
+T0 = datetime(2026, 1, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _event(i, actor_type="user", activity_type="question_created", actor_id="u1", seconds=None):
+    return ActivityEvent(
+        activity_id=f"e{i:03d}", project_id="p1", activity_type=activity_type,
+        actor_type=actor_type, actor_id=actor_id, entity_type="question", entity_id=f"q{i}",
+        action="created", title=f"Event {i}",
+        created_at=T0 + timedelta(seconds=i if seconds is None else seconds)
+    )
+
+
+def test_insert_hooks_append_events(db):
+    db.add(ResearchQuestion(question_id="q1", project_id="p1", question_text="Why?", created_by="u1"))
+    db.add(Hypothesis(hypothesis_id="h1", project_id="p1", question_id="q1",
+                      hypothesis_text="Because", created_by="u1"))
+    db.add(PaperTriage(triage_id="t1", project_id="p1", article_pmid="111", triage_status="must_read"))
+    db.add(PaperTriage(triage_id="t2", project_id="p1", article_pmid="222", triage_status="ignore"))
+    db.add(PaperTriage(triage_id="t3", article_pmid="333", triage_status="must_read"))  # contextless
+    db.commit()
+
+    events = ActivityLoggingService(db).get_project_timeline("p1")
+    by_type = {e.activity_type: e for e in events}
+
+    assert sorted(by_type) == ["hypothesis_created", "question_created", "triage_completed"]
+    assert by_type["question_created"].entity_id == "q1"
+    assert by_type["triage_completed"].metadata["paper_pmids"] == ["111"]
+    assert db.query(ProjectActivityEvent).count() == 3
+
+
+def test_triage_update_records_only_status_changes(db):
+    triage = PaperTriage(triage_id="t1", project_id="p1", article_pmid="111", triage_status="ignore")
+    db.add(triage)
+    db.commit()
+
+    triage.relevance_score = 80
+    db.commit()
+    assert db.query(ProjectActivityEvent).count() == 0
+
+    triage.triage_status = "nice_to_know"
+    db.commit()
+    events = ActivityLoggingService(db).get_project_timeline("p1")
+    assert [e.description for e in events] == ["0 must-read, 1 nice-to-know"]
+
+
+def test_keyset_pagination_without_duplicates(db):
+    service = ActivityLoggingService(db)
+    for i in range(7):
+        service.record(_event(i))
+    # Timestamp ties are broken by event_id
+    for i in range(7, 10):
+        service.record(_event(i, seconds=100))
+    db.commit()
+
+    seen = []
+    cursor = None
+    while True:
+        page, cursor = service.get_project_timeline_page("p1", limit=3, cursor=cursor)
+        seen.extend(e.activity_id for e in page)
+        if cursor is None:
+            break
+
+    assert seen == [f"e{i:03d}" for i in reversed(range(10))]
+    assert decode_cursor(service.get_project_timeline_page("p1", limit=3)[1])[1] == "e007"
+
+
+def test_server_side_filters(db):
+    service = ActivityLoggingService(db)
+    service.record(_event(1))
+    service.record(_event(2, actor_type="ai", activity_type="triage_completed", actor_id="ai_agent"))
+    service.record(_event(3, actor_id="u2"))
+    db.commit()
+
+    assert [e.activity_id for e in service.get_project_timeline("p1", actor_types=["ai"])] == ["e002"]
+    assert [e.activity_id for e in service.get_project_timeline("p1", event_types=["question_created"])] == ["e003", "e001"]
+    page, _ = service.get_project_timeline_page("p1", actor_ids=["u2"])
+    assert [e.activity_id for e in page] == ["e003"]
+
+
+def test_invalid_cursor_rejected(db):
+    with pytest.raises(ValueError):
+        ActivityLoggingService(db).get_project_timeline_page("p1", cursor="not-a-cursor")
+
+
+def test_backfill_is_idempotent(db):
+    # Rows that predate the table: insert them directly and drop the hook output
+    db.add(ResearchQuestion(question_id="q1", project_id="p1", question_text="Why?", created_by="u1",
+                            created_at=T0))
+    db.add_all([
+        PaperTriage(triage_id=f"t{i}", project_id="p1", article_pmid=str(i),
+                    triage_status="must_read" if i < 2 else "nice_to_know", created_at=T0)
+        for i in range(3)
+    ])
+    db.commit()
+    db.query(ProjectActivityEvent).delete()
+    db.commit()
+
+    service = ActivityLoggingService(db)
+    assert service.backfill_project("p1", dry_run=True) == 2
+    assert db.query(ProjectActivityEvent).count() == 0
+
+    assert service.backfill_project("p1") == 2
+    assert service.backfill_project("p1") == 0
+
+    triage = [e for e in service.get_project_timeline("p1") if e.activity_type == "triage_completed"][0]
+    assert triage.title == "AI Triaged 3 Papers"
+    assert triage.metadata["must_read_count"] == 2
+
+
+def test_timeline_stats(db):
+    service = ActivityLoggingService(db)
+    service.record(_event(1))
+    service.record(_event(2))
+    service.record(_event(3, actor_type="ai", activity_type="protocol_extracted", actor_id="ai_agent"))
+    db.commit()
+
+    stats = service.get_timeline_stats("p1")
+
+    assert stats["total_events"] == 3
+    assert stats["user_actions"] == 2
+    assert stats["ai_actions"] == 1
+    assert stats["event_type_counts"] == {"question_created": 2, "protocol_extracted": 1}
@@ -0,0 +1,121 @@
+"""
+Tests for recursive-CTE annotation thread loading and keyset pagination
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, Annotation
+from services.annotation_threads import (
+    page_root_annotations, load_threads, decode_cursor, MAX_THREAD_DEPTH
+)
+
+T0 = datetime(2026, 1, 1, 12, 0, 0)
+
+
+def _note(annotation_id, parent=None, minutes=0, **kwargs):
+    return Annotation(annotation_id=annotation_id, project_id="p1", content=f"note {annotation_id}",
+                      author_id="u1", parent_annotation_id=parent,
+                      created_at=T0 + timedelta(minutes=minutes), **kwargs)
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        _note("r1", minutes=0, note_type="finding"),
+        _note("r1-a", "r1", minutes=5),
+        _note("r1-b", "r1", minutes=3),
+        _note("r1-a-x", "r1-a", minutes=6),
+        _note("r2", minutes=10, note_type="question"),
+        _note("r3", minutes=20),
+        _note("r3-a", "r3", minutes=21),
+        Annotation(annotation_id="other", project_id="p2", content="x", author_id="u1",
+                   parent_annotation_id="r3", created_at=T0),
+    ])
+    session.commit()
+    yield session
+    session.close()
+
+
+def test_threads_nested_and_counted(db):
+    roots, next_cursor = page_root_annotations(db, "p1")
+    threads = load_threads(db, "p1", roots)
+
+    assert next_cursor is None
+    assert [t["annotation_id"] for t in threads] == ["r3", "r2", "r1"]
+    r1 = threads[2]
+    assert [c["annotation_id"] for c in r1["children"]] == ["r1-b", "r1-a"]  # oldest reply first
+    assert r1["children"][1]["children"][0]["annotation_id"] == "r1-a-x"
+    assert r1["children"][1]["children"][0]["depth"] == 2
+    assert r1["total_in_thread"] == 4
+    # Replies from another project are not pulled into the thread
+    assert threads[0]["total_in_thread"] == 2
+
+
+def test_forest_loaded_in_constant_queries(db, engine):
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    roots, _ = page_root_annotations(db, "p1")
+    load_threads(db, "p1", roots)
+
+    assert len(statements) == 2
+
+
+def test_keyset_pagination(db):
+    first, cursor = page_root_annotations(db, "p1", limit=2)
+    second, last_cursor = page_root_annotations(db, "p1", limit=2, cursor=cursor)
+
+    assert [r.annotation_id for r in first] == ["r3", "r2"]
+    assert [r.annotation_id for r in second] == ["r1"]
+    assert last_cursor is None
+    assert decode_cursor(cursor)[1] == "r2"
+
+
+def test_keyset_pagination_breaks_timestamp_ties_by_id(db):
+    db.add_all([_note("t1", minutes=30), _note("t2", minutes=30), _note("t3", minutes=30)])
+    db.commit()
+
+    seen = []
+    cursor = None
+    while True:
+        page, cursor = page_root_annotations(db, "p1", limit=2, cursor=cursor)
+        seen.extend(r.annotation_id for r in page)
+        if cursor is None:
+            break
+
+    assert seen == ["t3", "t2", "t1", "r3", "r2", "r1"]
+
+
+def test_root_filters(db):
+    roots, _ = page_root_annotations(db, "p1", [Annotation.note_type == "question"])
+    assert [r.annotation_id for r in roots] == ["r2"]
+
+
+def test_invalid_cursor_rejected(db):
+    with pytest.raises(ValueError):
+        page_root_annotations(db, "p1", limit=2, cursor="not-a-cursor")
+
+
+def test_depth_limit(db):
+    parent = "r2"
+    for i in range(MAX_THREAD_DEPTH + 2):
+        db.add(_note(f"deep{i}", parent, minutes=11 + i))
+        parent = f"deep{i}"
+    db.commit()
+
+    root = db.query(Annotation).filter(Annotation.annotation_id == "r2").first()
+    thread = load_threads(db, "p1", [root])[0]
+
+    assert thread["total_in_thread"] == 1 + MAX_THREAD_DEPTH
@@ -0,0 +1,128 @@
+"""
+Query-size regression tests for Article load profiles
+
+Asserts the exact columns each profile selects and keeps the bytes fetched
+per row well below a full Article hydration.
+"""
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from database import Article
+from utils.article_profiles import (
+    ARTICLE_LOAD_PROFILES,
+    article_load_options,
+    get_profile_columns,
+    query_article_rows,
+)
+
+BIG_TEXT = "x" * 20000
+
+
+@pytest.fixture
+def db():
+    """In-memory database with only the articles table"""
+    engine = create_engine("sqlite:///:memory:")
+    Article.__table__.create(bind=engine)
+    session = sessionmaker(bind=engine)()
+
+    for i in range(20):
+        session.add(Article(
+            pmid=str(1000 + i),
+            title=f"Article {i}",
+            authors=["Smith J", "Doe A"],
+            journal="Nature",
+            publication_year=2023,
+            abstract="abstract " * 200,
+            pdf_text=BIG_TEXT,
+            ai_summary_expanded=BIG_TEXT,
+            cited_by_pmids=[str(2000 + j) for j in range(50)],
+            references_pmids=[str(3000 + j) for j in range(50)],
+            citation_count=i,
+        ))
+    session.commit()
+
+    statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    session.statements = statements
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _selected_columns(statement: str) -> set:
+    select_clause = statement.split("FROM")[0].replace("SELECT", "")
+    return {part.strip().split(".")[-1].split(" ")[0] for part in select_clause.split(",")}
+
+
+def _row_bytes(rows) -> int:
+    return sum(len(repr(value)) for row in rows for value in row)
+
+
+@pytest.mark.parametrize("profile", sorted(ARTICLE_LOAD_PROFILES))
+def test_row_query_selects_only_profile_columns(db, profile):
+    rows = query_article_rows(db, profile).all()
+
+    assert len(rows) == 20
+    assert _selected_columns(db.statements[-1]) == set(ARTICLE_LOAD_PROFILES[profile])
+
+
+@pytest.mark.parametrize("profile", sorted(ARTICLE_LOAD_PROFILES))
+def test_load_options_defer_remaining_columns(db, profile):
+    articles = db.query(Article).options(article_load_options(profile)).all()
+
+    assert len(articles) == 20
+    assert _selected_columns(db.statements[-1]) == set(ARTICLE_LOAD_PROFILES[profile])
+    assert "pdf_text" not in articles[0].__dict__
+    assert "ai_summary_expanded" not in articles[0].__dict__
+
+
+def test_profiles_never_fetch_large_text_columns():
+    for profile, columns in ARTICLE_LOAD_PROFILES.items():
+        assert "pdf_text" not in columns, profile
+        assert "ai_summary_expanded" not in columns, profile
+        assert "pdf_tables" not in columns, profile
+        assert "pdf_figures" not in columns, profile
+
+
+@pytest.mark.parametrize("profile,max_bytes_per_row", [
+    ("card", 200),
+    ("graph", 1400),
+    ("pool", 2200),
+    ("similarity", 3000),
+])
+def test_bytes_fetched_per_profile(db, profile, max_bytes_per_row):
+    full_rows = db.query(*Article.__table__.columns).all()
+    profile_rows = query_article_rows(db, profile).all()
+
+    full_bytes = _row_bytes(full_rows)
+    profile_bytes = _row_bytes(profile_rows)
+
+    assert profile_bytes / len(profile_rows) <= max_bytes_per_row
+    assert profile_bytes < full_bytes / 10
+
+
+@pytest.mark.parametrize("loader", ["rows", "orm"])
+def test_graph_profile_builds_network_graph(db, loader):
+    from main import build_network_graph
+
+    if loader == "rows":
+        articles = query_article_rows(db, "graph").all()
+    else:
+        articles = db.query(Article).options(article_load_options("graph")).all()
+
+    graph = build_network_graph(articles, "project")
+
+    assert "error" not in graph["metadata"]
+    assert len(graph["nodes"]) == 20
+    assert graph["metadata"]["total_nodes"] == 20
+
+
+def test_unknown_profile_raises():
+    with pytest.raises(ValueError):
+        get_profile_columns("everything")
@@ -0,0 +1,159 @@
+"""
+Tests for the bulk citation enrichment pipeline
+"""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, Article, ArticleCitation, CitationWork
+from services.citation_enrichment_service import CitationEnrichmentService
+from services.citation_store import CitationStore
+
+
+class FakeResponse:
+    def __init__(self, status, payload=None):
+        self.status = status
+        self.payload = payload
+        self.headers = {"Retry-After": "0"}
+
+    async def json(self):
+        return self.payload
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+
+class FakeOpenAlex:
+    """Serves /works filter queries for pmid:, openalex:, cites: and cursor paging"""
+
+    def __init__(self, works, citers, throttle_first=False):
+        self.works = works
+        self.citers = citers
+        self.throttle_first = throttle_first
+        self.requests = []
+
+    def get(self, url, params=None):
+        self.requests.append(params)
+        if self.throttle_first:
+            self.throttle_first = False
+            return FakeResponse(429)
+        kind, values = params["filter"].split(":", 1)
+        if kind == "pmid":
+            return FakeResponse(200, {"results": [self.works[p] for p in values.split("|") if p in self.works]})
+        if kind == "openalex":
+            return FakeResponse(200, {"results": [_ref(w) for w in values.split("|")]})
+        citing = self.citers[values]
+        start = 0 if params["cursor"] == "*" else int(params["cursor"])
+        page = citing[start:start + 2]
+        next_cursor = str(start + 2) if start + 2 < len(citing) else None
+        return FakeResponse(200, {"results": page, "meta": {"next_cursor": next_cursor}})
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+
+def _work(pmid, work_id, references=(), cited_by_count=0):
+    return {
+        "id": f"https://openalex.org/W{work_id}",
+        "ids": {"pmid": f"https://pubmed.ncbi.nlm.nih.gov/{pmid}"} if pmid else {},
+        "title": f"Work {work_id}",
+        "publication_year": 2020,
+        "referenced_works": [f"https://openalex.org/W{r}" for r in references],
+        "cited_by_count": cited_by_count,
+    }
+
+
+def _ref(short_id):
+    # W20000001 is stored article 4, other referenced works only have an OpenAlex id
+    return _work("4" if short_id == "W20000001" else None, short_id[1:])
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    for pmid in ("1", "2", "3", "4"):
+        session.add(Article(pmid=pmid, title=f"Paper {pmid}"))
+    session.commit()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def openalex(monkeypatch):
+    fake = FakeOpenAlex(
+        works={
+            "1": _work("1", "10000001", references=["20000001", "20000002"], cited_by_count=3),
+            "2": _work("2", "10000002", references=["20000001"]),
+        },
+        citers={"W10000001": [_work(None, f"3000000{i}") for i in range(3)]},
+    )
+    service = CitationEnrichmentService()
+    service.store = CitationStore()
+    service.store.rate_limit_delay = 0
+    monkeypatch.setattr(service.store, "open_session", lambda: fake)
+    return service, fake
+
+
+@pytest.mark.asyncio
+async def test_bulk_enrichment_batches_lookups_and_pages_citers(db, openalex):
+    service, fake = openalex
+    result = await service.enrich_articles(["1", "2", "3"], db)
+
+    assert result["articles_enriched"] == 3
+    assert (result["citations_added"], result["references_added"]) == (3, 3)
+    assert result["total_relationships"] == 2  # 1 -> 4 and 2 -> 4; other works are not articles
+    # one pmid batch lookup, two cursor pages for the only cited work, one lookup for all references
+    assert [r["filter"] for r in fake.requests] == [
+        "pmid:1|2|3", "cites:W10000001", "cites:W10000001", "openalex:W20000001|W20000002"
+    ]
+
+    article = db.query(Article).filter_by(pmid="1").one()
+    assert article.citation_count == 3
+    assert article.references_pmids == ["4", "OA20000002"]
+    assert article.cited_by_pmids == ["OA30000000", "OA30000001", "OA30000002"]
+    assert db.query(Article).filter_by(pmid="3").one().citation_data_updated is not None
+
+    # related works are stored in citation_works, never as article rows
+    assert db.query(Article).count() == 4
+    work = db.query(CitationWork).filter_by(work_id="OA20000002").one()
+    assert work.title == "Work 20000002" and work.openalex_id == "https://openalex.org/W20000002"
+    assert db.query(CitationWork).count() == 1 + 3
+    assert sorted(db.query(ArticleCitation.citing_pmid, ArticleCitation.cited_pmid).all()) == [("1", "4"), ("2", "4")]
+
+
+@pytest.mark.asyncio
+async def test_existing_edges_are_skipped_and_recent_articles_not_refetched(db, openalex):
+    service, fake = openalex
+    db.add(ArticleCitation(citing_pmid="1", cited_pmid="4"))
+    db.commit()
+
+    result = await service.enrich_articles(["1", "2"], db)
+    assert result["total_relationships"] == 1
+    assert db.query(ArticleCitation).count() == 2
+
+    fake.requests.clear()
+    again = await service.enrich_articles(["1", "2", "404"], db)
+    assert fake.requests == []
+    assert (again["articles_skipped"], again["not_found"]) == (2, 1)
+
+    single = await service.enrich_article_citations("1", db)
+    assert single == {"status": "recently_updated", "citations": 3}
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_requests_are_retried(db, openalex):
+    service, fake = openalex
+    fake.throttle_first = True
+
+    result = await service.enrich_article_citations("2", db)
+    assert result == {"status": "success", "citations_added": 0, "references_added": 1, "total_relationships": 1}
+    assert len(fake.requests) == 3
@@ -0,0 +1,115 @@
+"""
+Tests for the CSR citation graph index
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, Article, ArticleCitation
+from services.citation_graph_index import CitationGraphIndex
+
+
+@pytest.fixture
+def index():
+    """
+    A and B both cite C and D; C cites E; E cites F.
+    B also cites A.
+    """
+    idx = CitationGraphIndex()
+    idx.add_edges([
+        ("A", "C"), ("A", "D"),
+        ("B", "C"), ("B", "D"), ("B", "A"),
+        ("C", "E"),
+        ("E", "F"),
+        ("A", "C"),  # duplicate edge
+    ])
+    return idx
+
+
+def test_direct_neighbours(index):
+    assert sorted(index.references("A")) == ["C", "D"]
+    assert sorted(index.citations("C")) == ["A", "B"]
+    assert index.references("unknown") == []
+
+
+def test_duplicate_edges_collapsed(index):
+    assert index.get_stats()["edges"] == 7
+
+
+def test_k_hop_expansion(index):
+    assert index.k_hop("A", k=1) == {"A": 0, "C": 1, "D": 1}
+    assert index.k_hop("A", k=3) == {"A": 0, "C": 1, "D": 1, "E": 2, "F": 3}
+    assert index.k_hop("F", k=2, direction="citations") == {"F": 0, "E": 1, "C": 2}
+    assert index.k_hop("C", k=1, direction="both") == {"C": 0, "A": 1, "B": 1, "E": 1}
+
+
+def test_k_hop_respects_max_nodes(index):
+    assert len(index.k_hop("B", k=3, max_nodes=3)) == 3
+
+
+def test_co_citation_counts(index):
+    # C and D are cited together by A and B; B also cites A alongside C
+    assert index.co_citation("C") == [("D", 2), ("A", 1)]
+    assert index.co_citation("C", limit=1) == [("D", 2)]
+
+
+def test_bibliographic_coupling_counts(index):
+    # A and B share references C and D
+    assert index.bibliographic_coupling("A") == [("B", 2)]
+
+
+def test_subgraph_edges(index):
+    assert sorted(index.subgraph_edges(["A", "B", "C"])) == [("A", "C"), ("B", "A"), ("B", "C")]
+
+
+def test_update_article_replaces_outgoing_edges(index):
+    index.update_article("A", references=["F"], cited_by=["Z"])
+
+    assert index.references("A") == ["F"]
+    assert sorted(index.citations("A")) == ["B", "Z"]
+    assert dict(index.bibliographic_coupling("A")) == {"E": 1}
+
+
+def test_load_from_database():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add_all([
+        Article(pmid="1", title="One", references_pmids=["2"], cited_by_pmids=["9"]),
+        Article(pmid="2", title="Two"),
+        Article(pmid="3", title="Three"),
+    ])
+    db.add(ArticleCitation(citing_pmid="3", cited_pmid="2"))
+    db.commit()
+
+    idx = CitationGraphIndex()
+    stats = idx.load(db)
+
+    assert stats["loaded"] is True
+    assert stats["edges"] == 3
+    assert sorted(idx.citations("2")) == ["1", "3"]
+    assert idx.k_hop("9", k=2) == {"9": 0, "1": 1, "2": 2}
+    db.close()
+
+
+def test_concurrent_first_users_share_one_load(monkeypatch):
+    idx = CitationGraphIndex()
+    loads = []
+
+    def slow_load(db):
+        loads.append(db)
+        time.sleep(0.05)
+        idx.loaded = True
+        return idx.get_stats()
+
+    monkeypatch.setattr(idx, "load", slow_load)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(idx.ensure_loaded, ["db"] * 4))
+
+    assert len(loads) == 1
+    assert all(stats["loaded"] for stats in results)
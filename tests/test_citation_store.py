@@ -0,0 +1,119 @@
+"""
+Tests for the read-through citation store shared by the citation services
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database import Base, Article, ArticleCitation, CitationWork
+from services.citation_service import CitationService
+from services.citation_store import CitationStore, work_article_fields, work_pmid
+
+
+class SlowOpenAlex:
+    """Answers pmid:/openalex: lookups after yielding to the event loop, counting requests"""
+
+    def __init__(self):
+        self.filters = []
+
+    def get(self, url, params=None):
+        self.filters.append(params["filter"])
+        kind, values = params["filter"].split(":", 1)
+        if kind == "pmid":
+            results = [{"id": "https://openalex.org/W1", "ids": {"pmid": "https://pubmed.ncbi.nlm.nih.gov/100"},
+                        "title": "Source", "publication_year": 2021, "cited_by_count": 0,
+                        "referenced_works": ["https://openalex.org/W2"]}
+                       for pmid in values.split("|") if pmid == "100"]
+        else:
+            results = [{"id": "https://openalex.org/W2", "ids": {"pmid": "https://pubmed.ncbi.nlm.nih.gov/200"},
+                        "title": "Referenced", "publication_year": 2019,
+                        "authorships": [{"author": {"display_name": "Ada Lovelace"}}]}]
+        return SlowResponse({"results": results})
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+
+class SlowResponse:
+    status = 200
+    headers = {}
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    async def json(self):
+        await asyncio.sleep(0.01)
+        return self.payload
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+
+@pytest.fixture
+def store(monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    store = CitationStore(session_factory=sessionmaker(bind=engine))
+    store.rate_limit_delay = 0
+    fake = SlowOpenAlex()
+    monkeypatch.setattr(store, "open_session", lambda: fake)
+    monkeypatch.setattr("services.citation_store._citation_store", store)
+    store.fake = fake
+    return store
+
+
+def test_work_helpers():
+    work = {"id": "https://openalex.org/W2741809807", "doi": "https://doi.org/10.1/x", "title": "T",
+            "primary_location": {"source": {"display_name": "Nature"}}, "cited_by_count": 4}
+    assert work_pmid(work) == "OA2741809807"
+    # works sharing a numeric prefix keep distinct ids
+    assert work_pmid({**work, "id": "https://openalex.org/W2741809811"}) == "OA2741809811"
+    assert work_pmid({**work, "ids": {"pmid": "https://pubmed.ncbi.nlm.nih.gov/123"}}) == "123"
+    fields = work_article_fields(work)
+    assert (fields["journal"], fields["doi"], fields["citation_count"]) == ("Nature", "10.1/x", 4)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_reads_share_one_upstream_fetch(store):
+    records = await asyncio.gather(*[store.get("100") for _ in range(5)])
+
+    assert store.fake.filters == ["pmid:100", "openalex:W2"]
+    assert store.upstream_fetches == 1 and store.coalesced == 4
+    assert all(r.references == ["200"] for r in records)
+    assert records[0].title == "Source"
+
+    # fresh data is served from the database
+    await store.get("100")
+    assert len(store.fake.filters) == 2
+
+
+@pytest.mark.asyncio
+async def test_citation_service_reads_what_enrichment_stored(store):
+    db = store.session_factory()
+    db.add(Article(pmid="100", title="Source"))
+    db.commit()
+    await store.ingest(["100"], db)
+    db.close()
+    store.fake.filters.clear()
+
+    service = CitationService()
+    references = await service.fetch_references("100")
+    assert [(r.pmid, r.title, r.authors) for r in references] == [("200", "Referenced", ["Ada Lovelace"])]
+    assert store.fake.filters == []  # stored work metadata is enough for related papers
+
+    db = store.session_factory()
+    assert db.query(CitationWork.work_id, CitationWork.title).all() == [("200", "Referenced")]
+    assert db.query(Article.pmid).all() == [("100",)]
+    # 200 is not an article, so the edge lives only in the article's references list
+    assert db.query(ArticleCitation).count() == 0
+    db.close()
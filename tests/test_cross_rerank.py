@@ -0,0 +1,101 @@
+"""
+Tests for budgeted cross-encoder reranking of triage shortlists
+"""
+
+import time
+
+from services.cross_rerank import RerankScoreCache, rerank
+
+
+class FakeCrossEncoder:
+    """Scores a pair by a per-title score table and records batch sizes"""
+
+    def __init__(self, scores, delay_s=0.0, fail=False):
+        self.scores = scores
+        self.delay_s = delay_s
+        self.fail = fail
+        self.batches = []
+
+    def predict(self, pairs, batch_size=32):
+        if self.fail:
+            raise RuntimeError("out of memory")
+        self.batches.append(len(pairs))
+        time.sleep(self.delay_s)
+        return [self.scores[text.split(".")[0]] for _, text in pairs]
+
+
+def candidates(n):
+    # Bi-encoder order: p0 best
+    return [{"pmid": f"p{i}", "title": f"p{i}", "abstract": "", "score": 1.0 - i * 0.01} for i in range(n)]
+
+
+def test_scores_head_in_batches_and_reorders_it():
+    ranked = candidates(12)
+    model = FakeCrossEncoder({f"p{i}": (1.0 if i == 9 else 0.0) for i in range(12)})
+
+    reranked, report = rerank("metformin cancer", ranked, model, RerankScoreCache(), top_n=10, batch_size=4, weight=0.5)
+
+    assert model.batches == [4, 4, 2]
+    assert reranked[0]["pmid"] == "p9" and reranked[0]["cross_encoder_score"] == 1.0
+    assert [p["pmid"] for p in reranked[10:]] == ["p10", "p11"]
+    assert (report.applied, report.reason, report.scored, report.batches) == (True, "ok", 10, 3)
+
+
+def test_repeat_objective_is_served_from_cache():
+    cache = RerankScoreCache()
+    model = FakeCrossEncoder({f"p{i}": 0.5 for i in range(6)})
+    rerank("Metformin  cancer", candidates(6), model, cache, top_n=6, batch_size=4)
+
+    _, report = rerank("metformin cancer", candidates(8), FakeCrossEncoder({"p6": 0.1, "p7": 0.1}), cache,
+                       top_n=8, batch_size=4)
+
+    assert (report.cache_hits, report.scored) == (6, 2)
+
+
+def test_exhausted_budget_keeps_bi_encoder_order_for_unscored_tail():
+    ranked = candidates(8)
+    model = FakeCrossEncoder({f"p{i}": float(i) for i in range(8)}, delay_s=0.05)
+
+    reranked, report = rerank("q", ranked, model, RerankScoreCache(), top_n=8, batch_size=2, budget_s=0.08)
+
+    assert report.budget_exhausted and report.reason == "partial"
+    assert report.scored == 2
+    assert [p["pmid"] for p in reranked] == ["p1", "p0", "p2", "p3", "p4", "p5", "p6", "p7"]
+    assert "cross_encoder_score" not in reranked[2]
+
+
+def test_without_model_or_time_the_input_is_unchanged():
+    ranked = candidates(3)
+    for model, budget, reason in ((None, 3.0, "no_model"), (FakeCrossEncoder({}), 0.0, "no_time")):
+        reranked, report = rerank("q", ranked, model, RerankScoreCache(), budget_s=budget)
+        assert reranked is ranked and not report.applied and report.reason == reason
+
+
+def test_model_error_degrades_to_bi_encoder_order():
+    ranked = candidates(4)
+    reranked, report = rerank("q", ranked, FakeCrossEncoder({}, fail=True), RerankScoreCache())
+
+    assert [p["pmid"] for p in reranked] == ["p0", "p1", "p2", "p3"]
+    assert (report.applied, report.reason) == (False, "model_error")
+
+
+def test_oa_backfill_topup_reranks_within_the_request_deadline(monkeypatch):
+    import main
+
+    result = {"title": "Metformin and cancer", "pmid": "1", "pubYear": "2020",
+              "fullTextUrlList": {"fullTextUrl": [{"availability": "Open access", "url": "https://x/1"}]}}
+    monkeypatch.setattr(main, "_fetch_json", lambda url, timeout=0: {"resultList": {"result": [result]}})
+    monkeypatch.setattr(main, "_normalize_candidates", lambda items: items)
+    seen = {}
+
+    def fake_triage_rank(objective, candidates, max_keep, **kwargs):
+        seen.update(kwargs)
+        return candidates
+
+    monkeypatch.setattr(main, "_triage_rank", fake_triage_rank)
+    deadline = time.time() + 30.0
+
+    topped = main._oa_backfill_topup("metformin cancer", [], 8, deadline)
+
+    assert [a["pmid"] for a in topped] == ["1"]
+    assert seen["deadline"] == deadline
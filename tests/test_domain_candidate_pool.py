@@ -0,0 +1,166 @@
+"""
+Tests for shared per-domain recommendation candidate pools
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, Article
+from services import domain_candidate_pool
+from services.domain_candidate_pool import DomainCandidatePoolService, embed_texts, pool_queries
+
+
+def _paper(pmid, title, year=2026):
+    return {"pmid": pmid, "title": title, "abstract": "No abstract available",
+            "publication_year": year, "citation_count": 0}
+
+
+PAPERS = {
+    "kidney": [
+        _paper("1", "Dialysis outcomes in chronic kidney disease", 2025),
+        _paper("2", "Renal denervation for resistant hypertension", 2026),
+        _paper("3", "Kidney transplant immunosuppression", 2024),
+    ],
+    "cancer": [
+        _paper("10", "Tumor microenvironment and immunotherapy response"),
+        _paper("11", "Chemotherapy resistance in malignant glioma"),
+    ],
+}
+
+
+class FakePubMed:
+    def __init__(self):
+        self.queries = []
+
+    async def __call__(self, query, max_results=20, sort="relevance"):
+        self.queries.append((query, sort))
+        await asyncio.sleep(0)
+        for keyword, papers in PAPERS.items():
+            if keyword in query:
+                return [dict(p) for p in papers]
+        return []
+
+
+@pytest.fixture
+def pubmed():
+    return FakePubMed()
+
+
+@pytest.fixture
+def pools(pubmed):
+    return DomainCandidatePoolService(pubmed)
+
+
+def test_pool_queries_use_rolling_windows():
+    queries = pool_queries("nephrology", "trending", year=2031)
+
+    assert queries[0] == ('(kidney OR renal OR dialysis) AND ("2030"[Date - Publication]:"2031"[Date - Publication])', "date")
+    assert [sort for _, sort in pool_queries("oncology", "recent")] == ["relevance"] * 3
+    assert "Date - Publication" not in pool_queries("oncology", "recent")[-1][0]
+
+
+def test_users_sharing_a_domain_share_one_refresh(pools, pubmed):
+    async def run():
+        # Many users asking for the same pool at once wait on a single refresh
+        return await asyncio.gather(*[pools.get_pool("Nephrology", "recent") for _ in range(20)])
+
+    results = asyncio.run(run())
+
+    assert len(pubmed.queries) == 1
+    assert all(pool is results[0] for pool in results)
+    assert pools.stats() == {"pools": 1, "refreshes": 1, "papers": 3}
+
+
+def test_pubmed_calls_scale_with_domains_not_users(pools, pubmed):
+    async def run():
+        for user_domains in (["nephrology", "oncology"], ["oncology"], ["nephrology"], ["oncology", "nephrology"]):
+            for domain in user_domains:
+                await pools.get_pool(domain, "recent")
+                await pools.get_pool(domain, "trending")
+
+    asyncio.run(run())
+
+    assert pools.refresh_count == 4  # 2 domains x 2 kinds
+
+
+def test_expired_pool_is_refreshed(pubmed):
+    pools = DomainCandidatePoolService(pubmed, refresh_interval=0)
+
+    asyncio.run(pools.get_pool("oncology"))
+    asyncio.run(pools.get_pool("oncology"))
+
+    assert pools.refresh_count == 2
+
+
+def test_empty_refresh_is_retried_instead_of_cached(pubmed, monkeypatch):
+    pools = DomainCandidatePoolService(pubmed, refresh_interval=3600, retry_interval=60)
+    clock = [1000.0]
+    monkeypatch.setattr(domain_candidate_pool, "time", SimpleNamespace(monotonic=lambda: clock[0]))
+    outage = []
+
+    async def flaky_pubmed(query, max_results=20, sort="relevance"):
+        outage.append(query)
+        return [] if len(outage) <= 3 else await pubmed(query, max_results, sort)
+
+    pools.search_fn = flaky_pubmed
+
+    async def run():
+        first = await pools.get_pool("oncology")
+        again = await pools.get_pool("oncology")  # within the retry interval: no new search
+        clock[0] += 61
+        return first, again, await pools.get_pool("oncology")
+
+    first, again, retried = asyncio.run(run())
+
+    assert len(first) == 0 and again is first
+    assert len(outage) == 4  # three empty fallback windows, then a successful retry
+    assert [p["pmid"] for p in retried.papers] == ["10", "11"]
+
+    # A later failed refresh keeps serving the previous pool
+    clock[0] += 3601
+    outage.clear()
+    assert asyncio.run(pools.get_pool("oncology")) is retried
+
+
+def test_rank_prefers_profile_match_and_excludes_used(pools):
+    pool = asyncio.run(pools.get_pool("nephrology", "recent"))
+    profile = {"primary_domains": ["nephrology"], "topic_preferences": {"dialysis": 1.0}}
+
+    ranked = pools.rank(pool, profile, limit=2)
+    assert ranked[0][0]["pmid"] == "1"
+    assert ranked[0][1] >= ranked[1][1]
+
+    ranked = pools.rank(pool, profile, exclude={"1"}, limit=5)
+    assert "1" not in [p["pmid"] for p, _ in ranked]
+    # Callers get copies they can annotate
+    ranked[0][0]["relevance_score"] = 0.1
+    assert "relevance_score" not in pool.papers[0]
+
+
+def test_citation_velocity_from_local_articles(pools):
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add(Article(pmid="11", title="Chemotherapy resistance in malignant glioma", citation_count=120))
+    db.commit()
+
+    pool = asyncio.run(pools.get_pool("oncology", "trending", db))
+
+    assert pool.papers[1]["citation_count"] == 120
+    assert pool.velocity[1] > 0 and pool.velocity[0] == 0
+    ranked = pools.rank(pool, {"primary_domains": ["oncology"]}, weights=(0.0, 1.0, 0.0))
+    assert ranked[0][0]["pmid"] == "11"
+    db.close()
+
+
+def test_embeddings_are_normalized_and_deterministic():
+    vectors = embed_texts(["kidney dialysis outcomes", "kidney dialysis outcomes", ""])
+
+    assert np.allclose(np.linalg.norm(vectors[:2], axis=1), 1.0)
+    assert np.array_equal(vectors[0], vectors[1])
+    assert not vectors[2].any()
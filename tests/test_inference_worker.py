@@ -0,0 +1,96 @@
+"""
+Tests for the micro-batching inference worker
+"""
+
+import asyncio
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from services.inference_worker import InferenceWorker, sentence_encoder
+from services.semantic_analysis_service import SemanticAnalysisService
+
+
+class FakeModel:
+    """SentenceTransformer-like encode that records batch sizes and the calling thread"""
+
+    def __init__(self, delay=0.0):
+        self.batches = []
+        self.threads = set()
+        self.delay = delay
+
+    def encode(self, texts, batch_size=32, show_progress_bar=False):
+        self.batches.append(len(texts))
+        self.threads.add(threading.current_thread().name)
+        time.sleep(self.delay)
+        return np.array([[len(t), i] for i, t in enumerate(texts)], dtype=float)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_batches():
+    model = FakeModel()
+    worker = sentence_encoder(model, max_batch_size=8, max_latency_ms=50)
+    texts = [f"text {'x' * i}" for i in range(20)]
+
+    outputs = await asyncio.gather(*[worker.encode(t) for t in texts])
+    worker.shutdown()
+
+    assert [o[0] for o in outputs] == [len(t) for t in texts]
+    assert model.batches == [8, 8, 4]
+    assert model.threads == {"embeddings-worker-0"}
+    stats = worker.get_stats()
+    assert (stats["requests"], stats["batches"], stats["items"], stats["max_batch_seen"]) == (20, 3, 20, 8)
+    assert stats["avg_batch_size"] == pytest.approx(20 / 3, abs=0.01)
+
+
+@pytest.mark.asyncio
+async def test_lone_request_is_served_after_max_latency():
+    model = FakeModel()
+    worker = sentence_encoder(model, max_batch_size=64, max_latency_ms=1)
+    start = time.monotonic()
+    output = await worker.encode("alone")
+    worker.shutdown()
+
+    assert model.batches == [1]
+    assert output[0] == 5
+    assert time.monotonic() - start < 1
+
+
+@pytest.mark.asyncio
+async def test_batch_errors_reach_every_caller():
+    def failing(items):
+        raise RuntimeError("model exploded")
+
+    worker = InferenceWorker(failing, max_batch_size=4, max_latency_ms=20, name="failing")
+    results = await asyncio.gather(*[worker.encode(i) for i in range(3)], return_exceptions=True)
+    worker.shutdown()
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert worker.get_stats()["failed_batches"] == 1
+
+
+@pytest.mark.asyncio
+async def test_semantic_embeddings_use_the_worker_without_blocking_the_loop():
+    service = SemanticAnalysisService()
+    model = FakeModel(delay=0.05)
+    service.scibert_model = model
+
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.005)
+
+    ticking = asyncio.create_task(ticker())
+    embeddings = await asyncio.gather(*[service._generate_embeddings(f"paper {i}") for i in range(6)])
+    ticking.cancel()
+    service.encoder.shutdown()
+
+    assert len(embeddings) == 6
+    assert sum(model.batches) == 6 and len(model.batches) < 6
+    assert ticks > 3  # the event loop kept running during the forward pass
+    assert service.get_inference_stats()["name"] == "scibert"
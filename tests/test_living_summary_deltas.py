@@ -0,0 +1,145 @@
+"""
+Tests for delta-based living summary updates
+"""
+
+import json
+import os
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from database import Base, Project, ResearchQuestion, Article, PaperTriage, ProjectSummary
+from backend.app.services import living_summary_service
+from backend.app.services.living_summary_service import LivingSummaryService
+from backend.app.services.project_context_snapshot import ProjectContextSnapshots
+from backend.app.services.summary_deltas import diff_source_state, summary_source_state
+
+T0 = datetime(2026, 1, 1, 12, 0, 0)
+
+FULL_SUMMARY = {
+    "summary_text": "The journey began with CDK questions.",
+    "key_findings": ["Finding from paper 1"],
+    "protocol_insights": [],
+    "experiment_status": "No experiments yet.",
+    "next_steps": [{"action": "Triage more papers", "priority": "high"}],
+}
+
+
+class FakeCompletions:
+    def __init__(self):
+        self.calls = []
+
+    async def create(self, **kwargs):
+        self.calls.append(kwargs)
+        system = kwargs["messages"][0]["content"]
+        if '"key_findings"' in system and "one section" in system:
+            content = {"key_findings": ["Finding from paper 1", "Finding from paper 2"]}
+        else:
+            content = FULL_SUMMARY
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(content)))],
+            usage=SimpleNamespace(prompt_tokens=100, completion_tokens=20, total_tokens=120)
+        )
+
+
+@pytest.fixture
+def db(monkeypatch):
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    session.add(Project(project_id="p1", project_name="Kinases", owner_user_id="u1"))
+    for i in range(6):
+        session.add(ResearchQuestion(question_id=f"q{i}", project_id="p1", question_text=f"Question {i}?",
+                                     created_by="u1", created_at=T0 + timedelta(hours=i)))
+    session.add(Article(pmid="1", title="Paper one"))
+    session.add(Article(pmid="2", title="Paper two"))
+    session.add(PaperTriage(triage_id="t1", project_id="p1", article_pmid="1", triage_status="must_read",
+                            relevance_score=90, triaged_at=T0))
+    session.commit()
+    monkeypatch.setattr("backend.app.services.project_context_snapshot._project_context_snapshots",
+                        ProjectContextSnapshots())
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def completions(monkeypatch):
+    fake = FakeCompletions()
+    monkeypatch.setattr(living_summary_service, "client", SimpleNamespace(chat=SimpleNamespace(completions=fake)))
+    return fake
+
+
+def _question(i, text="Question?"):
+    return SimpleNamespace(question_id=f"q{i}", question_text=text, status="exploring", priority="high",
+                           updated_at=T0, created_at=T0)
+
+
+def test_diff_source_state_reports_added_updated_removed():
+    before = summary_source_state({"questions": [_question(1), _question(2)]})
+    changed = _question(1, "Reworded?")
+    changed.updated_at = T0 + timedelta(days=1)
+    after = summary_source_state({"questions": [changed, _question(3)]})
+
+    changes = diff_source_state(before, after)
+    assert list(changes) == ["questions"]
+    assert len(changes["questions"]["added"]) == 1
+    assert "Reworded?" in changes["questions"]["updated"][0]
+    assert len(changes["questions"]["removed"]) == 1
+    assert diff_source_state(None, after) is None
+    assert diff_source_state(after, after) == {}
+
+
+@pytest.mark.asyncio
+async def test_single_triage_updates_only_the_evidence_section(db, completions):
+    service = LivingSummaryService()
+    first = await service.generate_summary("p1", db, force_refresh=True)
+    assert first["generation_stats"]["mode"] == "full"
+    assert first["generation_stats"]["total_tokens"] == 120
+
+    db.add(PaperTriage(triage_id="t2", project_id="p1", article_pmid="2", triage_status="must_read",
+                       relevance_score=70, triaged_at=T0 + timedelta(days=1)))
+    db.commit()
+    completions.calls.clear()
+
+    second = await service.generate_summary("p1", db, force_refresh=True)
+    assert len(completions.calls) == 1
+    assert "Added: Paper: Paper two" in completions.calls[0]["messages"][1]["content"]
+    assert second["generation_stats"] == {
+        "mode": "incremental", "sections": ["evidence"], "changed_entities": 1,
+        "prompt_tokens": 100, "completion_tokens": 20, "total_tokens": 120
+    }
+    assert second["key_findings"] == ["Finding from paper 1", "Finding from paper 2"]
+    assert second["summary_text"] == FULL_SUMMARY["summary_text"]
+    assert db.query(ProjectSummary).one().incremental_updates == 1
+
+
+@pytest.mark.asyncio
+async def test_unchanged_project_makes_no_llm_calls(db, completions):
+    service = LivingSummaryService()
+    await service.generate_summary("p1", db, force_refresh=True)
+    completions.calls.clear()
+
+    result = await service.generate_summary("p1", db, force_refresh=True)
+    assert completions.calls == []
+    assert result["generation_stats"]["mode"] == "unchanged"
+    assert result["generation_stats"]["total_tokens"] == 0
+
+
+@pytest.mark.asyncio
+async def test_large_drift_falls_back_to_full_rebuild(db, completions):
+    service = LivingSummaryService()
+    await service.generate_summary("p1", db, force_refresh=True)
+    for i in range(6, 12):
+        db.add(ResearchQuestion(question_id=f"q{i}", project_id="p1", question_text=f"Question {i}?",
+                                created_by="u1"))
+    db.commit()
+
+    result = await service.generate_summary("p1", db, force_refresh=True)
+    assert result["generation_stats"]["mode"] == "full"
+    assert result["generation_stats"]["changed_entities"] == 6
+    assert db.query(ProjectSummary).one().incremental_updates == 0
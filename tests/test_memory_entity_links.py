@@ -0,0 +1,103 @@
+"""
+Tests for normalized memory entity links and single-query retrieval candidates
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, ConversationMemory, MemoryEntityLink
+from backend.app.services.memory_store import MemoryStore
+from backend.app.services.retrieval_engine import RetrievalEngine
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def store(db):
+    return MemoryStore(db)
+
+
+def _store(store, itype="insights", score=1.0, project_id="p1", **links):
+    return store.store_memory(project_id=project_id, interaction_type=itype, content={"summary": itype},
+                              user_id="u1", relevance_score=score, **links)
+
+
+def test_store_memory_writes_links(store, db):
+    memory_id = _store(store, linked_question_ids=["q1", "q2", "q1"], linked_paper_ids=["123"])
+
+    links = {(l.entity_type, l.entity_id) for l in db.query(MemoryEntityLink).filter_by(memory_id=memory_id)}
+
+    assert links == {("question", "q1"), ("question", "q2"), ("paper", "123")}
+    assert {l.project_id for l in db.query(MemoryEntityLink)} == {"p1"}
+
+
+def test_get_memories_by_links_uses_exact_ids(store):
+    m1 = _store(store, linked_question_ids=["q1"])
+    m2 = _store(store, linked_question_ids=["q10"], linked_hypothesis_ids=["h1"], score=0.5)
+    _store(store, linked_question_ids=["q1"], project_id="p2")
+
+    by_question = store.get_memories_by_links("p1", question_ids=["q1"])
+    by_either = store.get_memories_by_links("p1", question_ids=["q1"], hypothesis_ids=["h1"])
+
+    assert [m["memory_id"] for m in by_question] == [m1]  # no substring match on q10
+    assert [m["memory_id"] for m in by_either] == [m1, m2]
+
+
+def test_delete_and_cleanup_remove_links(store, db):
+    deleted = _store(store, linked_paper_ids=["1"])
+    expired = _store(store, linked_paper_ids=["2"])
+    db.query(ConversationMemory).filter_by(memory_id=expired).update(
+        {"expires_at": datetime.utcnow() - timedelta(days=1)})
+    db.commit()
+
+    store.delete_memory(deleted)
+    assert store.cleanup_expired_memories("p1") == 1
+
+    assert db.query(MemoryEntityLink).count() == 0
+
+
+def test_candidates_are_fetched_in_one_query(store, db):
+    linked = _store(store, itype="triage", linked_question_ids=["q1"], score=0.2)
+    summary = _store(store, itype="summary", score=0.9)
+    insight = _store(store, itype="insights", score=0.8)
+    _store(store, itype="protocol", score=1.0)
+
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+
+    candidates = RetrievalEngine(db)._get_candidate_memories(
+        "p1", ["insights", "summary"], {"questions": ["q1"]})
+
+    assert len(statements) == 1
+    assert [m["memory_id"] for m in candidates] == [linked, insight, summary]
+
+
+def test_candidates_fall_back_to_recent(store, db):
+    _store(store, itype="protocol", score=0.4)
+    best = _store(store, itype="experiment", score=0.9)
+
+    candidates = store.get_candidate_memories("p1", {"questions": ["missing"]}, ["insights"])
+
+    assert [m["memory_id"] for m in candidates][0] == best
+    assert len(candidates) == 2
+
+
+def test_type_branch_limits_each_type(store):
+    for i in range(4):
+        _store(store, itype="insights", score=1.0 - i / 10)
+    _store(store, itype="summary", score=0.1)
+
+    candidates = store.get_candidate_memories("p1", interaction_types=["insights", "summary"], type_limit=2)
+
+    assert [m["interaction_type"] for m in candidates] == ["insights", "insights", "summary"]
@@ -0,0 +1,129 @@
+"""
+Tests for embedding-based memory retrieval
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, ConversationMemory
+from backend.app.services.memory_store import MemoryStore
+from backend.app.services.memory_vector_index import LocalMemoryIndex, _ProjectVectors, ensure_embeddings, memory_text
+from backend.app.services.retrieval_engine import RetrievalEngine
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def index():
+    return LocalMemoryIndex()
+
+
+@pytest.fixture
+def store(db, index):
+    return MemoryStore(db, vector_index=index)
+
+
+def _store(store, summary, itype="insights", project_id="p1", **kwargs):
+    return store.store_memory(project_id=project_id, interaction_type=itype,
+                              content={"summary": summary}, user_id="u1", summary=summary, **kwargs)
+
+
+def test_memory_text_collects_strings():
+    text = memory_text("Summary", {"a": "alpha", "b": ["beta", 3], "c": {"nested": "skipped"}})
+
+    assert text == "Summary alpha beta"
+
+
+def test_store_memory_persists_embedding(store, db, index):
+    memory_id = _store(store, "Protein folding kinetics")
+
+    row = db.query(ConversationMemory).filter_by(memory_id=memory_id).one()
+
+    assert len(row.embedding) == index.dim
+    assert np.linalg.norm(row.embedding) == pytest.approx(1.0, abs=1e-5)
+
+
+def test_search_finds_memories_beyond_candidate_caps(store, db, index):
+    target = _store(store, "CRISPR knockout of TP53 in organoids", itype="triage", relevance_score=0.1)
+    for i in range(60):
+        _store(store, f"Routine insight number {i} about sample logistics", relevance_score=1.0)
+
+    engine = RetrievalEngine(db, vector_index=index)
+    memories = engine.retrieve_relevant_memories("p1", query="TP53 CRISPR organoids",
+                                                 interaction_types=["insights"], min_score=0.0)
+
+    # triage isn't a requested type, so the semantic hit is filtered out
+    assert target not in [m["memory_id"] for m in memories]
+
+    memories = engine.retrieve_relevant_memories("p1", query="TP53 CRISPR organoids", min_score=0.0, limit=3)
+
+    assert memories[0]["memory_id"] == target
+
+
+def test_index_syncs_with_archived_and_backfilled_rows(store, db, index):
+    kept = _store(store, "Mitochondrial stress signalling")
+    archived = _store(store, "Mitochondrial stress response assay")
+    legacy = ConversationMemory(memory_id="legacy", project_id="p1", interaction_type="summary",
+                                content={}, summary="Mitochondrial stress in neurons", created_by="u1",
+                                is_archived=False, relevance_score=1.0, access_count=0)
+    db.add(legacy)
+    db.commit()
+    store.archive_memory(archived)
+
+    hits = dict(index.search(db, "p1", index.embed(["mitochondrial stress"])[0], k=10))
+
+    assert set(hits) == {kept, "legacy"}
+    # Searching embeds legacy rows in memory only; the read path writes nothing
+    assert not db.dirty
+    assert db.query(ConversationMemory).filter_by(memory_id="legacy").one().embedding is None
+
+    legacy_row = db.query(ConversationMemory).filter_by(memory_id="legacy").one()
+    assert ensure_embeddings(db, [legacy_row], index) == 1
+    db.commit()
+    assert len(db.query(ConversationMemory).filter_by(memory_id="legacy").one().embedding) == index.dim
+
+
+def test_concurrent_adds_keep_snapshots_consistent(index):
+    vectors = index._projects.setdefault("p1", _ProjectVectors(index.dim))
+    embedded = index.embed([f"memory {i}" for i in range(200)])
+
+    def add(i):
+        index.add("p1", f"m{i}", embedded[i])
+        ids, positions, matrix = vectors.snapshot()
+        assert len(ids) == len(positions) == matrix.shape[0]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(add, range(200)))
+
+    ids, positions, matrix = vectors.snapshot()
+    assert sorted(ids) == sorted(f"m{i}" for i in range(200))
+    assert all(np.allclose(matrix[positions[f"m{i}"]], embedded[i]) for i in range(200))
+
+
+def test_batch_scores_match_single_memory_scores(store, db, index):
+    _store(store, "Kinase inhibitor screen", linked_question_ids=["q1"])
+    _store(store, "Kinase resistance mutations", relevance_score=1.5)
+    db.query(ConversationMemory).update({"access_count": 10, "created_at": datetime.utcnow() - timedelta(days=7)})
+    db.commit()
+
+    engine = RetrievalEngine(db, vector_index=index)
+    memories = store.get_memories_by_project("p1")
+    vector = index.embed(["kinase inhibitor"])[0]
+    batch = engine._score_candidates("p1", memories, vector, {"questions": ["q1"]})
+
+    for memory, score in zip(memories, batch):
+        assert engine._compute_hybrid_score(memory, "kinase inhibitor", {"questions": ["q1"]}) == pytest.approx(score)
+    assert engine._compute_popularity_scores(np.array([0.0, 100.0])).tolist() == [0.3, 1.0]
+    assert engine._compute_recency_scores([None, datetime.utcnow().isoformat()]).tolist() == [0.5, 1.0]
@@ -0,0 +1,143 @@
+"""
+Tests for the MeSH autocomplete index
+"""
+
+import asyncio
+import random
+import time
+
+import pytest
+
+from services.mesh_autocomplete_service import MeSHAutocompleteService
+from services.mesh_index import MeshDescriptor, MeshIndex, load_descriptors, normalize, write_descriptor_tsv
+
+DESCRIPTORS = [
+    MeshDescriptor("D009369", "Neoplasms", ["Tumors", "Cancer", "Malignancy"], ["C04"], popularity=0.9),
+    MeshDescriptor("D001943", "Breast Neoplasms", ["Breast Cancer", "Mammary Carcinoma, Human"], ["C04.588.180"],
+                   popularity=0.6),
+    MeshDescriptor("D002318", "Cardiovascular Diseases", ["Cardiac Diseases"], ["C14"], popularity=0.8),
+    MeshDescriptor("D007328", "Insulin", ["Novolin"], ["D06.472.699.587.200.500.850"], popularity=0.7),
+    MeshDescriptor("D007333", "Insulin Resistance", [], ["C18.452.394.968.500"], popularity=0.75),
+    MeshDescriptor("D000544", "Alzheimer Disease", ["Alzheimer's Disease", "Dementia, Senile"], ["C10.228"],
+                   popularity=0.5),
+]
+
+NLM_XML = """<?xml version="1.0"?>
+<DescriptorRecordSet LanguageCode="eng">
+  <DescriptorRecord DescriptorClass="1">
+    <DescriptorUI>D009369</DescriptorUI>
+    <DescriptorName><String>Neoplasms</String></DescriptorName>
+    <TreeNumberList><TreeNumber>C04</TreeNumber></TreeNumberList>
+    <ConceptList>
+      <Concept PreferredConceptYN="Y">
+        <TermList>
+          <Term><String>Neoplasms</String></Term>
+          <Term><String>Tumors</String></Term>
+        </TermList>
+      </Concept>
+      <Concept PreferredConceptYN="N">
+        <TermList><Term><String>Cancer</String></Term></TermList>
+      </Concept>
+    </ConceptList>
+  </DescriptorRecord>
+</DescriptorRecordSet>
+"""
+
+
+@pytest.fixture(scope="module")
+def index():
+    return MeshIndex(DESCRIPTORS, dense_range=2)
+
+
+def terms(matches):
+    return [(m.term, m.match) for m in matches]
+
+
+def test_exact_then_prefix_by_popularity(index):
+    assert terms(index.search("insulin", 3)) == [("Insulin", "exact"), ("Insulin Resistance", "prefix")]
+    assert terms(index.search("ca", 2)) == [("Cancer", "prefix"), ("Cardiovascular Diseases", "prefix")]
+
+
+def test_word_prefix_and_infix_fill_the_limit(index):
+    assert terms(index.search("cancer", 3)) == [("Cancer", "exact"), ("Breast Cancer", "word_prefix")]
+    assert terms(index.search("plasm", 3)) == [("Neoplasms", "infix"), ("Breast Neoplasms", "infix")]
+
+
+def test_one_suggestion_per_descriptor_and_normalized_queries(index):
+    matches = index.search("  ALZHEIMER'S ", 5)
+    assert terms(matches) == [("Alzheimer's Disease", "prefix")]
+    assert matches[0].descriptor.mesh_id == "D000544" and not matches[0].is_main_term
+    assert normalize("Mammary Carcinoma, Human") == "mammary carcinoma human"
+    assert index.search("", 5) == [] and index.search("zzz", 5) == []
+
+
+def test_vocabulary_files_round_trip(tmp_path):
+    xml = tmp_path / "desc.xml"
+    xml.write_text(NLM_XML)
+    [descriptor] = load_descriptors(str(xml))
+    assert (descriptor.name, descriptor.entry_terms, descriptor.category) == ("Neoplasms", ["Tumors", "Cancer"], "oncology")
+
+    tsv = str(tmp_path / "mesh.tsv.gz")
+    write_descriptor_tsv(DESCRIPTORS, tsv)
+    loaded = load_descriptors(tsv)
+    assert [(d.mesh_id, d.entry_terms, d.popularity) for d in loaded] == \
+        [(d.mesh_id, d.entry_terms, d.popularity) for d in DESCRIPTORS]
+
+
+def test_service_uses_vocabulary_file_and_falls_back_to_basic_terms(tmp_path):
+    tsv = str(tmp_path / "mesh.tsv")
+    write_descriptor_tsv(DESCRIPTORS, tsv)
+    service = MeSHAutocompleteService(vocabulary_path=tsv)
+    suggestions = asyncio.run(service.get_suggestions("breast can", 8))
+    assert not service.using_fallback_vocabulary
+    assert suggestions["mesh_terms"][0]["term"] == "Breast Cancer"
+    assert suggestions["mesh_terms"][0]["main_term"] == "Breast Neoplasms"
+    assert asyncio.run(service.get_mesh_term_details("D007328"))["synonyms"] == ["Novolin"]
+
+    fallback = MeSHAutocompleteService(vocabulary_path=str(tmp_path / "missing.tsv"))
+    assert asyncio.run(fallback.get_suggestions("crispr", 8))["mesh_terms"][0]["mesh_id"] == "D064113"
+    assert fallback.using_fallback_vocabulary
+
+
+def test_index_is_built_off_the_event_loop(tmp_path, monkeypatch):
+    service = MeSHAutocompleteService(vocabulary_path=str(tmp_path / "missing.tsv"))
+    build = service._build_index
+    built_in = []
+
+    def tracked_build():
+        try:
+            asyncio.get_running_loop()
+            built_in.append("event loop")
+        except RuntimeError:
+            built_in.append("worker thread")
+        return build()
+
+    monkeypatch.setattr(service, "_build_index", tracked_build)
+
+    suggestions = asyncio.run(service.get_suggestions("insulin", 8))
+
+    assert built_in == ["worker thread"]
+    assert suggestions["mesh_terms"][0]["mesh_id"] == "D007328"
+
+
+def test_p99_latency_with_300k_terms():
+    rng = random.Random(7)
+    syllables = ["neo", "plas", "card", "io", "my", "op", "athy", "gen", "ic", "thera", "py", "lym", "pho", "ma",
+                 "in", "sulin", "hyper", "tens", "ion", "cyto", "kine", "rec", "ept", "al", "zhei", "mer", "syn"]
+    word = lambda: "".join(rng.choice(syllables) for _ in range(rng.randint(2, 4)))
+    phrase = lambda: " ".join(word() for _ in range(rng.randint(1, 4))).title()
+    index = MeshIndex(MeshDescriptor(f"D{i:06d}", phrase(), [phrase() for _ in range(9)], [f"C{i % 20:02d}"],
+                                     popularity=rng.random()) for i in range(30000))
+    assert index.term_count > 290000
+
+    queries = []
+    for _ in range(2000):
+        w = word().lower()
+        queries += [w[:rng.randint(2, len(w))], w[1:6]]
+    latencies = []
+    for q in queries:
+        started = time.perf_counter()
+        index.search(q, 10)
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    assert latencies[int(len(latencies) * 0.99)] < 0.002
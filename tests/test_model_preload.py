@@ -0,0 +1,96 @@
+"""
+Tests for preloading models in the server master before forking workers
+"""
+
+import gc
+import multiprocessing
+import sys
+
+import pytest
+
+from services import model_preload
+
+
+@pytest.fixture
+def unfreeze():
+    yield
+    gc.unfreeze()
+
+
+MODELS = {}
+
+
+def load_encoder():
+    MODELS["encoder"] = [0.5] * 1000
+    return MODELS["encoder"]
+
+
+def worker_sees_preloaded_model(queue):
+    queue.put(MODELS.get("encoder") is not None)
+
+
+def test_preload_runs_sync_and_async_loaders_and_freezes(unfreeze):
+    async def load_semantic():
+        return True
+
+    def load_broken():
+        raise OSError("no such model")
+
+    results = model_preload.preload_models({
+        "encoder": load_encoder, "semantic_analysis": load_semantic, "nli": load_broken, "reranker": lambda: None,
+    })
+
+    assert results["encoder"]["loaded"] and results["semantic_analysis"]["loaded"]
+    assert (results["nli"]["loaded"], results["nli"]["error"]) == (False, "no such model")
+    assert results["reranker"]["error"] == "loader returned no model"
+    assert gc.get_freeze_count() > 0
+    assert model_preload.preload_status()["models"]["encoder"]["loaded"]
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="fork start method")
+def test_forked_workers_inherit_preloaded_models(unfreeze):
+    MODELS.clear()
+    model_preload.preload_models({"encoder": load_encoder})
+
+    ctx = multiprocessing.get_context("fork")
+    queue = ctx.Queue()
+    worker = ctx.Process(target=worker_sees_preloaded_model, args=(queue,))
+    worker.start()
+    worker.join(timeout=30)
+    assert queue.get(timeout=5) is True
+
+
+def test_after_fork_drops_inherited_database_connections(monkeypatch):
+    disposed = []
+
+    class Engine:
+        def dispose(self, close=True):
+            disposed.append(close)
+
+    monkeypatch.setattr("database.engine", Engine())
+    model_preload.after_fork()
+    assert disposed == [False]
+
+
+def test_onnx_sessions_are_not_created_before_the_fork(monkeypatch, unfreeze):
+    import main
+    from services import onnx_inference
+
+    sessions = []
+
+    def load_session(model_name, task):
+        sessions.append(model_name)
+        raise RuntimeError("InferenceSession created in the master")
+
+    monkeypatch.setenv("INFERENCE_BACKEND", "onnx")
+    monkeypatch.setattr(onnx_inference, "_load_session", load_session)
+
+    loaders = main.model_preload_loaders()
+    model_preload.preload_models(loaders)
+
+    assert sessions == []
+    assert not set(loaders) & set(main.ONNX_BACKED_MODELS)
+    assert "mesh_index" in loaders
+
+    monkeypatch.setenv("INFERENCE_BACKEND", "torch")
+    assert {"embeddings", "cross_encoder"} <= set(main.model_preload_loaders())
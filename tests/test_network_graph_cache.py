@@ -0,0 +1,220 @@
+"""
+Tests for the incremental network graph cache
+"""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, Article, ArticleCollection, Collection, NetworkGraph, NetworkGraphArticle, Project
+from services.network_graph_cache import NetworkGraphCache, CHANGE_LOG_LIMIT
+
+
+@pytest.fixture
+def db():
+    """In-memory database with a few citing articles"""
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+
+    session.add_all([
+        Article(pmid="1", title="Root paper", publication_year=2023, citation_count=5,
+                references_pmids=["2", "3"]),
+        Article(pmid="2", title="Second paper", publication_year=2020, citation_count=2,
+                references_pmids=["3"]),
+        Article(pmid="3", title="Third paper", publication_year=2015, citation_count=9,
+                references_pmids=[]),
+        Article(pmid="4", title="New paper", publication_year=2024, citation_count=0,
+                references_pmids=["1"]),
+    ])
+    session.commit()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def cache():
+    return NetworkGraphCache()
+
+
+def _build(db, pmids):
+    from main import build_network_graph
+    from utils.article_profiles import query_article_rows
+    rows = query_article_rows(db, "graph").filter(Article.pmid.in_(pmids)).all()
+    return build_network_graph(rows, "project")
+
+
+def test_store_graph_stamps_version(db, cache):
+    graph = cache.store_graph(db, "project", "p1", _build(db, ["1", "2", "3"]))
+
+    assert graph.version == 1
+    assert {e["id"] for e in graph.edges} == {"1->2", "1->3", "2->3"}
+    assert all(n["version"] == 1 for n in graph.nodes)
+
+
+def test_rebuild_continues_version_sequence(db, cache):
+    first = cache.store_graph(db, "project", "p1", _build(db, ["1", "2"]))
+    second = cache.store_graph(db, "project", "p1", _build(db, ["1", "2", "3"]))
+
+    assert second.version == first.version + 1
+    assert db.query(NetworkGraph).filter(NetworkGraph.is_active == True).count() == 1
+
+
+def test_add_article_patches_nodes_and_both_edge_directions(db, cache):
+    graph = cache.store_graph(db, "project", "p1", _build(db, ["1", "2"]))
+    row = db.query(Article).filter(Article.pmid == "3").first()
+    incoming = db.query(Article).filter(Article.pmid == "4").first()
+
+    cache.add_articles(db, graph, [row])
+    version = cache.add_articles(db, graph, [incoming])
+    db.commit()
+
+    assert version == 3
+    assert {n["id"] for n in graph.nodes} == {"1", "2", "3", "4"}
+    assert {e["id"] for e in graph.edges} == {"1->2", "1->3", "2->3", "4->1"}
+    assert graph.graph_metadata["total_nodes"] == 4
+
+
+def test_delta_since_version(db, cache):
+    graph = cache.store_graph(db, "project", "p1", _build(db, ["1", "2", "3"]))
+    cache.add_articles(db, graph, [db.query(Article).filter(Article.pmid == "4").first()])
+    cache.remove_articles(graph, ["2"])
+    db.commit()
+
+    delta = cache.get_delta(graph, since=1)
+
+    assert delta["full"] is False
+    assert delta["version"] == 3
+    assert [n["id"] for n in delta["nodes"]] == ["4"]
+    assert [e["id"] for e in delta["edges"]] == ["4->1"]
+    assert delta["removed_nodes"] == ["2"]
+    assert set(delta["removed_edges"]) == {"1->2", "2->3"}
+
+    assert cache.get_delta(graph, since=3)["nodes"] == []
+    assert cache.get_delta(graph, since=2)["removed_nodes"] == ["2"]
+
+
+def test_delta_before_base_version_returns_full_graph(db, cache):
+    cache.store_graph(db, "project", "p1", _build(db, ["1"]))
+    graph = cache.store_graph(db, "project", "p1", _build(db, ["1", "2"]))
+
+    delta = cache.get_delta(graph, since=1)
+
+    assert delta["full"] is True
+    assert len(delta["nodes"]) == 2
+
+
+def test_change_log_truncation_moves_base_version(db, cache):
+    graph = cache.store_graph(db, "project", "p1", _build(db, ["1", "2", "3"]))
+    for i in range(CHANGE_LOG_LIMIT + 5):
+        cache.add_articles(db, graph, [{"pmid": f"x{i}", "title": "tmp"}])
+        cache.remove_articles(graph, [f"x{i}"])
+
+    assert len(graph.change_log) == CHANGE_LOG_LIMIT
+    assert graph.base_version > 1
+    assert cache.get_delta(graph, since=1)["full"] is True
+
+
+def test_refresh_article_after_enrichment(db, cache):
+    graph = cache.store_graph(db, "project", "p1", _build(db, ["1", "2", "3"]))
+
+    article = db.query(Article).filter(Article.pmid == "1").first()
+    article.references_pmids = ["3"]
+    article.citation_count = 40
+    db.commit()
+
+    assert cache.refresh_article(db, "1") == 1
+
+    db.refresh(graph)
+    node = next(n for n in graph.nodes if n["id"] == "1")
+    assert node["metadata"]["citation_count"] == 40
+    assert {e["id"] for e in graph.edges} == {"1->3", "2->3"}
+    assert cache.get_delta(graph, since=1)["removed_edges"] == ["1->2"]
+
+
+def _linked(db, graph):
+    return {pmid for (pmid,) in db.query(NetworkGraphArticle.pmid).filter(NetworkGraphArticle.graph_id == graph.graph_id)}
+
+
+def test_article_links_follow_graph_nodes(db, cache):
+    first = cache.store_graph(db, "project", "p1", _build(db, ["1", "2"]))
+    graph = cache.store_graph(db, "project", "p1", _build(db, ["1", "2", "3"]))
+    collection_graph = cache.store_graph(db, "collection", "c1", _build(db, ["1"]))
+
+    assert _linked(db, first) == set() and _linked(db, collection_graph) == set()
+    assert _linked(db, graph) == {"1", "2", "3"}
+
+    cache.add_articles(db, graph, [db.query(Article).filter(Article.pmid == "4").first()])
+    cache.remove_articles(graph, ["2"])
+    db.commit()
+
+    assert _linked(db, graph) == {"1", "3", "4"}
+
+
+def test_refresh_articles_patches_each_graph_once_and_ignores_pmid_prefixes(db, cache):
+    db.add(Article(pmid="10", title="Prefix paper", publication_year=2021, references_pmids=[]))
+    db.commit()
+    graph = cache.store_graph(db, "project", "p1", _build(db, ["1", "2", "3"]))
+    other = cache.store_graph(db, "report", "r1", _build(db, ["10"]))
+
+    for pmid, count in (("1", 40), ("2", 7)):
+        db.query(Article).filter(Article.pmid == pmid).first().citation_count = count
+    db.commit()
+
+    assert cache.refresh_articles(db, ["1", "2"]) == 1
+
+    db.refresh(graph)
+    db.refresh(other)
+    assert graph.version == 2
+    assert {n["id"]: n["metadata"]["citation_count"] for n in graph.nodes} == {"1": 40, "2": 7, "3": 9}
+    assert other.version == 1
+
+
+def _project_with_collection(db):
+    db.add_all([
+        Project(project_id="p1", project_name="Citations", owner_user_id="u1"),
+        Collection(collection_id="c1", project_id="p1", collection_name="Core", created_by="u1"),
+    ])
+    db.commit()
+
+
+def test_collection_hook_adds_article_to_collection_and_project_graphs(db, cache):
+    _project_with_collection(db)
+    project_graph = cache.store_graph(db, "project", "p1", _build(db, ["1", "2"]))
+    collection_graph = cache.store_graph(db, "collection", "c1", {"nodes": [], "edges": [], "metadata": {}})
+
+    added = ArticleCollection(collection_id="c1", article_pmid="4", article_title="New paper",
+                              source_type="manual", added_by="u1")
+    db.add(added)
+    db.commit()
+    cache.on_collection_article_added(db, "p1", added)
+
+    db.refresh(project_graph)
+    db.refresh(collection_graph)
+    assert [n["id"] for n in collection_graph.nodes] == ["4"]
+    assert {n["id"] for n in project_graph.nodes} == {"1", "2", "4"}
+    assert "4->1" in {e["id"] for e in project_graph.edges}
+    assert _linked(db, project_graph) == {"1", "2", "4"}
+
+
+def test_collection_hook_removes_article_no_longer_in_the_project(db, cache):
+    _project_with_collection(db)
+    kept = ArticleCollection(collection_id="c1", article_pmid="1", article_title="Root paper",
+                             source_type="manual", added_by="u1")
+    removed = ArticleCollection(collection_id="c1", article_pmid="2", article_title="Second paper",
+                                source_type="manual", added_by="u1")
+    db.add_all([kept, removed])
+    db.commit()
+    project_graph = cache.store_graph(db, "project", "p1", _build(db, ["1", "2"]))
+    collection_graph = cache.store_graph(db, "collection", "c1", _build(db, ["1", "2"]))
+
+    db.delete(removed)
+    db.commit()
+    cache.on_collection_article_removed(db, "p1", removed)
+
+    db.refresh(project_graph)
+    db.refresh(collection_graph)
+    assert [n["id"] for n in collection_graph.nodes] == ["1"]
+    assert [n["id"] for n in project_graph.nodes] == ["1"]
+    assert cache.get_delta(project_graph, since=1)["removed_edges"] == ["1->2"]
+    assert _linked(db, project_graph) == {"1"}
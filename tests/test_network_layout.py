@@ -0,0 +1,123 @@
+"""
+Tests for server-side network layout and level-of-detail payloads
+"""
+
+import numpy as np
+
+from services.network_layout import (
+    compute_graph_layout,
+    build_lod_payload,
+    detect_communities,
+    LAYOUT_SCALE,
+)
+
+
+def _node(pmid, citations=0, year=2020):
+    return {
+        "id": pmid,
+        "label": f"Paper {pmid}",
+        "color": "#4CAF50",
+        "metadata": {"pmid": pmid, "title": f"Paper {pmid}", "citation_count": citations, "year": year},
+    }
+
+
+def _edge(a, b):
+    return {"id": f"{a}->{b}", "from": a, "to": b}
+
+
+def _two_cliques(size=8):
+    """Two dense cliques joined by one bridge edge"""
+    left = [f"a{i}" for i in range(size)]
+    right = [f"b{i}" for i in range(size)]
+    nodes = [_node(p, citations=i) for i, p in enumerate(left + right)]
+    edges = [_edge(x, y) for group in (left, right) for i, x in enumerate(group) for y in group[i + 1:]]
+    edges.append(_edge("a0", "b0"))
+    return {"nodes": nodes, "edges": edges, "metadata": {"source_type": "project"}}
+
+
+def test_cliques_form_separate_communities():
+    graph = _two_cliques()
+    layout = compute_graph_layout(graph["nodes"], graph["edges"])
+    communities = layout["communities"]
+
+    assert len({communities[f"a{i}"] for i in range(8)}) == 1
+    assert len({communities[f"b{i}"] for i in range(8)}) == 1
+    assert communities["a1"] != communities["b1"]
+
+
+def test_positions_are_bounded():
+    graph = _two_cliques()
+    layout = compute_graph_layout(graph["nodes"], graph["edges"])
+    coords = np.array(list(layout["positions"].values()))
+
+    assert coords.shape == (16, 2)
+    assert np.abs(coords).max() <= LAYOUT_SCALE + 1e-6
+
+
+def test_isolated_nodes_grouped_by_fallback_key():
+    communities = detect_communities(
+        ["x", "y", "z"], np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), ["old", "old", "new"]
+    )
+    assert communities[0] == communities[1] != communities[2]
+
+
+def test_small_graph_returned_in_full_with_positions():
+    graph = _two_cliques()
+    layout = compute_graph_layout(graph["nodes"], graph["edges"])
+
+    payload = build_lod_payload(graph, layout, max_nodes=100)
+
+    assert payload["metadata"]["lod"]["level"] == "full"
+    assert len(payload["nodes"]) == 16
+    assert all("x" in n and "y" in n and n["cluster_id"] is not None for n in payload["nodes"])
+
+
+def test_large_graph_collapsed_to_super_nodes():
+    graph = _two_cliques()
+    layout = compute_graph_layout(graph["nodes"], graph["edges"])
+
+    payload = build_lod_payload(graph, layout, max_nodes=10)
+
+    assert payload["metadata"]["lod"]["level"] == "clusters"
+    assert len(payload["nodes"]) == 2
+    assert all(n["is_cluster"] and n["metadata"]["member_count"] == 8 for n in payload["nodes"])
+    assert len(payload["edges"]) == 1
+    assert payload["edges"][0]["edge_count"] == 1
+
+
+def test_cluster_drill_down():
+    graph = _two_cliques()
+    layout = compute_graph_layout(graph["nodes"], graph["edges"])
+    cluster_id = layout["communities"]["a0"]
+
+    payload = build_lod_payload(graph, layout, max_nodes=5, cluster=cluster_id)
+    lod = payload["metadata"]["lod"]
+    members = [n for n in payload["nodes"] if not n.get("is_cluster")]
+    super_nodes = [n for n in payload["nodes"] if n.get("is_cluster")]
+
+    assert lod["level"] == "cluster_detail"
+    assert lod["member_count"] == 8 and lod["truncated"] is True
+    # Top members by citation count
+    assert [n["id"] for n in members] == ["a7", "a6", "a5", "a4", "a3"]
+    # The bridge starts at a0, which is not shown
+    assert super_nodes == []
+
+    payload = build_lod_payload(graph, layout, max_nodes=8, cluster=cluster_id)
+    super_nodes = [n for n in payload["nodes"] if n.get("is_cluster")]
+
+    assert len(payload["nodes"]) == 9
+    assert [n["metadata"]["member_count"] for n in super_nodes] == [8]
+    assert any(e["from"] == "a0" and e["to"] == super_nodes[0]["id"] for e in payload["edges"])
+
+
+def test_warm_start_keeps_known_positions_close():
+    graph = _two_cliques()
+    first = compute_graph_layout(graph["nodes"], graph["edges"])
+
+    graph["nodes"].append(_node("a8"))
+    graph["edges"].append(_edge("a8", "a1"))
+    second = compute_graph_layout(graph["nodes"], graph["edges"], previous=first)
+
+    assert "a8" in second["positions"]
+    shift = np.linalg.norm(np.array(first["positions"]["b3"]) - np.array(second["positions"]["b3"]))
+    assert shift < LAYOUT_SCALE * 0.5
@@ -0,0 +1,73 @@
+"""
+Tests for batched NLI entailment scoring of fact anchors
+"""
+
+import math
+
+import pytest
+
+from services.cross_rerank import RerankScoreCache
+from services.nli_entailment import entailment_probability, score_pairs
+
+
+class FakeNLI:
+    """Returns (contradiction, entailment, neutral) logits: entailed iff the claim occurs in the premise"""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.calls = []
+
+    def predict(self, pairs, batch_size=32):
+        if self.fail:
+            raise RuntimeError("CUDA out of memory")
+        self.calls.append(list(pairs))
+        return [[0.0, 4.0, 0.0] if claim in premise else [4.0, 0.0, 0.0] for premise, claim in pairs]
+
+
+ABSTRACT_A = "Metformin reduced tumour growth in organoids."
+ABSTRACT_B = "Rapamycin inhibited mTOR signalling in mice."
+
+
+def test_entailment_probability_reads_the_entailment_column():
+    assert entailment_probability([0.0, 4.0, 0.0]) == pytest.approx(math.exp(4) / (math.exp(4) + 2))
+    assert entailment_probability([4.0, 0.0, 0.0]) < 0.05
+    assert entailment_probability(0.8) == 0.8
+    assert entailment_probability(3.0) == pytest.approx(1 / (1 + math.exp(-3)))
+
+
+def test_pairs_from_all_articles_are_scored_in_one_call_and_deduplicated():
+    model = FakeNLI()
+    pairs = [
+        (ABSTRACT_A, "Metformin reduced tumour growth"),
+        (ABSTRACT_A, "Metformin increased tumour growth"),
+        (ABSTRACT_B, "Rapamycin inhibited mTOR"),
+        (ABSTRACT_A, "Metformin reduced tumour growth"),
+    ]
+
+    scores, report = score_pairs(pairs, model, RerankScoreCache())
+
+    assert len(model.calls) == 1 and len(model.calls[0]) == 3
+    assert scores[0] > 0.9 and scores[1] < 0.1 and scores[2] > 0.9 and scores[3] == scores[0]
+    assert (report.pairs, report.unique, report.scored, report.batches) == (4, 3, 3, 1)
+
+
+def test_cached_pairs_skip_the_model():
+    cache = RerankScoreCache()
+    score_pairs([(ABSTRACT_A, "Metformin reduced tumour growth")], FakeNLI(), cache)
+
+    model = FakeNLI()
+    scores, report = score_pairs([(ABSTRACT_A, "Metformin reduced tumour growth"), (ABSTRACT_B, "Rapamycin")],
+                                 model, cache)
+
+    assert model.calls == [[(ABSTRACT_B, "Rapamycin")]]
+    assert report.cache_hits == 1 and all(s is not None for s in scores)
+
+
+def test_unscored_pairs_are_none_on_model_error_or_no_budget():
+    pairs = [(ABSTRACT_A, "Metformin")]
+
+    scores, report = score_pairs(pairs, FakeNLI(fail=True), RerankScoreCache())
+    assert scores == [None] and report.error == "CUDA out of memory"
+
+    scores, report = score_pairs(pairs, FakeNLI(), RerankScoreCache(), budget_s=-1.0)
+    assert scores == [None] and report.budget_exhausted
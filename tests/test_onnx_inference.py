@@ -0,0 +1,100 @@
+"""
+Tests for the ONNX Runtime inference wrappers
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from services import onnx_inference
+from services.onnx_inference import OnnxCrossEncoder, OnnxEmbeddings, OnnxSentenceEncoder
+from services.semantic_analysis_service import SemanticAnalysisService
+
+
+class FakeTokenizer:
+    """Pads whitespace tokens; token ids are word lengths"""
+
+    def __call__(self, texts, pairs=None, padding=True, truncation=True, max_length=512, return_tensors="np"):
+        words = [t.split() + (p.split() if pairs else []) for t, p in zip(texts, pairs or texts)]
+        width = max(len(w) for w in words)
+        ids = np.array([[len(x) for x in w] + [0] * (width - len(w)) for w in words])
+        mask = np.array([[1] * len(w) + [0] * (width - len(w)) for w in words])
+        return {"input_ids": ids, "attention_mask": mask, "token_type_ids": np.zeros_like(ids)}
+
+
+class FakeSession:
+    """Feature extraction: token vector [id, 1]; classification: logits from the summed ids"""
+
+    def __init__(self, labels=None):
+        self.labels = labels
+        self.calls = []
+
+    def get_inputs(self):
+        return [SimpleNamespace(name="input_ids"), SimpleNamespace(name="attention_mask")]
+
+    def run(self, outputs, inputs):
+        self.calls.append(inputs["input_ids"].shape[0])
+        ids = inputs["input_ids"].astype(np.float32)
+        if self.labels is None:
+            return [np.stack([ids, np.ones_like(ids)], axis=-1)]
+        total = ids.sum(axis=1, keepdims=True)
+        return [np.concatenate([total - i for i in range(self.labels)], axis=1) / 10]
+
+
+def test_sentence_encoder_mean_pools_over_the_attention_mask():
+    session = FakeSession()
+    encoder = OnnxSentenceEncoder(session, FakeTokenizer())
+
+    embeddings = encoder.encode(["ab abcd", "abc", "a b c"], batch_size=2)
+    assert session.calls == [2, 1]
+    np.testing.assert_allclose(embeddings, [[3, 1], [3, 1], [1, 1]])
+    np.testing.assert_allclose(encoder.encode("abc"), [3, 1])
+
+    normalized = OnnxSentenceEncoder(FakeSession(), FakeTokenizer(), pooling="cls", normalize=True)
+    np.testing.assert_allclose(normalized.encode(["abcd ab"]), [[0.9701425, 0.2425356]], rtol=1e-6)
+
+    langchain = OnnxEmbeddings(encoder)
+    assert langchain.embed_query("abc") == [3.0, 1.0]
+    assert langchain.embed_documents(["ab", "abcd"]) == [[2.0, 1.0], [4.0, 1.0]]
+
+
+def test_cross_encoder_matches_crossencoder_predict_outputs():
+    reranker = OnnxCrossEncoder(FakeSession(labels=1), FakeTokenizer())
+    scores = reranker.predict([("ab", "abc"), ("a", "a")])
+    np.testing.assert_allclose(scores, 1 / (1 + np.exp(-np.array([0.5, 0.2]))), rtol=1e-6)
+
+    nli = OnnxCrossEncoder(FakeSession(labels=3), FakeTokenizer())
+    logits = nli.predict([("ab", "abc")])
+    assert logits.shape == (1, 3)
+    assert nli.predict(("ab", "abc")).shape == (3,)
+
+
+def test_loaders_fall_back_to_pytorch(monkeypatch, tmp_path):
+    monkeypatch.setenv("ONNX_CACHE_DIR", str(tmp_path))
+    monkeypatch.delenv("INFERENCE_BACKEND", raising=False)
+    assert onnx_inference.onnx_cross_encoder("cross-encoder/ms-marco-MiniLM-L-6-v2") is None
+
+    def failing(model_name):
+        raise ImportError("No module named 'optimum'")
+
+    monkeypatch.setenv("INFERENCE_BACKEND", "onnx")
+    monkeypatch.setattr(OnnxCrossEncoder, "load", failing)
+    assert onnx_inference.onnx_cross_encoder("cross-encoder/ms-marco-MiniLM-L-6-v2") is None
+
+    monkeypatch.setenv("ONNX_QUANTIZATION", "avx512_vnni")
+    assert onnx_inference.model_dir("cross-encoder/ms-marco-MiniLM-L-6-v2", "text-classification") == str(
+        tmp_path / "cross-encoder__ms-marco-MiniLM-L-6-v2.text-classification.avx512_vnni")
+
+
+@pytest.mark.parametrize("mode,name", [
+    ("avx2", "scibert-onnx-int8-avx2"),
+    ("avx512_vnni", "scibert-onnx-int8-avx512_vnni"),
+    ("none", "scibert-onnx-fp32"),
+])
+def test_onnx_models_get_their_own_embedding_model_name(monkeypatch, mode, name):
+    monkeypatch.setenv("ONNX_QUANTIZATION", mode)
+    service = SemanticAnalysisService()
+    service.scibert_model = OnnxSentenceEncoder(FakeSession(), FakeTokenizer())
+    encoder = service._embedding_encoder()
+    assert encoder.name == name
@@ -0,0 +1,186 @@
+"""
+Tests for versioned project context snapshots shared by the context services
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from database import (
+    Base, Project, User, ResearchQuestion, Hypothesis, HypothesisEvidence, Article,
+    PaperTriage, Protocol, ExperimentPlan, ExperimentResult, ProjectDecision
+)
+from backend.app.services.context_manager import ContextManager
+from backend.app.services.project_context_service import ProjectContextService
+from backend.app.services.project_context_snapshot import ProjectContextSnapshots, SnapshotRow
+
+T0 = datetime(2026, 1, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(bind=engine)()
+    session.add(User(user_id="u1", username="u1", email="u1@example.com", first_name="A", last_name="B",
+                     category="academic", role="researcher", institution="X", subject_area="bio",
+                     how_heard_about_us="web"))
+    session.add(Project(project_id="p1", project_name="Kinase project", description="CDK inhibitors",
+                        owner_user_id="u1"))
+    session.add(ResearchQuestion(question_id="q1", project_id="p1", question_text="Does CDK4 matter?",
+                                 priority="high", created_by="u1", created_at=T0))
+    session.add(ResearchQuestion(question_id="q2", project_id="p1", question_text="What about CDK6?",
+                                 priority="critical", created_by="u1", created_at=T0 + timedelta(days=1)))
+    session.add(Hypothesis(hypothesis_id="h1", project_id="p1", question_id="q1", hypothesis_text="Yes",
+                           status="testing", confidence_level=70, created_by="u1", created_at=T0))
+    session.add(Article(pmid="111", title="CDK4 paper", abstract="Abstract"))
+    session.add(Article(pmid="222", title="Other paper"))
+    session.add(PaperTriage(triage_id="t1", project_id="p1", article_pmid="111", triage_status="must_read",
+                            relevance_score=90, triaged_at=T0))
+    session.add(PaperTriage(triage_id="t2", project_id="p1", article_pmid="222", triage_status="ignore",
+                            relevance_score=10, triaged_at=T0 + timedelta(days=2)))
+    session.add(Protocol(protocol_id="pr1", project_id="p1", protocol_name="Assay", created_by="u1",
+                         created_at=T0))
+    session.add(ExperimentPlan(plan_id="e1", project_id="p1", plan_name="Plan A", objective="Test",
+                               created_by="u1", created_at=T0))
+    session.add(ExperimentResult(result_id="r1", plan_id="e1", project_id="p1", status="completed",
+                                 completed_at=T0))
+    session.add(ProjectDecision(decision_id="d1", project_id="p1", decision_type="scope", title="Focus",
+                                description="CDK4 only", decided_by="u1", decided_at=datetime.utcnow()))
+    session.commit()
+    yield session
+    session.close()
+
+
+def _count_selects(engine):
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    return statements
+
+
+def _version(db):
+    db.expire_all()
+    return db.query(Project.context_version).filter(Project.project_id == "p1").scalar()
+
+
+def test_snapshot_contents_and_orderings(db):
+    snapshot = ProjectContextSnapshots().get(db, "p1")
+
+    assert snapshot.project.project_name == "Kinase project"
+    assert [q.question_id for q in snapshot.questions] == ["q1", "q2"]
+    assert [t.triage_id for _, t in snapshot.papers] == ["t2", "t1"]
+    assert snapshot.papers[1][0].abstract == "Abstract"
+    assert snapshot.results[0].plan.plan_name == "Plan A"
+    assert snapshot.questions[0]["priority"] == "high"
+    with pytest.raises(AttributeError):
+        snapshot.questions[0].question_text = "changed"
+
+
+def test_writes_bump_context_version(db):
+    start = _version(db)
+
+    db.add(ResearchQuestion(question_id="q3", project_id="p1", question_text="New?", created_by="u1"))
+    db.commit()
+    assert _version(db) == start + 1
+
+    db.query(Hypothesis).first().status = "supported"
+    db.commit()
+    assert _version(db) == start + 2
+
+    db.add(HypothesisEvidence(hypothesis_id="h1", article_pmid="111", added_by="u1"))
+    db.commit()
+    assert _version(db) == start + 3
+
+    project = db.query(Project).first()
+    project.paper_count = 5  # not part of the context
+    db.commit()
+    assert _version(db) == start + 3
+
+
+def test_snapshot_is_shared_until_version_changes(engine, db):
+    snapshots = ProjectContextSnapshots()
+    first = snapshots.get(db, "p1")
+
+    statements = _count_selects(engine)
+    assert snapshots.get(db, "p1") is first
+    assert len(statements) == 1  # only the version lookup
+
+    db.add(Protocol(protocol_id="pr2", project_id="p1", protocol_name="Second", created_by="u1"))
+    db.commit()
+    second = snapshots.get(db, "p1")
+    assert second is not first
+    assert [p.protocol_id for p in second.protocols][0] == "pr2"
+    assert snapshots.builds == 2 and snapshots.hits == 1
+
+
+def test_uncommitted_writes_are_not_shared(db):
+    snapshots = ProjectContextSnapshots()
+    snapshots.get(db, "p1")
+
+    db.add(ResearchQuestion(question_id="q9", project_id="p1", question_text="Draft", created_by="u1"))
+    db.flush()
+    private = snapshots.get(db, "p1")
+    assert "q9" in [q.question_id for q in private.questions]
+    db.rollback()
+
+    shared = snapshots.get(db, "p1")
+    assert "q9" not in [q.question_id for q in shared.questions]
+
+
+def test_prompt_memo_drops_decisions_past_the_cutoff(db, monkeypatch):
+    snapshots = ProjectContextSnapshots()
+    monkeypatch.setattr("backend.app.services.project_context_snapshot._project_context_snapshots", snapshots)
+
+    service = ProjectContextService()
+    prompt = service.format_for_prompt(service.get_full_context("p1", db))
+    assert "CDK4 only" in prompt
+
+    # Same snapshot version, but d1 has aged out of the 90-day window
+    monkeypatch.setattr(service, "_decisions_cutoff", lambda: datetime.utcnow() + timedelta(days=1))
+    context = service.get_full_context("p1", db)
+
+    assert context["decisions"] == []
+    assert "CDK4 only" not in service.format_for_prompt(context)
+
+
+def test_services_read_the_snapshot(db, monkeypatch):
+    snapshots = ProjectContextSnapshots()
+    monkeypatch.setattr("backend.app.services.project_context_snapshot._project_context_snapshots", snapshots)
+
+    service = ProjectContextService()
+    context = service.get_full_context("p1", db)
+    assert context["project_name"] == "Kinase project"
+    assert [q["question_id"] for q in context["questions"]] == ["q2", "q1"]  # critical before high
+    assert [p["pmid"] for p in context["papers"]] == ["111"]
+    assert [d["decision_id"] for d in context["decisions"]] == ["d1"]
+    prompt = service.format_for_prompt(context)
+    assert service.format_for_prompt(context) is prompt
+    assert "CDK inhibitors" in prompt
+
+    manager = ContextManager(db)
+    full = manager.get_full_context("p1")
+    assert full["project_name"] == "Kinase project"
+    assert [e["type"] for e in full["timeline"]].count("question") == 2
+    formatted = manager.format_context_for_ai("p1")
+    assert manager.format_context_for_ai("p1") is formatted
+    assert "Does CDK4 matter?" in formatted
+    assert snapshots.builds == 1
+
+
+def test_snapshot_row_access():
+    row = SnapshotRow({"a": 1})
+    assert row.a == row["a"] == row.get("a") == 1
+    assert row.get("b", 2) == 2
+    assert not hasattr(row, "b")
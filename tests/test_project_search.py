@@ -0,0 +1,106 @@
+"""
+Tests for the full-text project search index (SQLite FTS5 backend)
+"""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import (
+    Base, Annotation, Article, ArticleCollection, Collection, Report, SearchDocument
+)
+from services.project_search import (
+    ensure_search_index, rebuild_index, search_project, postgres_tsquery, fts5_query, query_tokens
+)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    assert ensure_search_index(engine) == "sqlite_fts5"
+    session = sessionmaker(bind=engine)()
+
+    session.add_all([
+        Collection(collection_id="c1", project_id="p1", collection_name="Diabetes papers",
+                   description="Insulin resistance studies", created_by="u1"),
+        Collection(collection_id="c2", project_id="p2", collection_name="Diabetes elsewhere", created_by="u1"),
+        Article(pmid="100", title="Metformin and AMPK", abstract="Metformin activates AMPK signalling in hepatocytes."),
+    ])
+    session.flush()
+    session.add_all([
+        ArticleCollection(collection_id="c1", article_pmid="100", article_title="Metformin and AMPK",
+                          article_journal="Cell", source_type="manual", added_by="u1"),
+        Annotation(annotation_id="n1", project_id="p1", content="Check diabetic mouse dosing", author_id="u1",
+                   tags=["dosing"]),
+        Report(report_id="r1", project_id="p1", title="Diabetes landscape", objective="Map GLP-1 therapies",
+               molecule="semaglutide", content={}, created_by="u1"),
+    ])
+    session.commit()
+    yield session
+    session.close()
+
+
+def test_query_builders():
+    assert query_tokens("GLP-1 agonist!") == ["glp", "1", "agonist"]
+    assert postgres_tsquery(["insulin", "resist"]) == "insulin:* & resist:*"
+    assert fts5_query(["insulin", "resist"]) == '"insulin"* "resist"*'
+
+
+def test_write_hooks_index_content(db):
+    assert db.query(SearchDocument).filter(SearchDocument.project_id == "p1").count() == 4
+
+
+def test_unified_search_is_project_scoped_and_ranked(db):
+    found = search_project(db, "p1", "diabet", ["papers", "collections", "notes", "reports", "analyses"])
+
+    assert [c["id"] for c in found["results"]["collections"]] == ["c1"]
+    assert [r["id"] for r in found["results"]["reports"]] == ["r1"]
+    assert [n["id"] for n in found["results"]["notes"]] == ["n1"]
+    assert found["results"]["papers"] == []
+    scores = [item["score"] for item in found["ranked"]]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_prefix_search_matches_abstract(db):
+    found = search_project(db, "p1", "hepato", ["papers"])
+
+    papers = found["results"]["papers"]
+    assert [p["pmid"] for p in papers] == ["100"]
+    assert "hepatocytes" in papers[0]["highlight"]
+
+
+def test_updates_and_deletes_keep_index_current(db):
+    note = db.query(Annotation).filter(Annotation.annotation_id == "n1").first()
+    note.content = "Rapamycin follow-up"
+    db.commit()
+
+    assert search_project(db, "p1", "diabetic", ["notes"])["results"]["notes"] == []
+    assert len(search_project(db, "p1", "rapamycin", ["notes"])["results"]["notes"]) == 1
+
+    db.delete(note)
+    db.commit()
+    assert search_project(db, "p1", "rapamycin", ["notes"])["results"]["notes"] == []
+
+
+def test_inactive_collection_hidden(db):
+    db.query(Collection).filter(Collection.collection_id == "c1").first().is_active = False
+    db.commit()
+
+    found = search_project(db, "p1", "metformin", ["papers", "collections"])
+    assert found["results"]["papers"] == []
+
+
+def test_article_abstract_change_reindexes_papers(db):
+    db.query(Article).filter(Article.pmid == "100").first().abstract = "Mitochondrial complex I inhibition"
+    db.commit()
+
+    assert len(search_project(db, "p1", "mitochondrial", ["papers"])["results"]["papers"]) == 1
+
+
+def test_rebuild_index(db):
+    db.query(SearchDocument).delete()
+    db.commit()
+
+    assert rebuild_index(db, "p1") == 4
+    assert len(search_project(db, "p1", "semaglutide", ["reports"])["results"]["reports"]) == 1
@@ -0,0 +1,121 @@
+"""
+Tests for the vectorized recommendation ranking kernel
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from services import recommendation_ranking as ranking
+
+NOW = 2026
+
+
+def _article(pmid, title, abstract="", year=NOW, citations=0):
+    return SimpleNamespace(pmid=pmid, title=title, abstract=abstract,
+                           publication_year=year, citation_count=citations)
+
+
+PAPERS = [
+    _article("1", "Nephrology outcomes in diabetes", "Kidney cohort", 2026, 3),
+    _article("2", "Deep learning for retinal imaging", "Machine learning in diabetes screening", 2025, 12),
+    _article("3", "Oncology trial design", "", 2019, 250),
+    _article("4", "Cardiac rehabilitation", "Nephrology referral patterns", 2024, 40),
+]
+
+
+def _legacy_relevance(paper, profile):
+    score = min(paper.citation_count / 100, 0.3)
+    score += max(0, (5 - (NOW - paper.publication_year)) / 5) * 0.2
+    if any(d.lower() in paper.title.lower() for d in profile["primary_domains"][:3]):
+        score += 0.3
+    score += {"high": 0.1, "low": -0.1}.get(profile.get("activity_level", "moderate"), 0.0)
+    return min(score, 1.0)
+
+
+def _legacy_opportunity(paper, profile):
+    years_old = NOW - paper.publication_year
+    score = {0: 0.5, 1: 0.3}.get(years_old, 0.0)
+    score += 0.3 if paper.citation_count < 5 else 0.2 if paper.citation_count < 15 else 0.0
+    if any(d.lower() in paper.title.lower() for d in profile["primary_domains"]):
+        score += 0.2
+    return min(score, 1.0)
+
+
+PROFILES = [
+    {"primary_domains": ["nephrology", "diabetes"], "activity_level": "high"},
+    {"primary_domains": ["Oncology"], "activity_level": "low"},
+    {"primary_domains": ["physics", "chemistry", "biology", "cardiac"]},
+]
+
+
+@pytest.fixture
+def candidates():
+    terms = [d for p in PROFILES for d in p["primary_domains"]]
+    return ranking.build_candidate_matrix(PAPERS, terms)
+
+
+def test_batch_scores_match_per_paper_formulas(candidates):
+    users = ranking.build_profile_matrix(candidates, PROFILES)
+
+    relevance = ranking.personalized_relevance(candidates, users, now_year=NOW)
+    opportunity = ranking.citation_opportunity(candidates, users, now_year=NOW)
+
+    assert relevance.shape == opportunity.shape == (len(PROFILES), len(PAPERS))
+    for u, profile in enumerate(PROFILES):
+        for p, paper in enumerate(PAPERS):
+            assert relevance[u, p] == pytest.approx(_legacy_relevance(paper, profile))
+            assert opportunity[u, p] == pytest.approx(_legacy_opportunity(paper, profile))
+
+
+def test_relevance_only_uses_top_three_domains(candidates):
+    users = ranking.build_profile_matrix(candidates, [PROFILES[2]])
+
+    relevance = ranking.personalized_relevance(candidates, users, now_year=NOW)[0]
+    opportunity = ranking.citation_opportunity(candidates, users, now_year=NOW)[0]
+
+    # "cardiac" is the fourth domain: counts for opportunity, not for relevance
+    assert relevance[3] == pytest.approx(0.3 + 0.12)
+    assert opportunity[3] == pytest.approx(0.2)
+
+
+def test_interdisciplinary_checks_title_and_abstract():
+    candidates = ranking.build_candidate_matrix(PAPERS, ["nephrology", "diabetes"])
+
+    scores = ranking.interdisciplinary(candidates, "Nephrology", "diabetes")
+
+    assert scores.tolist() == pytest.approx([0.8 + 0.06, 0.4 + 0.2, 0.1 + 0.2, 0.4 + 0.2])
+
+
+def test_dict_papers_and_unknown_terms():
+    papers = [{"pmid": "9", "title": "Renal dialysis", "year": NOW - 1, "citation_count": None}]
+    candidates = ranking.build_candidate_matrix(papers, ["renal"])
+
+    scores = ranking.interdisciplinary(candidates, "renal", "astronomy")
+
+    assert candidates.years.tolist() == [NOW - 1]
+    assert scores.tolist() == pytest.approx([0.4])
+
+
+def test_top_k_orders_best_first():
+    scores = np.array([[0.1, 0.9, 0.5, 0.7], [0.4, 0.3, 0.2, 0.1]])
+
+    assert ranking.top_k(scores, 2).tolist() == [[1, 3], [0, 1]]
+    assert ranking.top_k(scores, 10).shape == (2, 4)
+
+
+def test_mmr_demotes_near_duplicates():
+    embeddings = np.array([[1.0, 0.0], [1.0, 0.0], [0.0, 1.0]], dtype=np.float32)
+    relevance = np.array([1.0, 0.95, 0.8])
+
+    assert ranking.mmr_order(relevance, embeddings, lambda_=1.0) == [0, 1, 2]
+    assert ranking.mmr_order(relevance, embeddings, lambda_=0.5) == [0, 2, 1]
+
+
+def test_mmr_accounts_for_previously_selected():
+    embeddings = np.array([[1.0, 0.0], [0.0, 1.0]], dtype=np.float32)
+    shown = np.array([[1.0, 0.0]], dtype=np.float32)
+
+    assert ranking.mmr_order(np.array([1.0, 0.9]), embeddings, lambda_=0.5, selected=shown) == [1, 0]
+    assert ranking.mmr_order(np.array([]), np.zeros((0, 2)), selected=shown) == []
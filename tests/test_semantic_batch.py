@@ -0,0 +1,120 @@
+"""
+Tests for batch semantic analysis and persisted per-PMID features
+"""
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database import Base, PaperSemanticFeatures
+from services.semantic_analysis_service import (
+    NoveltyType, ResearchMethodology, SemanticAnalysisService
+)
+
+
+class FakeModel:
+    """SentenceTransformer-like encode that records batch sizes"""
+
+    def __init__(self):
+        self.batches = []
+
+    def encode(self, texts, batch_size=32, show_progress_bar=False):
+        self.batches.append(len(texts))
+        return np.array([[len(t), 1.0, 2.0] for t in texts], dtype=float)
+
+
+@pytest.fixture
+def db():
+    # Persisted features are read and written from a worker thread
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def service():
+    service = SemanticAnalysisService()
+    service.is_initialized = True
+    service.scibert_model = FakeModel()
+    yield service
+    if service.encoder is not None:
+        service.encoder.shutdown()
+
+
+def _papers(n, suffix=""):
+    return [
+        {"pmid": str(i), "title": f"Paper {i}",
+         "abstract": f"A randomized clinical trial of patients with statistical analysis{suffix}"}
+        for i in range(n)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_batch_is_embedded_in_one_pass_and_persisted(service, db):
+    features = await service.analyze_papers(_papers(5), db=db)
+
+    assert service.scibert_model.batches == [5]
+    assert len(features) == 5
+    assert features[0].methodology == ResearchMethodology.EXPERIMENTAL
+    assert features[0].research_domains == ["medicine"]
+    assert features[0].confidence_scores["methodology"] == 0.8
+
+    row = db.query(PaperSemanticFeatures).filter_by(pmid="0").one()
+    assert (row.model_name, row.methodology) == ("scibert", "experimental")
+    assert row.embedding == features[0].embeddings.tolist()
+
+
+@pytest.mark.asyncio
+async def test_repeat_analyses_are_cache_hits_until_text_changes(service, db):
+    first = await service.analyze_papers(_papers(3), db=db)
+    again = await service.analyze_papers(_papers(3) + [{"title": "No PMID", "abstract": "theory"}], db=db)
+
+    assert service.scibert_model.batches == [3, 1]  # only the paper without a PMID was analyzed
+    assert [f.methodology for f in again[:3]] == [f.methodology for f in first]
+    assert np.array_equal(again[0].embeddings, first[0].embeddings)
+    assert again[3].methodology == ResearchMethodology.THEORETICAL
+
+    await service.analyze_papers(_papers(3, suffix=" revised"), db=db)
+    assert service.scibert_model.batches == [3, 1, 3]
+    assert db.query(PaperSemanticFeatures).count() == 3
+
+
+@pytest.mark.asyncio
+async def test_unreadable_persisted_row_is_a_cache_miss(service, db):
+    await service.analyze_papers(_papers(2), db=db)
+    db.query(PaperSemanticFeatures).filter_by(pmid="0").update({"methodology": "retired_label"})
+    db.commit()
+
+    features = await service.analyze_papers(_papers(2), db=db)
+
+    assert service.scibert_model.batches == [2, 1]  # only the bad row was re-analyzed
+    assert features[0].methodology == ResearchMethodology.EXPERIMENTAL
+    assert db.query(PaperSemanticFeatures).filter_by(pmid="0").one().methodology == "experimental"
+
+
+@pytest.mark.asyncio
+async def test_single_paper_analysis_goes_through_the_batch_path(service, monkeypatch):
+    calls = []
+
+    async def analyze_papers(papers, db=None):
+        calls.append(papers)
+        return ["features"]
+
+    monkeypatch.setattr(service, "analyze_papers", analyze_papers)
+    assert await service.analyze_paper("T", "A", pmid="7") == "features"
+    assert calls == [[{"pmid": "7", "title": "T", "abstract": "A", "full_text": None}]]
+
+
+def test_precompiled_detectors():
+    service = SemanticAnalysisService()
+    text = "a novel breakthrough algorithm for quantum simulation using machine learning".lower()
+
+    assert service._methodology_of(text) == ResearchMethodology.COMPUTATIONAL
+    assert service._novelty_of(text) == NoveltyType.BREAKTHROUGH
+    assert service._complexity_of(text) == pytest.approx(0.7)
+    assert set(service._domains_of(text)) == {"machine_learning", "physics", "computer_science"}
+    assert service._technical_terms_batch([text, text]) == [[], []]  # no spaCy model loaded
@@ -0,0 +1,100 @@
+"""
+Tests for startup cost: import-time budgets and background model warm-up
+
+The import checks run `python -X importtime` in a subprocess (a fresh
+interpreter, as a new worker would be). Budgets can be tuned per machine with
+MAIN_IMPORT_BUDGET_S and SERVICE_IMPORT_BUDGET_S. To see where the time goes:
+
+    python -X importtime -c "import main" 2>&1 | sort -t'|' -k2 -n | tail -30
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from services.warmup import Warmup
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loaded on first use / by the background warm-up, never at import
+DEFERRED_MODULES = {"torch", "transformers", "sentence_transformers", "spacy", "nltk",
+                    "langgraph", "pdfminer", "pinecone", "onnxruntime"}
+
+
+def import_profile(module):
+    """(return code, cumulative import seconds per top-level package, stderr) of a fresh import"""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=ROOT, capture_output=True, text=True, timeout=300)
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        cumulative[name] = max(cumulative.get(name, 0), int(cumulative_us) / 1e6)
+    return proc.returncode, cumulative, proc.stderr
+
+
+def test_semantic_service_import_defers_nlp_models():
+    code, cumulative, stderr = import_profile("services.semantic_analysis_service")
+    assert code == 0, stderr[-2000:]
+    assert not DEFERRED_MODULES & set(cumulative)
+    assert cumulative["services.semantic_analysis_service"] < float(os.getenv("SERVICE_IMPORT_BUDGET_S", "5"))
+
+
+def test_main_import_within_budget():
+    code, cumulative, stderr = import_profile("main")
+    if code != 0 and "ModuleNotFoundError" in stderr:
+        missing = next(line for line in stderr.splitlines() if line.startswith("ModuleNotFoundError"))
+        pytest.skip(f"app dependencies not installed: {missing}")
+    assert code == 0, stderr[-2000:]
+    assert not DEFERRED_MODULES & set(cumulative)
+    assert cumulative["main"] < float(os.getenv("MAIN_IMPORT_BUDGET_S", "15"))
+
+
+@pytest.mark.asyncio
+async def test_warmup_runs_in_background_and_reports_readiness():
+    warmup = Warmup(concurrency=2, enabled=True)
+
+    def slow_model():
+        time.sleep(0.1)
+        return object()
+
+    async def async_model():
+        return True
+
+    def broken_model():
+        raise OSError("model not found")
+
+    warmup.register("slow", slow_model)
+    warmup.register("async", async_model)
+    warmup.register("broken", broken_model)
+    warmup.register("disabled", lambda: None)
+
+    started = time.monotonic()
+    warmup.start()
+    assert time.monotonic() - started < 0.05  # start() does not wait for the loaders
+    status = warmup.status()
+    assert status["status"] == "warming_up" and not status["ready"]
+
+    await warmup.wait(timeout=5)
+    status = warmup.status()
+    assert (status["status"], status["ready"]) == ("degraded", True)
+    states = {name: c["state"] for name, c in status["components"].items()}
+    assert states == {"slow": "ready", "async": "ready", "broken": "failed", "disabled": "failed"}
+    assert status["components"]["broken"]["error"] == "model not found"
+    assert status["components"]["slow"]["duration_ms"] >= 100
+
+
+@pytest.mark.asyncio
+async def test_disabled_warmup_is_ready_immediately():
+    warmup = Warmup(enabled=False)
+    warmup.register("model", lambda: object())
+    assert warmup.start() is None
+    assert warmup.status()["status"] == "ready"
+    assert warmup.components["model"].state == "pending"
+    await asyncio.sleep(0)
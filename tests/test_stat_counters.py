@@ -0,0 +1,155 @@
+"""
+Tests for maintained dashboard stat counters
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import (
+    Base, Project, User, ResearchQuestion, Hypothesis, HypothesisEvidence, Article,
+    PaperTriage, ProjectAlert, PaperTriageStat, ProjectAlertStat
+)
+from backend.app.routers.alerts import DismissRequest, dismiss_alerts_batch
+from backend.app.services import stat_counters
+from backend.app.services.auto_hypothesis_status_service import AutoHypothesisStatusService
+from backend.app.services.stat_counters import (
+    alert_counts, hypothesis_evidence_counts, rebuild_counters, triage_counts
+)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    session.add(User(user_id="u1", username="u1", email="u1@example.com", first_name="A", last_name="B",
+                     category="academic", role="researcher", institution="X", subject_area="bio",
+                     how_heard_about_us="web"))
+    session.add(Project(project_id="p1", project_name="Kinases", owner_user_id="u1"))
+    session.add(ResearchQuestion(question_id="q1", project_id="p1", question_text="Q?", created_by="u1"))
+    session.add(Hypothesis(hypothesis_id="h1", project_id="p1", question_id="q1", hypothesis_text="H",
+                           created_by="u1"))
+    for pmid in ("1", "2", "3", "4"):
+        session.add(Article(pmid=pmid, title=f"Paper {pmid}"))
+    session.commit()
+    yield session
+    session.close()
+
+
+def _counter_rows(db):
+    triage = sorted((r.scope_type, r.scope_id, r.context_type, r.triage_status, r.read_status,
+                     r.paper_count, r.relevance_sum) for r in db.query(PaperTriageStat) if r.paper_count)
+    alerts = sorted((r.project_id, r.alert_type, r.severity, r.action_required, r.dismissed, r.alert_count)
+                    for r in db.query(ProjectAlertStat) if r.alert_count)
+    return triage, alerts
+
+
+def test_triage_counters_follow_inserts_updates_and_deletes(db):
+    db.add(PaperTriage(triage_id="t1", project_id="p1", article_pmid="1", triage_status="must_read",
+                       relevance_score=80))
+    db.add(PaperTriage(triage_id="t2", project_id="p1", article_pmid="2", triage_status="ignore",
+                       relevance_score=20))
+    db.add(PaperTriage(triage_id="t3", user_id="u1", article_pmid="3", context_type="search_query",
+                       triage_status="nice_to_know", relevance_score=60))
+    db.commit()
+
+    counts = triage_counts(db, project_ids=["p1"])
+    assert counts.total == 2
+    assert counts.by_status == {"must_read": 1, "ignore": 1}
+    assert counts.by_read_status == {"unread": 2}
+    assert counts.avg_relevance_score == 50
+
+    triage = db.query(PaperTriage).filter_by(triage_id="t2").one()
+    triage.triage_status = "must_read"
+    triage.read_status = "read"
+    triage.relevance_score = 40
+    db.commit()
+    db.delete(db.query(PaperTriage).filter_by(triage_id="t1").one())
+    db.commit()
+
+    counts = triage_counts(db, project_ids=["p1"])
+    assert (counts.total, counts.by_status, counts.by_read_status) == (1, {"must_read": 1}, {"read": 1})
+    assert counts.avg_relevance_score == 40
+
+    everything = triage_counts(db, project_ids=["p1"], user_id="u1")
+    assert everything.by_context_type == {"project": 1, "search_query": 1}
+
+    maintained = _counter_rows(db)
+    rebuild_counters(db)
+    assert _counter_rows(db) == maintained
+
+
+def test_alert_counters(db):
+    for i, (alert_type, severity, action) in enumerate([("new_paper", "high", True), ("new_paper", "low", False),
+                                                         ("gap_identified", "high", True)]):
+        db.add(ProjectAlert(alert_id=f"a{i}", project_id="p1", alert_type=alert_type, severity=severity,
+                            title="t", description="d", action_required=action))
+    db.commit()
+    db.query(ProjectAlert).filter_by(alert_id="a0").one().dismissed = True
+    db.commit()
+
+    counts = alert_counts(db, "p1")
+    assert (counts.total, counts.undismissed, counts.action_required) == (3, 2, 1)
+    assert counts.by_type == {"new_paper": 1, "gap_identified": 1}
+    assert counts.by_severity == {"low": 1, "high": 1}
+
+    maintained = _counter_rows(db)
+    rebuild_counters(db)
+    assert _counter_rows(db) == maintained
+
+
+def test_batch_dismiss_updates_alert_counters(db):
+    for i in range(3):
+        db.add(ProjectAlert(alert_id=f"a{i}", project_id="p1", alert_type="new_paper", severity="high",
+                            title="t", description="d", action_required=True))
+    db.commit()
+
+    result = asyncio.run(dismiss_alerts_batch(DismissRequest(alert_ids=["a0", "a1"]), user_id="u1", db=db))
+
+    assert result["dismissed_count"] == 2
+    counts = alert_counts(db, "p1")
+    assert (counts.total, counts.undismissed, counts.action_required) == (3, 1, 1)
+
+    maintained = _counter_rows(db)
+    rebuild_counters(db)
+    assert _counter_rows(db) == maintained
+
+
+def test_hypothesis_evidence_counts_are_maintained(db):
+    db.add(HypothesisEvidence(hypothesis_id="h1", article_pmid="1", evidence_type="supports", added_by="u1"))
+    db.add(HypothesisEvidence(hypothesis_id="h1", article_pmid="2", evidence_type="supports", added_by="u1"))
+    db.add(HypothesisEvidence(hypothesis_id="h1", article_pmid="3", evidence_type="neutral", added_by="u1"))
+    db.commit()
+
+    evidence = db.query(HypothesisEvidence).filter_by(article_pmid="2").one()
+    evidence.evidence_type = "contradicts"
+    db.commit()
+    db.delete(db.query(HypothesisEvidence).filter_by(article_pmid="3").one())
+    db.commit()
+
+    expected = {"supporting": 1, "contradicting": 1, "neutral": 0, "total": 2}
+    assert hypothesis_evidence_counts(db, "h1") == expected
+    assert AutoHypothesisStatusService()._calculate_evidence_counts("h1", db) == expected
+    db.expire_all()
+    hypothesis = db.query(Hypothesis).one()
+    assert (hypothesis.supporting_evidence_count, hypothesis.contradicting_evidence_count) == (1, 1)
+
+
+def test_reads_fall_back_to_grouped_queries_without_counter_tables(db, monkeypatch):
+    db.add(PaperTriage(triage_id="t1", project_id="p1", article_pmid="1", triage_status="must_read",
+                       relevance_score=70))
+    db.add(ProjectAlert(alert_id="a1", project_id="p1", alert_type="new_paper", severity="high",
+                        title="t", description="d"))
+    db.add(HypothesisEvidence(hypothesis_id="h1", article_pmid="1", evidence_type="supports", added_by="u1"))
+    db.commit()
+    db.query(PaperTriageStat).delete()
+    db.query(ProjectAlertStat).delete()
+    db.commit()
+    monkeypatch.setattr(stat_counters, "_counters_ready", lambda connection: False)
+
+    assert triage_counts(db, project_ids=["p1"]).by_status == {"must_read": 1}
+    assert alert_counts(db, "p1").by_type == {"new_paper": 1}
+    assert hypothesis_evidence_counts(db, "h1")["supporting"] == 1
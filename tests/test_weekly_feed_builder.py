@@ -0,0 +1,203 @@
+"""
+Tests for precomputed weekly recommendation feeds
+"""
+
+import asyncio
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, ArticleCollection, WeeklyRecommendationFeed
+from services.ai_recommendations_service import SpotifyInspiredRecommendationsService, _pubmed_batch_cache
+import services.weekly_feed_builder as weekly_feed_builder
+from services.weekly_feed_builder import WeeklyFeedBuilder, week_start
+
+
+class FakeRecommendations:
+    """Records calls instead of querying PubMed"""
+
+    def __init__(self):
+        self.calls = []
+        self.batches = 0
+
+    @contextmanager
+    def pubmed_batch(self):
+        self.batches += 1
+        yield
+
+    async def get_weekly_recommendations(self, user_id, project_id=None, force_refresh=False):
+        self.calls.append((user_id, project_id, force_refresh))
+        return {"status": "success", "user_id": user_id, "project_id": project_id,
+                "recommendations": {"papers_for_you": [{"pmid": "1"}]}}
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def builder():
+    return WeeklyFeedBuilder(FakeRecommendations())
+
+
+def _save_paper(db, user_id, pmid="1", added_at=None):
+    db.add(ArticleCollection(collection_id="c1", article_pmid=pmid, article_title="t",
+                             source_type="manual", added_by=user_id, added_at=added_at))
+    db.commit()
+
+
+def test_build_stores_feed_and_serves_it(db, builder):
+    asyncio.run(builder.build_feed(db, "u1"))
+
+    feed = builder.get_feed(db, "u1")
+    assert feed.status == "ready"
+    assert builder.is_current(feed)
+    served = builder.serve(feed)
+    assert served["recommendations"]["papers_for_you"] == [{"pmid": "1"}]
+    assert served["served_from"] == "precomputed"
+
+    # Rebuilding upserts the same row
+    asyncio.run(builder.build_feed(db, "u1"))
+    assert db.query(WeeklyRecommendationFeed).count() == 1
+
+
+def test_project_scope_is_separate(db, builder):
+    asyncio.run(builder.build_feed(db, "u1"))
+    asyncio.run(builder.build_feed(db, "u1", "p1"))
+
+    assert builder.get_feed(db, "u1", "p1").project_id == "p1"
+    assert builder.get_feed(db, "u1").project_id is None
+
+
+def test_saving_paper_marks_feeds_stale(db, builder):
+    asyncio.run(builder.build_feed(db, "u1"))
+    asyncio.run(builder.build_feed(db, "u2"))
+
+    _save_paper(db, "u1")
+    db.expire_all()
+
+    assert builder.get_feed(db, "u1").status == "stale"
+    assert builder.get_feed(db, "u2").status == "ready"
+
+
+def test_due_feeds(db, builder):
+    asyncio.run(builder.build_feed(db, "fresh"))
+    asyncio.run(builder.build_feed(db, "stale"))
+    asyncio.run(builder.build_feed(db, "last_week"))
+    _save_paper(db, "stale")
+    db.query(WeeklyRecommendationFeed).filter_by(user_id="last_week").update(
+        {"week_of": week_start() - timedelta(days=7)})
+    _save_paper(db, "new_user", pmid="2")
+    _save_paper(db, "dormant", pmid="3", added_at=datetime.now(timezone.utc) - timedelta(days=365))
+
+    due = builder.due_feeds(db)
+
+    assert sorted(due) == [("last_week", None), ("new_user", None), ("stale", None)]
+
+
+def test_build_feeds_runs_one_shared_batch(db, builder):
+    stats = asyncio.run(builder.build_feeds(db, [("u1", None), ("u2", None), ("u3", "p1")]))
+
+    assert stats == {"built": 3, "failed": 0}
+    assert builder.recommendations_service.batches == 1
+    assert [c[0] for c in builder.recommendations_service.calls] == ["u1", "u2", "u3"]
+
+
+def test_run_once_builds_due_feeds_when_tick_is_claimed(db, builder, monkeypatch):
+    _save_paper(db, "u1")
+    monkeypatch.setattr(weekly_feed_builder, "get_session_local",
+                        lambda: sessionmaker(bind=db.get_bind()))
+
+    stats = asyncio.run(builder.run_once())
+
+    assert stats == {"built": 1, "failed": 0}
+
+
+def test_run_once_skips_tick_held_by_another_worker(db, builder, monkeypatch):
+    _save_paper(db, "u1")
+
+    @contextmanager
+    def held_elsewhere(session):
+        yield False
+
+    monkeypatch.setattr(weekly_feed_builder, "get_session_local",
+                        lambda: sessionmaker(bind=db.get_bind()))
+    monkeypatch.setattr(weekly_feed_builder, "scheduler_lock", held_elsewhere)
+
+    stats = asyncio.run(builder.run_once())
+
+    assert stats["built"] == 0 and stats["skipped"] == 1
+    assert builder.recommendations_service.calls == []
+
+
+def test_pubmed_batch_reuses_identical_queries():
+    service = object.__new__(SpotifyInspiredRecommendationsService)
+    fetched = []
+
+    async def fake_fetch(query, max_results, sort):
+        fetched.append(query)
+        return [{"pmid": "1", "title": query}]
+
+    service._fetch_pubmed = fake_fetch
+
+    async def run():
+        with service.pubmed_batch():
+            first = await service._search_pubmed("kidney", 8, "date")
+            first[0]["relevance_score"] = 0.9  # callers mutate results
+            second = await service._search_pubmed("kidney", 8, "date")
+            await service._search_pubmed("heart", 8, "date")
+        await service._search_pubmed("kidney", 8, "date")
+        return second
+
+    second = asyncio.run(run())
+
+    assert fetched == ["kidney", "heart", "kidney"]
+    assert "relevance_score" not in second[0]
+    assert _pubmed_batch_cache.get() is None
+
+
+def test_interleaved_pubmed_batches_leave_no_cache_behind():
+    service = object.__new__(SpotifyInspiredRecommendationsService)
+    fetched = []
+
+    async def fake_fetch(query, max_results, sort):
+        fetched.append(query)
+        await asyncio.sleep(0)
+        return [{"pmid": "1", "title": query}]
+
+    service._fetch_pubmed = fake_fetch
+
+    async def batch(query, entered, release):
+        with service.pubmed_batch():
+            entered.set()
+            await release.wait()
+            await service._search_pubmed(query, 8, "date")
+            await service._search_pubmed(query, 8, "date")
+
+    async def run():
+        # A scheduler tick and a schedule_refresh task overlapping: the first
+        # exits its batch while the second is still inside its own
+        first_in, second_in, release_first, release_second = (asyncio.Event() for _ in range(4))
+        first = asyncio.create_task(batch("kidney", first_in, release_first))
+        await first_in.wait()
+        second = asyncio.create_task(batch("heart", second_in, release_second))
+        await second_in.wait()
+        release_first.set()
+        await first
+        release_second.set()
+        await second
+        await service._search_pubmed("kidney", 8, "date")
+        await service._search_pubmed("kidney", 8, "date")
+
+    asyncio.run(run())
+
+    assert fetched == ["kidney", "heart", "kidney", "kidney"]
+    assert _pubmed_batch_cache.get() is None
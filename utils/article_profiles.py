@@ -0,0 +1,96 @@
+"""
+Article Load Profiles
+Deferred-column loading for hot Article queries
+
+The `articles` table carries several large columns (abstract, pdf_text,
+pdf_tables, pdf_figures, ai_summary_expanded, citation PMID lists) that
+most list/graph endpoints never read. Hydrating full Article objects for
+hundreds of rows pulls all of them over the wire.
+
+This module defines named load profiles - the exact column set each hot
+call site needs - and two ways to apply them:
+- article_load_options(): load_only() option for ORM queries that still
+  need Article instances (remaining columns are deferred)
+- query_article_rows(): lightweight Row tuples with attribute access,
+  used where no ORM identity/unit-of-work is needed
+
+Profiles:
+- card:       list cards and candidate pools (no text bodies)
+- graph:      network graph nodes + citation lists
+- similarity: content/citation/author similarity scoring
+- pool:       recommendation agent paper pool (card + abstract)
+"""
+
+import logging
+from typing import Dict, List, Tuple
+
+from sqlalchemy.orm import Query, Session, load_only
+
+from database import Article
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# PROFILE DEFINITIONS
+# ============================================================================
+
+ARTICLE_LOAD_PROFILES: Dict[str, Tuple[str, ...]] = {
+    "card": (
+        "pmid", "title", "authors", "journal", "publication_year",
+        "doi", "citation_count",
+    ),
+    "graph": (
+        "pmid", "title", "authors", "journal", "publication_year",
+        "citation_count", "cited_by_pmids", "references_pmids",
+    ),
+    "similarity": (
+        "pmid", "title", "abstract", "authors", "journal", "publication_year",
+        "citation_count", "cited_by_pmids", "references_pmids",
+    ),
+    "pool": (
+        "pmid", "title", "abstract", "authors", "journal", "publication_year",
+        "citation_count",
+    ),
+}
+
+
+def get_profile_columns(profile: str) -> List:
+    """Return the Article column attributes for a named load profile"""
+    try:
+        names = ARTICLE_LOAD_PROFILES[profile]
+    except KeyError:
+        raise ValueError(
+            f"Unknown article load profile '{profile}'. "
+            f"Available: {', '.join(sorted(ARTICLE_LOAD_PROFILES))}"
+        )
+    return [getattr(Article, name) for name in names]
+
+
+# ============================================================================
+# QUERY HELPERS
+# ============================================================================
+
+def article_load_options(profile: str):
+    """
+    ORM loader option restricting an Article query to a profile's columns
+
+    Columns outside the profile are deferred and only fetched if accessed.
+
+    Usage:
+        articles = db.query(Article).options(article_load_options("graph")).all()
+    """
+    return load_only(*get_profile_columns(profile))
+
+
+def query_article_rows(db: Session, profile: str) -> Query:
+    """
+    Column query returning lightweight Row tuples for a profile
+
+    Rows support attribute access (row.pmid, row.title, ...) so they can be
+    passed to code written against Article objects, but skip ORM identity
+    map bookkeeping entirely.
+
+    Usage:
+        rows = query_article_rows(db, "similarity").filter(Article.pmid.in_(pmids)).all()
+    """
+    return db.query(*get_profile_columns(profile))